@@ -1,7 +1,7 @@
 """
 Interact with accounts on the Harmony blockchain
 """
-from .rpc.request import rpc_request
+from .rpc.request import rpc_request, rpc_stream
 
 from .rpc.exceptions import RPCError, RequestsError, RequestsTimeoutError
 
@@ -410,6 +410,78 @@ def get_transaction_history( # pylint: disable=too-many-arguments
         raise InvalidRPCReplyError( method, endpoint ) from exception
 
 
+def iter_transaction_history( # pylint: disable=too-many-arguments
+    address,
+    page=0,
+    page_size=1000,
+    include_full_tx=False,
+    tx_type="ALL",
+    order="ASC",
+    endpoint=DEFAULT_ENDPOINT,
+    timeout=DEFAULT_TIMEOUT,
+):
+    """Iterate over the transaction history of the account as they are read from the
+    reply.
+
+    Same as get_transaction_history, but only one transaction is held in memory at a time.
+
+    Parameters
+    ----------
+    address: str
+        Address to get transaction history for
+    page: :obj:`int`, optional
+        Page to request for pagination
+    page_size: :obj:`int`, optional
+        Size of page for pagination
+    include_full_tx: :obj:`bool`, optional
+        True to include full transaction data
+        False to just get the transaction hash
+    tx_type: :obj:`str`, optional
+        see get_transaction_history
+    order: :obj:`str`, optional
+        see get_transaction_history
+    endpoint: :obj:`str`, optional
+        Endpoint to send request to
+    timeout: :obj:`int`, optional
+        Timeout in seconds, to connect and between two reads
+
+    Yields
+    ------
+    Transactions (dict) if include_full_tx is True, else transaction hashes
+
+    Raises
+    ------
+    InvalidRPCReplyError
+        If received unknown result from endpoint
+
+    See Also
+    --------
+    get_transaction_history
+    """
+    params = [
+        {
+            "address": address,
+            "pageIndex": page,
+            "pageSize": page_size,
+            "fullTx": include_full_tx,
+            "txType": tx_type,
+            "order": order,
+        }
+    ]
+    method = "hmyv2_getTransactionsHistory"
+    try:
+        yield from rpc_stream(
+            method,
+            params = params,
+            path = ( "result",
+                     "transactions" ),
+            endpoint = endpoint,
+            timeout = timeout
+        )
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
 def get_staking_transaction_history( # pylint: disable=too-many-arguments
     address,
     page=0,
@@ -499,6 +571,78 @@ def get_staking_transaction_history( # pylint: disable=too-many-arguments
         raise InvalidRPCReplyError( method, endpoint ) from exception
 
 
+def iter_staking_transaction_history( # pylint: disable=too-many-arguments
+    address,
+    page=0,
+    page_size=1000,
+    include_full_tx=False,
+    tx_type="ALL",
+    order="ASC",
+    endpoint=DEFAULT_ENDPOINT,
+    timeout=DEFAULT_TIMEOUT,
+):
+    """Iterate over the staking transaction history of the account as they are read from the
+    reply.
+
+    Same as get_staking_transaction_history, but only one transaction is held in memory at a time.
+
+    Parameters
+    ----------
+    address: str
+        Address to get staking transaction history for
+    page: :obj:`int`, optional
+        Page to request for pagination
+    page_size: :obj:`int`, optional
+        Size of page for pagination
+    include_full_tx: :obj:`bool`, optional
+        True to include full transaction data
+        False to just get the transaction hash
+    tx_type: :obj:`str`, optional
+        see get_staking_transaction_history
+    order: :obj:`str`, optional
+        see get_staking_transaction_history
+    endpoint: :obj:`str`, optional
+        Endpoint to send request to
+    timeout: :obj:`int`, optional
+        Timeout in seconds, to connect and between two reads
+
+    Yields
+    ------
+    Transactions (dict) if include_full_tx is True, else transaction hashes
+
+    Raises
+    ------
+    InvalidRPCReplyError
+        If received unknown result from endpoint
+
+    See Also
+    --------
+    get_staking_transaction_history
+    """
+    params = [
+        {
+            "address": address,
+            "pageIndex": page,
+            "pageSize": page_size,
+            "fullTx": include_full_tx,
+            "txType": tx_type,
+            "order": order,
+        }
+    ]
+    method = "hmyv2_getStakingTransactionsHistory"
+    try:
+        yield from rpc_stream(
+            method,
+            params = params,
+            path = ( "result",
+                     "staking_transactions" ),
+            endpoint = endpoint,
+            timeout = timeout
+        )
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
 def get_balance_on_all_shards(
     address,
     skip_error = True,
@@ -517,8 +661,8 @@ def get_balance_on_all_shards(
         False to include errors when getting balance for shard
     endpoint: :obj:`str`, optional
         Endpoint to send request to
-    timeout: :obj:`int`, optional
-        Timeout in seconds per request
+    timeout: :obj:`int` or :obj:`~pyhmy.rpc.deadline.Deadline`, optional
+        Timeout in seconds per request, or deadline of the whole call
 
     Returns
     -------
@@ -573,8 +717,8 @@ def get_total_balance(
         Address to get balance for
     endpoint: :obj:`str`, optional
         Endpoint to send request to
-    timeout: :obj:`int`, optional
-        Timeout in seconds per request
+    timeout: :obj:`int` or :obj:`~pyhmy.rpc.deadline.Deadline`, optional
+        Timeout in seconds per request, or deadline of the whole call
 
     Returns
     -------
@@ -0,0 +1,13 @@
+"""
+Asyncio versions of the pyhmy query modules
+
+Every RPC function of :mod:`pyhmy.account`, :mod:`pyhmy.blockchain`,
+:mod:`pyhmy.staking`, :mod:`pyhmy.transaction` and :mod:`pyhmy.contract`
+has a coroutine twin with the same name, parameters and errors::
+
+    >>> import asyncio
+    >>> from pyhmy.aio import account
+    >>> asyncio.run( account.get_balance( address, endpoint = endpoint ) )
+
+Requires the optional `aiohttp` dependency (`pip install pyhmy[async]`).
+"""
@@ -0,0 +1,365 @@
+"""
+Async twins of :mod:`pyhmy.account`
+"""
+import asyncio
+
+from ..rpc.async_request import rpc_request, rpc_stream
+
+from ..rpc.exceptions import RPCError, RequestsError, RequestsTimeoutError
+
+from ..exceptions import InvalidRPCReplyError
+
+from ..account import is_valid_address  # pylint: disable=unused-import
+
+from .blockchain import get_sharding_structure
+
+from ..constants import DEFAULT_ENDPOINT, DEFAULT_TIMEOUT
+
+
+async def get_balance(
+    address,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.account.get_balance`."""
+    method = "hmyv2_getBalance"
+    params = [ address ]
+    try:
+        balance = (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+        return int( balance )
+    except TypeError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_balance_by_block(
+    address,
+    block_num,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.account.get_balance_by_block`."""
+    method = "hmyv2_getBalanceByBlockNumber"
+    params = [ address, block_num ]
+    try:
+        balance = (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+        return int( balance )
+    except TypeError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_account_nonce(
+    address,
+    block_num = "latest",
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.account.get_account_nonce`."""
+    method = "hmyv2_getAccountNonce"
+    params = [ address, block_num ]
+    try:
+        nonce = (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+        return int( nonce )
+    except TypeError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_nonce(
+    address,
+    block_num = "latest",
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.account.get_nonce`."""
+    return await get_account_nonce( address, block_num, endpoint, timeout )
+
+
+async def get_transaction_count(
+    address,
+    block_num,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.account.get_transaction_count`."""
+    method = "hmyv2_getTransactionCount"
+    params = [ address, block_num ]
+    try:
+        nonce = (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+        return int( nonce )
+    except TypeError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_transactions_count(
+    address,
+    tx_type,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.account.get_transactions_count`."""
+    method = "hmyv2_getTransactionsCount"
+    params = [ address, tx_type ]
+    try:
+        tx_count = (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+        return int( tx_count )
+    except TypeError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_staking_transactions_count(
+    address,
+    tx_type,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.account.get_staking_transactions_count`."""
+    method = "hmyv2_getStakingTransactionsCount"
+    params = [ address, tx_type ]
+    try:
+        tx_count = (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+        return int( tx_count )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_transaction_history(
+    address,
+    page = 0,
+    page_size = 1000,
+    include_full_tx = False,
+    tx_type = "ALL",
+    order = "ASC",
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.account.get_transaction_history`."""
+    params = [
+        {
+            "address": address,
+            "pageIndex": page,
+            "pageSize": page_size,
+            "fullTx": include_full_tx,
+            "txType": tx_type,
+            "order": order
+        }
+    ]
+    method = "hmyv2_getTransactionsHistory"
+    try:
+        tx_history = await rpc_request(
+            method,
+            params = params,
+            endpoint = endpoint,
+            timeout = timeout
+        )
+        return tx_history[ "result" ][ "transactions" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def iter_transaction_history(
+    address,
+    page = 0,
+    page_size = 1000,
+    include_full_tx = False,
+    tx_type = "ALL",
+    order = "ASC",
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+):
+    """Async version of :func:`pyhmy.account.iter_transaction_history`, an async
+    generator."""
+    params = [
+        {
+            "address": address,
+            "pageIndex": page,
+            "pageSize": page_size,
+            "fullTx": include_full_tx,
+            "txType": tx_type,
+            "order": order
+        }
+    ]
+    method = "hmyv2_getTransactionsHistory"
+    try:
+        async for transaction in rpc_stream(
+            method,
+            params = params,
+            path = ( "result",
+                     "transactions" ),
+            endpoint = endpoint,
+            timeout = timeout
+        ):
+            yield transaction
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_staking_transaction_history(
+    address,
+    page = 0,
+    page_size = 1000,
+    include_full_tx = False,
+    tx_type = "ALL",
+    order = "ASC",
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of
+    :func:`pyhmy.account.get_staking_transaction_history`."""
+    params = [
+        {
+            "address": address,
+            "pageIndex": page,
+            "pageSize": page_size,
+            "fullTx": include_full_tx,
+            "txType": tx_type,
+            "order": order
+        }
+    ]
+    method = "hmyv2_getStakingTransactionsHistory"
+    try:
+        stx_history = (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+        return stx_history[ "staking_transactions" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def iter_staking_transaction_history(
+    address,
+    page = 0,
+    page_size = 1000,
+    include_full_tx = False,
+    tx_type = "ALL",
+    order = "ASC",
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+):
+    """Async version of :func:`pyhmy.account.iter_staking_transaction_history`, an async
+    generator."""
+    params = [
+        {
+            "address": address,
+            "pageIndex": page,
+            "pageSize": page_size,
+            "fullTx": include_full_tx,
+            "txType": tx_type,
+            "order": order
+        }
+    ]
+    method = "hmyv2_getStakingTransactionsHistory"
+    try:
+        async for transaction in rpc_stream(
+            method,
+            params = params,
+            path = ( "result",
+                     "staking_transactions" ),
+            endpoint = endpoint,
+            timeout = timeout
+        ):
+            yield transaction
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_balance_on_all_shards(
+    address,
+    skip_error = True,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.account.get_balance_on_all_shards`.
+
+    The shards are queried concurrently.
+    """
+    sharding_structure = await get_sharding_structure(
+        endpoint = endpoint,
+        timeout = timeout
+    )
+
+    async def shard_balance( shard ):
+        try:
+            return {
+                "shard": shard[ "shardID" ],
+                "balance": await get_balance(
+                    address,
+                    endpoint = shard[ "http" ],
+                    timeout = timeout
+                ),
+            }
+        except ( KeyError, RPCError, RequestsError, RequestsTimeoutError ):
+            if skip_error:
+                return None
+            return {
+                "shard": shard[ "shardID" ],
+                "balance": None
+            }
+
+    balances = await asyncio.gather(
+        *[ shard_balance( shard ) for shard in sharding_structure ]
+    )
+    return [ balance for balance in balances if balance is not None ]
+
+
+async def get_total_balance(
+    address,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.account.get_total_balance`."""
+    try:
+        balances = await get_balance_on_all_shards(
+            address,
+            skip_error = False,
+            endpoint = endpoint,
+            timeout = timeout
+        )
+        return sum( b[ "balance" ] for b in balances )
+    except TypeError as exception:
+        raise RuntimeError from exception
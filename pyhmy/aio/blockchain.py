@@ -0,0 +1,816 @@
+"""
+Async twins of :mod:`pyhmy.blockchain`
+"""
+from ..rpc.async_request import rpc_request, rpc_stream
+
+from ..exceptions import InvalidRPCReplyError
+
+from ..constants import DEFAULT_ENDPOINT, DEFAULT_TIMEOUT
+
+
+async def get_bad_blocks(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.blockchain.get_bad_blocks`."""
+    method = "hmyv2_getCurrentBadBlocks"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def chain_id(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.blockchain.chain_id`."""
+    method = "hmyv2_chainId"
+    try:
+        data = await rpc_request(
+            method,
+            endpoint = endpoint,
+            timeout = timeout
+        )
+        return data[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_node_metadata(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.blockchain.get_node_metadata`."""
+    method = "hmyv2_getNodeMetadata"
+    try:
+        metadata = await rpc_request(
+            method,
+            endpoint = endpoint,
+            timeout = timeout
+        )
+        return metadata[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_peer_info(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.blockchain.get_peer_info`."""
+    method = "hmyv2_getPeerInfo"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def protocol_version(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.blockchain.protocol_version`."""
+    method = "hmyv2_protocolVersion"
+    try:
+        value = await rpc_request(
+            method,
+            endpoint = endpoint,
+            timeout = timeout
+        )
+        return value[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_num_peers(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.blockchain.get_num_peers`."""
+    method = "net_peerCount"
+    try:
+        return int(
+            (
+                await
+                rpc_request( method,
+                             endpoint = endpoint,
+                             timeout = timeout )
+            )[ "result" ],
+            16
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_version(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.blockchain.get_version`."""
+    method = "net_version"
+    try:
+        return int(
+            (
+                await
+                rpc_request( method,
+                             endpoint = endpoint,
+                             timeout = timeout )
+            )[ "result" ],
+            16
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def in_sync(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> bool:
+    """Async version of :func:`pyhmy.blockchain.in_sync`."""
+    method = "hmyv2_inSync"
+    try:
+        return bool(
+            (
+                await
+                rpc_request( method,
+                             endpoint = endpoint,
+                             timeout = timeout )
+            )[ "result" ]
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def beacon_in_sync(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> bool:
+    """Async version of :func:`pyhmy.blockchain.beacon_in_sync`."""
+    method = "hmyv2_beaconInSync"
+    try:
+        return bool(
+            (
+                await
+                rpc_request( method,
+                             endpoint = endpoint,
+                             timeout = timeout )
+            )[ "result" ]
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_staking_epoch(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.blockchain.get_staking_epoch`."""
+    method = "hmyv2_getNodeMetadata"
+    try:
+        data = (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+        return int( data[ "chain-config" ][ "staking-epoch" ] )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_prestaking_epoch(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.blockchain.get_prestaking_epoch`."""
+    method = "hmyv2_getNodeMetadata"
+    try:
+        data = (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+        return int( data[ "chain-config" ][ "prestaking-epoch" ] )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_shard(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.blockchain.get_shard`."""
+    method = "hmyv2_getNodeMetadata"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ][ "shard-id" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_sharding_structure(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.blockchain.get_sharding_structure`."""
+    method = "hmyv2_getShardingStructure"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_leader_address(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> str:
+    """Async version of :func:`pyhmy.blockchain.get_leader_address`."""
+    method = "hmyv2_getLeader"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def is_last_block(
+    block_num,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> bool:
+    """Async version of :func:`pyhmy.blockchain.is_last_block`."""
+    params = [ block_num ]
+    method = "hmyv2_isLastBlock"
+    try:
+        return bool(
+            (
+                await rpc_request(
+                    method,
+                    params = params,
+                    endpoint = endpoint,
+                    timeout = timeout
+                )
+            )[ "result" ]
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def epoch_last_block(
+    epoch,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.blockchain.epoch_last_block`."""
+    params = [ epoch ]
+    method = "hmyv2_epochLastBlock"
+    try:
+        return int(
+            (
+                await rpc_request(
+                    method,
+                    params = params,
+                    endpoint = endpoint,
+                    timeout = timeout
+                )
+            )[ "result" ]
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_circulating_supply(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.blockchain.get_circulating_supply`."""
+    method = "hmyv2_getCirculatingSupply"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_total_supply(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.blockchain.get_total_supply`."""
+    method = "hmyv2_getTotalSupply"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_block_number(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.blockchain.get_block_number`."""
+    method = "hmyv2_blockNumber"
+    try:
+        return int(
+            (
+                await
+                rpc_request( method,
+                             endpoint = endpoint,
+                             timeout = timeout )
+            )[ "result" ]
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_current_epoch(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.blockchain.get_current_epoch`."""
+    method = "hmyv2_getEpoch"
+    try:
+        return int(
+            (
+                await
+                rpc_request( method,
+                             endpoint = endpoint,
+                             timeout = timeout )
+            )[ "result" ]
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_last_cross_links(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.blockchain.get_last_cross_links`."""
+    method = "hmyv2_getLastCrossLinks"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_gas_price(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.blockchain.get_gas_price`."""
+    method = "hmyv2_gasPrice"
+    try:
+        return int(
+            (
+                await
+                rpc_request( method,
+                             endpoint = endpoint,
+                             timeout = timeout )
+            )[ "result" ]
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_latest_header(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.blockchain.get_latest_header`."""
+    method = "hmyv2_latestHeader"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_header_by_number(
+    block_num,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.blockchain.get_header_by_number`."""
+    method = "hmyv2_getHeaderByNumber"
+    params = [ block_num ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_latest_chain_headers(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.blockchain.get_latest_chain_headers`."""
+    method = "hmyv2_getLatestChainHeaders"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_block_by_number(
+    block_num,
+    full_tx = False,
+    include_tx = False,
+    include_staking_tx = False,
+    include_signers = False,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.blockchain.get_block_by_number`."""
+    params = [
+        block_num,
+        {
+            "inclTx": include_tx,
+            "fullTx": full_tx,
+            "inclStaking": include_staking_tx,
+            "withSigners": include_signers
+        }
+    ]
+    method = "hmyv2_getBlockByNumber"
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_block_by_hash(
+    block_hash,
+    full_tx = False,
+    include_tx = False,
+    include_staking_tx = False,
+    include_signers = False,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.blockchain.get_block_by_hash`."""
+    params = [
+        block_hash,
+        {
+            "inclTx": include_tx,
+            "fullTx": full_tx,
+            "inclStaking": include_staking_tx,
+            "withSigners": include_signers
+        }
+    ]
+    method = "hmyv2_getBlockByHash"
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_block_transaction_count_by_number(
+    block_num,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of
+    :func:`pyhmy.blockchain.get_block_transaction_count_by_number`."""
+    params = [ block_num ]
+    method = "hmyv2_getBlockTransactionCountByNumber"
+    try:
+        return int(
+            (
+                await rpc_request(
+                    method,
+                    params = params,
+                    endpoint = endpoint,
+                    timeout = timeout
+                )
+            )[ "result" ]
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_block_transaction_count_by_hash(
+    block_hash,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of
+    :func:`pyhmy.blockchain.get_block_transaction_count_by_hash`."""
+    params = [ block_hash ]
+    method = "hmyv2_getBlockTransactionCountByHash"
+    try:
+        return int(
+            (
+                await rpc_request(
+                    method,
+                    params = params,
+                    endpoint = endpoint,
+                    timeout = timeout
+                )
+            )[ "result" ]
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_block_staking_transaction_count_by_number(
+    block_num,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of
+    :func:`pyhmy.blockchain.get_block_staking_transaction_count_by_number`."""
+    params = [ block_num ]
+    method = "hmyv2_getBlockStakingTransactionCountByNumber"
+    try:
+        return int(
+            (
+                await rpc_request(
+                    method,
+                    params = params,
+                    endpoint = endpoint,
+                    timeout = timeout
+                )
+            )[ "result" ]
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_block_staking_transaction_count_by_hash(
+    block_hash,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of
+    :func:`pyhmy.blockchain.get_block_staking_transaction_count_by_hash`."""
+    params = [ block_hash ]
+    method = "hmyv2_getBlockStakingTransactionCountByHash"
+    try:
+        return int(
+            (
+                await rpc_request(
+                    method,
+                    params = params,
+                    endpoint = endpoint,
+                    timeout = timeout
+                )
+            )[ "result" ]
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_blocks(
+    start_block,
+    end_block,
+    full_tx = False,
+    include_tx = False,
+    include_staking_tx = False,
+    include_signers = False,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.blockchain.get_blocks`."""
+    params = [
+        start_block,
+        end_block,
+        {
+            "withSigners": include_signers,
+            "fullTx": full_tx,
+            "inclStaking": include_staking_tx,
+            "inclTx": include_tx
+        }
+    ]
+    method = "hmyv2_getBlocks"
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def iter_blocks(
+    start_block,
+    end_block,
+    full_tx = False,
+    include_tx = False,
+    include_staking_tx = False,
+    include_signers = False,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+):
+    """Async version of :func:`pyhmy.blockchain.iter_blocks`, an async
+    generator."""
+    params = [
+        start_block,
+        end_block,
+        {
+            "withSigners": include_signers,
+            "fullTx": full_tx,
+            "inclStaking": include_staking_tx,
+            "inclTx": include_tx
+        }
+    ]
+    method = "hmyv2_getBlocks"
+    try:
+        async for block in rpc_stream(
+            method,
+            params = params,
+            endpoint = endpoint,
+            timeout = timeout
+        ):
+            yield block
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_block_signers(
+    block_num,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.blockchain.get_block_signers`."""
+    params = [ block_num ]
+    method = "hmyv2_getBlockSigners"
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_block_signers_keys(
+    block_num,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.blockchain.get_block_signers_keys`."""
+    params = [ block_num ]
+    method = "hmyv2_getBlockSignerKeys"
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def is_block_signer(
+    block_num,
+    address,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> bool:
+    """Async version of :func:`pyhmy.blockchain.is_block_signer`."""
+    params = [ block_num, address ]
+    method = "hmyv2_isBlockSigner"
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_signed_blocks(
+    address,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> bool:
+    """Async version of :func:`pyhmy.blockchain.get_signed_blocks`."""
+    params = [ address ]
+    method = "hmyv2_getSignedBlocks"
+    try:
+        return int(
+            (
+                await rpc_request(
+                    method,
+                    params = params,
+                    endpoint = endpoint,
+                    timeout = timeout
+                )
+            )[ "result" ]
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_validators(
+    epoch,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.blockchain.get_validators`."""
+    params = [ epoch ]
+    method = "hmyv2_getValidators"
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_validator_keys(
+    epoch,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.blockchain.get_validator_keys`."""
+    params = [ epoch ]
+    method = "hmyv2_getValidatorKeys"
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
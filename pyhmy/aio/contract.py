@@ -0,0 +1,148 @@
+"""
+Async twins of :mod:`pyhmy.contract`
+"""
+from ..rpc.async_request import rpc_request
+
+from ..exceptions import InvalidRPCReplyError
+
+from .transaction import get_transaction_receipt
+
+from ..constants import DEFAULT_ENDPOINT, DEFAULT_TIMEOUT
+
+
+async def call(
+    to_address,
+    block_num,
+    from_address = None,
+    gas = None,
+    gas_price = None,
+    value = None,
+    data = None,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> str:
+    """Async version of :func:`pyhmy.contract.call`."""
+    params = [
+        {
+            "to": to_address,
+            "from": from_address,
+            "gas": gas,
+            "gasPrice": gas_price,
+            "value": value,
+            "data": data
+        },
+        block_num
+    ]
+    method = "hmyv2_call"
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def estimate_gas(
+    to_address,
+    from_address = None,
+    gas = None,
+    gas_price = None,
+    value = None,
+    data = None,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.contract.estimate_gas`."""
+    params = [
+        {
+            "to": to_address,
+            "from": from_address,
+            "gas": gas,
+            "gasPrice": gas_price,
+            "value": value,
+            "data": data
+        }
+    ]
+    method = "hmyv2_estimateGas"
+    try:
+        return int(
+            (
+                await rpc_request(
+                    method,
+                    params = params,
+                    endpoint = endpoint,
+                    timeout = timeout
+                )
+            )[ "result" ],
+            16
+        )
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_code(
+    address,
+    block_num,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> str:
+    """Async version of :func:`pyhmy.contract.get_code`."""
+    params = [ address, block_num ]
+    method = "hmyv2_getCode"
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_storage_at(
+    address,
+    key,
+    block_num,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> str:
+    """Async version of :func:`pyhmy.contract.get_storage_at`."""
+    params = [ address, key, block_num ]
+    method = "hmyv2_getStorageAt"
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_contract_address_from_hash(
+    tx_hash,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> str:
+    """Async version of
+    :func:`pyhmy.contract.get_contract_address_from_hash`."""
+    try:
+        return ( await get_transaction_receipt( tx_hash,
+                                                endpoint,
+                                                timeout ) )[ "contractAddress" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError(
+            "hmyv2_getTransactionReceipt",
+            endpoint
+        ) from exception
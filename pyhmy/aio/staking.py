@@ -0,0 +1,433 @@
+"""
+Async twins of :mod:`pyhmy.staking`
+"""
+from ..rpc.async_request import rpc_request
+
+from ..exceptions import InvalidRPCReplyError
+
+from ..constants import DEFAULT_ENDPOINT, DEFAULT_TIMEOUT
+
+
+async def get_all_validator_addresses(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.staking.get_all_validator_addresses`."""
+    method = "hmyv2_getAllValidatorAddresses"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_validator_information(
+    validator_addr,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.staking.get_validator_information`."""
+    method = "hmyv2_getValidatorInformation"
+    params = [ validator_addr ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_elected_validator_addresses(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of
+    :func:`pyhmy.staking.get_elected_validator_addresses`."""
+    method = "hmyv2_getElectedValidatorAddresses"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_validators(
+    epoch,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.staking.get_validators`."""
+    method = "hmyv2_getValidators"
+    params = [ epoch ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_validator_keys(
+    epoch,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.staking.get_validator_keys`."""
+    method = "hmyv2_getValidatorKeys"
+    params = [ epoch ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_validator_information_by_block_number(
+    validator_addr,
+    block_num,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+):
+    """Async version of
+    :func:`pyhmy.staking.get_validator_information_by_block_number`."""
+    method = "hmyv2_getValidatorInformationByBlockNumber"
+    params = [ validator_addr, block_num ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_all_validator_information(
+    page = 0,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.staking.get_all_validator_information`."""
+    method = "hmyv2_getAllValidatorInformation"
+    params = [ page ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_validator_self_delegation(
+    address,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.staking.get_validator_self_delegation`."""
+    method = "hmyv2_getValidatorSelfDelegation"
+    params = [ address ]
+    try:
+        return int(
+            (
+                await rpc_request(
+                    method,
+                    params = params,
+                    endpoint = endpoint,
+                    timeout = timeout
+                )
+            )[ "result" ]
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_validator_total_delegation(
+    address,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.staking.get_validator_total_delegation`."""
+    method = "hmyv2_getValidatorTotalDelegation"
+    params = [ address ]
+    try:
+        return int(
+            (
+                await rpc_request(
+                    method,
+                    params = params,
+                    endpoint = endpoint,
+                    timeout = timeout
+                )
+            )[ "result" ]
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_all_validator_information_by_block_number(
+    block_num,
+    page = 0,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of
+    :func:`pyhmy.staking.get_all_validator_information_by_block_number`."""
+    method = "hmyv2_getAllValidatorInformationByBlockNumber"
+    params = [ page, block_num ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_all_delegation_information(
+    page = 0,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.staking.get_all_delegation_information`."""
+    method = "hmyv2_getAllDelegationInformation"
+    params = [ page ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_delegations_by_delegator(
+    delegator_addr,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.staking.get_delegations_by_delegator`."""
+    method = "hmyv2_getDelegationsByDelegator"
+    params = [ delegator_addr ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_delegations_by_delegator_by_block_number(
+    delegator_addr,
+    block_num,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of
+    :func:`pyhmy.staking.get_delegations_by_delegator_by_block_number`."""
+    method = "hmyv2_getDelegationsByDelegatorByBlockNumber"
+    params = [ delegator_addr, block_num ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_delegation_by_delegator_and_validator(
+    delegator_addr,
+    validator_address,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of
+    :func:`pyhmy.staking.get_delegation_by_delegator_and_validator`."""
+    method = "hmyv2_getDelegationByDelegatorAndValidator"
+    params = [ delegator_addr, validator_address ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_available_redelegation_balance(
+    delegator_addr,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of
+    :func:`pyhmy.staking.get_available_redelegation_balance`."""
+    method = "hmyv2_getAvailableRedelegationBalance"
+    params = [ delegator_addr ]
+    try:
+        return int(
+            (
+                await rpc_request(
+                    method,
+                    params = params,
+                    endpoint = endpoint,
+                    timeout = timeout
+                )
+            )[ "result" ]
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_delegations_by_validator(
+    validator_addr,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.staking.get_delegations_by_validator`."""
+    method = "hmyv2_getDelegationsByValidator"
+    params = [ validator_addr ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_current_utility_metrics(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.staking.get_current_utility_metrics`."""
+    method = "hmyv2_getCurrentUtilityMetrics"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_staking_network_info(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.staking.get_staking_network_info`."""
+    method = "hmyv2_getStakingNetworkInfo"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_super_committees(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.staking.get_super_committees`."""
+    method = "hmyv2_getSuperCommittees"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_total_staking(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> int:
+    """Async version of :func:`pyhmy.staking.get_total_staking`."""
+    method = "hmyv2_getTotalStaking"
+    try:
+        return int(
+            (
+                await
+                rpc_request( method,
+                             endpoint = endpoint,
+                             timeout = timeout )
+            )[ "result" ]
+        )
+    except ( KeyError, TypeError ) as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_raw_median_stake_snapshot(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.staking.get_raw_median_stake_snapshot`."""
+    method = "hmyv2_getMedianRawStakeSnapshot"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
@@ -0,0 +1,428 @@
+"""
+Async twins of :mod:`pyhmy.transaction`
+"""
+import asyncio
+import random
+
+from ..rpc.async_request import rpc_request
+
+from ..rpc.deadline import as_deadline
+
+from ..rpc.exceptions import RequestsTimeoutError
+
+from ..exceptions import TxConfirmationTimedoutError, InvalidRPCReplyError
+
+from ..constants import DEFAULT_ENDPOINT, DEFAULT_TIMEOUT
+
+
+async def get_pending_transactions(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.transaction.get_pending_transactions`."""
+    method = "hmyv2_pendingTransactions"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_transaction_error_sink(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.transaction.get_transaction_error_sink`."""
+    method = "hmyv2_getCurrentTransactionErrorSink"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_pending_staking_transactions(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of
+    :func:`pyhmy.transaction.get_pending_staking_transactions`."""
+    method = "hmyv2_pendingStakingTransactions"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_staking_transaction_error_sink(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of
+    :func:`pyhmy.transaction.get_staking_transaction_error_sink`."""
+    method = "hmyv2_getCurrentStakingErrorSink"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_pool_stats(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.transaction.get_pool_stats`."""
+    method = "hmyv2_getPoolStats"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_transaction_by_hash(
+    tx_hash,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.transaction.get_transaction_by_hash`."""
+    method = "hmyv2_getTransactionByHash"
+    params = [ tx_hash ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_transaction_by_block_hash_and_index(
+    block_hash,
+    tx_index,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of
+    :func:`pyhmy.transaction.get_transaction_by_block_hash_and_index`."""
+    method = "hmyv2_getTransactionByBlockHashAndIndex"
+    params = [ block_hash, tx_index ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_transaction_by_block_number_and_index(
+    block_num,
+    tx_index,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of
+    :func:`pyhmy.transaction.get_transaction_by_block_number_and_index`."""
+    method = "hmyv2_getTransactionByBlockNumberAndIndex"
+    params = [ block_num, tx_index ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_transaction_receipt(
+    tx_hash,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.transaction.get_transaction_receipt`."""
+    method = "hmyv2_getTransactionReceipt"
+    params = [ tx_hash ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def send_raw_transaction(
+    signed_tx,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> str:
+    """Async version of :func:`pyhmy.transaction.send_raw_transaction`."""
+    params = [ signed_tx ]
+    method = "hmyv2_sendRawTransaction"
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def send_and_confirm_raw_transaction(
+    signed_tx,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of
+    :func:`pyhmy.transaction.send_and_confirm_raw_transaction`."""
+    deadline = as_deadline( timeout )
+    tx_hash = await send_raw_transaction(
+        signed_tx,
+        endpoint = endpoint,
+        timeout = deadline
+    )
+    try:
+        while not deadline.expired:
+            tx_response = await get_transaction_by_hash(
+                tx_hash,
+                endpoint = endpoint,
+                timeout = deadline
+            )
+            if tx_response is not None:
+                block_hash = tx_response.get( "blockHash", "0x00" )
+                unique_chars = "".join( set( list( block_hash[ 2 : ] ) ) )
+                if unique_chars != "0":
+                    return tx_response
+            await asyncio.sleep( deadline.cap( random.uniform( 0.2, 0.5 ) ) )
+    except RequestsTimeoutError as exception:
+        if not deadline.expired:
+            raise
+        raise TxConfirmationTimedoutError(
+            "Could not confirm transaction on-chain."
+        ) from exception
+    raise TxConfirmationTimedoutError(
+        "Could not confirm transaction on-chain."
+    )
+
+
+async def get_pending_cx_receipts(
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of :func:`pyhmy.transaction.get_pending_cx_receipts`."""
+    method = "hmyv2_getPendingCXReceipts"
+    try:
+        return (
+            await rpc_request( method,
+                               endpoint = endpoint,
+                               timeout = timeout )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_cx_receipt_by_hash(
+    cx_hash,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of :func:`pyhmy.transaction.get_cx_receipt_by_hash`."""
+    params = [ cx_hash ]
+    method = "hmyv2_getCXReceiptByHash"
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def resend_cx_receipt(
+    cx_hash,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> bool:
+    """Async version of :func:`pyhmy.transaction.resend_cx_receipt`."""
+    method = "hmyv2_resendCx"
+    params = [ cx_hash ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_staking_transaction_by_hash(
+    tx_hash,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of
+    :func:`pyhmy.transaction.get_staking_transaction_by_hash`."""
+    method = "hmyv2_getStakingTransactionByHash"
+    params = [ tx_hash ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_staking_transaction_by_block_hash_and_index(
+    block_hash,
+    tx_index,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of
+    :func:`pyhmy.transaction.get_staking_transaction_by_block_hash_and_index`."""
+    method = "hmyv2_getStakingTransactionByBlockHashAndIndex"
+    params = [ block_hash, tx_index ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def get_staking_transaction_by_block_number_and_index(
+    block_num,
+    tx_index,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> dict:
+    """Async version of
+    :func:`pyhmy.transaction.get_staking_transaction_by_block_number_and_index`."""
+    method = "hmyv2_getStakingTransactionByBlockNumberAndIndex"
+    params = [ block_num, tx_index ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def send_raw_staking_transaction(
+    raw_tx,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> str:
+    """Async version of
+    :func:`pyhmy.transaction.send_raw_staking_transaction`."""
+    method = "hmyv2_sendRawStakingTransaction"
+    params = [ raw_tx ]
+    try:
+        return (
+            await rpc_request(
+                method,
+                params = params,
+                endpoint = endpoint,
+                timeout = timeout
+            )
+        )[ "result" ]
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+async def send_and_confirm_raw_staking_transaction(
+    signed_tx,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> list:
+    """Async version of
+    :func:`pyhmy.transaction.send_and_confirm_raw_staking_transaction`."""
+    deadline = as_deadline( timeout )
+    tx_hash = await send_raw_staking_transaction(
+        signed_tx,
+        endpoint = endpoint,
+        timeout = deadline
+    )
+    try:
+        while not deadline.expired:
+            tx_response = await get_staking_transaction_by_hash(
+                tx_hash,
+                endpoint = endpoint,
+                timeout = deadline
+            )
+            if tx_response is not None:
+                block_hash = tx_response.get( "blockHash", "0x00" )
+                unique_chars = "".join( set( list( block_hash[ 2 : ] ) ) )
+                if unique_chars != "0":
+                    return tx_response
+            await asyncio.sleep( deadline.cap( random.uniform( 0.2, 0.5 ) ) )
+    except RequestsTimeoutError as exception:
+        if not deadline.expired:
+            raise
+        raise TxConfirmationTimedoutError(
+            "Could not confirm transaction on-chain."
+        ) from exception
+    raise TxConfirmationTimedoutError(
+        "Could not confirm transaction on-chain."
+    )
@@ -0,0 +1,439 @@
+"""
+Resumable backfill of the blocks of one or more shards into a sink
+
+Each shard runs a pipeline of three stages linked by bounded queues, so a
+slow stage holds back the ones before it instead of filling memory:
+
+* fetch: blocks in order, in parallel adaptive chunks, see
+  :obj:`~pyhmy.block_range.BlockRangeFetcher`
+* decode: an optional function applied to each block
+* sink: batches of decoded blocks written to the :obj:`Sink`, after which
+  the checkpoint of the shard is saved
+
+A backfill started again resumes after the checkpoint of each shard::
+
+    >>> backfill = Backfill(
+    ...     { 0: "https://api.s0.t.hmny.io", 1: "https://api.s1.t.hmny.io" },
+    ...     sink = MySink(),
+    ...     checkpoints = FileCheckpoints( "checkpoints.json" ),
+    ... )
+    >>> backfill.run()
+
+A crash between a write to the sink and the save of the checkpoint would
+deliver that batch again. Sinks that report the last block they durably
+hold with :meth:`Sink.committed` (e.g. stored in the same transaction as
+the blocks) never get a block twice, nor miss one.
+"""
+import abc
+import json
+import os
+import queue
+import tempfile
+import threading
+
+from .block_range import AdaptiveChunker, BlockRangeFetcher
+
+from .blockchain import get_block_number
+
+from .exceptions import BackfillGapError
+
+from .constants import DEFAULT_TIMEOUT
+
+# end of the blocks of a stage
+_DONE = object()
+
+
+class Checkpoints:
+    """Durable last delivered block of every shard, kept in memory; see
+    :obj:`FileCheckpoints` for one surviving restarts."""
+    def __init__( self ):
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+    def load( self, shard ):
+        """Last block delivered for the shard, None if none was."""
+        with self._lock:
+            return self._blocks.get( shard )
+
+    def save( self, shard, block_number ):
+        """Record that the blocks of the shard up to `block_number` were
+        delivered."""
+        with self._lock:
+            self._blocks[ shard ] = block_number
+
+
+class FileCheckpoints( Checkpoints ):
+    """Checkpoints stored in a JSON file, replaced atomically (and synced
+    to disk) on each save.
+
+    Parameters
+    ----------
+    path: str
+        Path of the file, created on the first save
+    """
+    def __init__( self, path ):
+        super().__init__()
+        self.path = os.fspath( path )
+        if os.path.exists( self.path ):
+            with open( self.path, encoding = "utf-8" ) as file:
+                self._blocks = {
+                    int( shard ): block
+                    for shard, block in json.load( file ).items()
+                }
+
+    def save( self, shard, block_number ):
+        with self._lock:
+            self._blocks[ shard ] = block_number
+            directory = os.path.dirname( os.path.abspath( self.path ) )
+            handle, temporary = tempfile.mkstemp(
+                dir = directory,
+                prefix = ".checkpoints"
+            )
+            try:
+                with os.fdopen( handle, "w", encoding = "utf-8" ) as file:
+                    json.dump(
+                        {
+                            str( shard ): block
+                            for shard, block in self._blocks.items()
+                        },
+                        file
+                    )
+                    file.flush()
+                    os.fsync( file.fileno() )
+                os.replace( temporary, self.path )
+            except BaseException:
+                if os.path.exists( temporary ):
+                    os.remove( temporary )
+                raise
+
+
+class Sink( abc.ABC ):
+    """Destination of the backfilled blocks."""
+    @abc.abstractmethod
+    def write( self, shard, blocks ):
+        """Store a batch of decoded blocks of the shard, in block order.
+
+        Parameters
+        ----------
+        shard: int
+        blocks: list of ( int, object )
+            Block numbers and decoded blocks
+        """
+
+    @abc.abstractmethod
+    def committed( self, shard ):
+        """Last block of the shard durably stored by the sink, None if
+        unknown. Backfills resume after the latest of this and the
+        checkpoint."""
+        return None
+
+
+class _FunctionSink( Sink ):
+    def __init__( self, func ):
+        self.func = func
+
+    def write( self, shard, blocks ):
+        self.func( shard, blocks )
+
+    def committed( self, shard ):
+        return None
+
+
+class _Stopped( Exception ):
+    pass
+
+
+class _ShardPipeline:
+    """Threads and queues of the stages of a shard."""
+    def __init__( self, backfill, shard, endpoint, start, end ):
+        self.backfill = backfill
+        self.shard = shard
+        self.endpoint = endpoint
+        self.start = start
+        self.end = end
+        self.decoded = queue.Queue( backfill.queue_size )
+        self.fetched = queue.Queue( backfill.queue_size )
+        self.counts = {
+            "fetched": 0,
+            "decoded": 0,
+            "delivered": 0
+        }
+        self.checkpoint = start - 1
+        self.fetcher = None
+
+    def _put( self, stage, item ):
+        while True:
+            if self.backfill.stopping.is_set():
+                raise _Stopped()
+            try:
+                stage.put( item, timeout = 0.1 )
+                return
+            except queue.Full:
+                continue
+
+    def _get( self, stage ):
+        while True:
+            if self.backfill.stopping.is_set():
+                raise _Stopped()
+            try:
+                return stage.get( timeout = 0.1 )
+            except queue.Empty:
+                continue
+
+    def fetch( self ):
+        backfill = self.backfill
+        self.fetcher = BlockRangeFetcher(
+            endpoint = self.endpoint,
+            timeout = backfill.timeout,
+            workers = backfill.workers,
+            chunker = AdaptiveChunker( initial = backfill.batch_size ),
+            **backfill.options,
+        )
+        blocks = self.fetcher.fetch( self.start, self.end )
+        try:
+            for block in blocks:
+                self._put( self.fetched, block )
+                self.counts[ "fetched" ] += 1
+        finally:
+            blocks.close()
+        self._put( self.fetched, _DONE )
+
+    def decode( self ):
+        decode = self.backfill.decode
+        while True:
+            block = self._get( self.fetched )
+            if block is _DONE:
+                break
+            number = block[ "number" ]
+            if isinstance( number, str ):
+                number = int( number, 16 )
+            item = ( number, block if decode is None else decode( block ) )
+            self._put( self.decoded, item )
+            self.counts[ "decoded" ] += 1
+        self._put( self.decoded, _DONE )
+
+    def deliver( self ):
+        backfill = self.backfill
+        batch = []
+        try:
+            while True:
+                item = self._get( self.decoded )
+                if item is not _DONE:
+                    batch.append( item )
+                full = len( batch ) >= backfill.batch_size
+                if batch and ( full or item is _DONE ):
+                    self._write( batch )
+                    batch = []
+                if item is _DONE:
+                    return
+        except _Stopped:
+            # what was decoded before the stop is delivered
+            while True:
+                try:
+                    item = self.decoded.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _DONE:
+                    batch.append( item )
+            if batch:
+                self._write( batch )
+            raise
+
+    def _write( self, batch ):
+        # blocks up to the checkpoint are never delivered twice
+        batch = [ item for item in batch if item[ 0 ] > self.checkpoint ]
+        if not batch:
+            return
+        # nor is one missed: the blocks before a gap are delivered, then
+        # the gap fails the backfill
+        gap = None
+        for index, ( number, _ ) in enumerate( batch ):
+            expected = self.checkpoint + 1 + index
+            if number != expected:
+                gap = BackfillGapError( self.shard, expected, number )
+                batch = batch[ : index ]
+                break
+        if batch:
+            backfill = self.backfill
+            with backfill.sink_lock:
+                backfill.sink.write( self.shard, batch )
+            self.checkpoint = batch[ -1 ][ 0 ]
+            backfill.checkpoints.save( self.shard, self.checkpoint )
+            self.counts[ "delivered" ] += len( batch )
+        if gap is not None:
+            raise gap
+
+    def stats( self ) -> dict:
+        return {
+            **self.counts,
+            "start": self.start,
+            "end": self.end,
+            "checkpoint": self.checkpoint,
+            "fetched_queue": self.fetched.qsize(),
+            "decoded_queue": self.decoded.qsize(),
+        }
+
+
+class Backfill:
+    """Resumable backfill of shards from `start_block` to `end_block`.
+
+    Parameters
+    ----------
+    endpoints: dict or list
+        Shard to endpoint (or :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool`),
+        a list for shards 0, 1, ...
+    sink: :obj:`Sink` or callable
+        Destination of the blocks; a callable is called with the shard and
+        the batch, see :meth:`Sink.write`
+    checkpoints: :obj:`Checkpoints`, optional
+        Checkpoints of the shards, in memory only if None
+    start_block: :obj:`int`, optional
+        First block of every shard when there is no checkpoint
+    end_block: :obj:`int`, optional
+        Last block of every shard, the head of each shard when the backfill
+        starts if None
+    decode: callable, optional
+        Applied to each block before it is delivered, in a stage of its own
+    batch_size: :obj:`int`, optional
+        Blocks written to the sink at once, and initial fetch chunk size
+    queue_size: :obj:`int`, optional
+        Blocks waiting between two stages, above which a stage waits
+    workers: :obj:`int`, optional
+        Chunks fetched in parallel per shard
+    timeout: :obj:`int`, optional
+        Timeout of each request in seconds
+    full_tx: :obj:`bool`, optional
+        Include full transactions data for the blocks
+    include_tx: :obj:`bool`, optional
+        Include regular transactions for the blocks
+    include_staking_tx: :obj:`bool`, optional
+        Include staking transactions for the blocks
+    include_signers: :obj:`bool`, optional
+        Include list of signers for the blocks
+    """
+    def __init__( # pylint: disable=too-many-arguments
+        self,
+        endpoints,
+        sink,
+        checkpoints = None,
+        start_block = 0,
+        end_block = None,
+        decode = None,
+        batch_size = 100,
+        queue_size = 1000,
+        workers = 4,
+        timeout = DEFAULT_TIMEOUT,
+        full_tx = False,
+        include_tx = False,
+        include_staking_tx = False,
+        include_signers = False,
+    ):
+        if not isinstance( endpoints, dict ):
+            endpoints = dict( enumerate( endpoints ) )
+        if not isinstance( sink, Sink ):
+            if not callable( sink ):
+                raise TypeError( f"invalid type {sink.__class__}" )
+            sink = _FunctionSink( sink )
+        self.endpoints = endpoints
+        self.sink = sink
+        self.checkpoints = checkpoints or Checkpoints()
+        self.start_block = start_block
+        self.end_block = end_block
+        self.decode = decode
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.workers = workers
+        self.timeout = timeout
+        self.options = {
+            "full_tx": full_tx,
+            "include_tx": include_tx,
+            "include_staking_tx": include_staking_tx,
+            "include_signers": include_signers,
+        }
+        self.sink_lock = threading.Lock()
+        self.stopping = threading.Event()
+        self._pipelines = {}
+        self._errors = []
+
+    def _resume( self, shard ) -> int:
+        """First block of the shard not delivered yet."""
+        checkpoint = self.checkpoints.load( shard )
+        committed = self.sink.committed( shard )
+        done = [
+            block for block in [ checkpoint, committed ] if block is not None
+        ]
+        return max( done ) + 1 if done else self.start_block
+
+    def _run_stage( self, stage ):
+        try:
+            stage()
+        except _Stopped:
+            pass
+        except BaseException as err:  # pylint: disable=broad-except
+            self._errors.append( err )
+            self.stopping.set()
+
+    def run( self ) -> dict:
+        """Backfill every shard up to its end block, resuming after the
+        checkpoints.
+
+        Returns
+        -------
+        dict
+            Shard to its stats, see :meth:`stats`
+
+        Raises
+        ------
+        BackfillGapError
+            If the blocks of a shard skip one, after delivering those
+            before the gap
+        Exception
+            The first error of a stage, after the blocks decoded before it
+            were delivered
+        """
+        self.stopping.clear()
+        self._errors = []
+        self._pipelines = {}
+        threads = []
+        for shard, endpoint in self.endpoints.items():
+            end = self.end_block
+            if end is None:
+                end = get_block_number(
+                    endpoint = endpoint,
+                    timeout = self.timeout
+                )
+            pipeline = _ShardPipeline(
+                self,
+                shard,
+                endpoint,
+                self._resume( shard ),
+                end
+            )
+            self._pipelines[ shard ] = pipeline
+            for stage in ( pipeline.fetch, pipeline.decode, pipeline.deliver ):
+                thread = threading.Thread(
+                    target = self._run_stage,
+                    args = [ stage ],
+                    name = f"pyhmy-backfill-{shard}-{stage.__name__}",
+                    daemon = True,
+                )
+                thread.start()
+                threads.append( thread )
+        for thread in threads:
+            thread.join()
+        if self._errors:
+            raise self._errors[ 0 ]
+        return self.stats()
+
+    def stop( self ):
+        """Stop a running backfill, after delivering the blocks already
+        decoded."""
+        self.stopping.set()
+
+    def stats( self ) -> dict:
+        """Blocks fetched, decoded and delivered, queue lengths and
+        checkpoint of every shard."""
+        return {
+            shard: pipeline.stats()
+            for shard, pipeline in self._pipelines.items()
+        }
@@ -0,0 +1,382 @@
+"""
+Fetch large block ranges in parallel chunks, in order
+
+:func:`pyhmy.blockchain.get_blocks` sends a single `hmyv2_getBlocks` call
+for the whole range, which times out or returns a huge reply for large
+ranges. :obj:`BlockRangeFetcher` splits the range into chunks sized by the
+latency and size of the previous replies, fetches them in parallel (across
+the nodes of an :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool` if given
+one), splits or retries the chunks that fail, and yields the blocks in
+order::
+
+    >>> for block in fetch_blocks( 1, 1000000, workers = 8, endpoint = pool ):
+    ...     process( block )
+"""
+import collections
+import concurrent.futures
+import contextvars
+import threading
+import time
+
+from .rpc.exceptions import RequestsError, RequestsTimeoutError, RPCError
+
+from .rpc.request import base_request, decode
+
+from .exceptions import InvalidRPCReplyError
+
+from .constants import DEFAULT_ENDPOINT, DEFAULT_TIMEOUT
+
+METHOD = "hmyv2_getBlocks"
+
+
+def _number( block ):
+    """Number of a block of a reply, None if it has none."""
+    number = block.get( "number" ) if isinstance( block, dict ) else None
+    if isinstance( number, str ):
+        try:
+            return int( number, 16 )
+        except ValueError:
+            return None
+    return number
+
+
+class AdaptiveChunker:
+    """Size of the next chunk of a range, adjusted after each reply so that
+    a chunk takes about `target_seconds` and `target_bytes`.
+
+    Each reply scales the size by the ratio of the targets to what was
+    measured, by at most `max_growth` up or down, within [`minimum`,
+    `maximum`]. Failures halve it.
+
+    Parameters
+    ----------
+    initial: :obj:`int`, optional
+        Size of the first chunks, in blocks
+    minimum: :obj:`int`, optional
+    maximum: :obj:`int`, optional
+    target_seconds: :obj:`float`, optional
+        Target latency of a chunk
+    target_bytes: :obj:`int`, optional
+        Target reply size of a chunk, None for no target
+    max_growth: :obj:`float`, optional
+        Largest factor the size changes by after a reply
+    """
+    def __init__(
+        self,
+        initial = 100,
+        minimum = 1,
+        maximum = 1000,
+        target_seconds = 2.0,
+        target_bytes = 4 * 1024 * 1024,
+        max_growth = 2.0,
+    ):
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError(
+                "chunk sizes must be 1 <= minimum <= initial <= maximum"
+            )
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+        self.target_bytes = target_bytes
+        self.max_growth = max_growth
+        self._size = initial
+        self._lock = threading.Lock()
+
+    @property
+    def size( self ) -> int:
+        """Size of the next chunk, in blocks."""
+        return self._size
+
+    def _set( self, size ):
+        self._size = max( self.minimum, min( self.maximum, int( size ) ) )
+
+    def record( self, size, seconds, nbytes ):
+        """Adjust to the reply of a chunk of `size` blocks that took
+        `seconds` and `nbytes`."""
+        ratio = self.target_seconds / max( seconds, 1e-3 )
+        if self.target_bytes:
+            ratio = min( ratio, self.target_bytes / max( nbytes, 1 ) )
+        ratio = max( 1 / self.max_growth, min( self.max_growth, ratio ) )
+        with self._lock:
+            self._set( max( 1, round( size * ratio ) ) )
+
+    def shrink( self ):
+        """Halve the size after a failed chunk."""
+        with self._lock:
+            self._set( self._size // 2 )
+
+
+class BlockRangeFetcher:
+    """Parallel, adaptive and in order fetcher of block ranges.
+
+    Chunks failing with a request or RPC error (e.g. a timeout or a range
+    the node refuses) are split in two and fetched again; single blocks are
+    retried `max_retries` times with exponential backoff before the error is
+    raised. A reply stopping short of the end of its chunk is kept and the
+    rest of the chunk fetched again; any other reply that is not the blocks
+    of the chunk in order fails like an RPC error. At most `workers` chunks
+    are in flight and `buffered` chunks wait to be yielded, bounding memory
+    when the consumer is slower than the node.
+
+    Parameters
+    ----------
+    endpoint: :obj:`str` or :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool`, optional
+        Endpoint (or pool of endpoints) to send the requests to
+    timeout: :obj:`int`, optional
+        Timeout of each chunk in seconds
+    workers: :obj:`int`, optional
+        Chunks fetched in parallel
+    chunker: :obj:`AdaptiveChunker`, optional
+        Chunk sizes, adaptive from 100 blocks if None
+    max_retries: :obj:`int`, optional
+        Retries of a single block that fails
+    backoff: :obj:`float`, optional
+        Delay before the first retry of a single block, doubled after each
+    buffered: :obj:`int`, optional
+        Fetched chunks waiting to be yielded, twice `workers` if None
+    full_tx: :obj:`bool`, optional
+        Include full transactions data for the blocks
+    include_tx: :obj:`bool`, optional
+        Include regular transactions for the blocks
+    include_staking_tx: :obj:`bool`, optional
+        Include staking transactions for the blocks
+    include_signers: :obj:`bool`, optional
+        Include list of signers for the blocks
+    """
+    split_on = (
+        RequestsError,
+        RequestsTimeoutError,
+        RPCError,
+        InvalidRPCReplyError
+    )
+
+    def __init__( # pylint: disable=too-many-arguments
+        self,
+        endpoint = DEFAULT_ENDPOINT,
+        timeout = DEFAULT_TIMEOUT,
+        workers = 4,
+        chunker = None,
+        max_retries = 3,
+        backoff = 0.5,
+        buffered = None,
+        full_tx = False,
+        include_tx = False,
+        include_staking_tx = False,
+        include_signers = False,
+    ):
+        if workers < 1:
+            raise ValueError( "workers must be at least 1" )
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.workers = workers
+        self.chunker = chunker or AdaptiveChunker()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.buffered = buffered or 2 * workers
+        self.options = {
+            "withSigners": include_signers,
+            "fullTx": full_tx,
+            "inclStaking": include_staking_tx,
+            "inclTx": include_tx,
+        }
+        self._lock = threading.Lock()
+        self._stats = collections.Counter()
+
+    def stats( self ) -> dict:
+        """Counters of the chunks, blocks and bytes fetched, and of the
+        splits and retries of failed chunks."""
+        with self._lock:
+            stats = {
+                key: self._stats[ key ]
+                for key in ( "chunks", "blocks", "bytes", "splits", "retries" )
+            }
+        stats[ "chunk_size" ] = self.chunker.size
+        return stats
+
+    def _count( self, **counts ):
+        with self._lock:
+            self._stats.update( counts )
+
+    def _fetch_chunk( self, start, end, attempt ) -> list:
+        """Blocks from `start` to at most `end`, see :meth:`_check`."""
+        if attempt:
+            time.sleep( self.backoff * 2**( attempt - 1 ) )
+        began = time.perf_counter()
+        raw_resp = base_request(
+            METHOD,
+            [ start,
+              end,
+              self.options ],
+            endpoint = self.endpoint,
+            timeout = self.timeout
+        )
+        seconds = time.perf_counter() - began
+        try:
+            blocks = decode( METHOD, self.endpoint, raw_resp )[ "result" ]
+        except KeyError as exception:
+            raise InvalidRPCReplyError( METHOD, self.endpoint ) from exception
+        blocks = self._check( start, end, blocks )
+        self.chunker.record( end - start + 1, seconds, len( raw_resp ) )
+        self._count(
+            chunks = 1,
+            blocks = len( blocks ),
+            bytes = len( raw_resp )
+        )
+        return blocks
+
+    def _check( self, start, end, blocks ) -> list:
+        """Blocks of the reply to the chunk from `start` to `end`, which
+        may stop short of `end`.
+
+        Raises
+        ------
+        InvalidRPCReplyError
+            Unless the reply has one or more blocks, numbered from `start`
+            on with no gap and none after `end`
+        """
+        if not isinstance( blocks, list ):
+            raise InvalidRPCReplyError( METHOD, self.endpoint )
+        if not 0 < len( blocks ) <= end - start + 1:
+            raise InvalidRPCReplyError( METHOD, self.endpoint )
+        for number, block in enumerate( blocks, start ):
+            if _number( block ) != number:
+                raise InvalidRPCReplyError( METHOD, self.endpoint )
+        return blocks
+
+    def fetch( self, start_block, end_block ):
+        """Yield the blocks from `start_block` to `end_block` (inclusive) in
+        order.
+
+        Raises
+        ------
+        RPCError
+            If a block could not be fetched, after its retries
+        RequestsTimeoutError
+            If a block timed out, after its retries
+        RequestsError
+            If a block could not be fetched, after its retries
+        InvalidRPCReplyError
+            If the reply of a block was not that block, after its retries
+        """
+        if end_block < start_block:
+            return
+        executor = concurrent.futures.ThreadPoolExecutor(
+            self.workers,
+            thread_name_prefix = "pyhmy-blocks"
+        )
+        pending = {}
+        # ( start, end, attempt ) of split and retried chunks
+        retries = collections.deque()
+        # start to ( end, blocks ) of fetched chunks
+        fetched = {}
+        cursor = position = start_block
+        try:
+            while position <= end_block:
+                while len( pending ) < self.workers:
+                    if retries:
+                        start, end, attempt = retries.popleft()
+                    elif cursor <= end_block and len( fetched ) < self.buffered:
+                        start, attempt = cursor, 0
+                        end = min( end_block, cursor + self.chunker.size - 1 )
+                        cursor = end + 1
+                    else:
+                        break
+                    future = executor.submit(
+                        contextvars.copy_context().run,
+                        self._fetch_chunk,
+                        start,
+                        end,
+                        attempt
+                    )
+                    pending[ future ] = ( start, end, attempt )
+                done, _ = concurrent.futures.wait(
+                    pending,
+                    return_when = concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    start, end, attempt = pending.pop( future )
+                    try:
+                        blocks = future.result()
+                    except self.split_on as err:
+                        self._retry( retries, start, end, attempt, err )
+                        continue
+                    last = start + len( blocks ) - 1
+                    fetched[ start ] = ( last, blocks )
+                    if last < end:
+                        # short reply, fetch the rest of the chunk again
+                        retries.appendleft( ( last + 1, end, 0 ) )
+                while position in fetched:
+                    end, blocks = fetched.pop( position )
+                    position = end + 1
+                    yield from blocks
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown( wait = False )
+
+    def _retry( self, retries, start, end, attempt, error ):
+        """Queue the halves of a failed chunk, or the failed block again;
+        raises the error of a block out of retries."""
+        if end > start:
+            middle = ( start + end ) // 2
+            retries.appendleft( ( middle + 1, end, 0 ) )
+            retries.appendleft( ( start, middle, 0 ) )
+            self.chunker.shrink()
+            self._count( splits = 1 )
+        elif attempt < self.max_retries:
+            retries.appendleft( ( start, end, attempt + 1 ) )
+            self._count( retries = 1 )
+        else:
+            raise error
+
+
+def fetch_blocks( # pylint: disable=too-many-arguments
+    start_block,
+    end_block,
+    full_tx=False,
+    include_tx=False,
+    include_staking_tx=False,
+    include_signers=False,
+    workers=4,
+    endpoint=DEFAULT_ENDPOINT,
+    timeout=DEFAULT_TIMEOUT,
+):
+    """Yield the blocks of a range in order, fetched in parallel adaptive
+    chunks, see :obj:`BlockRangeFetcher`.
+
+    Parameters
+    ----------
+    start_block: :obj:`int`
+        First block to fetch (inclusive)
+    end_block: :obj:`int`
+        Last block to fetch (inclusive)
+    full_tx: :obj:`bool`, optional
+        Include full transactions data for the block
+    include_tx: :obj:`bool`, optional
+        Include regular transactions for the block
+    include_staking_tx: :obj:`bool`, optional
+        Include staking transactions for the block
+    include_signers: :obj:`bool`, optional
+        Include list of signers for the block
+    workers: :obj:`int`, optional
+        Chunks fetched in parallel
+    endpoint: :obj:`str` or :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool`, optional
+        Endpoint (or pool of endpoints) to send the requests to
+    timeout: :obj:`int`, optional
+        Timeout of each chunk in seconds
+
+    Yields
+    ------
+    Blocks, see :func:`pyhmy.blockchain.get_block_by_number` for their
+    structure
+    """
+    fetcher = BlockRangeFetcher(
+        endpoint = endpoint,
+        timeout = timeout,
+        workers = workers,
+        full_tx = full_tx,
+        include_tx = include_tx,
+        include_staking_tx = include_staking_tx,
+        include_signers = include_signers,
+    )
+    yield from fetcher.fetch( start_block, end_block )
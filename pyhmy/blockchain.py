@@ -3,9 +3,17 @@ Interact with the Harmony blockchain to fetch
 blocks, headers, transaction pool, node status, etc.
 """
 # pylint: disable=too-many-lines
-from .rpc.request import rpc_request
+import collections
+import threading
+import time
 
-from .exceptions import InvalidRPCReplyError
+from .rpc import settings
+
+from .rpc.exceptions import RequestsError, RequestsTimeoutError, RPCError
+
+from .rpc.request import rpc_request, rpc_stream
+
+from .exceptions import InvalidRPCReplyError, ReorgTooDeepError
 
 from .constants import DEFAULT_ENDPOINT, DEFAULT_TIMEOUT
 
@@ -1388,6 +1396,9 @@ def get_blocks( # pylint: disable=too-many-arguments
 ) -> list:
     """Get list of blocks from a range.
 
+    The range is fetched with a single request, see
+    :func:`pyhmy.block_range.fetch_blocks` for large ranges.
+
     Parameters
     ----------
     start_block: :obj:`int`
@@ -1442,6 +1453,75 @@ def get_blocks( # pylint: disable=too-many-arguments
         raise InvalidRPCReplyError( method, endpoint ) from exception
 
 
+def iter_blocks( # pylint: disable=too-many-arguments
+    start_block,
+    end_block,
+    full_tx=False,
+    include_tx=False,
+    include_staking_tx=False,
+    include_signers=False,
+    endpoint=DEFAULT_ENDPOINT,
+    timeout=DEFAULT_TIMEOUT,
+):
+    """Iterate over the blocks of a range as they are read from the reply.
+
+    Same as get_blocks, but only one block is held in memory at a time.
+
+    Parameters
+    ----------
+    start_block: :obj:`int`
+        First block to fetch (inclusive)
+    end_block: :obj:`int`
+        Last block to fetch (inclusive)
+    full_tx: :obj:`bool`, optional
+        Include full transactions data for the block
+    include_tx: :obj:`bool`, optional
+        Include regular transactions for the block
+    include_staking_tx: :obj:`bool`, optional
+        Include staking transactions for the block
+    include_signers: :obj:`bool`, optional
+        Include list of signers for the block
+    endpoint: :obj:`str`, optional
+        Endpoint to send request to
+    timeout: :obj:`int`, optional
+        Timeout in seconds, to connect and between two reads
+
+    Yields
+    ------
+    dict
+        Blocks in order, see get_block_by_number for block structure
+
+    Raises
+    ------
+    InvalidRPCReplyError
+        If received unknown result from endpoint
+
+    See Also
+    --------
+    get_blocks
+    """
+    params = [
+        start_block,
+        end_block,
+        {
+            "withSigners": include_signers,
+            "fullTx": full_tx,
+            "inclStaking": include_staking_tx,
+            "inclTx": include_tx,
+        },
+    ]
+    method = "hmyv2_getBlocks"
+    try:
+        yield from rpc_stream(
+            method,
+            params = params,
+            endpoint = endpoint,
+            timeout = timeout
+        )
+    except KeyError as exception:
+        raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
 def get_block_signers(
     block_num,
     endpoint = DEFAULT_ENDPOINT,
@@ -1706,3 +1786,277 @@ def get_validator_keys(
         )[ "result" ]
     except KeyError as exception:
         raise InvalidRPCReplyError( method, endpoint ) from exception
+
+
+##################
+# Block follower #
+##################
+BLOCK = "block"
+ROLLBACK = "rollback"
+
+BlockEvent = collections.namedtuple(
+    "BlockEvent",
+    [ "kind",
+      "number",
+      "hash",
+      "block" ]
+)
+BlockEvent.__doc__ = """Event of a :obj:`BlockFollower`: a new block (`kind`
+is :data:`BLOCK`) or an emitted block replaced by a reorganization (`kind`
+is :data:`ROLLBACK`)."""
+
+# cached blocks would hide the reorganizations
+_NO_CACHE = {
+    "cache": None
+}
+
+
+class BlockFollower:  # pylint: disable=too-many-instance-attributes
+    """Follow the tip of the chain, block by block, across reorganizations.
+
+    The hashes of the last `depth` blocks are kept. A new block whose parent
+    hash is not the hash of the previous block means the chain was
+    reorganized: the follower walks back to the last block still on the
+    chain, emits a :data:`ROLLBACK` event for each emitted block replaced
+    (newest first), then the new blocks. With `confirmations`, blocks are
+    only emitted once that many blocks were built on top of them, so that
+    short reorganizations are absorbed without rollbacks.
+
+    The chain is polled every half estimated block time (an average of the
+    observed block times), within [`min_interval`, `max_interval`].
+
+    Parameters
+    ----------
+    start_block: :obj:`int`, optional
+        First block to emit, the current head if None
+    confirmations: :obj:`int`, optional
+        Blocks on top of a block before it is emitted
+    depth: :obj:`int`, optional
+        Blocks remembered to detect reorganizations, deeper ones raise
+        :obj:`~pyhmy.exceptions.ReorgTooDeepError`
+    min_interval: :obj:`float`, optional
+        Shortest time between two polls, in seconds
+    max_interval: :obj:`float`, optional
+        Longest time between two polls, in seconds
+    full_tx: :obj:`bool`, optional
+        Include full transactions data for the blocks
+    include_tx: :obj:`bool`, optional
+        Include regular transactions for the blocks
+    include_staking_tx: :obj:`bool`, optional
+        Include staking transactions for the blocks
+    include_signers: :obj:`bool`, optional
+        Include list of signers for the blocks
+    endpoint: :obj:`str`, optional
+        Endpoint to send requests to
+    timeout: :obj:`int`, optional
+        Timeout in seconds
+
+    Examples
+    --------
+    >>> for event in BlockFollower( confirmations = 2 ).follow():
+    ...     if event.kind == ROLLBACK:
+    ...         undo( event.number )
+    ...     else:
+    ...         apply( event.block )
+    """
+    # weight of a new block time sample in the average
+    smoothing = 0.3
+
+    def __init__( # pylint: disable=too-many-arguments
+        self,
+        start_block=None,
+        confirmations=0,
+        depth=128,
+        min_interval=0.5,
+        max_interval=10.0,
+        full_tx=False,
+        include_tx=False,
+        include_staking_tx=False,
+        include_signers=False,
+        endpoint=DEFAULT_ENDPOINT,
+        timeout=DEFAULT_TIMEOUT,
+    ):
+        if not 0 <= confirmations < depth:
+            raise ValueError( "confirmations must be positive and below depth" )
+        self.start_block = start_block
+        self.confirmations = confirmations
+        self.depth = depth
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.options = {
+            "full_tx": full_tx,
+            "include_tx": include_tx,
+            "include_staking_tx": include_staking_tx,
+            "include_signers": include_signers,
+        }
+        self.endpoint = endpoint
+        self.timeout = timeout
+        # ( number, hash, block ) of the last blocks, oldest first
+        self._chain = collections.deque( maxlen = depth )
+        self._next = None
+        self._emitted = None
+        self._head = None
+        self._head_time = None
+        self._stop = threading.Event()
+        self.block_time = None
+        self.reorgs = 0
+
+    @property
+    def head( self ):
+        """Last head of the chain seen, None before the first poll."""
+        return self._head
+
+    @property
+    def interval( self ) -> float:
+        """Time until the next poll, in seconds."""
+        if self.block_time is None:
+            return self.min_interval
+        return max(
+            self.min_interval,
+            min( self.max_interval,
+                 self.block_time / 2 )
+        )
+
+    def _observe_head( self, head ):
+        now = time.monotonic()
+        if self._head is not None and head > self._head:
+            sample = ( now - self._head_time ) / ( head - self._head )
+            if self.block_time is None:
+                self.block_time = sample
+            else:
+                self.block_time += self.smoothing * ( sample - self.block_time )
+        if self._head is None or head > self._head:
+            self._head, self._head_time = head, now
+
+    def _get_block( self, number ):
+        return get_block_by_number(
+            number,
+            endpoint = self.endpoint,
+            timeout = self.timeout,
+            **self.options
+        )
+
+    def _rollback( self ) -> list:
+        """Drop the blocks no longer on the chain, and return the rollback
+        events of the emitted ones."""
+        # the chain is only changed once every block has been fetched, so
+        # that a failed fetch can be retried
+        kept = len( self._chain )
+        while kept:
+            number, block_hash, _ = self._chain[ kept - 1 ]
+            block = self._get_block( number )
+            if block is not None and block[ "hash" ] == block_hash:
+                break
+            kept -= 1
+        else:
+            raise ReorgTooDeepError( self._chain[ 0 ][ 0 ], self.depth )
+        removed = [
+            self._chain.pop() for _ in range( len( self._chain ) - kept )
+        ]
+        ancestor = self._chain[ -1 ][ 0 ]
+        self._next = ancestor + 1
+        self.reorgs += 1
+        events = []
+        for number, block_hash, block in removed:
+            if number <= self._emitted:
+                event = BlockEvent( ROLLBACK, number, block_hash, block )
+                events.append( event )
+        self._emitted = min( self._emitted, ancestor )
+        return events
+
+    def poll( self ) -> list:
+        """Fetch the blocks up to the head once, without waiting.
+
+        Returns
+        -------
+        list of :obj:`BlockEvent`
+            Rollbacks and new blocks, in the order they happened
+
+        Raises
+        ------
+        ReorgTooDeepError
+            If a reorganization goes back further than `depth` blocks
+        InvalidRPCReplyError
+            If received unknown result from endpoint
+        """
+        with settings.using( _NO_CACHE ):
+            return self._poll()
+
+    def _poll( self ) -> list:
+        head = get_block_number(
+            endpoint = self.endpoint,
+            timeout = self.timeout
+        )
+        self._observe_head( head )
+        if self._next is None:
+            self._next = head if self.start_block is None else self.start_block
+            self._emitted = self._next - 1
+        confirmed = head - self.confirmations
+        events = []
+        try:
+            while self._next <= head:
+                block = self._get_block( self._next )
+                if block is None:
+                    # not served by the node yet
+                    break
+                parent = block[ "parentHash" ]
+                if self._chain and parent != self._chain[ -1 ][ 1 ]:
+                    events.extend( self._rollback() )
+                    continue
+                self._chain.append( ( self._next, block[ "hash" ], block ) )
+                self._next += 1
+                # emitted as they come, before older blocks leave the buffer
+                self._emit( confirmed, events )
+        except (
+            RequestsError,
+            RequestsTimeoutError,
+            RPCError,
+            InvalidRPCReplyError
+        ):
+            if not events:
+                raise
+            # the events are already counted as emitted, return them and
+            # fetch the failed block again on the next poll
+            return events
+        self._emit( confirmed, events )
+        return events
+
+    def _emit( self, confirmed, events ):
+        while self._chain and self._emitted < min(
+            confirmed,
+            self._chain[ -1 ][ 0 ]
+        ):
+            number = self._emitted + 1
+            _, block_hash, block = self._chain[ number - self._chain[ 0 ][ 0 ] ]
+            events.append( BlockEvent( BLOCK, number, block_hash, block ) )
+            self._emitted = number
+
+    def follow( self ):
+        """Yield the events of the chain until :meth:`stop` is called.
+
+        Connection errors, timeouts, RPC errors and invalid replies are
+        retried after `max_interval`; a reorganization deeper than `depth`
+        ends the follow with :obj:`~pyhmy.exceptions.ReorgTooDeepError`.
+
+        Yields
+        ------
+        :obj:`BlockEvent`
+        """
+        self._stop.clear()
+        while not self._stop.is_set():
+            try:
+                events = self.poll()
+            except (
+                RequestsError,
+                RequestsTimeoutError,
+                RPCError,
+                InvalidRPCReplyError
+            ):
+                self._stop.wait( self.max_interval )
+                continue
+            yield from events
+            self._stop.wait( self.interval )
+
+    def stop( self ):
+        """Stop :meth:`follow` after its current poll."""
+        self._stop.set()
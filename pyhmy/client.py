@@ -0,0 +1,389 @@
+"""
+Client objects holding an endpoint, a timeout and the RPC layer settings
+
+The module level functions (:mod:`pyhmy.account`, :mod:`pyhmy.blockchain`,
+...) use the module defaults of the RPC layer (see the `set_default_*`
+functions of :mod:`pyhmy.rpc`). A :obj:`HarmonyClient` exposes the same
+functions with its own endpoint,
+timeout, session pool, retry policy, cache, metrics, ... so that several
+configurations can live side by side::
+
+    >>> client = HarmonyClient( "https://api.s0.t.hmny.io", timeout = 10, cache = ResponseCache() )
+    >>> client.blockchain.get_block_number()
+    >>> client.account.get_balance( address )
+"""
+import functools
+import inspect
+import threading
+
+from . import account, blockchain, contract, staking, transaction
+
+from .rpc import request, settings
+
+from .rpc.breaker import CircuitBreaker
+
+from .rpc.cache import ResponseCache
+
+from .rpc.codec import JSONCodec
+
+from .rpc.compression import Compression
+
+from .rpc.metrics import Metrics
+
+from .rpc.middleware import MiddlewareChain
+
+from .rpc.ratelimit import RateLimiter
+
+from .rpc.retry import RetryPolicy
+
+from .rpc.session import SessionPool
+
+from .rpc.singleflight import SingleFlight
+
+from .constants import DEFAULT_ENDPOINT, DEFAULT_TIMEOUT
+
+# marks settings that are not set by the client, the module default is used
+INHERIT = object()
+
+# setting name to type
+_SETTINGS = {
+    "retry_policy": RetryPolicy,
+    "singleflight": SingleFlight,
+    "cache": ResponseCache,
+    "limiter": RateLimiter,
+    "breaker": CircuitBreaker,
+    "compression": Compression,
+    "codec": JSONCodec,
+    "metrics": Metrics,
+    "middleware": MiddlewareChain,
+}
+
+# settings that can be disabled with None
+_OPTIONAL = frozenset(
+    [ "singleflight",
+      "cache",
+      "limiter",
+      "breaker",
+      "metrics" ]
+)
+
+
+class _BoundIterator:
+    """Iterator of a generator of a client, run with its settings."""
+    def __init__( self, client, iterator ):
+        self._client = client
+        self._iterator = iterator
+
+    def __iter__( self ):
+        return self
+
+    def __next__( self ):
+        with self._client.activate():
+            return next( self._iterator )
+
+    def close( self ):
+        self._iterator.close()
+
+
+class _BoundAsyncIterator:
+    """Async iterator of an async generator of a client, run with its
+    settings."""
+    def __init__( self, client, iterator ):
+        self._client = client
+        self._iterator = iterator
+
+    def __aiter__( self ):
+        return self
+
+    async def __anext__( self ):
+        with self._client.activate():
+            return await self._iterator.__anext__()
+
+    async def aclose( self ):
+        await self._iterator.aclose()
+
+
+class _Namespace:
+    """Functions of a module bound to a client: they default to its
+    endpoint and timeout, and run with its settings."""
+    def __init__( self, client, module ):
+        self._client = client
+        self._module = module
+
+    def __repr__( self ):
+        return f"<{self._module.__name__} of {self._client!r}>"
+
+    def __dir__( self ):
+        return [
+            name for name in dir( self._module ) if not name.startswith( "_" )
+        ]
+
+    def __getattr__( self, name ):
+        value = getattr( self._module, name )
+        if inspect.isfunction( value ):
+            value = self._client._bind( value )  # pylint: disable=protected-access
+            setattr( self, name, value )
+        return value
+
+
+class HarmonyClient:
+    """Endpoint, timeout and RPC layer settings, with the functions of
+    :mod:`pyhmy.account`, :mod:`pyhmy.blockchain`, :mod:`pyhmy.staking`,
+    :mod:`pyhmy.transaction` and :mod:`pyhmy.contract` bound to them as
+    namespaces of the same name.
+
+    Settings not given are those of the module defaults, and follow their
+    changes. None disables the optional ones (coalescing, cache, rate
+    limiter, circuit breaker, metrics).
+
+    Parameters
+    ----------
+    endpoint: :obj:`str` or :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool`, optional
+        Endpoint of the calls that do not pass one
+    timeout: :obj:`int` or :obj:`~pyhmy.rpc.deadline.Deadline`, optional
+        Timeout of the calls that do not pass one
+    session_pool: :obj:`~pyhmy.rpc.session.SessionPool`, optional
+        HTTP sessions of the client
+    retry_policy: :obj:`~pyhmy.rpc.retry.RetryPolicy`, optional
+    singleflight: :obj:`~pyhmy.rpc.singleflight.SingleFlight`, optional
+    cache: :obj:`~pyhmy.rpc.cache.ResponseCache`, optional
+    limiter: :obj:`~pyhmy.rpc.ratelimit.RateLimiter`, optional
+    breaker: :obj:`~pyhmy.rpc.breaker.CircuitBreaker`, optional
+    compression: :obj:`~pyhmy.rpc.compression.Compression`, optional
+    codec: :obj:`~pyhmy.rpc.codec.JSONCodec`, optional
+    metrics: :obj:`~pyhmy.rpc.metrics.Metrics`, optional
+        Metrics of the calls made through the client
+    middleware: :obj:`~pyhmy.rpc.middleware.MiddlewareChain`, optional
+        Middlewares of the calls made through the client
+
+    Raises
+    ------
+    TypeError
+        If a setting is of the wrong type
+    """
+    _modules = {
+        "account": account,
+        "blockchain": blockchain,
+        "contract": contract,
+        "staking": staking,
+        "transaction": transaction,
+    }
+    _session_pool = ( "session_pool", SessionPool )
+
+    def __init__(
+        self,
+        endpoint = DEFAULT_ENDPOINT,
+        timeout = DEFAULT_TIMEOUT,
+        session_pool = INHERIT,
+        retry_policy = INHERIT,
+        singleflight = INHERIT,
+        cache = INHERIT,
+        limiter = INHERIT,
+        breaker = INHERIT,
+        compression = INHERIT,
+        codec = INHERIT,
+        metrics = INHERIT,
+        middleware = INHERIT,
+    ):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        given = {
+            "retry_policy": retry_policy,
+            "singleflight": singleflight,
+            "cache": cache,
+            "limiter": limiter,
+            "breaker": breaker,
+            "compression": compression,
+            "codec": codec,
+            "metrics": metrics,
+            "middleware": middleware,
+        }
+        kinds = dict( _SETTINGS )
+        name, kind = self._session_pool
+        given[ name ] = session_pool
+        kinds[ name ] = kind
+        self.settings = {}
+        for name, value in given.items():
+            if value is INHERIT:
+                continue
+            optional = name in _OPTIONAL and value is None
+            if not ( optional or isinstance( value, kinds[ name ] ) ):
+                raise TypeError( f"invalid type {value.__class__} for {name}" )
+            self.settings[ name ] = value
+        self._namespaces = {}
+        self._lock = threading.Lock()
+
+    def __repr__( self ):
+        return f"{self.__class__.__name__}({self.endpoint!s})"
+
+    def __getattr__( self, name ):
+        module = self._modules.get( name )
+        if module is None:
+            raise AttributeError(
+                f"{self.__class__.__name__!r} object has no attribute {name!r}"
+            )
+        with self._lock:
+            namespace = self._namespaces.get( name )
+            if namespace is None:
+                namespace = _Namespace( self, module )
+                self._namespaces[ name ] = namespace
+        return namespace
+
+    def activate( self ):
+        """Context in which every RPC (not only those made through the
+        client) uses the settings of the client."""
+        return settings.using( self.settings )
+
+    def _arguments( self, func ):
+        """Function of the positional and keyword arguments of a call of
+        `func` to its keyword arguments, with the endpoint and timeout of
+        the client unless the call passes them."""
+        signature = inspect.signature( func )
+        defaults = {}
+        if "endpoint" in signature.parameters:
+            defaults[ "endpoint" ] = self.endpoint
+        if "timeout" in signature.parameters:
+            defaults[ "timeout" ] = self.timeout
+
+        def arguments( args, kwargs ):
+            bound = signature.bind_partial( *args, **kwargs ).arguments
+            return {
+                **{
+                    name: value
+                    for name, value in defaults.items() if name not in bound
+                },
+                **kwargs
+            }
+
+        return arguments
+
+    def _bind( self, func ):
+        arguments = self._arguments( func )
+
+        if inspect.isgeneratorfunction( func ):
+
+            @functools.wraps( func )
+            def bound_generator( *args, **kwargs ):
+                iterator = func( *args, **arguments( args, kwargs ) )
+                return _BoundIterator( self, iterator )
+
+            return bound_generator
+
+        @functools.wraps( func )
+        def bound( *args, **kwargs ):
+            with self.activate():
+                return func( *args, **arguments( args, kwargs ) )
+
+        return bound
+
+    def rpc_request( self, method, params = None, retry_policy = None ) -> dict:
+        """Send an RPC to the endpoint of the client, see
+        :func:`pyhmy.rpc.request.rpc_request`."""
+        with self.activate():
+            return request.rpc_request(
+                method,
+                params = params,
+                endpoint = self.endpoint,
+                timeout = self.timeout,
+                retry_policy = retry_policy
+            )
+
+    def close( self ):
+        """Close the session pool of the client, if it has its own."""
+        pool = self.settings.get( self._session_pool[ 0 ] )
+        if pool is not None:
+            pool.close()
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc_info ):
+        self.close()
+
+
+class AsyncHarmonyClient( HarmonyClient ):
+    """Async version of :obj:`HarmonyClient`, whose namespaces are the
+    coroutines of :mod:`pyhmy.aio`.
+
+    Requires the optional `aiohttp` dependency (`pip install pyhmy[async]`).
+
+    Parameters
+    ----------
+    session_pool: :obj:`~pyhmy.rpc.async_request.AsyncSessionPool`, optional
+        HTTP sessions of the client, see :obj:`HarmonyClient` for the others
+    """
+    def __init__( self, *args, **kwargs ):
+        # pylint: disable=import-outside-toplevel
+        from .aio import account as aio_account
+        from .aio import blockchain as aio_blockchain
+        from .aio import contract as aio_contract
+        from .aio import staking as aio_staking
+        from .aio import transaction as aio_transaction
+        from .rpc.async_request import AsyncSessionPool
+
+        self._modules = {
+            "account": aio_account,
+            "blockchain": aio_blockchain,
+            "contract": aio_contract,
+            "staking": aio_staking,
+            "transaction": aio_transaction,
+        }
+        self._session_pool = ( "async_session_pool", AsyncSessionPool )
+        super().__init__( *args, **kwargs )
+
+    def _bind( self, func ):
+        arguments = self._arguments( func )
+
+        if inspect.isasyncgenfunction( func ):
+
+            @functools.wraps( func )
+            def bound_generator( *args, **kwargs ):
+                iterator = func( *args, **arguments( args, kwargs ) )
+                return _BoundAsyncIterator( self, iterator )
+
+            return bound_generator
+
+        if not inspect.iscoroutinefunction( func ):
+            return super()._bind( func )
+
+        @functools.wraps( func )
+        async def bound( *args, **kwargs ):
+            with self.activate():
+                return await func( *args, **arguments( args, kwargs ) )
+
+        return bound
+
+    async def rpc_request(
+        self,
+        method,
+        params = None,
+        retry_policy = None
+    ) -> dict:
+        """Async version of :meth:`HarmonyClient.rpc_request`."""
+        # pylint: disable=import-outside-toplevel
+        from .rpc import async_request
+
+        with self.activate():
+            return await async_request.rpc_request(
+                method,
+                params = params,
+                endpoint = self.endpoint,
+                timeout = self.timeout,
+                retry_policy = retry_policy
+            )
+
+    async def close( self ):
+        """Close the session of the running loop of the client's session
+        pool, if it has its own."""
+        pool = self.settings.get( self._session_pool[ 0 ] )
+        if pool is not None:
+            await pool.close()
+
+    def __enter__( self ):
+        raise TypeError( "use `async with` with an AsyncHarmonyClient" )
+
+    async def __aenter__( self ):
+        return self
+
+    async def __aexit__( self, *exc_info ):
+        await self.close()
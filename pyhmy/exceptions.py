@@ -36,3 +36,26 @@ class TxConfirmationTimedoutError( AssertionError ):
     confirmed during the timeout period specified."""
     def __init__( self, msg ):
         super().__init__( f"{msg}" )
+
+
+class ReorgTooDeepError( RuntimeError ):
+    """Exception raised when a chain reorganization reaches further back
+    than the blocks remembered by a block follower."""
+    def __init__( self, number, depth ):
+        self.number = number
+        self.depth = depth
+        super().__init__(
+            f"Reorganization before block {number}, deeper than {depth} blocks"
+        )
+
+
+class BackfillGapError( RuntimeError ):
+    """Exception raised when the blocks of a shard to deliver do not follow
+    its checkpoint, which would leave a hole in the sink."""
+    def __init__( self, shard, expected, number ):
+        self.shard = shard
+        self.expected = expected
+        self.number = number
+        super().__init__(
+            f"Block {number} of shard {shard} delivered instead of {expected}"
+        )
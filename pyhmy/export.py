@@ -0,0 +1,683 @@
+"""
+Export blocks and their transactions to columnar files for analytics
+
+Blocks, transactions, staking transactions and signers are written to one
+table each, in typed columns: integers as 32 or 64-bit unsigned integers,
+hashes (32 bytes), addresses (20 bytes) and logs blooms (256 bytes) as
+fixed-width binary, amounts in Atto as 32-byte big-endian unsigned
+integers, transaction data as variable binary and staking messages as
+JSON strings. Missing hashes and addresses (e.g. the receiver of a
+contract creation) are all zero.
+
+Tables are Parquet or Arrow IPC files when `pyarrow` is installed (`pip
+install pyhmy[export]`), and directories of NumPy `.npy` files, one per
+column, otherwise::
+
+    >>> export_blocks( 1, 100000, "blocks", endpoint = test_net )
+    {'blocks': 100000, 'transactions': 41236, 'staking_transactions': 812,
+     'signers': 0}
+    >>> pandas.read_parquet( "blocks/transactions.parquet" )
+
+NumPy files hold fixed-width columns as `uint8` arrays of shape (rows,
+width). A variable column `<name>` is stored as its concatenated bytes in
+`<name>.npy` and the offsets of its rows (rows + 1 of them) in
+`<name>.offsets.npy`.
+"""
+import functools
+import json
+import os
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+from .bech32.bech32 import bech32_decode, convertbits
+
+from .block_range import fetch_blocks
+
+from .constants import DEFAULT_ENDPOINT, DEFAULT_TIMEOUT
+
+PARQUET = "parquet"
+ARROW = "arrow"
+NPY = "npy"
+
+# column kinds: fixed-width binary ones are their width in bytes
+U32 = "u32"
+U64 = "u64"
+U256 = "u256"
+BINARY = "binary"
+STRING = "string"
+HASH = 32
+ADDRESS = 20
+BLOOM = 256
+
+
+def _width( kind ) -> int:
+    """Width of a fixed-width binary kind, in bytes."""
+    return 32 if kind == U256 else kind
+
+
+def _uint( value ) -> int:
+    if value is None or value == "":
+        return 0
+    if isinstance( value, str ):
+        return int( value, 16 ) if value.startswith( "0x" ) else int( value )
+    return int( value )
+
+
+def _hex( value ) -> bytes:
+    if not value:
+        return b""
+    value = value[ 2 : ] if value.startswith( "0x" ) else value
+    return bytes.fromhex( value if len( value ) % 2 == 0 else "0" + value )
+
+
+@functools.lru_cache( maxsize = 4096 )
+def _address( value ) -> bytes:
+    # miners, senders and signers repeat across blocks
+    if not value:
+        return bytes( ADDRESS )
+    if value.startswith( "one1" ):
+        _, data = bech32_decode( value )
+        if data is None:
+            raise ValueError( f"invalid address {value}" )
+        return bytes( convertbits( data, 5, 8, False ) )
+    return _hex( value )
+
+
+def _fixed( value, width ) -> bytes:
+    if isinstance( value, int ):
+        return value.to_bytes( width, "big" )
+    data = _address( value ) if width == ADDRESS else _hex( value )
+    if len( data ) > width:
+        raise ValueError( f"{value} is longer than {width} bytes" )
+    # hex numbers such as signatures may have their leading zeros dropped
+    return data.rjust( width, b"\0" )
+
+
+def _string( value ) -> str:
+    if value is None:
+        return ""
+    if not isinstance( value, str ):
+        value = json.dumps( value, sort_keys = True, separators = ( ",", ":" ) )
+    return value
+
+
+def _convert( value, kind ):
+    if kind in ( U32, U64 ):
+        return _uint( value )
+    if kind == U256:
+        return _uint( value ).to_bytes( _width( U256 ), "big" )
+    if kind == BINARY:
+        return value if isinstance( value, bytes ) else _hex( value )
+    if kind == STRING:
+        return _string( value )
+    return _fixed( value, kind )
+
+
+def _count( key ):
+    return lambda row: len( row.get( key ) or () )
+
+
+# ( column, key in the RPC reply or function of the row, kind )
+TABLES = {
+    "blocks": (
+        ( "number",
+          "number",
+          U64 ),
+        ( "hash",
+          "hash",
+          HASH ),
+        ( "parentHash",
+          "parentHash",
+          HASH ),
+        ( "miner",
+          "miner",
+          ADDRESS ),
+        ( "timestamp",
+          "timestamp",
+          U64 ),
+        ( "epoch",
+          "epoch",
+          U64 ),
+        ( "viewID",
+          "viewID",
+          U64 ),
+        ( "gasLimit",
+          "gasLimit",
+          U64 ),
+        ( "gasUsed",
+          "gasUsed",
+          U64 ),
+        ( "size",
+          "size",
+          U64 ),
+        ( "stateRoot",
+          "stateRoot",
+          HASH ),
+        ( "transactionsRoot",
+          "transactionsRoot",
+          HASH ),
+        ( "receiptsRoot",
+          "receiptsRoot",
+          HASH ),
+        ( "mixHash",
+          "mixHash",
+          HASH ),
+        ( "logsBloom",
+          "logsBloom",
+          BLOOM ),
+        ( "extraData",
+          "extraData",
+          BINARY ),
+        ( "transactionCount",
+          _count( "transactions" ),
+          U32 ),
+        ( "stakingTransactionCount",
+          _count( "stakingTransactions" ),
+          U32 ),
+        ( "signerCount",
+          _count( "signers" ),
+          U32 ),
+    ),
+    "transactions": (
+        ( "blockNumber",
+          "blockNumber",
+          U64 ),
+        ( "blockHash",
+          "blockHash",
+          HASH ),
+        ( "transactionIndex",
+          "transactionIndex",
+          U32 ),
+        ( "hash",
+          "hash",
+          HASH ),
+        ( "ethHash",
+          "ethHash",
+          HASH ),
+        ( "from",
+          "from",
+          ADDRESS ),
+        ( "to",
+          "to",
+          ADDRESS ),
+        ( "shardID",
+          "shardID",
+          U32 ),
+        ( "toShardID",
+          "toShardID",
+          U32 ),
+        ( "nonce",
+          "nonce",
+          U64 ),
+        ( "gas",
+          "gas",
+          U64 ),
+        ( "gasPrice",
+          "gasPrice",
+          U256 ),
+        ( "value",
+          "value",
+          U256 ),
+        ( "input",
+          "input",
+          BINARY ),
+        ( "timestamp",
+          "timestamp",
+          U64 ),
+        ( "v",
+          "v",
+          U64 ),
+        ( "r",
+          "r",
+          HASH ),
+        ( "s",
+          "s",
+          HASH ),
+    ),
+    "staking_transactions": (
+        ( "blockNumber",
+          "blockNumber",
+          U64 ),
+        ( "blockHash",
+          "blockHash",
+          HASH ),
+        ( "transactionIndex",
+          "transactionIndex",
+          U32 ),
+        ( "hash",
+          "hash",
+          HASH ),
+        ( "from",
+          "from",
+          ADDRESS ),
+        ( "type",
+          "type",
+          STRING ),
+        ( "nonce",
+          "nonce",
+          U64 ),
+        ( "gas",
+          "gas",
+          U64 ),
+        ( "gasPrice",
+          "gasPrice",
+          U256 ),
+        ( "timestamp",
+          "timestamp",
+          U64 ),
+        ( "v",
+          "v",
+          U64 ),
+        ( "r",
+          "r",
+          HASH ),
+        ( "s",
+          "s",
+          HASH ),
+        # JSON of the message, whose fields depend on the type
+        ( "msg",
+          "msg",
+          STRING ),
+    ),
+    "signers": (
+        ( "blockNumber",
+          "blockNumber",
+          U64 ),
+        ( "signer",
+          "signer",
+          ADDRESS ),
+    ),
+}
+
+
+class _ArrowTable:
+    """Batches of a table written to a Parquet or Arrow IPC file."""
+    def __init__( self, path, columns, file_format, compression ):
+        types = {
+            U32: pyarrow.uint32(),
+            U64: pyarrow.uint64(),
+            BINARY: pyarrow.binary(),
+            STRING: pyarrow.string(),
+        }
+        self.schema = pyarrow.schema(
+            [
+                ( name,
+                  types.get( kind ) or pyarrow.binary( _width( kind ) ) )
+                for name, _, kind in columns
+            ]
+        )
+        self._sink = None
+        if file_format == PARQUET:
+            options = {} if compression is None else {
+                "compression": compression
+            }
+            self._writer = pyarrow.parquet.ParquetWriter(
+                path,
+                self.schema,
+                **options
+            )
+        else:
+            self._sink = pyarrow.OSFile( path, "wb" )
+            self._writer = pyarrow.ipc.new_file(
+                self._sink,
+                self.schema,
+                options = pyarrow.ipc.IpcWriteOptions(
+                    compression = compression
+                )
+            )
+
+    def write( self, values ):
+        arrays = [
+            pyarrow.array( column,
+                           type = field.type )
+            for field, column in zip( self.schema, values )
+        ]
+        self._writer.write_batch(
+            pyarrow.record_batch( arrays,
+                                  schema = self.schema )
+        )
+
+    def close( self ):
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+
+class _NpyTable:
+    """Columns of a table kept as compact arrays, written to a directory of
+    `.npy` files on close."""
+    def __init__( self, path, columns ):
+        os.makedirs( path, exist_ok = True )
+        self.path = path
+        self.columns = columns
+        self._chunks = {
+            name: []
+            for name, _, _ in columns
+        }
+        self._offsets = {
+            name: 0
+            for name, _, kind in columns
+            if kind in ( BINARY, STRING )
+        }
+        self._offset_chunks = {
+            name: [ numpy.zeros( 1,
+                                 numpy.int64 ) ]
+            for name in self._offsets
+        }
+
+    def write( self, values ):
+        for ( name, _, kind ), column in zip( self.columns, values ):
+            if kind == U32:
+                chunk = numpy.array( column, numpy.uint32 )
+            elif kind == U64:
+                chunk = numpy.array( column, numpy.uint64 )
+            elif kind in ( BINARY, STRING ):
+                if kind == STRING:
+                    column = [ value.encode() for value in column ]
+                chunk = numpy.frombuffer( b"".join( column ), numpy.uint8 )
+                offsets = numpy.cumsum(
+                    [ len( value ) for value in column ],
+                    dtype = numpy.int64
+                )
+                self._offset_chunks[ name ].append(
+                    offsets + self._offsets[ name ]
+                )
+                self._offsets[ name ] += len( chunk )
+            else:
+                chunk = numpy.frombuffer( b"".join( column ),
+                                          numpy.uint8
+                                         ).reshape( -1,
+                                                    _width( kind ) )
+            self._chunks[ name ].append( chunk )
+
+    @staticmethod
+    def _save( path, chunks, dtype, shape ):
+        rows = sum( len( chunk ) for chunk in chunks )
+        if not rows:
+            numpy.save( path, numpy.empty( ( 0, *shape ), dtype ) )
+            return
+        # written in place rather than concatenated in memory first
+        array = numpy.lib.format.open_memmap(
+            path,
+            "w+",
+            dtype,
+            ( rows,
+              *shape )
+        )
+        position = 0
+        for chunk in chunks:
+            array[ position : position + len( chunk ) ] = chunk
+            position += len( chunk )
+        array.flush()
+        del array
+
+    def close( self ):
+        dtypes = {
+            U32: numpy.uint32,
+            U64: numpy.uint64
+        }
+        for name, _, kind in self.columns:
+            path = os.path.join( self.path, f"{name}.npy" )
+            if kind in dtypes:
+                self._save( path, self._chunks[ name ], dtypes[ kind ], () )
+            elif kind in ( BINARY, STRING ):
+                self._save( path, self._chunks[ name ], numpy.uint8, () )
+                self._save(
+                    os.path.join( self.path,
+                                  f"{name}.offsets.npy" ),
+                    self._offset_chunks[ name ],
+                    numpy.int64,
+                    ()
+                )
+            else:
+                self._save(
+                    path,
+                    self._chunks[ name ],
+                    numpy.uint8,
+                    ( _width( kind ),
+                     )
+                )
+        self._chunks.clear()
+        self._offset_chunks.clear()
+
+
+class ColumnarExporter:
+    """Writer of blocks to the columnar tables of :data:`TABLES` in the
+    directory `path`.
+
+    Rows are converted as the blocks are written and flushed every
+    `batch_size` rows (a row group of Parquet, a record batch of Arrow), so
+    memory does not grow with the range. The NumPy fallback keeps the
+    typed columns in memory until :meth:`close`, a fraction of the size of
+    the blocks.
+
+    Parameters
+    ----------
+    path: str
+        Directory of the tables, created if needed
+    file_format: :obj:`str`, optional
+        :data:`PARQUET`, :data:`ARROW` or :data:`NPY`; Parquet if `pyarrow`
+        is installed, NumPy otherwise if None
+    batch_size: :obj:`int`, optional
+        Rows of a table converted and written at once
+    compression: :obj:`str`, optional
+        Compression of the Parquet or Arrow files, e.g. "zstd"; the default
+        of `pyarrow` if None
+
+    Raises
+    ------
+    ImportError
+        If the library of the format is not installed
+    ValueError
+        If the format is unknown
+    """
+    def __init__(
+        self,
+        path,
+        file_format = None,
+        batch_size = 65536,
+        compression = None
+    ):
+        if file_format is None:
+            file_format = NPY if pyarrow is None else PARQUET
+        if file_format not in ( PARQUET, ARROW, NPY ):
+            raise ValueError( f"unknown format {file_format}" )
+        if file_format == NPY and numpy is None:
+            raise ImportError(
+                "`numpy` is not installed, install it with `pip install numpy`"
+            )
+        if file_format != NPY and pyarrow is None:
+            raise ImportError(
+                "`pyarrow` is not installed, "
+                "install it with `pip install pyhmy[export]`"
+            )
+        os.makedirs( path, exist_ok = True )
+        self.path = os.fspath( path )
+        self.file_format = file_format
+        self.batch_size = batch_size
+        self.rows = {
+            table: 0
+            for table in TABLES
+        }
+        self._pending = {
+            table: []
+            for table in TABLES
+        }
+        self._tables = {}
+        for table, columns in TABLES.items():
+            if file_format == NPY:
+                self._tables[ table ] = _NpyTable(
+                    os.path.join( self.path,
+                                  table ),
+                    columns
+                )
+            else:
+                self._tables[ table ] = _ArrowTable(
+                    os.path.join( self.path,
+                                  f"{table}.{file_format}" ),
+                    columns,
+                    file_format,
+                    compression
+                )
+
+    def _add( self, table, row ):
+        pending = self._pending[ table ]
+        pending.append( row )
+        if len( pending ) >= self.batch_size:
+            self._flush( table )
+
+    def _flush( self, table ):
+        pending = self._pending[ table ]
+        if not pending:
+            return
+        values = [
+            [
+                _convert(
+                    key( row ) if callable( key ) else row.get( key ),
+                    kind
+                ) for row in pending
+            ] for _, key, kind in TABLES[ table ]
+        ]
+        self._tables[ table ].write( values )
+        self.rows[ table ] += len( pending )
+        pending.clear()
+
+    def write( self, blocks ):
+        """Add blocks, and their transactions and signers when they were
+        fetched with them, to the tables.
+
+        Parameters
+        ----------
+        blocks: iterable of dict
+            Blocks as returned by :func:`~pyhmy.blockchain.get_blocks`;
+            transaction hashes (blocks fetched without `full_tx`) are only
+            counted
+        """
+        for block in blocks:
+            self._add( "blocks", block )
+            for transaction in block.get( "transactions" ) or ():
+                if isinstance( transaction, dict ):
+                    self._add( "transactions", transaction )
+            for transaction in block.get( "stakingTransactions" ) or ():
+                if isinstance( transaction, dict ):
+                    self._add( "staking_transactions", transaction )
+            for signer in block.get( "signers" ) or ():
+                self._add(
+                    "signers",
+                    {
+                        "blockNumber": block.get( "number" ),
+                        "signer": signer
+                    }
+                )
+
+    def close( self ) -> dict:
+        """Flush and close the tables.
+
+        Returns
+        -------
+        dict
+            Rows written to each table
+        """
+        for table in TABLES:
+            self._flush( table )
+        for writer in self._tables.values():
+            writer.close()
+        self._tables = {}
+        return dict( self.rows )
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc_info ):
+        if self._tables:
+            self.close()
+
+
+def export_blocks( # pylint: disable=too-many-arguments
+    start_block,
+    end_block,
+    path,
+    file_format=None,
+    include_tx=True,
+    include_staking_tx=True,
+    include_signers=False,
+    batch_size=65536,
+    compression=None,
+    workers=4,
+    endpoint=DEFAULT_ENDPOINT,
+    timeout=DEFAULT_TIMEOUT,
+) -> dict:
+    """Fetch a range of blocks in parallel chunks (see
+    :func:`~pyhmy.block_range.fetch_blocks`) and write them to columnar
+    tables, see :obj:`ColumnarExporter`.
+
+    Parameters
+    ----------
+    start_block: :obj:`int`
+        First block to export (inclusive)
+    end_block: :obj:`int`
+        Last block to export (inclusive)
+    path: str
+        Directory of the tables
+    file_format: :obj:`str`, optional
+        :data:`PARQUET`, :data:`ARROW` or :data:`NPY`, the best available if
+        None
+    include_tx: :obj:`bool`, optional
+        Export the transactions of the blocks
+    include_staking_tx: :obj:`bool`, optional
+        Export the staking transactions of the blocks
+    include_signers: :obj:`bool`, optional
+        Export the signers of the blocks
+    batch_size: :obj:`int`, optional
+        Rows of a table converted and written at once
+    compression: :obj:`str`, optional
+        Compression of the Parquet or Arrow files
+    workers: :obj:`int`, optional
+        Chunks fetched in parallel
+    endpoint: :obj:`str` or :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool`, optional
+        Endpoint (or pool of endpoints) to send the requests to
+    timeout: :obj:`int`, optional
+        Timeout of each chunk in seconds
+
+    Returns
+    -------
+    dict
+        Rows written to each table
+
+    Raises
+    ------
+    ImportError
+        If the library of the format is not installed
+    RPCError, RequestsError, RequestsTimeoutError
+        If a block could not be fetched, after its retries
+    """
+    with ColumnarExporter(
+        path,
+        file_format = file_format,
+        batch_size = batch_size,
+        compression = compression
+    ) as exporter:
+        exporter.write(
+            fetch_blocks(
+                start_block,
+                end_block,
+                full_tx = include_tx or include_staking_tx,
+                include_tx = include_tx,
+                include_staking_tx = include_staking_tx,
+                include_signers = include_signers,
+                workers = workers,
+                endpoint = endpoint,
+                timeout = timeout,
+            )
+        )
+        return exporter.close()
@@ -0,0 +1,445 @@
+"""
+Asyncio RPC wrapper around aiohttp, mirroring :mod:`pyhmy.rpc.request`
+
+Requires the optional `aiohttp` dependency (`pip install pyhmy[async]`).
+"""
+import asyncio
+import contextlib
+import json
+import math
+import time
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+from . import settings, websocket
+
+from .exceptions import RequestsError, RequestsTimeoutError, RPCError
+
+from .breaker import guarded, record_failure
+
+from .cache import lookup, store
+
+from .compression import get_default_compression
+
+from .deadline import resolve, seconds
+
+from .endpoint_pool import EndpointPool
+
+from .metrics import count_error, count_retry, get_default_metrics
+
+from .middleware import Call, get_default_chain
+
+from .ratelimit import async_limited
+
+from .request import check_status, decode, encode, remainder
+
+from .retry import async_call_with_retry
+
+from .session import DEFAULT_POOL_MAXSIZE
+
+from .singleflight import async_coalesce
+
+from .stream import JSONArrayStream
+
+from .websocket import is_websocket
+
+from ..constants import DEFAULT_ENDPOINT, DEFAULT_TIMEOUT
+
+
+def _require_aiohttp():
+    if aiohttp is None:
+        raise ImportError(
+            "async RPC requires `aiohttp`, install it with `pip install pyhmy[async]`"
+        )
+
+
+class AsyncSessionPool:
+    """Keep-alive :obj:`aiohttp.ClientSession` shared by async RPC calls.
+
+    aiohttp sessions are bound to an event loop, so one session is kept per
+    running loop. Its connector keeps up to `pool_maxsize` connections alive
+    per endpoint.
+
+    Parameters
+    ----------
+    pool_maxsize: :obj:`int`, optional
+        Maximum number of connections per endpoint
+    pool_total: :obj:`int`, optional
+        Maximum number of connections overall, 0 for no limit
+    """
+    def __init__( self, pool_maxsize = DEFAULT_POOL_MAXSIZE, pool_total = 0 ):
+        self.pool_maxsize = pool_maxsize
+        self.pool_total = pool_total
+        self._sessions = {}
+
+    def get_session( self ) -> "aiohttp.ClientSession":
+        """Get (or create) the session of the running event loop."""
+        _require_aiohttp()
+        loop = asyncio.get_running_loop()
+        # drop sessions of loops that are gone, e.g. after asyncio.run
+        for other in [ other for other in self._sessions if other.is_closed() ]:
+            del self._sessions[ other ]
+        session = self._sessions.get( loop )
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector = aiohttp.TCPConnector(
+                    limit = self.pool_total,
+                    limit_per_host = self.pool_maxsize
+                )
+            )
+            self._sessions[ loop ] = session
+        return session
+
+    async def close( self ):
+        """Close the session of the running event loop."""
+        session = self._sessions.pop( asyncio.get_running_loop(), None )
+        if session is not None:
+            await session.close()
+
+    async def __aenter__( self ):
+        return self
+
+    async def __aexit__( self, *exc_info ):
+        await self.close()
+
+
+_default_pool = AsyncSessionPool()
+
+
+def get_default_pool() -> AsyncSessionPool:
+    """Session pool shared by all async RPC calls."""
+    return settings.lookup( "async_session_pool", _default_pool )
+
+
+def set_default_pool( pool ) -> AsyncSessionPool:
+    """Replace the shared async session pool and return the previous one."""
+    global _default_pool  # pylint: disable=global-statement
+    if not isinstance( pool, AsyncSessionPool ):
+        raise TypeError( f"invalid type {pool.__class__}" )
+    previous, _default_pool = _default_pool, pool
+    return previous
+
+
+async def base_request(
+    method,
+    params = None,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT
+) -> bytes:
+    """Basic async RPC request.
+
+    Parameters
+    ---------
+    method: str
+        RPC Method to call
+    params: :obj:`list`, optional
+        Parameters for the RPC method
+    endpoint: :obj:`str` or :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool`, optional
+        Endpoint (or pool of endpoints) to send request to
+    timeout: :obj:`int`, optional
+        Timeout in seconds
+
+    Returns
+    -------
+    bytes
+        Raw output from the request
+
+    Raises
+    ------
+    TypeError
+        If params is not a list or None
+    ImportError
+        If aiohttp is not installed
+    RequestsTimeoutError
+        If request timed out
+    RequestsThrottledError
+        If the endpoint throttled the request (HTTP 429)
+    RequestsServerError
+        If the endpoint replied with a 5xx HTTP status
+    RequestsError
+        If other request error occured
+    """
+    return await _send( encode( method, params ), method, endpoint, timeout )
+
+
+async def _send( data, method, endpoint, timeout ) -> bytes:
+    """Async twin of :func:`pyhmy.rpc.request._send`."""
+    if isinstance( endpoint, EndpointPool ):
+        return await endpoint.async_send(
+            lambda node: _send_to( data, method, node, timeout ),
+            method
+        )
+    return await _send_to( data, method, endpoint, timeout )
+
+
+async def _send_to( data, method, endpoint, timeout ) -> bytes:
+    """Async twin of :func:`pyhmy.rpc.request._send_to`."""
+    chain = get_default_chain()
+    if not chain:
+        return await _send_measured( data, method, endpoint, timeout )
+
+    def send( call ):
+        return _send_measured(
+            call.data,
+            method,
+            call.endpoint,
+            timeout,
+            call.headers
+        )
+
+    return await chain.async_send(
+        Call( method,
+              endpoint,
+              data,
+              asynchronous = True ),
+        send
+    )
+
+
+async def _send_measured(
+    data,
+    method,
+    endpoint,
+    timeout,
+    headers = None
+) -> bytes:
+    metrics = get_default_metrics()
+    if metrics is None:
+        return await _send_guarded( data, endpoint, timeout, headers )
+    start = time.perf_counter()
+    try:
+        content = await _send_guarded( data, endpoint, timeout, headers )
+    except Exception as err:
+        metrics.observe_failure(
+            endpoint,
+            method,
+            time.perf_counter() - start,
+            err
+        )
+        raise
+    metrics.observe_request(
+        endpoint,
+        method,
+        time.perf_counter() - start,
+        len( data ),
+        len( content )
+    )
+    return content
+
+
+async def _send_guarded( data, endpoint, timeout, headers = None ) -> bytes:
+    with guarded( endpoint ):
+        if is_websocket( endpoint ):
+            return await websocket.async_send(
+                data,
+                endpoint,
+                seconds( timeout,
+                         endpoint )
+            )
+        return await _post( data, endpoint, timeout, headers )
+
+
+def _client_timeout( timeout, endpoint, stream = False ):
+    """`aiohttp` timeout for an RPC `timeout` argument, see
+    :mod:`pyhmy.rpc.deadline`. Without a deadline, a number of seconds
+    bounds the whole request, or each read of a streamed reply."""
+    deadline = resolve( timeout )
+    if deadline is None:
+        if stream:
+            return aiohttp.ClientTimeout(
+                sock_connect = timeout,
+                sock_read = timeout
+            )
+        return aiohttp.ClientTimeout( total = timeout )
+    connect, read = deadline.timeouts( endpoint )
+    remaining = deadline.remaining()
+    return aiohttp.ClientTimeout(
+        total = None if remaining == math.inf else remaining,
+        sock_connect = connect,
+        sock_read = read
+    )
+
+
+async def _post( data, endpoint, timeout, extra_headers = None ) -> bytes:
+    """Async twin of :func:`pyhmy.rpc.request._post`."""
+    compression = get_default_compression()
+    body, headers = compression.encode( data )
+    if extra_headers:
+        headers.update( extra_headers )
+    session = get_default_pool().get_session()
+    async with async_limited( endpoint ):
+        try:
+            async with session.post(
+                endpoint,
+                headers = headers,
+                data = body,
+                timeout = _client_timeout( timeout,
+                                           endpoint ),
+                allow_redirects = True,
+            ) as resp:
+                content = await resp.read()
+                wire_size = getattr(
+                    resp.content,
+                    "total_raw_bytes",
+                    len( content )
+                )
+        except asyncio.TimeoutError as err:
+            raise RequestsTimeoutError( endpoint ) from err
+        except aiohttp.ClientError as err:
+            raise RequestsError( endpoint ) from err
+        check_status( endpoint, resp.status, resp.headers )
+        compression.record(
+            len( data ),
+            len( body ),
+            len( content ),
+            wire_size
+        )
+        return content
+
+
+async def rpc_request(
+    method,
+    params = None,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT,
+    retry_policy = None
+) -> dict:
+    """Async RPC request.
+
+    Parameters
+    ---------
+    method: str
+        RPC Method to call
+    params: :obj:`list`, optional
+        Parameters for the RPC method
+    endpoint: :obj:`str` or :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool`, optional
+        Endpoint (or pool of endpoints) to send request to
+    timeout: :obj:`int`, optional
+        Timeout in seconds
+    retry_policy: :obj:`~pyhmy.rpc.retry.RetryPolicy`, optional
+        Retry policy for this call, the default policy if None
+
+    Returns
+    -------
+    dict
+        Returns dictionary representation of RPC response
+
+    Raises
+    ------
+    RPCError
+        If RPC response returned a blockchain error
+
+    See Also
+    --------
+    pyhmy.rpc.request.rpc_request
+    """
+    raw_resp = lookup( method, params, endpoint )
+    if raw_resp is not None:
+        return decode( method, endpoint, raw_resp )
+    attempts = 0
+
+    async def request():
+        nonlocal attempts
+        attempts += 1
+        if attempts > 1:
+            count_retry( endpoint, method )
+        raw_resp = await base_request( method, params, endpoint, timeout )
+        try:
+            resp = decode( method, endpoint, raw_resp )
+        except RPCError as err:
+            record_failure( endpoint, err )
+            count_error( endpoint, method, err )
+            raise
+        store( method, params, endpoint, raw_resp, resp )
+        return resp
+
+    return await async_coalesce(
+        lambda: async_call_with_retry( request, method, retry_policy, timeout ),
+        method,
+        params,
+        endpoint
+    )
+
+
+async def rpc_stream(
+    method,
+    params = None,
+    path = ( "result",
+            ),
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT,
+    retry_policy = None,
+    chunk_size = 65536,
+):
+    """Async version of :func:`pyhmy.rpc.request.rpc_stream`, an async
+    generator."""
+    data = encode( method, params )
+    async with contextlib.AsyncExitStack() as stack:
+        resp = await async_call_with_retry(
+            lambda: _open_stream( stack, data, method, endpoint, timeout ),
+            method,
+            retry_policy,
+            timeout
+        )
+        parser = JSONArrayStream( path )
+        try:
+            async for chunk in resp.content.iter_chunked( chunk_size ):
+                for element in parser.feed( chunk ):
+                    yield element
+                if parser.done:
+                    return
+            for element in parser.close():
+                yield element
+        except asyncio.TimeoutError as err:
+            raise RequestsTimeoutError( endpoint ) from err
+        except aiohttp.ClientError as err:
+            raise RequestsError( endpoint ) from err
+        except json.decoder.JSONDecodeError as err:
+            raise RPCError( method, endpoint, "invalid reply" ) from err
+    for element in remainder( method, endpoint, parser.document, path ):
+        yield element
+
+
+async def _open_stream( stack, data, method, endpoint, timeout ):
+    """Async twin of :func:`pyhmy.rpc.request._open_stream`."""
+    async def open_on( node ):
+        async with contextlib.AsyncExitStack() as attempt:
+            resp = await attempt.enter_async_context(
+                _post_stream( data,
+                              node,
+                              timeout )
+            )
+            stack.push_async_exit( attempt.pop_all() )
+            return resp
+
+    if isinstance( endpoint, EndpointPool ):
+        return await endpoint.async_send( open_on, method, hedge = False )
+    return await open_on( endpoint )
+
+
+@contextlib.asynccontextmanager
+async def _post_stream( data, endpoint, timeout ):
+    """Async twin of :func:`pyhmy.rpc.request._post_stream`."""
+    body, headers = get_default_compression().encode( data )
+    session = get_default_pool().get_session()
+    async with async_limited( endpoint ):
+        try:
+            resp = await session.post(
+                endpoint,
+                headers = headers,
+                data = body,
+                timeout = _client_timeout( timeout,
+                                           endpoint,
+                                           stream = True ),
+                allow_redirects = True,
+            )
+        except asyncio.TimeoutError as err:
+            raise RequestsTimeoutError( endpoint ) from err
+        except aiohttp.ClientError as err:
+            raise RequestsError( endpoint ) from err
+        async with resp:
+            check_status( endpoint, resp.status, resp.headers )
+            yield resp
@@ -0,0 +1,264 @@
+"""
+JSON-RPC 2.0 batch requests
+"""
+import functools
+import itertools
+import json
+
+from . import codec
+
+from .exceptions import RPCError
+
+from .request import _send
+
+from .retry import call_with_retry
+
+from ..constants import DEFAULT_ENDPOINT, DEFAULT_TIMEOUT
+
+_ids = itertools.count( 1 )
+
+BATCH_METHOD = "batch"
+
+
+class BatchCall:
+    """Single call of a :obj:`BatchRequest`.
+
+    Attributes
+    ----------
+    method: str
+        RPC method of the call
+    params: list
+        Parameters of the call
+    id: int
+        JSON-RPC id of the call, unique within the process
+    reply: dict
+        Reply matched to the call once the batch has been sent
+    error: :obj:`RPCError`
+        Error for this call once the batch has been sent, if any
+    """
+    def __init__( self, method, params, endpoint ):
+        self.method = method
+        self.params = params
+        self.endpoint = endpoint
+        self.id = next( _ids )  # pylint: disable=invalid-name
+        self.reply = None
+        self.error = None
+
+    @property
+    def payload( self ) -> dict:
+        """JSON-RPC request object of the call, as sent in the batch.
+
+        Returns
+        -------
+        dict
+            With the `id`, `jsonrpc`, `method` and `params` keys
+        """
+        return {
+            "id": self.id,
+            "jsonrpc": "2.0",
+            "method": self.method,
+            "params": self.params
+        }
+
+    @property
+    def done( self ) -> bool:
+        """True once a reply or error has been set for the call."""
+        return self.reply is not None or self.error is not None
+
+    def result( self ) -> dict:
+        """Reply of the call, same format as :func:`rpc_request`.
+
+        Raises
+        ------
+        RPCError
+            If the node returned an error for this call, no reply for this
+            call, or the batch has not been sent yet
+        """
+        if self.error is not None:
+            raise self.error
+        if self.reply is None:
+            raise RPCError( self.method, self.endpoint, "batch not sent" )
+        return self.reply
+
+    def _resolve( self, reply ):
+        if reply is None:
+            self.error = RPCError(
+                self.method,
+                self.endpoint,
+                f"no reply for id {self.id} in batch"
+            )
+        elif "error" in reply:
+            self.error = RPCError(
+                self.method,
+                self.endpoint,
+                str( reply[ "error" ] )
+            )
+        else:
+            self.reply = reply
+
+
+class BatchRequest:
+    """Builder for a JSON-RPC 2.0 batch, sent as one HTTP request.
+
+    Example::
+
+        >>> batch = BatchRequest( endpoint = endpoint )
+        >>> calls = [ batch.add( "hmyv2_getBalance", [ addr ] ) for addr in addresses ]
+        >>> batch.send()
+        >>> balances = [ call.result()[ "result" ] for call in calls ]
+
+    Parameters
+    ----------
+    endpoint: :obj:`str` or :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool`, optional
+        Endpoint (or pool of endpoints) to send request to
+    timeout: :obj:`int`, optional
+        Timeout in seconds
+    max_size: :obj:`int`, optional
+        Maximum number of calls per HTTP request, larger batches are split
+        None to always send a single HTTP request
+    retry_policy: :obj:`~pyhmy.rpc.retry.RetryPolicy`, optional
+        Retry policy for each HTTP request, the default policy if None.
+        A batch is only retried if all of its methods are idempotent
+    """
+    def __init__(
+        self,
+        endpoint = DEFAULT_ENDPOINT,
+        timeout = DEFAULT_TIMEOUT,
+        max_size = None,
+        retry_policy = None
+    ):
+        if max_size is not None and max_size < 1:
+            raise ValueError( "max_size must be at least 1" )
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.max_size = max_size
+        self.retry_policy = retry_policy
+        self.calls = []
+
+    def __len__( self ):
+        return len( self.calls )
+
+    def add( self, method, params = None ) -> BatchCall:
+        """Add a call to the batch.
+
+        Parameters
+        ----------
+        method: str
+            RPC Method to call
+        params: :obj:`list`, optional
+            Parameters for the RPC method
+
+        Returns
+        -------
+        :obj:`BatchCall`
+            Call whose result is available once the batch is sent
+
+        Raises
+        ------
+        TypeError
+            If params is not a list or None
+        """
+        if params is None:
+            params = []
+        elif not isinstance( params, list ):
+            raise TypeError( f"invalid type {params.__class__}" )
+        call = BatchCall( method, params, self.endpoint )
+        self.calls.append( call )
+        return call
+
+    def _chunks( self ):
+        pending = [ call for call in self.calls if not call.done ]
+        size = self.max_size or len( pending ) or 1
+        for start in range( 0, len( pending ), size ):
+            yield pending[ start : start + size ]
+
+    def send( self ) -> list:
+        """Send all calls not sent yet and match the replies by id.
+
+        Errors returned by the node for individual calls do not fail the
+        batch, they are raised by :meth:`BatchCall.result` instead.
+
+        Returns
+        -------
+        list of :obj:`BatchCall`
+            All calls of the batch, in the order they were added
+
+        Raises
+        ------
+        RequestsTimeoutError
+            If request timed out
+        RequestsError
+            If other request error occured
+        RPCError
+            If the reply could not be decoded, or is neither a list of replies
+            nor an error
+        """
+        for chunk in self._chunks():
+            data = codec.dumps( [ call.payload for call in chunk ] )
+            methods = [ call.method for call in chunk ]
+            raw_resp = call_with_retry(
+                functools.partial(
+                    _send,
+                    data,
+                    methods,
+                    self.endpoint,
+                    self.timeout
+                ),
+                methods,
+                self.retry_policy,
+                self.timeout
+            )
+            try:
+                replies = codec.loads( raw_resp )
+            except json.decoder.JSONDecodeError as err:
+                raise RPCError( BATCH_METHOD, self.endpoint, raw_resp ) from err
+            if isinstance( replies, dict ) and "error" in replies:
+                # the whole batch was rejected, e.g. batch size limit
+                for call in chunk:
+                    call._resolve( replies )  # pylint: disable=protected-access
+                continue
+            if not isinstance( replies, list ):
+                raise RPCError( BATCH_METHOD, self.endpoint, raw_resp )
+            by_id = {
+                reply.get( "id" ): reply
+                for reply in replies
+                if isinstance( reply, dict )
+            }
+            for call in chunk:
+                call._resolve( by_id.get( call.id ) )  # pylint: disable=protected-access
+        return self.calls
+
+
+def rpc_batch_request(
+    calls,
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT,
+    max_size = None
+) -> list:
+    """Send many RPC calls as one JSON-RPC batch.
+
+    Parameters
+    ----------
+    calls: list of (str, list)
+        (method, params) pairs to call
+    endpoint: :obj:`str` or :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool`, optional
+        Endpoint (or pool of endpoints) to send request to
+    timeout: :obj:`int`, optional
+        Timeout in seconds
+    max_size: :obj:`int`, optional
+        Maximum number of calls per HTTP request
+
+    Returns
+    -------
+    list of :obj:`BatchCall`
+        One call per (method, params) pair, in the same order.
+        Use :meth:`BatchCall.result` to get the reply or raise its RPCError
+
+    See Also
+    --------
+    BatchRequest
+    """
+    batch = BatchRequest( endpoint, timeout, max_size )
+    for method, params in calls:
+        batch.add( method, params )
+    return batch.send()
@@ -0,0 +1,301 @@
+"""
+Per-endpoint circuit breakers, failing fast while an endpoint is down
+"""
+import collections
+import contextlib
+import threading
+import time
+
+from . import settings
+
+from .exceptions import (
+    CircuitOpenError,
+    RequestsError,
+    RequestsTimeoutError,
+    RPCError,
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# number of buckets of the failure rate window
+_BUCKETS = 10
+
+
+class Circuit:
+    """Circuit breaker of a single endpoint.
+
+    Closed, requests go through and their outcomes are counted over the last
+    `window` seconds. It opens when at least `min_requests` were sent in
+    the window and `failure_rate` of them failed. Open, requests fail with
+    :obj:`~pyhmy.rpc.exceptions.CircuitOpenError` without being sent, for
+    `open_seconds`. Half-open, `probes` requests are let through: the
+    circuit closes if one succeeds, and opens again if one fails.
+    """
+    def __init__(
+        self,
+        endpoint,
+        failure_rate = 0.5,
+        min_requests = 10,
+        window = 30.0,
+        open_seconds = 10.0,
+        probes = 1,
+    ):
+        self.endpoint = endpoint
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.open_seconds = open_seconds
+        self.probes = probes
+        self._state = CLOSED
+        self._open_until = 0.0
+        self._probing = 0
+        # ( bucket, requests, failures ), oldest first
+        self._buckets = collections.deque()
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.rejected = 0
+
+    def _bucket( self, now ) -> list:
+        bucket = int( now * _BUCKETS / self.window )
+        while self._buckets and self._buckets[ 0 ][ 0 ] <= bucket - _BUCKETS:
+            self._buckets.popleft()
+        if not self._buckets or self._buckets[ -1 ][ 0 ] != bucket:
+            self._buckets.append( [ bucket, 0, 0 ] )
+        return self._buckets[ -1 ]
+
+    def _counts( self, now ) -> tuple:
+        self._bucket( now )
+        return (
+            sum( bucket[ 1 ] for bucket in self._buckets ),
+            sum( bucket[ 2 ] for bucket in self._buckets ),
+        )
+
+    def _open( self, now ):
+        self._state = OPEN
+        self._open_until = now + self.open_seconds
+        self._probing = 0
+        self.opened += 1
+
+    @property
+    def state( self ) -> str:
+        """'closed', 'open' or 'half_open'."""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() >= self._open_until:
+                return HALF_OPEN
+            return self._state
+
+    def acquire( self ):
+        """Let a request through, or fail fast.
+
+        Raises
+        ------
+        CircuitOpenError
+            If the circuit is open, or half-open with all probes in flight
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._state == OPEN and now >= self._open_until:
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN:
+                if self._probing < self.probes:
+                    self._probing += 1
+                    return
+            elif self._state == CLOSED:
+                self._bucket( now )[ 1 ] += 1
+                return
+            self.rejected += 1
+            retry_after = max( 0.0, self._open_until - now )
+        raise CircuitOpenError( self.endpoint, retry_after )
+
+    def success( self ):
+        """Record that the request went through."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._probing = 0
+                self._buckets.clear()
+
+    def failure( self ):
+        """Record a failed request, opening the circuit if the failure rate
+        is reached."""
+        now = time.monotonic()
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._open( now )
+            elif self._state == CLOSED:
+                self._bucket( now )[ 2 ] += 1
+                requests, failures = self._counts( now )
+                if (
+                    requests >= self.min_requests and
+                    failures >= self.failure_rate * requests
+                ):
+                    self._open( now )
+
+    def release( self ):
+        """Give back the probe of a request whose outcome is unknown, e.g.
+        cancelled."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probing:
+                self._probing -= 1
+
+    def stats( self ) -> dict:
+        """State of the circuit, and counts of the window."""
+        state = self.state
+        with self._lock:
+            requests, failures = self._counts( time.monotonic() )
+            return {
+                "state": state,
+                "requests": requests,
+                "failures": failures,
+                "failure_rate": failures / requests if requests else 0.0,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+class CircuitBreaker:
+    """Circuit breakers of every endpoint, see :obj:`Circuit`.
+
+    Endpoints of an :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool` have their
+    own circuit; the pool does not pick endpoints whose circuit is open.
+    RPC errors are only counted for requests to a single endpoint, as the
+    endpoint of a pool that replied is not known by then.
+
+    Parameters
+    ----------
+    failure_rate: :obj:`float`, optional
+        Fraction of failed requests in the window that opens the circuit
+    min_requests: :obj:`int`, optional
+        Requests in the window below which the circuit stays closed
+    window: :obj:`float`, optional
+        Length of the window of counted requests, in seconds
+    open_seconds: :obj:`float`, optional
+        Time an open circuit fails requests before letting probes through
+    probes: :obj:`int`, optional
+        Concurrent requests let through by a half-open circuit
+    failures: :obj:`tuple`, optional
+        Exception types counted as failures
+    """
+    def __init__(
+        self,
+        failure_rate = 0.5,
+        min_requests = 10,
+        window = 30.0,
+        open_seconds = 10.0,
+        probes = 1,
+        failures = ( RequestsError,
+                     RequestsTimeoutError,
+                     RPCError ),
+    ):
+        if not 0 < failure_rate <= 1:
+            raise ValueError( "failure_rate must be in (0, 1]" )
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.open_seconds = open_seconds
+        self.probes = probes
+        self.failures = tuple( failures )
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def circuit( self, endpoint ) -> Circuit:
+        """Get (or create) the circuit of the endpoint."""
+        with self._lock:
+            circuit = self._circuits.get( endpoint )
+            if circuit is None:
+                circuit = self._circuits[ endpoint ] = Circuit(
+                    endpoint,
+                    self.failure_rate,
+                    self.min_requests,
+                    self.window,
+                    self.open_seconds,
+                    self.probes,
+                )
+            return circuit
+
+    def is_open( self, endpoint ) -> bool:
+        """Check if requests to the endpoint currently fail fast."""
+        with self._lock:
+            circuit = self._circuits.get( endpoint )
+        return circuit is not None and circuit.state == OPEN
+
+    @contextlib.contextmanager
+    def guarded( self, endpoint ):
+        """Context of a request to the endpoint, fails fast on entry if the
+        circuit is open and records the outcome."""
+        circuit = self.circuit( endpoint )
+        circuit.acquire()
+        try:
+            yield circuit
+        except self.failures:
+            circuit.failure()
+            raise
+        except BaseException:
+            circuit.release()
+            raise
+        circuit.success()
+
+    def record_failure( self, endpoint, error ):
+        """Count a failure detected after the request went through, e.g. an
+        RPC error reply."""
+        if isinstance( error, self.failures ):
+            self.circuit( endpoint ).failure()
+
+    def stats( self ) -> dict:
+        """State of every circuit, see :meth:`Circuit.stats`."""
+        with self._lock:
+            circuits = dict( self._circuits )
+        return {
+            endpoint: circuit.stats()
+            for endpoint, circuit in circuits.items()
+        }
+
+
+_default_breaker = None
+_default_breaker_lock = threading.Lock()
+
+
+def get_default_breaker() -> CircuitBreaker:
+    """Circuit breaker applied to every request, None if disabled (the
+    default)."""
+    return settings.lookup( "breaker", _default_breaker )
+
+
+def set_default_breaker( breaker ) -> CircuitBreaker:
+    """Replace the default circuit breaker and return the previous one.
+
+    Parameters
+    ----------
+    breaker: :obj:`CircuitBreaker`
+        New default breaker, None to disable circuit breaking
+    """
+    global _default_breaker  # pylint: disable=global-statement
+    if breaker is not None and not isinstance( breaker, CircuitBreaker ):
+        raise TypeError( f"invalid type {breaker.__class__}" )
+    with _default_breaker_lock:
+        previous, _default_breaker = _default_breaker, breaker
+    return previous
+
+
+def guarded( endpoint ):
+    """Context of a request to the endpoint under the default breaker."""
+    breaker = get_default_breaker()
+    if breaker is None:
+        return contextlib.nullcontext()
+    return breaker.guarded( endpoint )
+
+
+def record_failure( endpoint, error ):
+    """Count an RPC error reply of a single endpoint in the default
+    breaker."""
+    breaker = get_default_breaker()
+    if breaker is not None and isinstance( endpoint, str ):
+        breaker.record_failure( endpoint, error )
+
+
+def is_open( endpoint ) -> bool:
+    """Check if the default breaker fails requests to the endpoint fast."""
+    breaker = get_default_breaker()
+    return breaker is not None and breaker.is_open( endpoint )
@@ -0,0 +1,387 @@
+"""
+Finality-aware response cache: replies that can no longer change (blocks,
+transactions and receipts once included in a block) are kept until evicted,
+replies about the chain tip for a short time only
+"""
+import collections
+import math
+import threading
+import time
+
+from . import settings
+
+from .methods import (
+    BLOCK_NUMBER_METHODS,
+    HASH_METHODS,
+    TIP_METHODS,
+    call_key,
+)
+
+_ZERO_HASHES = ( None, "", "0x" + "0" * 64 )
+
+
+def _is_block_number( param ) -> bool:
+    # "latest", "pending", ... move with the chain, hex strings do not
+    if isinstance( param, str ):
+        return param.startswith( "0x" )
+    return isinstance( param, int ) and not isinstance( param, bool )
+
+
+def _block_number( param ) -> int:
+    return param if isinstance( param, int ) else int( param, 16 )
+
+
+def _is_pending( result ) -> bool:
+    """Check if a result refers to something not yet in a block."""
+    if isinstance( result, list ):
+        return any( _is_pending( item ) for item in result )
+    if not isinstance( result, dict ):
+        return False
+    if "blockHash" in result and result[ "blockHash" ] in _ZERO_HASHES:
+        return True
+    return "blockNumber" in result and result[ "blockNumber" ] is None
+
+
+class CacheBackend:
+    """Storage of a :obj:`ResponseCache`, mapping string keys to raw replies.
+
+    Backends must be safe to use from several threads. Persistent backends
+    outlive the process and the endpoint URLs it used, so their keys are
+    built from the chain identity of the :obj:`ResponseCache`.
+    """
+    persistent = False
+
+    def get( self, key ):
+        """Stored value of the key, None if missing or expired."""
+        raise NotImplementedError
+
+    def set( self, key, value, ttl = None ):
+        """Store the value for `ttl` seconds, or until evicted if None."""
+        raise NotImplementedError
+
+    def delete( self, key ):
+        """Remove the key, if stored."""
+        raise NotImplementedError
+
+    def clear( self ):
+        """Remove every key."""
+        raise NotImplementedError
+
+    def stats( self ) -> dict:
+        """Backend specific counters."""
+        return {}
+
+    def close( self ):
+        """Release the resources held by the backend."""
+
+
+class MemoryBackend( CacheBackend ):
+    """In-process LRU backend bounded by entry count and total size.
+
+    Parameters
+    ----------
+    max_entries: :obj:`int`, optional
+        Maximum number of stored replies
+    max_bytes: :obj:`int`, optional
+        Maximum total size of the stored replies, in bytes
+    """
+    def __init__( self, max_entries = 100000, max_bytes = 64 * 1024 * 1024 ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get( self, key ):
+        with self._lock:
+            entry = self._entries.get( key )
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                self._remove( key )
+                return None
+            self._entries.move_to_end( key )
+            return value
+
+    def set( self, key, value, ttl = None ):
+        if len( value ) > self.max_bytes:
+            return
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove( key )
+            self._entries[ key ] = ( value, expires )
+            self._size += len( value )
+            while self._over_limits():
+                self._remove( next( iter( self._entries ) ) )
+                self.evictions += 1
+
+    def delete( self, key ):
+        with self._lock:
+            if key in self._entries:
+                self._remove( key )
+
+    def clear( self ):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove( self, key ):
+        value, _ = self._entries.pop( key )
+        self._size -= len( value )
+
+    def _over_limits( self ) -> bool:
+        if len( self._entries ) > self.max_entries:
+            return True
+        return self._size > self.max_bytes
+
+    def stats( self ) -> dict:
+        with self._lock:
+            return {
+                "entries": len( self._entries ),
+                "bytes": self._size,
+                "evictions": self.evictions,
+            }
+
+
+class TieredBackend( CacheBackend ):
+    """Small fast backend in front of a large slow one, e.g. a
+    :obj:`MemoryBackend` in front of a
+    :obj:`~pyhmy.rpc.disk_cache.SQLiteBackend`.
+
+    Final replies are written to both backends, replies with a TTL (chain
+    tip) to the front one only. Replies read from the back backend are copied
+    to the front one.
+
+    Parameters
+    ----------
+    front: :obj:`CacheBackend`
+        Backend looked up first
+    back: :obj:`CacheBackend`
+        Backend looked up on a miss of the front one
+    """
+    def __init__( self, front, back ):
+        self.front = front
+        self.back = back
+        self.persistent = front.persistent or back.persistent
+
+    def get( self, key ):
+        value = self.front.get( key )
+        if value is None:
+            value = self.back.get( key )
+            if value is not None:
+                self.front.set( key, value )
+        return value
+
+    def set( self, key, value, ttl = None ):
+        self.front.set( key, value, ttl )
+        if ttl is None:
+            self.back.set( key, value )
+
+    def delete( self, key ):
+        self.front.delete( key )
+        self.back.delete( key )
+
+    def clear( self ):
+        self.front.clear()
+        self.back.clear()
+
+    def stats( self ) -> dict:
+        return {
+            "front": self.front.stats(),
+            "back": self.back.stats(),
+        }
+
+    def close( self ):
+        self.front.close()
+        self.back.close()
+
+
+class ResponseCache:
+    """Cache of raw RPC replies, deciding per call whether and for how long a
+    reply may be reused.
+
+    Reads of a block by number or hash, and of transactions, staking
+    transactions and receipts by hash are cached until evicted, unless the
+    block does not exist yet or the transaction is still pending (null reply,
+    zero block hash). Harmony blocks are final once produced, so no
+    confirmation depth is needed. Reads of the chain tip are cached for
+    `tip_ttl` seconds. Error replies and all other methods are never cached.
+
+    Replies are keyed by method, params and either the endpoint or, if
+    `chain` is given, the chain identity of the endpoint, so that endpoints
+    (and pools, whatever the order of their nodes) serving the same shard
+    share entries.
+
+    Parameters
+    ----------
+    backend: :obj:`CacheBackend`, optional
+        Storage of the replies, a :obj:`MemoryBackend` if None
+    tip_ttl: :obj:`float`, optional
+        Lifetime of chain tip replies (block number, latest header), in
+        seconds, 0 to not cache them
+    chain: :obj:`str` or callable, optional
+        Identity of the chain and shard the calls go to, e.g.
+        ``"mainnet-s0"``, or a function returning it for an endpoint;
+        required if the backend is persistent
+
+    Raises
+    ------
+    ValueError
+        If the backend is persistent and no `chain` is given
+    """
+    def __init__( self, backend = None, tip_ttl = 1.0, chain = None ):
+        self.backend = backend if backend is not None else MemoryBackend()
+        if chain is None and self.backend.persistent:
+            raise ValueError( "a persistent backend needs a chain identity" )
+        self.tip_ttl = tip_ttl
+        self.chain = chain
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @staticmethod
+    def applies( method ) -> bool:
+        """Check if replies of the method may be cached."""
+        return (
+            method in BLOCK_NUMBER_METHODS or method in HASH_METHODS or
+            method in TIP_METHODS or method == "hmyv2_getBlocks"
+        )
+
+    def ttl( self, method, params, result ):
+        """Lifetime of a result in seconds, :data:`math.inf` if final, None
+        if it must not be cached."""
+        if method in TIP_METHODS:
+            return self.tip_ttl or None
+        if result is None or _is_pending( result ):
+            return None
+        if method in HASH_METHODS:
+            return math.inf
+        if method in BLOCK_NUMBER_METHODS:
+            return math.inf if params and _is_block_number(
+                params[ 0 ]
+            ) else None
+        if method == "hmyv2_getBlocks":
+            # a range reaching past the tip is missing its last blocks
+            if len( params ) < 2 or not all(
+                _is_block_number( param ) for param in params[ : 2 ]
+            ):
+                return None
+            count = _block_number( params[ 1 ] ) - _block_number( params[ 0 ] )
+            return math.inf if len( result ) == count + 1 else None
+        return None
+
+    def key( self, endpoint, method, params ) -> str:
+        """Key of the call in the backend."""
+        chain = self.chain
+        if chain is None:
+            chain = endpoint
+        elif callable( chain ):
+            chain = chain( endpoint )
+        return call_key( chain, method, params )
+
+    def get( self, endpoint, method, params ):
+        """Cached raw reply of the call, None on a miss."""
+        if not self.applies( method ):
+            return None
+        raw_resp = self.backend.get( self.key( endpoint, method, params ) )
+        with self._lock:
+            if raw_resp is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return raw_resp
+
+    def put( self, endpoint, method, params, raw_resp, resp ):
+        """Store the raw reply of the call, if its result may be cached.
+
+        Parameters
+        ----------
+        endpoint: :obj:`str` or :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool`
+            Endpoint the call was sent to
+        method: str
+            RPC method
+        params: list
+            Parameters of the call
+        raw_resp: bytes
+            Raw reply
+        resp: dict
+            Decoded reply, used to check the finality of the result
+        """
+        if not self.applies( method ):
+            return
+        ttl = self.ttl( method, params, resp.get( "result" ) )
+        if ttl is None:
+            return
+        self.backend.set(
+            self.key( endpoint,
+                      method,
+                      params ),
+            raw_resp,
+            None if ttl == math.inf else ttl
+        )
+        with self._lock:
+            self.stores += 1
+
+    def clear( self ):
+        """Remove every cached reply."""
+        self.backend.clear()
+
+    def close( self ):
+        """Close the backend."""
+        self.backend.close()
+
+    def stats( self ) -> dict:
+        """Hit, miss and store counters, and those of the backend."""
+        with self._lock:
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+            }
+        stats.update( self.backend.stats() )
+        return stats
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> ResponseCache:
+    """Response cache used by :func:`pyhmy.rpc.request.rpc_request`, None
+    if caching is disabled (the default)."""
+    return settings.lookup( "cache", _default_cache )
+
+
+def set_default_cache( cache ) -> ResponseCache:
+    """Replace the default response cache and return the previous one.
+
+    Parameters
+    ----------
+    cache: :obj:`ResponseCache`
+        New default cache, None to disable caching
+    """
+    global _default_cache  # pylint: disable=global-statement
+    if cache is not None and not isinstance( cache, ResponseCache ):
+        raise TypeError( f"invalid type {cache.__class__}" )
+    with _default_cache_lock:
+        previous, _default_cache = _default_cache, cache
+    return previous
+
+
+def lookup( method, params, endpoint ):
+    """Raw reply of the call from the default cache, None on a miss."""
+    cache = get_default_cache()
+    if cache is None:
+        return None
+    return cache.get( endpoint, method, params or [] )
+
+
+def store( method, params, endpoint, raw_resp, resp ):
+    """Store the reply of the call in the default cache, if enabled."""
+    cache = get_default_cache()
+    if cache is not None:
+        cache.put( endpoint, method, params or [], raw_resp, resp )
@@ -0,0 +1,136 @@
+"""
+JSON codecs used to encode RPC payloads and decode replies
+
+The standard library is used by default. :obj:`OrjsonCodec` (`pip install
+pyhmy[fast]`) encodes with `orjson`, but decodes exactly only after
+scanning the reply for integers above 64 bits, which costs about what
+`orjson` saves.
+"""
+import json
+import threading
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+from . import settings
+
+
+def _number_table() -> bytes:
+    table = bytearray( b"x" * 256 )
+    for char in b"0123456789":
+        table[ char ] = ord( "0" )
+    # whitespace is mapped rather than deleted, which is much slower
+    for char in b":,[ \t\r\n":
+        table[ char ] = ord( ":" )
+    table[ ord( "-" ) ] = ord( "-" )
+    return bytes( table )
+
+
+# orjson decodes integers above the uint64 maximum (20 digits) or below the
+# int64 minimum (19 digits) as floats, e.g. balances in wei; such numbers
+# are found by mapping digits to "0" and value separators to ":", several
+# times faster than a regex
+_NUMBER_TABLE = _number_table()
+_BIG_INTS = ( b":" + b"0" * 20, b":-" + b"0" * 19 )
+
+
+def _has_big_int( data ) -> bool:
+    numbers = data.translate( _NUMBER_TABLE )
+    return any( pattern in numbers for pattern in _BIG_INTS )
+
+
+class JSONCodec:
+    """Standard library JSON codec, the base of all codecs.
+
+    Codecs encode to and decode from bytes, so that replies are decoded
+    straight from the buffer they were read into.
+    """
+    name = "json"
+
+    def dumps( self, obj ) -> bytes:
+        """Encode an object to JSON bytes."""
+        return json.dumps( obj, separators = ( ",", ":" ) ).encode()
+
+    def loads( self, data ):
+        """Decode JSON from :obj:`bytes`, :obj:`bytearray`,
+        :obj:`memoryview` or :obj:`str`.
+
+        Raises
+        ------
+        json.decoder.JSONDecodeError
+            If data is not valid JSON
+        """
+        if isinstance( data, memoryview ):
+            data = data.tobytes()
+        return json.loads( data )
+
+
+class OrjsonCodec( JSONCodec ):
+    """JSON codec on `orjson`.
+
+    orjson only handles 64-bit integers, so payloads and replies containing
+    larger ones are handled by the standard library to keep them exact.
+    Replies are scanned for them first (a translated copy of the reply),
+    and any amount in Atto above about 18.4 ONE sends the whole reply to the
+    standard library, so decoding is not faster than with
+    :obj:`JSONCodec`, the default.
+    """
+    name = "orjson"
+
+    def __init__( self ):
+        if orjson is None:
+            raise ImportError(
+                "`orjson` is not installed, install it with `pip install pyhmy[fast]`"
+            )
+
+    def dumps( self, obj ) -> bytes:
+        try:
+            return orjson.dumps( obj )
+        except TypeError:
+            return super().dumps( obj )
+
+    def loads( self, data ):
+        if isinstance( data, str ):
+            data = data.encode()
+        elif isinstance( data, memoryview ):
+            data = data.tobytes()
+        if _has_big_int( data ):
+            return super().loads( data )
+        return orjson.loads( data )
+
+
+_default_codec = JSONCodec()
+_default_codec_lock = threading.Lock()
+
+
+def get_default_codec() -> JSONCodec:
+    """Codec used for RPC payloads and replies."""
+    return settings.lookup( "codec", _default_codec )
+
+
+def set_default_codec( codec ) -> JSONCodec:
+    """Replace the default codec and return the previous one.
+
+    Parameters
+    ----------
+    codec: :obj:`JSONCodec`
+        New default codec
+    """
+    global _default_codec  # pylint: disable=global-statement
+    if not isinstance( codec, JSONCodec ):
+        raise TypeError( f"invalid type {codec.__class__}" )
+    with _default_codec_lock:
+        previous, _default_codec = _default_codec, codec
+    return previous
+
+
+def dumps( obj ) -> bytes:
+    """Encode an object with the default codec."""
+    return get_default_codec().dumps( obj )
+
+
+def loads( data ):
+    """Decode JSON with the default codec."""
+    return get_default_codec().loads( data )
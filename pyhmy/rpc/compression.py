@@ -0,0 +1,126 @@
+"""
+Compression of RPC payloads and replies, with byte counters
+
+Replies are compressed by the node when the request allows it with
+`Accept-Encoding`, and decompressed transparently. Large request bodies,
+such as big batches, can be gzip compressed too, for nodes (or gateways in
+front of them) that accept `Content-Encoding: gzip`.
+"""
+import gzip
+import threading
+
+from . import settings
+
+DEFAULT_ACCEPT_ENCODING = "gzip, deflate"
+
+
+class Compression:
+    """Content encodings of the RPC traffic, and counters of the bytes sent
+    and received before and after compression.
+
+    Parameters
+    ----------
+    accept_encoding: :obj:`str`, optional
+        `Accept-Encoding` of the requests, 'identity' for uncompressed
+        replies
+    compress_requests: :obj:`int`, optional
+        Request bodies of at least this many bytes are gzip compressed,
+        None to never compress them
+    level: :obj:`int`, optional
+        gzip compression level of request bodies, 1 (fastest) to 9
+    """
+    def __init__(
+        self,
+        accept_encoding = DEFAULT_ACCEPT_ENCODING,
+        compress_requests = None,
+        level = 5
+    ):
+        self.accept_encoding = accept_encoding
+        self.compress_requests = compress_requests
+        self.level = level
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._compressed_requests = 0
+        self._request_bytes = 0
+        self._request_wire_bytes = 0
+        self._response_bytes = 0
+        self._response_wire_bytes = 0
+
+    def encode( self, data ) -> tuple:
+        """Body and headers of the request for an encoded payload.
+
+        Returns
+        -------
+        tuple of (bytes, dict)
+            Body to send (compressed if large enough) and its HTTP headers
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Accept-Encoding": self.accept_encoding,
+        }
+        if self.compress_requests is not None and len(
+            data
+        ) >= self.compress_requests:
+            data = gzip.compress( data, compresslevel = self.level, mtime = 0 )
+            headers[ "Content-Encoding" ] = "gzip"
+        return data, headers
+
+    def record( self, request, request_wire, response, response_wire ):
+        """Count the bytes of a request and its reply.
+
+        Parameters
+        ----------
+        request: int
+            Size of the payload
+        request_wire: int
+            Size of the body sent
+        response: int
+            Size of the decompressed reply
+        response_wire: int
+            Size of the reply received
+        """
+        with self._lock:
+            self._requests += 1
+            self._compressed_requests += request_wire != request
+            self._request_bytes += request
+            self._request_wire_bytes += request_wire
+            self._response_bytes += response
+            self._response_wire_bytes += response_wire
+
+    def stats( self ) -> dict:
+        """Byte counters; `*_wire_bytes` are the sizes on the network."""
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "compressed_requests": self._compressed_requests,
+                "request_bytes": self._request_bytes,
+                "request_wire_bytes": self._request_wire_bytes,
+                "response_bytes": self._response_bytes,
+                "response_wire_bytes": self._response_wire_bytes,
+            }
+
+
+_default_compression = Compression()
+_default_compression_lock = threading.Lock()
+
+
+def get_default_compression() -> Compression:
+    """Compression settings used by the RPC layer."""
+    return settings.lookup( "compression", _default_compression )
+
+
+def set_default_compression( compression ) -> Compression:
+    """Replace the default compression settings and return the previous
+    ones.
+
+    Parameters
+    ----------
+    compression: :obj:`Compression`
+        New default settings
+    """
+    global _default_compression  # pylint: disable=global-statement
+    if not isinstance( compression, Compression ):
+        raise TypeError( f"invalid type {compression.__class__}" )
+    with _default_compression_lock:
+        previous, _default_compression = _default_compression, compression
+    return previous
@@ -0,0 +1,175 @@
+"""
+Total time budgets shared by the requests of a call
+
+Every `timeout` argument accepts a :obj:`Deadline` in place of a number of
+seconds, which is passed down unchanged to the nested calls, so that they
+all draw from the same budget::
+
+    >>> account.get_total_balance( address, timeout = Deadline( 10 ) )
+
+A deadline can also be entered as a context, which caps every request sent
+within it, including the ones of calls that do not take a `timeout`::
+
+    >>> with Deadline( 10, connect = 2 ):
+    ...     transaction.send_and_confirm_raw_transaction( signed_tx )
+"""
+import contextvars
+import math
+import time
+
+from .exceptions import RequestsTimeoutError
+
+_scope = contextvars.ContextVar( "pyhmy_deadline", default = None )
+# tokens of the deadline contexts entered in the current context, innermost
+# last; kept per context so that a deadline can be entered concurrently
+_tokens = contextvars.ContextVar( "pyhmy_deadline_tokens", default = () )
+
+
+class Deadline:
+    """Time budget, with optional separate connect and read timeouts for
+    each request.
+
+    Parameters
+    ----------
+    total: :obj:`float`, optional
+        Seconds from now until the deadline, None for no total budget
+    connect: :obj:`float`, optional
+        Timeout for each connection attempt, in seconds
+    read: :obj:`float`, optional
+        Timeout for each read of the reply, in seconds
+
+    Attributes
+    ----------
+    expires: float
+        :func:`time.monotonic` time of the deadline, `math.inf` if none
+    """
+    def __init__( self, total = None, connect = None, read = None ):
+        self.total = total
+        self.connect = connect
+        self.read = read
+        self.expires = math.inf if total is None else time.monotonic() + total
+
+    def remaining( self ) -> float:
+        """Seconds left until the deadline, `math.inf` if none."""
+        return self.expires - time.monotonic()
+
+    @property
+    def expired( self ) -> bool:
+        return self.remaining() <= 0
+
+    def cap( self, seconds ) -> float:
+        """`seconds`, cut to the time left until the deadline."""
+        return max( 0.0, min( seconds, self.remaining() ) )
+
+    def within( self, other ) -> "Deadline":
+        """Copy of the deadline expiring no later than `other`."""
+        if other is None or other.expires >= self.expires:
+            return self
+        deadline = Deadline( connect = self.connect, read = self.read )
+        deadline.total = other.total
+        deadline.expires = other.expires
+        return deadline
+
+    def timeouts( self, endpoint ) -> tuple:
+        """Connect and read timeouts of the next request, cut to the time
+        left, in the format of `requests`.
+
+        Raises
+        ------
+        RequestsTimeoutError
+            If the deadline has passed
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise RequestsTimeoutError( endpoint )
+        if remaining == math.inf:
+            return ( self.connect, self.read )
+        return tuple(
+            remaining if seconds is None else min( seconds,
+                                                   remaining )
+            for seconds in ( self.connect, self.read )
+        )
+
+    def __enter__( self ):
+        token = _scope.set( self.within( _scope.get() ) )
+        _tokens.set( ( *_tokens.get(), token ) )
+        return self
+
+    def __exit__( self, *exc_info ):
+        tokens = _tokens.get()
+        _tokens.set( tokens[ :-1 ] )
+        _scope.reset( tokens[ -1 ] )
+
+    def __repr__( self ):
+        return (
+            f"Deadline(remaining={self.remaining():.3f}, "
+            f"connect={self.connect}, read={self.read})"
+        )
+
+
+def current() -> Deadline:
+    """Deadline of the innermost deadline context, None outside of one."""
+    return _scope.get()
+
+
+def resolve( timeout ) -> Deadline:
+    """Deadline of a request from its `timeout` argument and the deadline
+    context, None if neither sets one (a plain number of seconds outside
+    of a deadline context)."""
+    scope = _scope.get()
+    if isinstance( timeout, Deadline ):
+        return timeout.within( scope )
+    if scope is None:
+        return None
+    # the timeouts of the context replace the default ones of the call
+    deadline = Deadline(
+        connect = timeout if scope.connect is None else scope.connect,
+        read = timeout if scope.read is None else scope.read
+    )
+    deadline.total = scope.total
+    deadline.expires = scope.expires
+    return deadline
+
+
+def as_deadline( timeout ) -> Deadline:
+    """Deadline for a total budget of `timeout` seconds (or the given
+    :obj:`Deadline`), within the deadline context."""
+    if not isinstance( timeout, Deadline ):
+        timeout = Deadline( timeout )
+    return timeout.within( _scope.get() )
+
+
+def remaining( timeout ) -> float:
+    """Seconds left for a request with this `timeout` argument, `math.inf`
+    if no deadline applies."""
+    deadline = resolve( timeout )
+    return math.inf if deadline is None else deadline.remaining()
+
+
+def requests_timeout( timeout, endpoint ):
+    """`timeout` argument of `requests` for an RPC `timeout` argument.
+
+    Raises
+    ------
+    RequestsTimeoutError
+        If the deadline has passed
+    """
+    deadline = resolve( timeout )
+    if deadline is None:
+        return timeout
+    return deadline.timeouts( endpoint )
+
+
+def seconds( timeout, endpoint ) -> float:
+    """Seconds to wait for a whole reply with this `timeout` argument, None
+    for no limit.
+
+    Raises
+    ------
+    RequestsTimeoutError
+        If the deadline has passed
+    """
+    deadline = resolve( timeout )
+    if deadline is None:
+        return timeout
+    return deadline.timeouts( endpoint )[ 1 ]
@@ -0,0 +1,217 @@
+"""
+Persistent response cache backend on SQLite, shared by processes and kept
+across restarts
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from .cache import CacheBackend
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS responses ("
+    " key TEXT PRIMARY KEY,"
+    " value BLOB NOT NULL,"
+    " size INTEGER NOT NULL,"
+    " expires REAL,"
+    " accessed REAL NOT NULL"
+    ")",
+    "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)",
+)
+
+
+class SQLiteBackend( CacheBackend ):
+    """Response cache backend stored in a SQLite database file.
+
+    The database is opened in WAL mode, so any number of threads and
+    processes can read and write the same file concurrently; writers wait up
+    to `busy_timeout` seconds for each other. Each thread (and process) uses
+    its own connection.
+
+    Expired entries and, above `max_bytes`, the least recently used ones are
+    removed by :meth:`compact`, which runs every `compact_every` writes of a
+    process and can also be called explicitly (e.g. with `vacuum = True` to
+    give the freed space back to the file system).
+
+    The backend is persistent: a :obj:`~pyhmy.rpc.cache.ResponseCache`
+    using it needs a `chain` identity, so that the stored keys do not depend
+    on the endpoint URLs.
+
+    Parameters
+    ----------
+    path: str
+        Path of the database file, created if missing
+    max_bytes: :obj:`int`, optional
+        Total size of the stored replies above which entries are evicted on
+        compaction, None for no limit
+    compact_every: :obj:`int`, optional
+        Writes between automatic compactions, 0 to only compact explicitly
+    busy_timeout: :obj:`float`, optional
+        Time to wait for a lock held by another connection, in seconds
+    access_resolution: :obj:`float`, optional
+        Minimum time between two updates of the access time of an entry, in
+        seconds, so that reads rarely write
+    """
+    persistent = True
+
+    def __init__(
+        self,
+        path,
+        max_bytes = None,
+        compact_every = 10000,
+        busy_timeout = 30.0,
+        access_resolution = 60.0,
+    ):
+        self.path = os.fspath( path )
+        self.max_bytes = max_bytes
+        self.compact_every = compact_every
+        self.busy_timeout = busy_timeout
+        self.access_resolution = access_resolution
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.evictions = 0
+        conn = self._connect()
+        for statement in _SCHEMA:
+            conn.execute( statement )
+
+    def _connect( self ) -> sqlite3.Connection:
+        """Connection of the calling thread, opened on first use (and again
+        in a forked process)."""
+        conn = getattr( self._local, "conn", None )
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(
+                self.path,
+                timeout = self.busy_timeout,
+                isolation_level = None,
+                check_same_thread = False
+            )
+            conn.execute( "PRAGMA journal_mode=WAL" )
+            conn.execute( "PRAGMA synchronous=NORMAL" )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            with self._lock:
+                self._connections.append( ( os.getpid(), conn ) )
+        return conn
+
+    def get( self, key ):
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value, expires, accessed FROM responses WHERE key = ?",
+            [ key ]
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires, accessed = row
+        if expires is not None and expires <= now:
+            conn.execute(
+                "DELETE FROM responses WHERE key = ? AND expires <= ?",
+                ( key,
+                  now )
+            )
+            return None
+        if now - accessed >= self.access_resolution:
+            conn.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?",
+                ( now,
+                  key )
+            )
+        return bytes( value )
+
+    def set( self, key, value, ttl = None ):
+        now = time.time()
+        self._connect().execute(
+            "INSERT OR REPLACE INTO responses "
+            "(key, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+            (
+                key,
+                sqlite3.Binary( value ),
+                len( value ),
+                None if ttl is None else now + ttl,
+                now
+            )
+        )
+        with self._lock:
+            self._writes += 1
+            due = self.compact_every and not self._writes % self.compact_every
+        if due:
+            self.compact()
+
+    def delete( self, key ):
+        self._connect().execute(
+            "DELETE FROM responses WHERE key = ?",
+            [ key ]
+        )
+
+    def clear( self ):
+        self._connect().execute( "DELETE FROM responses" )
+
+    def compact( self, vacuum = False ) -> int:
+        """Remove expired entries, then the least recently used ones until
+        the stored replies fit in `max_bytes`.
+
+        Parameters
+        ----------
+        vacuum: :obj:`bool`, optional
+            Also rebuild the database file to release the free pages
+
+        Returns
+        -------
+        int
+            Number of removed entries
+        """
+        conn = self._connect()
+        removed = conn.execute(
+            "DELETE FROM responses WHERE expires IS NOT NULL AND expires <= ?",
+            [ time.time() ]
+        ).rowcount
+        if self.max_bytes is not None:
+            excess = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[ 0 ] - self.max_bytes
+            while excess > 0:
+                rows = conn.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed LIMIT 256"
+                ).fetchall()
+                if not rows:
+                    break
+                victims = []
+                for key, size in rows:
+                    if excess <= 0:
+                        break
+                    victims.append( [ key ] )
+                    excess -= size
+                conn.executemany(
+                    "DELETE FROM responses WHERE key = ?",
+                    victims
+                )
+                removed += len( victims )
+                with self._lock:
+                    self.evictions += len( victims )
+        if vacuum:
+            conn.execute( "VACUUM" )
+            conn.execute( "PRAGMA wal_checkpoint(TRUNCATE)" )
+        return removed
+
+    def stats( self ) -> dict:
+        entries, size = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        return {
+            "entries": entries,
+            "bytes": size,
+            "evictions": self.evictions,
+        }
+
+    def close( self ):
+        """Close the connections of every thread of this process."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for pid, conn in connections:
+            # connections inherited from a parent process are left alone
+            if pid == os.getpid():
+                conn.close()
+        self._local = threading.local()
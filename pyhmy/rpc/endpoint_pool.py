@@ -0,0 +1,526 @@
+"""
+Pool of RPC endpoints with health-aware load balancing and failover
+"""
+import asyncio
+import concurrent.futures
+import contextvars
+import random
+import threading
+import time
+
+from .breaker import get_default_breaker, is_open
+
+from .exceptions import RequestsError, RequestsTimeoutError
+
+from .methods import is_idempotent
+
+DEFAULT_MAX_FAILURES = 3
+DEFAULT_EJECT_SECONDS = 30
+DEFAULT_DELAY_TOLERANCE = 60
+
+
+class _Node:
+    """Observed health of a single endpoint."""
+    def __init__( self, endpoint ):
+        self.endpoint = endpoint
+        self.latency = None  # EWMA of successful request latency, seconds
+        self.error_rate = 0.0  # EWMA of failures, 0 to 1
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    def score( self ) -> float:
+        # nodes without any observed latency are tried first
+        latency = self.latency or 0.0
+        return latency * ( 1 + 10 * self.error_rate ) + self.error_rate
+
+
+class _HedgedRequests( dict ):
+    """Futures of a hedged request, mapped to their (endpoint, start time),
+    in the order they were sent."""
+    def add( self, future, endpoint ):
+        self[ future ] = ( endpoint, time.monotonic() )
+
+    @property
+    def first( self ):
+        return next( iter( self ) )
+
+    def last( self, futures ):
+        return [ future for future in self if future in futures ][ -1 ]
+
+
+class EndpointPool:
+    """Several endpoints of the same shard, usable anywhere an `endpoint` is
+    accepted.
+
+    Requests go to the healthier of two randomly picked endpoints, judged on
+    observed latency and error rate. An endpoint is ejected for
+    `eject_seconds` after `max_failures` consecutive connection errors or
+    when :meth:`check_health` finds it lagging, and skipped while its
+    circuit breaker (see :mod:`pyhmy.rpc.breaker`) is open. Idempotent
+    reads that fail to connect are retried on another endpoint.
+
+    Example::
+
+        >>> pool = EndpointPool( [ "https://api.s0.t.hmny.io", "https://rpc.s0.t.hmny.io" ] )
+        >>> blockchain.get_block_number( endpoint = pool )
+
+    Parameters
+    ----------
+    endpoints: list of str
+        Endpoints of the pool, all serving the same shard
+    max_failures: :obj:`int`, optional
+        Consecutive connection errors before an endpoint is ejected
+    eject_seconds: :obj:`float`, optional
+        Time an ejected endpoint is kept out of rotation
+    max_attempts: :obj:`int`, optional
+        Endpoints to try for an idempotent read, None for all of them
+    alpha: :obj:`float`, optional
+        Smoothing factor of the latency / error rate moving averages
+    hedge_policy: :obj:`~pyhmy.rpc.hedge.HedgePolicy`, optional
+        Policy to hedge slow reads on a second endpoint, None to disable
+    """
+    def __init__(
+        self,
+        endpoints,
+        max_failures = DEFAULT_MAX_FAILURES,
+        eject_seconds = DEFAULT_EJECT_SECONDS,
+        max_attempts = None,
+        alpha = 0.3,
+        hedge_policy = None,
+    ):
+        if isinstance( endpoints, str ):
+            endpoints = [ endpoints ]
+        if not endpoints:
+            raise ValueError( "an endpoint pool needs at least one endpoint" )
+        self._nodes = {
+            endpoint: _Node( endpoint )
+            for endpoint in dict.fromkeys( endpoints )
+        }
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self.max_attempts = max_attempts or len( self._nodes )
+        self.alpha = alpha
+        self.hedge_policy = hedge_policy
+        self._lock = threading.Lock()
+        self._health_thread = None
+        self._health_stop = threading.Event()
+        self._executor = None
+
+    def __str__( self ):
+        return f"EndpointPool({', '.join( self._nodes )})"
+
+    def __repr__( self ):
+        return f"EndpointPool({list( self._nodes )!r})"
+
+    def __len__( self ):
+        return len( self._nodes )
+
+    def __iter__( self ):
+        return iter( list( self._nodes ) )
+
+    @property
+    def endpoints( self ) -> list:
+        return list( self._nodes )
+
+    def healthy( self ) -> list:
+        """Endpoints currently in rotation."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                node.endpoint
+                for node in self._nodes.values()
+                if node.ejected_until <= now and not is_open( node.endpoint )
+            ]
+
+    def select( self, exclude = () ) -> str:
+        """Pick the endpoint for the next request.
+
+        Parameters
+        ----------
+        exclude: :obj:`list`, optional
+            Endpoints not to pick, e.g. those already tried
+
+        Returns
+        -------
+        str
+            The healthier of two random healthy endpoints. If every endpoint
+            is ejected, the one whose ejection ends first
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [
+                node for node in self._nodes.values()
+                if node.endpoint not in exclude
+            ] or list( self._nodes.values() )
+            healthy = [
+                node for node in candidates
+                if node.ejected_until <= now and not is_open( node.endpoint )
+            ]
+            if not healthy:
+                return min(
+                    candidates,
+                    key = lambda node: node.ejected_until
+                ).endpoint
+            if len( healthy ) == 1:
+                return healthy[ 0 ].endpoint
+            first, second = random.sample( healthy, 2 )
+            return min( first, second, key = _Node.score ).endpoint
+
+    def record_success( self, endpoint, latency ):
+        """Record a successful request to the endpoint.
+
+        Parameters
+        ----------
+        endpoint: str
+            Endpoint the request was sent to
+        latency: float
+            Time the request took, in seconds
+        """
+        with self._lock:
+            node = self._nodes.get( endpoint )
+            if node is None:
+                return
+            node.requests += 1
+            node.consecutive_failures = 0
+            node.ejected_until = 0.0
+            if node.latency is None:
+                node.latency = latency
+            else:
+                node.latency += self.alpha * ( latency - node.latency )
+            node.error_rate -= self.alpha * node.error_rate
+
+    def record_failure( self, endpoint ):
+        """Record a failed (connection error / timeout) request to the
+        endpoint, ejecting it after `max_failures` consecutive failures."""
+        with self._lock:
+            node = self._nodes.get( endpoint )
+            if node is None:
+                return
+            node.requests += 1
+            node.failures += 1
+            node.consecutive_failures += 1
+            node.error_rate += self.alpha * ( 1 - node.error_rate )
+            if node.consecutive_failures >= self.max_failures:
+                node.ejected_until = time.monotonic() + self.eject_seconds
+
+    def record_latency( self, endpoint, latency ):
+        """Record a lower bound of the latency of the endpoint, e.g. for a
+        request that was abandoned before it completed."""
+        with self._lock:
+            node = self._nodes.get( endpoint )
+            if node is None:
+                return
+            if node.latency is None:
+                node.latency = latency
+            else:
+                node.latency += self.alpha * max( 0, latency - node.latency )
+
+    def eject( self, endpoint, seconds = None ):
+        """Take an endpoint out of rotation for `seconds` (default
+        `eject_seconds`)."""
+        if seconds is None:
+            seconds = self.eject_seconds
+        with self._lock:
+            node = self._nodes.get( endpoint )
+            if node is not None:
+                node.ejected_until = time.monotonic() + seconds
+
+    def check_health( self, delay_tolerance = DEFAULT_DELAY_TOLERANCE ) -> dict:
+        """Eject endpoints whose latest header lags behind wall time, see
+        :func:`pyhmy.util.is_active_shard`.
+
+        Parameters
+        ----------
+        delay_tolerance: :obj:`int`, optional
+            The time (in seconds) that the latest header can be behind
+
+        Returns
+        -------
+        dict
+            Endpoint to health (True if active)
+        """
+        from ..util import is_active_shard  # pylint: disable=import-outside-toplevel
+
+        health = {}
+        for endpoint in self.endpoints:
+            health[ endpoint ] = is_active_shard( endpoint, delay_tolerance )
+            if not health[ endpoint ]:
+                self.eject( endpoint )
+        return health
+
+    def start_health_checks(
+        self,
+        interval = DEFAULT_EJECT_SECONDS,
+        delay_tolerance = DEFAULT_DELAY_TOLERANCE
+    ):
+        """Run :meth:`check_health` every `interval` seconds in a daemon
+        thread, until :meth:`stop_health_checks` is called."""
+        if self._health_thread is not None:
+            return
+        self._health_stop.clear()
+
+        def run():
+            while not self._health_stop.wait( interval ):
+                self.check_health( delay_tolerance )
+
+        self._health_thread = threading.Thread(
+            target = run,
+            name = "pyhmy-endpoint-health",
+            daemon = True
+        )
+        self._health_thread.start()
+
+    def stop_health_checks( self ):
+        """Stop the background health checks."""
+        self._health_stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+            self._health_thread = None
+
+    def stats( self ) -> dict:
+        """Per endpoint health, for monitoring. `circuit` is the state of
+        the circuit breaker of the endpoint, None without breaker."""
+        now = time.monotonic()
+        breaker = get_default_breaker()
+        with self._lock:
+            return {
+                node.endpoint: {
+                    "latency": node.latency,
+                    "error_rate": node.error_rate,
+                    "requests": node.requests,
+                    "failures": node.failures,
+                    "ejected": node.ejected_until > now,
+                    "circuit": None if breaker is None else
+                    breaker.circuit( node.endpoint ).state,
+                }
+                for node in self._nodes.values()
+            }
+
+    def close( self ):
+        """Stop the health checks and the hedging worker threads."""
+        self.stop_health_checks()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown( wait = False, cancel_futures = True )
+
+    def _attempts( self, method ) -> int:
+        return self.max_attempts if is_idempotent( method ) else 1
+
+    def _hedges( self, method ) -> bool:
+        return (
+            self.hedge_policy is not None and
+            self.hedge_policy.applies( method ) and len( self.healthy() ) > 1
+        )
+
+    def _get_executor( self ) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers = self.hedge_policy.max_workers,
+                    thread_name_prefix = "pyhmy-hedge"
+                )
+            return self._executor
+
+    @staticmethod
+    def _timed( send, endpoint ):
+        start = time.monotonic()
+        return send( endpoint ), time.monotonic() - start
+
+    @staticmethod
+    async def _async_timed( send, endpoint ):
+        start = time.monotonic()
+        return await send( endpoint ), time.monotonic() - start
+
+    def _resolve_hedged( self, racing, future, hedged ):
+        """Record the outcome of a completed hedged request, return its
+        reply or raise its error."""
+        endpoint, _ = racing[ future ]
+        try:
+            reply, latency = future.result()
+        except ( RequestsError, RequestsTimeoutError ):
+            self.record_failure( endpoint )
+            raise
+        self.record_success( endpoint, latency )
+        self.hedge_policy.observe( latency )
+        self.hedge_policy.record(
+            hedged,
+            hedged and future is not racing.first
+        )
+        return reply
+
+    def _abandon( self, racing, pending ):
+        """Account the time spent so far by the requests that lost the race
+        as their latency, so that a slow endpoint is not picked first
+        again."""
+        now = time.monotonic()
+        for future in pending:
+            future.cancel()
+            endpoint, start = racing[ future ]
+            self.record_latency( endpoint, now - start )
+
+    def _send_hedged( self, send, tried ):
+        executor = self._get_executor()
+        racing = _HedgedRequests()
+        primary = self.select()
+        tried.append( primary )
+        # hedged requests run in the deadline context of the caller
+        racing.add(
+            executor.submit(
+                contextvars.copy_context().run,
+                self._timed,
+                send,
+                primary
+            ),
+            primary
+        )
+        done, _ = concurrent.futures.wait(
+            list( racing ),
+            timeout = self.hedge_policy.delay()
+        )
+        if not done:
+            secondary = self.select( exclude = tried )
+            tried.append( secondary )
+            racing.add(
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self._timed,
+                    send,
+                    secondary
+                ),
+                secondary
+            )
+        pending = set( racing )
+        try:
+            while True:
+                done, pending = concurrent.futures.wait(
+                    pending,
+                    return_when = concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    try:
+                        return self._resolve_hedged(
+                            racing,
+                            future,
+                            len( racing ) > 1
+                        )
+                    except ( RequestsError, RequestsTimeoutError ):
+                        if not pending and future is racing.last( done ):
+                            self.hedge_policy.record( len( racing ) > 1, False )
+                            raise
+        finally:
+            # a running sync request cannot be interrupted, its reply is
+            # dropped when it completes
+            self._abandon( racing, pending )
+
+    async def _async_send_hedged( self, send, tried ):
+        racing = _HedgedRequests()
+        primary = self.select()
+        tried.append( primary )
+        racing.add(
+            asyncio.ensure_future( self._async_timed( send,
+                                                      primary ) ),
+            primary
+        )
+        done, _ = await asyncio.wait(
+            list( racing ),
+            timeout = self.hedge_policy.delay()
+        )
+        if not done:
+            secondary = self.select( exclude = tried )
+            tried.append( secondary )
+            racing.add(
+                asyncio.ensure_future( self._async_timed( send,
+                                                          secondary ) ),
+                secondary
+            )
+        pending = set( racing )
+        try:
+            while True:
+                done, pending = await asyncio.wait(
+                    pending,
+                    return_when = asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    try:
+                        return self._resolve_hedged(
+                            racing,
+                            future,
+                            len( racing ) > 1
+                        )
+                    except ( RequestsError, RequestsTimeoutError ):
+                        if not pending and future is racing.last( done ):
+                            self.hedge_policy.record( len( racing ) > 1, False )
+                            raise
+        finally:
+            self._abandon( racing, pending )
+
+    def send( self, send, method, hedge = True ):
+        """Send a request through the pool.
+
+        Parameters
+        ----------
+        send: callable
+            Called with the selected endpoint, returns the reply
+        method: str
+            RPC method (or list of methods for a batch), idempotent reads are
+            retried on another endpoint after a connection error, and hedged
+            if the pool has a hedge policy
+        hedge: :obj:`bool`, optional
+            False to never hedge the request, e.g. when the reply holds a
+            connection that must be closed
+
+        Returns
+        -------
+        The return value of `send`
+
+        Raises
+        ------
+        RequestsTimeoutError
+            If the request timed out on the last endpoint tried
+        RequestsError
+            If the request failed on the last endpoint tried
+        """
+        tried = []
+        if hedge and self._hedges( method ):
+            try:
+                return self._send_hedged( send, tried )
+            except ( RequestsError, RequestsTimeoutError ):
+                if len( tried ) >= self._attempts( method ):
+                    raise
+        while True:
+            endpoint = self.select( exclude = tried )
+            tried.append( endpoint )
+            try:
+                reply, latency = self._timed( send, endpoint )
+            except ( RequestsError, RequestsTimeoutError ):
+                self.record_failure( endpoint )
+                if len( tried ) >= self._attempts( method ):
+                    raise
+                continue
+            self.record_success( endpoint, latency )
+            return reply
+
+    async def async_send( self, send, method, hedge = True ):
+        """Async version of :meth:`send`, `send` returns an awaitable."""
+        tried = []
+        if hedge and self._hedges( method ):
+            try:
+                return await self._async_send_hedged( send, tried )
+            except ( RequestsError, RequestsTimeoutError ):
+                if len( tried ) >= self._attempts( method ):
+                    raise
+        while True:
+            endpoint = self.select( exclude = tried )
+            tried.append( endpoint )
+            try:
+                reply, latency = await self._async_timed( send, endpoint )
+            except ( RequestsError, RequestsTimeoutError ):
+                self.record_failure( endpoint )
+                if len( tried ) >= self._attempts( method ):
+                    raise
+                continue
+            self.record_success( endpoint, latency )
+            return reply
@@ -16,11 +16,55 @@ class RPCError( RuntimeError ):
 
 class RequestsError( requests.exceptions.RequestException ):
     """Wrapper for requests lib exceptions."""
-    def __init__( self, endpoint ):
-        super().__init__( f"Error connecting to {endpoint}" )
+    def __init__( self, endpoint, message = None ):
+        if message is None:
+            message = f"Error connecting to {endpoint}"
+        super().__init__( message )
+
+
+class RequestsServerError( RequestsError ):
+    """Exception raised when the endpoint replies with a 5xx HTTP status."""
+    def __init__( self, endpoint, status_code ):
+        self.status_code = status_code
+        super().__init__(
+            endpoint,
+            f"Error {status_code} in reply from {endpoint}"
+        )
+
+
+class RequestsThrottledError( RequestsError ):
+    """Exception raised when the endpoint throttles requests (HTTP 429)."""
+    def __init__( self, endpoint, retry_after = None ):
+        self.status_code = 429
+        self.retry_after = retry_after
+        message = f"Requests to {endpoint} are throttled"
+        if retry_after is not None:
+            message += f", retry after {retry_after:g}s"
+        super().__init__( endpoint, message )
+
+
+class CircuitOpenError( RequestsError ):
+    """Exception raised without sending the request when the circuit
+    breaker of the endpoint is open, see :mod:`pyhmy.rpc.breaker`."""
+    def __init__( self, endpoint, retry_after = None ):
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+        message = f"Circuit breaker for {endpoint} is open"
+        if retry_after is not None:
+            message += f", retry after {retry_after:g}s"
+        super().__init__( endpoint, message )
 
 
 class RequestsTimeoutError( requests.exceptions.Timeout ):
     """Wrapper for requests lib Timeout exceptions."""
     def __init__( self, endpoint ):
         super().__init__( f"Error connecting to {endpoint}" )
+
+
+class ReplayMissError( LookupError ):
+    """Exception raised when a request has no recorded reply to replay, see
+    :mod:`pyhmy.rpc.replay`."""
+    def __init__( self, method, endpoint ):
+        self.method = method
+        self.endpoint = endpoint
+        super().__init__( f"No recorded reply for {method} to {endpoint}" )
@@ -0,0 +1,119 @@
+"""
+Hedged requests: send a duplicate of a slow read to a second endpoint and
+keep the first reply
+"""
+import collections
+import threading
+
+from .methods import is_idempotent
+
+
+class HedgePolicy:
+    """When to hedge a read sent through an
+    :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool`.
+
+    A duplicate of an idempotent request is sent to another endpoint if the
+    first one has not answered after the `percentile` of recently observed
+    latencies (clamped to [`min_delay`, `max_delay`]). The first reply wins
+    and the other request is cancelled: async requests are aborted, sync
+    requests are left to finish in a worker thread and their reply dropped.
+
+    Parameters
+    ----------
+    percentile: :obj:`float`, optional
+        Latency percentile (0 to 100) after which a request is hedged
+    min_delay: :obj:`float`, optional
+        Lower bound of the hedge delay, in seconds
+    max_delay: :obj:`float`, optional
+        Upper bound of the hedge delay, in seconds
+    initial_delay: :obj:`float`, optional
+        Hedge delay until `min_samples` latencies have been observed
+    min_samples: :obj:`int`, optional
+        Observed latencies needed before the percentile is used
+    window: :obj:`int`, optional
+        Number of recent latencies the percentile is computed over
+    methods: :obj:`set`, optional
+        Only hedge these methods, None for every idempotent method
+    max_workers: :obj:`int`, optional
+        Worker threads used to run hedged sync requests
+    """
+    def __init__(
+        self,
+        percentile = 95,
+        min_delay = 0.01,
+        max_delay = 5.0,
+        initial_delay = 1.0,
+        min_samples = 20,
+        window = 1000,
+        methods = None,
+        max_workers = 32,
+    ):
+        if not 0 < percentile <= 100:
+            raise ValueError( "percentile must be in (0, 100]" )
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.methods = None if methods is None else frozenset( methods )
+        self.max_workers = max_workers
+        self._latencies = collections.deque( maxlen = window )
+        self._delay = None
+        self._observed = 0
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def applies( self, method ) -> bool:
+        """Check if requests of the method (list of methods for a batch) are
+        hedged under this policy."""
+        names = method if isinstance( method, ( list, tuple ) ) else [ method ]
+        if self.methods is not None and not self.methods.issuperset( names ):
+            return False
+        return is_idempotent( names )
+
+    def delay( self ) -> float:
+        """Time to wait for the first reply before hedging, in seconds."""
+        with self._lock:
+            if len( self._latencies ) < self.min_samples:
+                return self.initial_delay
+            if self._delay is None:
+                ordered = sorted( self._latencies )
+                index = min(
+                    len( ordered ) - 1,
+                    int( len( ordered ) * self.percentile / 100 )
+                )
+                self._delay = min(
+                    self.max_delay,
+                    max( self.min_delay,
+                         ordered[ index ] )
+                )
+            return self._delay
+
+    def observe( self, latency ):
+        """Record the latency of a completed request, in seconds."""
+        with self._lock:
+            self._latencies.append( latency )
+            self._observed += 1
+            # recompute the percentile lazily, every few observations
+            if self._observed % 16 == 0:
+                self._delay = None
+
+    def record( self, hedged, hedge_won ):
+        """Record the outcome of a request sent under this policy."""
+        with self._lock:
+            self.requests += 1
+            self.hedged += hedged
+            self.hedge_wins += hedge_won
+
+    def stats( self ) -> dict:
+        """Hedge counters, for tuning the percentile."""
+        delay = self.delay()
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "delay": delay,
+            }
@@ -0,0 +1,86 @@
+"""
+Classification of RPC methods, used to decide which calls can safely be
+sent again (to the same or another endpoint) and which replies can be cached
+"""
+import json
+
+_NAMESPACES = ( "hmy", "hmyv2", "eth" )
+
+
+def _namespaced( *names ) -> frozenset:
+    """The methods of every namespace with the given names."""
+    return frozenset(
+        f"{namespace}_{name}" for namespace in _NAMESPACES for name in names
+    )
+
+
+# methods with side effects on the node or the chain
+WRITE_METHODS = _namespaced(
+    "sendRawTransaction",
+    "sendRawStakingTransaction",
+    "sendTransaction",
+    "resendCx"
+)
+
+# reads of a block by number (first param), final once the block exists
+BLOCK_NUMBER_METHODS = _namespaced(
+    "getBlockByNumber",
+    "getHeaderByNumber",
+    "getBlockSigners",
+    "getBlockSignerKeys",
+    "isBlockSigner",
+    "getBlockTransactionCountByNumber",
+    "getBlockStakingTransactionCountByNumber",
+    "getTransactionByBlockNumberAndIndex",
+    "getStakingTransactionByBlockNumberAndIndex"
+)
+
+# reads by block or transaction hash, final once included in a block
+HASH_METHODS = _namespaced(
+    "getBlockByHash",
+    "getBlockTransactionCountByHash",
+    "getBlockStakingTransactionCountByHash",
+    "getTransactionByBlockHashAndIndex",
+    "getStakingTransactionByBlockHashAndIndex",
+    "getTransactionByHash",
+    "getStakingTransactionByHash",
+    "getTransactionReceipt",
+    "getCXReceiptByHash"
+)
+
+# reads of the chain tip, stale after the next block
+TIP_METHODS = _namespaced(
+    "blockNumber",
+    "latestHeader",
+    "getLatestChainHeaders",
+    "getEpoch"
+)
+
+
+def call_key( endpoint, method, params ) -> str:
+    """Key identifying a call, params are compared by value."""
+    return json.dumps(
+        [ str( endpoint ),
+          method,
+          params ],
+        sort_keys = True,
+        default = str
+    )
+
+
+def is_idempotent( method ) -> bool:
+    """Check if an RPC method can be called again without side effects.
+
+    Parameters
+    ----------
+    method: str
+        RPC method, or a list of methods for a batch
+
+    Returns
+    -------
+    bool
+        True if the method (every method of the batch) is a read
+    """
+    if isinstance( method, ( list, tuple ) ):
+        return all( is_idempotent( name ) for name in method )
+    return method not in WRITE_METHODS
@@ -0,0 +1,410 @@
+"""
+Per-endpoint and per-method metrics of the RPC layer
+
+Disabled by default; enable them with :func:`set_default_metrics` (or the
+`metrics` setting of a :obj:`~pyhmy.client.HarmonyClient`), then read them
+with :meth:`Metrics.snapshot` or export them with :func:`to_prometheus`::
+
+    >>> metrics = Metrics()
+    >>> set_default_metrics( metrics )
+    >>> blockchain.get_block_number()
+    >>> snapshot = metrics.snapshot()
+    >>> snapshot[ DEFAULT_ENDPOINT ][ "hmyv2_blockNumber" ][ "latency" ]
+
+Latency and sizes are those of each request sent, to the endpoint it was
+sent to (the node of an endpoint pool). Decode time, RPC errors and
+retries are those of the calls, to the endpoint they were made to. The
+state of the circuit of each endpoint, see :mod:`~pyhmy.rpc.breaker`, is
+reported with them.
+"""
+import bisect
+import threading
+
+from . import breaker as _breaker, settings
+
+# histogram bucket upper bounds, +Inf is implicit
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+DECODE_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+)
+SIZE_BUCKETS = (
+    256,
+    1024,
+    4096,
+    16384,
+    65536,
+    262144,
+    1048576,
+    4194304,
+    16777216,
+)
+
+# method label of batches
+BATCH_METHOD = "batch"
+# key of the circuit breaker state of an endpoint in snapshots
+CIRCUIT = "circuit"
+
+
+class Histogram:
+    """Cumulative histogram of observed values, Prometheus style.
+
+    Parameters
+    ----------
+    buckets: tuple
+        Sorted upper bounds of the buckets
+    """
+    def __init__( self, buckets ):
+        self.buckets = tuple( buckets )
+        self._counts = [ 0 ] * ( len( self.buckets ) + 1 )
+        self.count = 0
+        self.sum = 0.0
+
+    def observe( self, value ):
+        """Add a value (not thread safe, callers hold the lock)."""
+        self._counts[ bisect.bisect_left( self.buckets, value ) ] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot( self ) -> dict:
+        """Count, sum and cumulative counts of the buckets, keyed on their
+        upper bound (`float("inf")` for the last one)."""
+        cumulative = []
+        total = 0
+        for count in self._counts:
+            total += count
+            cumulative.append( total )
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": dict(
+                zip( self.buckets + ( float( "inf" ),
+                                     ),
+                     cumulative )
+            ),
+        }
+
+
+class MethodMetrics:
+    """Metrics of one method at one endpoint."""
+    def __init__( self ):
+        self.requests = 0
+        self.retries = 0
+        self.errors = {}
+        self.latency = Histogram( LATENCY_BUCKETS )
+        self.request_bytes = Histogram( SIZE_BUCKETS )
+        self.response_bytes = Histogram( SIZE_BUCKETS )
+        self.decode = Histogram( DECODE_BUCKETS )
+
+    def snapshot( self ) -> dict:
+        """Counters, errors by exception class name and histograms."""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": dict( self.errors ),
+            "latency": self.latency.snapshot(),
+            "request_bytes": self.request_bytes.snapshot(),
+            "response_bytes": self.response_bytes.snapshot(),
+            "decode": self.decode.snapshot(),
+        }
+
+
+def _labels( endpoint, method ) -> tuple:
+    if not isinstance( endpoint, str ):
+        endpoint = str( endpoint )
+    if not isinstance( method, str ):
+        method = BATCH_METHOD
+    return endpoint, method
+
+
+class Metrics:
+    """Registry of the metrics of every (endpoint, method) pair.
+
+    Errors are counted by exception class name; a request is counted once
+    it is sent, whatever its outcome.
+
+    Parameters
+    ----------
+    breaker: :obj:`~pyhmy.rpc.breaker.CircuitBreaker`, optional
+        Circuit breaker whose circuits are reported, the default one if None
+    """
+    def __init__( self, breaker = None ):
+        self.breaker = breaker
+        self._methods = {}
+        self._lock = threading.Lock()
+
+    def _get( self, endpoint, method ) -> MethodMetrics:
+        key = _labels( endpoint, method )
+        metrics = self._methods.get( key )
+        if metrics is None:
+            metrics = self._methods[ key ] = MethodMetrics()
+        return metrics
+
+    def observe_request(
+        self,
+        endpoint,
+        method,
+        latency,
+        request_bytes,
+        response_bytes
+    ):
+        """Record a request that got a reply."""
+        with self._lock:
+            metrics = self._get( endpoint, method )
+            metrics.requests += 1
+            metrics.latency.observe( latency )
+            metrics.request_bytes.observe( request_bytes )
+            metrics.response_bytes.observe( response_bytes )
+
+    def observe_failure( self, endpoint, method, latency, error ):
+        """Record a request that failed before getting a reply."""
+        with self._lock:
+            metrics = self._get( endpoint, method )
+            metrics.requests += 1
+            metrics.latency.observe( latency )
+            name = error.__class__.__name__
+            metrics.errors[ name ] = metrics.errors.get( name, 0 ) + 1
+
+    def observe_error( self, endpoint, method, error ):
+        """Record an error of a call, e.g. an RPC error reply."""
+        with self._lock:
+            metrics = self._get( endpoint, method )
+            name = error.__class__.__name__
+            metrics.errors[ name ] = metrics.errors.get( name, 0 ) + 1
+
+    def observe_decode( self, endpoint, method, seconds ):
+        """Record the time spent decoding a reply."""
+        with self._lock:
+            self._get( endpoint, method ).decode.observe( seconds )
+
+    def observe_retry( self, endpoint, method ):
+        """Record that a call was sent again."""
+        with self._lock:
+            self._get( endpoint, method ).retries += 1
+
+    def snapshot( self ) -> dict:
+        """Metrics of every endpoint and method, see
+        :meth:`MethodMetrics.snapshot`.
+
+        Endpoints with a circuit in the circuit breaker also have a
+        :data:`CIRCUIT` entry: its `state` (closed, open or half_open),
+        the number of times it was `opened` and the requests it `rejected`.
+
+        Returns
+        -------
+        dict
+            Endpoint to method to metrics
+        """
+        with self._lock:
+            snapshot = {}
+            for ( endpoint, method ), metrics in self._methods.items():
+                snapshot.setdefault( endpoint,
+                                     {} )[ method ] = metrics.snapshot()
+        breaker = self.breaker or _breaker.get_default_breaker()
+        if breaker is not None:
+            for endpoint, stats in breaker.stats().items():
+                snapshot.setdefault( str( endpoint ),
+                                     {} )[ CIRCUIT ] = {
+                                         "state": stats[ "state" ],
+                                         "opened": stats[ "opened" ],
+                                         "rejected": stats[ "rejected" ],
+                                     }
+        return snapshot
+
+    def reset( self ):
+        """Forget every metric."""
+        with self._lock:
+            self._methods.clear()
+
+
+def _escape( value ) -> str:
+    return value.replace( "\\",
+                          "\\\\" ).replace( '"',
+                                            '\\"' ).replace( "\n",
+                                                             "\\n" )
+
+
+def _format_labels( labels ) -> str:
+    return ",".join(
+        f'{name}="{_escape( str( value ) )}"' for name, value in labels
+    )
+
+
+def _format_bound( bound ) -> str:
+    return "+Inf" if bound == float( "inf" ) else repr( bound )
+
+
+def to_prometheus( metrics = None, prefix = "pyhmy_rpc" ) -> str:
+    """Metrics in the Prometheus text exposition format.
+
+    Parameters
+    ----------
+    metrics: :obj:`Metrics`, optional
+        Metrics to export, the default ones if None
+    prefix: :obj:`str`, optional
+        Prefix of the metric names
+
+    Returns
+    -------
+    str
+        Exposition text, empty if there are no metrics
+    """
+    metrics = metrics or get_default_metrics()
+    if metrics is None:
+        return ""
+    snapshot = metrics.snapshot()
+    series = [
+        ( endpoint,
+          method,
+          values )
+        for endpoint, methods in sorted( snapshot.items() )
+        for method, values in sorted( methods.items() )
+        if method != CIRCUIT
+    ]
+    circuits = [
+        ( endpoint,
+          methods[ CIRCUIT ] )
+        for endpoint, methods in sorted( snapshot.items() )
+        if CIRCUIT in methods
+    ]
+    lines = []
+
+    def counter( name, help_text, key ):
+        lines.append( f"# HELP {prefix}_{name} {help_text}" )
+        lines.append( f"# TYPE {prefix}_{name} counter" )
+        for endpoint, method, values in series:
+            labels = _format_labels(
+                ( ( "endpoint",
+                    endpoint ),
+                  ( "method",
+                    method ) )
+            )
+            lines.append( f"{prefix}_{name}{{{labels}}} {values[ key ]}" )
+
+    def histogram( name, help_text, key ):
+        lines.append( f"# HELP {prefix}_{name} {help_text}" )
+        lines.append( f"# TYPE {prefix}_{name} histogram" )
+        for endpoint, method, values in series:
+            labels = ( ( "endpoint", endpoint ), ( "method", method ) )
+            values = values[ key ]
+            for bound, count in values[ "buckets" ].items():
+                bucket = _format_labels(
+                    labels + ( ( "le",
+                                 _format_bound( bound ) ),
+                              )
+                )
+                lines.append( f"{prefix}_{name}_bucket{{{bucket}}} {count}" )
+            labels = _format_labels( labels )
+            lines.append(
+                f"{prefix}_{name}_sum{{{labels}}} {values[ 'sum' ]!r}"
+            )
+            lines.append(
+                f"{prefix}_{name}_count{{{labels}}} {values[ 'count' ]}"
+            )
+
+    counter( "requests_total", "Requests sent.", "requests" )
+    counter( "retries_total", "Calls sent again.", "retries" )
+    lines.append( f"# HELP {prefix}_errors_total Errors by exception class." )
+    lines.append( f"# TYPE {prefix}_errors_total counter" )
+    for endpoint, method, values in series:
+        for error, count in sorted( values[ "errors" ].items() ):
+            labels = _format_labels(
+                (
+                    ( "endpoint",
+                      endpoint ),
+                    ( "method",
+                      method ),
+                    ( "error",
+                      error )
+                )
+            )
+            lines.append( f"{prefix}_errors_total{{{labels}}} {count}" )
+    histogram( "latency_seconds", "Request latency.", "latency" )
+    histogram( "request_bytes", "Request payload size.", "request_bytes" )
+    histogram( "response_bytes", "Reply size.", "response_bytes" )
+    histogram( "decode_seconds", "Reply decode time.", "decode" )
+    if circuits:
+        lines.append( f"# HELP {prefix}_circuit_state Circuit breaker state." )
+        lines.append( f"# TYPE {prefix}_circuit_state gauge" )
+        for endpoint, circuit in circuits:
+            for state in ( _breaker.CLOSED, _breaker.OPEN, _breaker.HALF_OPEN ):
+                labels = _format_labels(
+                    ( ( "endpoint",
+                        endpoint ),
+                      ( "state",
+                        state ) )
+                )
+                value = int( circuit[ "state" ] == state )
+                lines.append( f"{prefix}_circuit_state{{{labels}}} {value}" )
+        for name, help_text, key in (
+            ( "circuit_trips_total", "Times the circuit opened.", "opened" ),
+            ( "circuit_rejected_total", "Requests failed fast.", "rejected" ),
+        ):
+            lines.append( f"# HELP {prefix}_{name} {help_text}" )
+            lines.append( f"# TYPE {prefix}_{name} counter" )
+            for endpoint, circuit in circuits:
+                labels = _format_labels( ( ( "endpoint",
+                                             endpoint ),
+                                          ) )
+                lines.append( f"{prefix}_{name}{{{labels}}} {circuit[ key ]}" )
+    return "\n".join( lines ) + "\n"
+
+
+_default_metrics = None
+_default_metrics_lock = threading.Lock()
+
+
+def get_default_metrics() -> Metrics:
+    """Metrics recorded by the RPC layer, None if disabled (the default)."""
+    return settings.lookup( "metrics", _default_metrics )
+
+
+def set_default_metrics( metrics ) -> Metrics:
+    """Replace the default metrics and return the previous ones.
+
+    Parameters
+    ----------
+    metrics: :obj:`Metrics`
+        New default metrics, None to disable metrics
+    """
+    global _default_metrics  # pylint: disable=global-statement
+    if metrics is not None and not isinstance( metrics, Metrics ):
+        raise TypeError( f"invalid type {metrics.__class__}" )
+    with _default_metrics_lock:
+        previous, _default_metrics = _default_metrics, metrics
+    return previous
+
+
+def count_error( endpoint, method, error ):
+    """Count an error of a call in the default metrics."""
+    metrics = get_default_metrics()
+    if metrics is not None:
+        metrics.observe_error( endpoint, method, error )
+
+
+def count_retry( endpoint, method ):
+    """Count a call sent again in the default metrics."""
+    metrics = get_default_metrics()
+    if metrics is not None:
+        metrics.observe_retry( endpoint, method )
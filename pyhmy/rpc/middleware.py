@@ -0,0 +1,224 @@
+"""
+Middleware around the requests sent by the RPC layer
+
+Middlewares see every request sent to an endpoint (each node of an
+endpoint pool, each attempt of a retried call), in the sync and async
+transports alike, and may change its payload and headers, answer it
+themselves, or replace its reply::
+
+    >>> class Auth( Middleware ):
+    ...     def before_send( self, call ):
+    ...         call.headers[ "Authorization" ] = f"Bearer {token}"
+    >>> get_default_chain().add( Auth() )
+
+Streamed replies (:func:`~pyhmy.rpc.request.rpc_stream`) do not go
+through the middlewares. Headers are not sent over WebSocket.
+"""
+import inspect
+import threading
+
+from . import settings
+
+
+class Call:
+    """A request about to be sent, as seen by middlewares.
+
+    Attributes
+    ----------
+    method: str or list
+        RPC method, list of methods for a batch
+    endpoint: str
+        Endpoint the request is sent to
+    data: bytes
+        Encoded JSON-RPC payload, may be replaced by `before_send`
+    headers: dict
+        Extra HTTP headers of the request
+    extras: dict
+        State of the middlewares for this request, e.g. a tracing span
+    asynchronous: bool
+        True if sent by the async transport, whose hooks may be coroutines
+    """
+    def __init__( self, method, endpoint, data, asynchronous = False ):
+        self.method = method
+        self.endpoint = endpoint
+        self.data = data
+        self.headers = {}
+        self.extras = {}
+        self.asynchronous = asynchronous
+
+    def __repr__( self ):
+        return f"Call({self.method!r}, {self.endpoint!r})"
+
+
+class Middleware:
+    """Base of middlewares, whose hooks do nothing.
+
+    Hooks of the async transport may be coroutines.
+    """
+    def before_send( self, call ):
+        """Called before the request is sent, in the order of the chain.
+
+        Returns
+        -------
+        bytes or None
+            A reply to answer the request without sending it (later
+            middlewares are skipped), None to send it
+        """
+
+    def after_receive( self, call, content ):
+        """Called with the raw reply, in the reverse order of the chain.
+
+        Returns
+        -------
+        bytes or None
+            A reply replacing `content`, None to keep it
+        """
+
+    def on_error( self, call, error ):
+        """Called when sending the request failed, in the reverse order of
+        the chain.
+
+        Returns
+        -------
+        bytes or None
+            A reply to recover with (later middlewares are skipped), None to
+            raise `error`
+        """
+
+
+class MiddlewareChain:
+    """Ordered middlewares applied to every request.
+
+    Parameters
+    ----------
+    middlewares: :obj:`list` of :obj:`Middleware`, optional
+    """
+    def __init__( self, middlewares = () ):
+        self._middlewares = ()
+        self._lock = threading.Lock()
+        for middleware in middlewares:
+            self.add( middleware )
+
+    def __len__( self ):
+        return len( self._middlewares )
+
+    def __iter__( self ):
+        return iter( self._middlewares )
+
+    def add( self, middleware, index = None ):
+        """Add a middleware at the end of the chain, or at `index`.
+
+        Raises
+        ------
+        TypeError
+            If middleware is not a :obj:`Middleware`
+        """
+        if not isinstance( middleware, Middleware ):
+            raise TypeError( f"invalid type {middleware.__class__}" )
+        with self._lock:
+            middlewares = list( self._middlewares )
+            if index is None:
+                middlewares.append( middleware )
+            else:
+                middlewares.insert( index, middleware )
+            self._middlewares = tuple( middlewares )
+
+    def remove( self, middleware ):
+        """Remove a middleware from the chain.
+
+        Raises
+        ------
+        ValueError
+            If the middleware is not in the chain
+        """
+        with self._lock:
+            middlewares = list( self._middlewares )
+            middlewares.remove( middleware )
+            self._middlewares = tuple( middlewares )
+
+    def send( self, call, send ) -> bytes:
+        """Send `call` with `send( call )` through the middlewares and
+        return the reply."""
+        # the chain may change while the request is in flight
+        middlewares = self._middlewares
+        entered = []
+        content = None
+        for middleware in middlewares:
+            entered.append( middleware )
+            content = middleware.before_send( call )
+            if content is not None:
+                break
+        else:
+            try:
+                content = send( call )
+            except Exception as err:  # pylint: disable=broad-except
+                for middleware in reversed( entered ):
+                    content = middleware.on_error( call, err )
+                    if content is not None:
+                        break
+                else:
+                    raise
+        for middleware in reversed( entered ):
+            replaced = middleware.after_receive( call, content )
+            if replaced is not None:
+                content = replaced
+        return content
+
+    async def async_send( self, call, send ) -> bytes:
+        """Async version of :meth:`send`, `send( call )` returns an
+        awaitable and hooks may be coroutines."""
+        middlewares = self._middlewares
+        entered = []
+        content = None
+        for middleware in middlewares:
+            entered.append( middleware )
+            content = await _resolve( middleware.before_send( call ) )
+            if content is not None:
+                break
+        else:
+            try:
+                content = await send( call )
+            except Exception as err:  # pylint: disable=broad-except
+                for middleware in reversed( entered ):
+                    content = await _resolve( middleware.on_error( call, err ) )
+                    if content is not None:
+                        break
+                else:
+                    raise
+        for middleware in reversed( entered ):
+            replaced = middleware.after_receive( call, content )
+            replaced = await _resolve( replaced )
+            if replaced is not None:
+                content = replaced
+        return content
+
+
+async def _resolve( value ):
+    if inspect.isawaitable( value ):
+        return await value
+    return value
+
+
+_default_chain = MiddlewareChain()
+_default_chain_lock = threading.Lock()
+
+
+def get_default_chain() -> MiddlewareChain:
+    """Middlewares applied by the RPC layer, empty by default."""
+    return settings.lookup( "middleware", _default_chain )
+
+
+def set_default_chain( chain ) -> MiddlewareChain:
+    """Replace the default middleware chain and return the previous one.
+
+    Parameters
+    ----------
+    chain: :obj:`MiddlewareChain`
+        New default chain
+    """
+    global _default_chain  # pylint: disable=global-statement
+    if not isinstance( chain, MiddlewareChain ):
+        raise TypeError( f"invalid type {chain.__class__}" )
+    with _default_chain_lock:
+        previous, _default_chain = _default_chain, chain
+    return previous
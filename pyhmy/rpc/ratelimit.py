@@ -0,0 +1,320 @@
+"""
+Client-side rate limiting: a token bucket and a cap on requests in flight
+per endpoint, shared by threads and coroutines
+"""
+import asyncio
+import collections
+import contextlib
+import email.utils
+import threading
+import time
+
+from urllib.parse import urlsplit
+
+from . import settings
+
+from .exceptions import RequestsThrottledError
+
+
+def parse_retry_after( value ):
+    """Seconds to wait according to a Retry-After header (delay in seconds
+    or HTTP date), None if missing or invalid."""
+    if not value:
+        return None
+    try:
+        return max( 0.0, float( value ) )
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime( value )
+    except ( TypeError, ValueError ):
+        return None
+    return max( 0.0, date.timestamp() - time.time() )
+
+
+class _Waiter:
+    """Caller queued for a slot, a thread or a coroutine."""
+    __slots__ = ( "event", "loop", "future", "granted" )
+
+    def __init__( self, loop = None ):
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future = None if loop is None else loop.create_future()
+        self.granted = False
+
+    def wake( self ):
+        if self.event is not None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe( _wake_future, self.future )
+
+
+def _wake_future( future ):
+    if not future.done():
+        future.set_result( None )
+
+
+class EndpointLimit:
+    """Token bucket and in-flight cap of one endpoint.
+
+    Requests take one token from a bucket refilled at `rate` tokens per
+    second and holding up to `burst` tokens, then one of `max_in_flight`
+    slots. Callers that have to wait are served in arrival order. A 429
+    reply blocks the bucket for its Retry-After delay.
+
+    Parameters
+    ----------
+    rate: :obj:`float`, optional
+        Sustained requests per second, None for no rate limit
+    burst: :obj:`int`, optional
+        Requests that can be sent at once after a pause, `rate` if None
+    max_in_flight: :obj:`int`, optional
+        Maximum number of concurrent requests, None for no limit
+    """
+    def __init__( self, rate = None, burst = None, max_in_flight = None ):
+        if rate is not None and rate <= 0:
+            raise ValueError( "rate must be positive" )
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError( "max_in_flight must be at least 1" )
+        self.rate = rate
+        self.burst = max( 1, burst if burst is not None else ( rate or 1 ) )
+        self.max_in_flight = max_in_flight
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._in_flight = 0
+        self._waiters = collections.deque()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.delayed = 0
+        self.throttled = 0
+
+    def _reserve( self ) -> float:
+        """Take a token, possibly ahead of time, and return the time to wait
+        until it is available."""
+        with self._lock:
+            now = time.monotonic()
+            self.requests += 1
+            wait = max( 0.0, self._blocked_until - now )
+            if self.rate is not None:
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + ( now - self._updated ) * self.rate
+                )
+                self._updated = now
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = max( wait, -self._tokens / self.rate )
+            if wait > 0:
+                self.delayed += 1
+            return wait
+
+    def _take_slot( self, loop = None ):
+        """Take a slot, or queue a waiter that is woken with one."""
+        with self._lock:
+            if self.max_in_flight is None:
+                return None
+            if self._in_flight < self.max_in_flight and not self._waiters:
+                self._in_flight += 1
+                return None
+            waiter = _Waiter( loop )
+            self._waiters.append( waiter )
+            return waiter
+
+    def release( self ):
+        """Give back the slot of a completed request."""
+        if self.max_in_flight is None:
+            return
+        with self._lock:
+            if not self._waiters:
+                self._in_flight -= 1
+                return
+            # hand the slot over to the next caller
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+        waiter.wake()
+
+    def acquire( self ):
+        """Wait for a token and a slot, in the calling thread."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep( wait )
+        waiter = self._take_slot()
+        if waiter is not None:
+            waiter.event.wait()
+
+    async def async_acquire( self ):
+        """Wait for a token and a slot, in the running event loop."""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep( wait )
+        waiter = self._take_slot( asyncio.get_running_loop() )
+        if waiter is None:
+            return
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove( waiter )
+            if granted:
+                self.release()
+            raise
+
+    def throttle( self, delay ):
+        """Hold back every request for `delay` seconds."""
+        with self._lock:
+            self.throttled += 1
+            self._blocked_until = max(
+                self._blocked_until,
+                time.monotonic() + delay
+            )
+            if self.rate is not None:
+                self._tokens = min( self._tokens, 0 )
+
+    def stats( self ) -> dict:
+        """Request counters, and the current queue."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "delayed": self.delayed,
+                "throttled": self.throttled,
+                "in_flight": self._in_flight,
+                "waiting": len( self._waiters ),
+            }
+
+
+class RateLimiter:
+    """Rate limits of every endpoint (scheme + host + port).
+
+    Parameters
+    ----------
+    rate: :obj:`float`, optional
+        Sustained requests per second per endpoint, None for no rate limit
+    burst: :obj:`int`, optional
+        Requests that can be sent at once after a pause, `rate` if None
+    max_in_flight: :obj:`int`, optional
+        Maximum number of concurrent requests per endpoint, None for no limit
+    throttle_delay: :obj:`float`, optional
+        Time to hold back requests after a 429 reply without Retry-After
+    overrides: :obj:`dict`, optional
+        Endpoint to dict of `rate`, `burst` and `max_in_flight` arguments,
+        for endpoints with other limits
+    """
+    def __init__(
+        self,
+        rate = None,
+        burst = None,
+        max_in_flight = None,
+        throttle_delay = 1.0,
+        overrides = None,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.throttle_delay = throttle_delay
+        self.overrides = {
+            self._key( endpoint ): limits
+            for endpoint, limits in ( overrides or {} ).items()
+        }
+        self._limits = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key( endpoint ) -> str:
+        parts = urlsplit( endpoint )
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def limit( self, endpoint ) -> EndpointLimit:
+        """Get (or create) the limit of the endpoint."""
+        key = self._key( endpoint )
+        with self._lock:
+            limit = self._limits.get( key )
+            if limit is None:
+                limits = {
+                    "rate": self.rate,
+                    "burst": self.burst,
+                    "max_in_flight": self.max_in_flight,
+                }
+                limits.update( self.overrides.get( key ) or {} )
+                limit = self._limits[ key ] = EndpointLimit( **limits )
+            return limit
+
+    @contextlib.contextmanager
+    def limited( self, endpoint ):
+        """Context of a request to the endpoint, waits for the limit on
+        entry and throttles the endpoint on a 429 reply."""
+        limit = self.limit( endpoint )
+        limit.acquire()
+        try:
+            yield limit
+        except RequestsThrottledError as err:
+            limit.throttle( err.retry_after or self.throttle_delay )
+            raise
+        finally:
+            limit.release()
+
+    @contextlib.asynccontextmanager
+    async def async_limited( self, endpoint ):
+        """Async version of :meth:`limited`."""
+        limit = self.limit( endpoint )
+        await limit.async_acquire()
+        try:
+            yield limit
+        except RequestsThrottledError as err:
+            limit.throttle( err.retry_after or self.throttle_delay )
+            raise
+        finally:
+            limit.release()
+
+    def stats( self ) -> dict:
+        """Counters of every endpoint, see :meth:`EndpointLimit.stats`."""
+        with self._lock:
+            limits = dict( self._limits )
+        return {
+            endpoint: limit.stats()
+            for endpoint, limit in limits.items()
+        }
+
+
+_default_limiter = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_default_limiter() -> RateLimiter:
+    """Rate limiter applied to every request, None if requests are not
+    limited (the default)."""
+    return settings.lookup( "limiter", _default_limiter )
+
+
+def set_default_limiter( limiter ) -> RateLimiter:
+    """Replace the default rate limiter and return the previous one.
+
+    Parameters
+    ----------
+    limiter: :obj:`RateLimiter`
+        New default limiter, None to not limit requests
+    """
+    global _default_limiter  # pylint: disable=global-statement
+    if limiter is not None and not isinstance( limiter, RateLimiter ):
+        raise TypeError( f"invalid type {limiter.__class__}" )
+    with _default_limiter_lock:
+        previous, _default_limiter = _default_limiter, limiter
+    return previous
+
+
+def limited( endpoint ):
+    """Context of a request to the endpoint under the default limiter."""
+    limiter = get_default_limiter()
+    if limiter is None:
+        return contextlib.nullcontext()
+    return limiter.limited( endpoint )
+
+
+def async_limited( endpoint ):
+    """Async version of :func:`limited`."""
+    limiter = get_default_limiter()
+    if limiter is None:
+        return contextlib.nullcontext()
+    return limiter.async_limited( endpoint )
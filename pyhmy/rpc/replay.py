@@ -0,0 +1,266 @@
+"""
+Record RPC exchanges to a file and replay them without network
+
+Recordings are gzip compressed JSON lines, one exchange per line: the
+endpoint, the request payload, the raw reply and the latency of the
+request. Both ends are middlewares (see :mod:`pyhmy.rpc.middleware`), so
+every pyhmy function, sync or async, can be recorded against a node once
+and then run, tested or benchmarked offline::
+
+    >>> with record( "blocks.jsonl.gz" ):
+    ...     blockchain.get_blocks( 1, 100, endpoint = test_net )
+    >>> with replay( "blocks.jsonl.gz", latency = RECORDED ):
+    ...     blockchain.get_blocks( 1, 100, endpoint = test_net )
+
+Requests are matched without their JSON-RPC ids, which differ from one run
+to the next for batches, and replayed replies get the ids of the requests
+they answer.
+
+Streamed calls (:func:`~pyhmy.rpc.request.rpc_stream`, used by
+:func:`~pyhmy.blockchain.iter_blocks` and the `iter_*_history` functions of
+:mod:`~pyhmy.account`) do not go through the middlewares, so they are
+neither recorded nor replayed.
+"""
+import asyncio
+import contextlib
+import gzip
+import json
+import threading
+import time
+
+from . import settings
+
+from .exceptions import ReplayMissError
+
+from .middleware import Middleware, MiddlewareChain, get_default_chain
+
+# replay the latency measured when recording
+RECORDED = "recorded"
+
+
+def _key( data ) -> tuple:
+    """Key of a request payload, independent of the codec that encoded it
+    and of its JSON-RPC ids, and the ids of its requests in order."""
+    payload = json.loads( data )
+    requests = payload if isinstance( payload, list ) else [ payload ]
+    ids = []
+    stripped = []
+    for request in requests:
+        if isinstance( request, dict ):
+            ids.append( request.get( "id" ) )
+            request = {
+                name: value
+                for name, value in request.items()
+                if name != "id"
+            }
+        else:
+            ids.append( None )
+        stripped.append( request )
+    if not isinstance( payload, list ):
+        stripped = stripped[ 0 ]
+    key = json.dumps( stripped, sort_keys = True, separators = ( ",", ":" ) )
+    return key, ids
+
+
+def _rewrite_ids( reply, recorded, ids ) -> bytes:
+    """Reply recorded for requests with the `recorded` ids, answering
+    requests with the `ids` instead."""
+    if recorded == ids:
+        return reply
+    mapping = dict( zip( recorded, ids ) )
+    document = json.loads( reply )
+    for item in document if isinstance( document, list ) else [ document ]:
+        if isinstance( item, dict ) and item.get( "id" ) in mapping:
+            item[ "id" ] = mapping[ item[ "id" ] ]
+    return json.dumps( document, separators = ( ",", ":" ) ).encode()
+
+
+class Recorder( Middleware ):
+    """Middleware appending every exchange to a recording.
+
+    Parameters
+    ----------
+    path: str
+        File of the recording, overwritten unless `append` is set
+    append: :obj:`bool`, optional
+        True to add to an existing recording
+    """
+    def __init__( self, path, append = False ):
+        self.path = path
+        mode = "at" if append else "wt"
+        self._file = gzip.open( path, mode, encoding = "utf-8" )
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def before_send( self, call ):
+        call.extras[ "replay_start" ] = time.perf_counter()
+
+    def after_receive( self, call, content ):
+        start = call.extras.get( "replay_start" )
+        latency = 0.0 if start is None else time.perf_counter() - start
+        line = json.dumps(
+            {
+                "endpoint": call.endpoint,
+                "request": bytes( call.data ).decode(),
+                "reply": bytes( content ).decode(),
+                "latency": round( latency,
+                                  6 ),
+            },
+            separators = ( ",",
+                           ":" )
+        )
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write( line + "\n" )
+            self.recorded += 1
+
+    def close( self ):
+        """Finish the recording."""
+        with self._lock:
+            self._file.close()
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc_info ):
+        self.close()
+
+
+class Replay( Middleware ):
+    """Middleware answering requests with the replies of a recording.
+
+    Identical requests get the replies recorded for them in order, the last
+    one once all were replayed. Requests are matched on their payload only,
+    ids aside, so that a recording replays against any endpoint, unless
+    `match_endpoint` is set.
+
+    Parameters
+    ----------
+    path: str
+        File of the recording
+    latency: :obj:`float` or :data:`RECORDED`, optional
+        Simulated latency of each reply in seconds, or :data:`RECORDED` for
+        the latency measured when recording
+    speed: :obj:`float`, optional
+        Divides the recorded latency, e.g. 2 to replay twice as fast
+    strict: :obj:`bool`, optional
+        True to raise :obj:`~pyhmy.rpc.exceptions.ReplayMissError` for
+        requests that were not recorded, False to send them
+    match_endpoint: :obj:`bool`, optional
+        True to only replay replies recorded from the same endpoint
+    """
+    def __init__(
+        self,
+        path,
+        latency = 0.0,
+        speed = 1.0,
+        strict = True,
+        match_endpoint = False,
+    ):
+        if latency != RECORDED and latency < 0:
+            raise ValueError( "latency must be positive" )
+        self.latency = latency
+        self.speed = speed
+        self.strict = strict
+        self.match_endpoint = match_endpoint
+        self._exchanges = {}
+        self._replayed = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        with gzip.open( path, "rt", encoding = "utf-8" ) as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                exchange = json.loads( line )
+                key, ids = self._lookup_key(
+                    exchange[ "endpoint" ],
+                    exchange[ "request" ]
+                )
+                replies = self._exchanges.setdefault( key, [] )
+                replies.append(
+                    (
+                        exchange[ "reply" ].encode(),
+                        exchange[ "latency" ],
+                        ids
+                    )
+                )
+
+    def __len__( self ):
+        return sum( len( replies ) for replies in self._exchanges.values() )
+
+    def _lookup_key( self, endpoint, data ) -> tuple:
+        key, ids = _key( data )
+        return ( endpoint if self.match_endpoint else None, key ), ids
+
+    def _next( self, call ):
+        """Reply to the call with its ids and the recorded latency, None if
+        it was not recorded."""
+        key, ids = self._lookup_key( call.endpoint, call.data )
+        with self._lock:
+            replies = self._exchanges.get( key )
+            if replies is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            index = self._replayed.get( key, 0 )
+            self._replayed[ key ] = index + 1
+            index = min( index, len( replies ) - 1 )
+            reply, latency, recorded = replies[ index ]
+        return _rewrite_ids( reply, recorded, ids ), latency
+
+    def _delay( self, recorded ) -> float:
+        if self.latency == RECORDED:
+            return recorded / self.speed
+        return self.latency
+
+    def before_send( self, call ):
+        exchange = self._next( call )
+        if exchange is None:
+            if self.strict:
+                raise ReplayMissError( call.method, call.endpoint )
+            return None
+        reply, recorded = exchange
+        delay = self._delay( recorded )
+        if call.asynchronous:
+            return self._reply_later( reply, delay )
+        if delay > 0:
+            time.sleep( delay )
+        return reply
+
+    @staticmethod
+    async def _reply_later( reply, delay ):
+        if delay > 0:
+            await asyncio.sleep( delay )
+        return reply
+
+    def rewind( self ):
+        """Replay the recording from its start again."""
+        with self._lock:
+            self._replayed.clear()
+
+
+@contextlib.contextmanager
+def _added( middleware ):
+    chain = MiddlewareChain( [ *get_default_chain(), middleware ] )
+    with settings.using( {
+        "middleware": chain
+    } ):
+        yield middleware
+
+
+@contextlib.contextmanager
+def record( path, append = False ):
+    """Context in which the exchanges of the RPC layer are recorded to
+    `path`, see :obj:`Recorder`."""
+    with Recorder( path, append ) as recorder, _added( recorder ):
+        yield recorder
+
+
+@contextlib.contextmanager
+def replay( path, **kwargs ):
+    """Context in which the RPC layer replays the recording at `path`
+    instead of sending requests, see :obj:`Replay` for the arguments."""
+    with _added( Replay( path, **kwargs ) ) as replayer:
+        yield replayer
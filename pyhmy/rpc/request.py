@@ -1,14 +1,54 @@
 """
 RPC wrapper around requests library
 """
+import contextlib
+import functools
 import json
+import time
 
 import requests
 
-from .exceptions import RequestsError, RequestsTimeoutError, RPCError
+from . import codec, websocket
+
+from .exceptions import (
+    RequestsError,
+    RequestsServerError,
+    RequestsThrottledError,
+    RequestsTimeoutError,
+    RPCError,
+)
+
+from .breaker import guarded, record_failure
+
+from .cache import lookup, store
+
+from .compression import get_default_compression
+
+from .deadline import requests_timeout, resolve, seconds
+
+from .endpoint_pool import EndpointPool
+
+from .metrics import count_error, count_retry, get_default_metrics
+
+from .middleware import Call, get_default_chain
+
+from .ratelimit import limited, parse_retry_after
+
+from .retry import call_with_retry
+
+from .session import get_default_pool
+
+from .singleflight import coalesce
+
+from .stream import JSONArrayStream
+
+from .websocket import is_websocket
 
 from ..constants import DEFAULT_ENDPOINT, DEFAULT_TIMEOUT
 
+# size of the reads of a reply with a total time budget, in bytes
+READ_SIZE = 16384
+
 
 def base_request(
     method,
@@ -18,14 +58,18 @@ def base_request(
 ) -> str:
     """Basic RPC request.
 
+    The request is sent through the session of the shared
+    :obj:`~pyhmy.rpc.session.SessionPool`, so connections to the endpoint
+    are kept alive and reused between calls.
+
     Parameters
     ---------
     method: str
         RPC Method to call
     params: :obj:`list`, optional
         Parameters for the RPC method
-    endpoint: :obj:`str`, optional
-        Endpoint to send request to
+    endpoint: :obj:`str` or :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool`, optional
+        Endpoint (or pool of endpoints) to send request to
     timeout: :obj:`int`, optional
         Timeout in seconds
 
@@ -40,58 +84,245 @@ def base_request(
         If params is not a list or None
     RequestsTimeoutError
         If request timed out
+    RequestsThrottledError
+        If the endpoint throttled the request (HTTP 429)
+    RequestsServerError
+        If the endpoint replied with a 5xx HTTP status
     RequestsError
         If other request error occured
     """
+    return _send( encode( method, params ), method, endpoint, timeout )
+
+
+def encode( method, params ) -> bytes:
+    """Encode the JSON-RPC payload of a single call.
+
+    Parameters
+    ----------
+    method: str
+        RPC method
+    params: list
+        Parameters of the call, None for no parameters
+
+    Returns
+    -------
+    bytes
+        Payload encoded with the default codec
+
+    Raises
+    ------
+    TypeError
+        If params is not a list
+    """
     if params is None:
         params = []
     elif not isinstance( params, list ):
         raise TypeError( f"invalid type {params.__class__}" )
 
-    try:
-        payload = {
-            "id": "1",
-            "jsonrpc": "2.0",
-            "method": method,
-            "params": params
-        }
-        headers = {
-            "Content-Type": "application/json"
-        }
+    payload = {
+        "id": "1",
+        "jsonrpc": "2.0",
+        "method": method,
+        "params": params
+    }
+    return codec.dumps( payload )
 
-        resp = requests.request(
-            "POST",
+
+def _send( data, method, endpoint, timeout ) -> bytes:
+    """Send an encoded JSON-RPC payload to the endpoint, or through the
+    endpoint pool with failover for idempotent methods."""
+    if isinstance( endpoint, EndpointPool ):
+        return endpoint.send(
+            lambda node: _send_to( data, method, node, timeout ),
+            method
+        )
+    return _send_to( data, method, endpoint, timeout )
+
+
+def _send_to( data, method, endpoint, timeout ) -> bytes:
+    """Send an encoded JSON-RPC payload over WebSocket for `ws://` and
+    `wss://` endpoints, by HTTP POST otherwise, through the middlewares
+    (see :mod:`pyhmy.rpc.middleware`) and the circuit breaker of the
+    endpoint (see :mod:`pyhmy.rpc.breaker`), recording its metrics when
+    enabled (see :mod:`pyhmy.rpc.metrics`)."""
+    chain = get_default_chain()
+    if not chain:
+        return _send_measured( data, method, endpoint, timeout )
+
+    def send( call ):
+        return _send_measured(
+            call.data,
+            method,
+            call.endpoint,
+            timeout,
+            call.headers
+        )
+
+    return chain.send( Call( method, endpoint, data ), send )
+
+
+def _send_measured( data, method, endpoint, timeout, headers = None ) -> bytes:
+    metrics = get_default_metrics()
+    if metrics is None:
+        return _send_guarded( data, endpoint, timeout, headers )
+    start = time.perf_counter()
+    try:
+        content = _send_guarded( data, endpoint, timeout, headers )
+    except Exception as err:
+        metrics.observe_failure(
             endpoint,
-            headers = headers,
-            data = json.dumps( payload ),
-            timeout = timeout,
-            allow_redirects = True,
+            method,
+            time.perf_counter() - start,
+            err
+        )
+        raise
+    metrics.observe_request(
+        endpoint,
+        method,
+        time.perf_counter() - start,
+        len( data ),
+        len( content )
+    )
+    return content
+
+
+def _send_guarded( data, endpoint, timeout, headers = None ) -> bytes:
+    with guarded( endpoint ):
+        if is_websocket( endpoint ):
+            return websocket.send(
+                data,
+                endpoint,
+                seconds( timeout,
+                         endpoint )
+            )
+        return _post( data, endpoint, timeout, headers )
+
+
+def _post( data, endpoint, timeout, extra_headers = None ) -> bytes:
+    """POST an encoded JSON-RPC payload (single call or batch) to the
+    endpoint and return the raw reply, within the rate limit of the
+    endpoint (see :mod:`pyhmy.rpc.ratelimit`), compressed according to the
+    default compression settings (see :mod:`pyhmy.rpc.compression`).
+
+    The reply is read in chunks, so that a slow reply fails with
+    RequestsTimeoutError once the total budget of a
+    :obj:`~pyhmy.rpc.deadline.Deadline` runs out."""
+    compression = get_default_compression()
+    body, headers = compression.encode( data )
+    if extra_headers:
+        headers.update( extra_headers )
+    with limited( endpoint ):
+        try:
+            session = get_default_pool().get_session( endpoint )
+            resp = session.post(
+                endpoint,
+                headers = headers,
+                data = body,
+                timeout = requests_timeout( timeout,
+                                            endpoint ),
+                allow_redirects = True,
+                stream = True,
+            )
+            with resp:
+                content = _read( resp, endpoint, timeout )
+        except requests.exceptions.Timeout as err:
+            raise RequestsTimeoutError( endpoint ) from err
+        except requests.exceptions.RequestException as err:
+            raise RequestsError( endpoint ) from err
+        check_status( endpoint, resp.status_code, resp.headers )
+        compression.record(
+            len( data ),
+            len( body ),
+            len( content ),
+            _wire_size( resp,
+                        content )
         )
+        return content
+
+
+def _read( resp, endpoint, timeout ) -> bytes:
+    """Body of a streamed reply, read within the total budget of the
+    deadline of `timeout`, if any.
+
+    Raises
+    ------
+    RequestsTimeoutError
+        If the deadline passed before the whole reply was read
+    """
+    deadline = resolve( timeout )
+    if deadline is None or deadline.total is None:
         return resp.content
-    except requests.exceptions.Timeout as err:
-        raise RequestsTimeoutError( endpoint ) from err
-    except requests.exceptions.RequestException as err:
-        raise RequestsError( endpoint ) from err
+    chunks = []
+    for chunk in resp.iter_content( READ_SIZE ):
+        if deadline.expired:
+            raise RequestsTimeoutError( endpoint )
+        chunks.append( chunk )
+    return b"".join( chunks )
+
+
+def _wire_size( resp, content ) -> int:
+    """Size of a reply as received, before decompression."""
+    try:
+        return resp.raw.tell()
+    except AttributeError:
+        return len( content )
+
+
+def check_status( endpoint, status, headers ):
+    """Raise for HTTP statuses that carry no JSON-RPC reply.
+
+    Parameters
+    ----------
+    endpoint: :obj:`str` or :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool`
+        Endpoint that replied
+    status: int
+        HTTP status of the reply
+    headers: dict
+        HTTP headers of the reply
+
+    Raises
+    ------
+    RequestsThrottledError
+        If the endpoint replied with a 429 HTTP status
+    RequestsServerError
+        If the endpoint replied with a 5xx HTTP status
+    """
+    if status == 429:
+        raise RequestsThrottledError(
+            endpoint,
+            parse_retry_after( headers.get( "Retry-After" ) )
+        )
+    if status >= 500:
+        raise RequestsServerError( endpoint, status )
 
 
 def rpc_request(
     method,
     params = None,
     endpoint = DEFAULT_ENDPOINT,
-    timeout = DEFAULT_TIMEOUT
+    timeout = DEFAULT_TIMEOUT,
+    retry_policy = None
 ) -> dict:
     """RPC request.
 
+    Failed idempotent reads are sent again according to the retry policy,
+    see :mod:`pyhmy.rpc.retry`. Identical hot reads in flight at the same
+    time share one request, see :mod:`pyhmy.rpc.singleflight`. Final chain
+    data is served from the response cache when one is set, see
+    :mod:`pyhmy.rpc.cache`.
+
     Parameters
     ---------
     method: str
         RPC Method to call
     params: :obj:`list`, optional
         Parameters for the RPC method
-    endpoint: :obj:`str`, optional
-        Endpoint to send request to
+    endpoint: :obj:`str` or :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool`, optional
+        Endpoint (or pool of endpoints) to send request to
     timeout: :obj:`int`, optional
         Timeout in seconds
+    retry_policy: :obj:`~pyhmy.rpc.retry.RetryPolicy`, optional
+        Retry policy for this call, the default policy if None
 
     Returns
     -------
@@ -113,12 +344,227 @@ def rpc_request(
     --------
     base_request
     """
-    raw_resp = base_request( method, params, endpoint, timeout )
+    raw_resp = lookup( method, params, endpoint )
+    if raw_resp is not None:
+        return decode( method, endpoint, raw_resp )
+    attempts = 0
+
+    def request():
+        nonlocal attempts
+        attempts += 1
+        if attempts > 1:
+            count_retry( endpoint, method )
+        raw_resp = base_request( method, params, endpoint, timeout )
+        try:
+            resp = decode( method, endpoint, raw_resp )
+        except RPCError as err:
+            record_failure( endpoint, err )
+            count_error( endpoint, method, err )
+            raise
+        store( method, params, endpoint, raw_resp, resp )
+        return resp
+
+    return coalesce(
+        lambda: call_with_retry( request, method, retry_policy, timeout ),
+        method,
+        params,
+        endpoint
+    )
 
+
+def decode( method, endpoint, raw_resp ) -> dict:
+    """Decode a raw JSON-RPC reply with the default codec (see
+    :mod:`pyhmy.rpc.codec`).
+
+    Parameters
+    ----------
+    method: str
+        RPC method of the call
+    endpoint: :obj:`str` or :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool`
+        Endpoint that replied
+    raw_resp: bytes
+        Raw reply, e.g. from :func:`base_request`
+
+    Returns
+    -------
+    dict
+        Decoded reply
+
+    Raises
+    ------
+    RPCError
+        If the reply is an error or could not be decoded
+    """
     try:
-        resp = json.loads( raw_resp )
+        metrics = get_default_metrics()
+        if metrics is None:
+            resp = codec.loads( raw_resp )
+        else:
+            start = time.perf_counter()
+            resp = codec.loads( raw_resp )
+            metrics.observe_decode(
+                endpoint,
+                method,
+                time.perf_counter() - start
+            )
         if "error" in resp:
             raise RPCError( method, endpoint, str( resp[ "error" ] ) )
         return resp
     except json.decoder.JSONDecodeError as err:
         raise RPCError( method, endpoint, raw_resp ) from err
+
+
+def rpc_stream(
+    method,
+    params = None,
+    path = ( "result",
+            ),
+    endpoint = DEFAULT_ENDPOINT,
+    timeout = DEFAULT_TIMEOUT,
+    retry_policy = None,
+    chunk_size = 65536,
+):
+    """Streamed RPC request, yielding the elements of an array of the reply
+    as they are read from the connection.
+
+    Peak memory is bounded by the largest element instead of the whole
+    reply. Failures to connect are retried according to the retry policy,
+    failures after the first element has been read are not. The connection
+    (and its rate limit slot) is held until the generator is exhausted or
+    closed. Replies are neither cached nor coalesced.
+
+    Parameters
+    ---------
+    method: str
+        RPC Method to call
+    params: :obj:`list`, optional
+        Parameters for the RPC method
+    path: :obj:`tuple`, optional
+        Keys leading to the array in the reply
+    endpoint: :obj:`str` or :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool`, optional
+        Endpoint (or pool of endpoints) to send request to
+    timeout: :obj:`int` or :obj:`~pyhmy.rpc.deadline.Deadline`, optional
+        Timeout in seconds, to connect and between two reads; a deadline
+        also bounds the time to read the whole reply
+    retry_policy: :obj:`~pyhmy.rpc.retry.RetryPolicy`, optional
+        Retry policy for this call, the default policy if None
+    chunk_size: :obj:`int`, optional
+        Size of the reads from the connection, in bytes
+
+    Yields
+    ------
+    Decoded elements of the array
+
+    Raises
+    ------
+    RPCError
+        If RPC response returned a blockchain error or is invalid
+    KeyError
+        If the reply has no value at `path`
+    RequestsTimeoutError
+        If request timed out
+    RequestsError
+        If other request error occured
+    """
+    data = encode( method, params )
+    with contextlib.ExitStack() as stack:
+        resp = call_with_retry(
+            functools.partial(
+                _open_stream,
+                stack,
+                data,
+                method,
+                endpoint,
+                timeout
+            ),
+            method,
+            retry_policy,
+            timeout
+        )
+        parser = JSONArrayStream( path )
+        deadline = resolve( timeout )
+        try:
+            for chunk in resp.iter_content( chunk_size ):
+                if deadline is not None and deadline.expired:
+                    raise RequestsTimeoutError( endpoint )
+                yield from parser.feed( chunk )
+                if parser.done:
+                    return
+            yield from parser.close()
+        except requests.exceptions.RequestException as err:
+            raise RequestsError( endpoint ) from err
+        except json.decoder.JSONDecodeError as err:
+            raise RPCError( method, endpoint, "invalid reply" ) from err
+    yield from remainder( method, endpoint, parser.document, path )
+
+
+def _open_stream( stack, data, method, endpoint, timeout ):
+    """Open a streamed reply, whose connection is closed by `stack`."""
+    def open_on( node ):
+        with contextlib.ExitStack() as attempt:
+            resp = attempt.enter_context( _post_stream( data, node, timeout ) )
+            stack.push( attempt.pop_all() )
+            return resp
+
+    if isinstance( endpoint, EndpointPool ):
+        return endpoint.send( open_on, method, hedge = False )
+    return open_on( endpoint )
+
+
+@contextlib.contextmanager
+def _post_stream( data, endpoint, timeout ):
+    """Streamed twin of :func:`_post`, yields the open response."""
+    body, headers = get_default_compression().encode( data )
+    with limited( endpoint ):
+        try:
+            session = get_default_pool().get_session( endpoint )
+            resp = session.post(
+                endpoint,
+                headers = headers,
+                data = body,
+                timeout = requests_timeout( timeout,
+                                            endpoint ),
+                allow_redirects = True,
+                stream = True,
+            )
+        except requests.exceptions.Timeout as err:
+            raise RequestsTimeoutError( endpoint ) from err
+        except requests.exceptions.RequestException as err:
+            raise RequestsError( endpoint ) from err
+        with resp:
+            check_status( endpoint, resp.status_code, resp.headers )
+            yield resp
+
+
+def remainder( method, endpoint, document, path ) -> list:
+    """Elements of a reply whose array was not found while streaming, e.g.
+    a null result.
+
+    Parameters
+    ----------
+    method: str
+        RPC method of the call
+    endpoint: :obj:`str` or :obj:`~pyhmy.rpc.endpoint_pool.EndpointPool`
+        Endpoint that replied
+    document: dict
+        Reply parsed by the streaming parser, None if empty
+    path: tuple of str
+        Keys leading to the array in the reply
+
+    Returns
+    -------
+    list
+        Elements of the array, empty if it is null
+
+    Raises
+    ------
+    RPCError
+        If the reply is an error
+    """
+    if document is None:
+        return []
+    if "error" in document:
+        raise RPCError( method, endpoint, str( document[ "error" ] ) )
+    for key in path:
+        document = document[ key ]
+    return document or []
@@ -0,0 +1,194 @@
+"""
+Retry policies with exponential backoff and jitter for idempotent RPCs
+"""
+import asyncio
+import random
+import threading
+import time
+
+from . import settings
+
+from .exceptions import (
+    CircuitOpenError,
+    RequestsError,
+    RequestsTimeoutError,
+)
+
+from .deadline import remaining
+
+from .methods import is_idempotent
+
+JITTER_NONE = "none"
+JITTER_FULL = "full"
+JITTER_EQUAL = "equal"
+
+
+class RetryPolicy:
+    """When and how often to send an RPC again.
+
+    The delay before attempt `n + 1` is
+    `min( max_backoff, backoff * multiplier ** ( n - 1 ) )`, randomized
+    according to `jitter`. Write methods (see
+    :data:`pyhmy.rpc.methods.WRITE_METHODS`) are never retried unless
+    `retry_writes` is set.
+
+    Parameters
+    ----------
+    max_attempts: :obj:`int`, optional
+        Total number of attempts, 1 to disable retries
+    backoff: :obj:`float`, optional
+        Delay before the first retry, in seconds
+    multiplier: :obj:`float`, optional
+        Growth factor of the delay between consecutive retries
+    max_backoff: :obj:`float`, optional
+        Upper bound of the delay, in seconds
+    jitter: :obj:`str`, optional
+        'full' for a uniform delay in [0, delay]
+        'equal' for a uniform delay in [delay / 2, delay]
+        'none' for the exact delay
+    retry_on: :obj:`tuple`, optional
+        Exception types that are retried
+    methods: :obj:`set`, optional
+        Only retry these methods, None for every idempotent method
+    retry_writes: :obj:`bool`, optional
+        True to also retry methods with side effects
+    """
+    def __init__(
+        self,
+        max_attempts = 3,
+        backoff = 0.1,
+        multiplier = 2.0,
+        max_backoff = 2.0,
+        jitter = JITTER_FULL,
+        retry_on = ( RequestsError,
+                     RequestsTimeoutError ),
+        methods = None,
+        retry_writes = False,
+    ):
+        if max_attempts < 1:
+            raise ValueError( "max_attempts must be at least 1" )
+        if jitter not in ( JITTER_NONE, JITTER_FULL, JITTER_EQUAL ):
+            raise ValueError( f"unknown jitter {jitter}" )
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_on = tuple( retry_on )
+        self.methods = None if methods is None else frozenset( methods )
+        self.retry_writes = retry_writes
+
+    def is_retryable( self, method ) -> bool:
+        """Check if the method (list of methods for a batch) may be retried
+        under this policy."""
+        if self.max_attempts < 2:
+            return False
+        names = method if isinstance( method, ( list, tuple ) ) else [ method ]
+        if self.methods is not None and not self.methods.issuperset( names ):
+            return False
+        return self.retry_writes or is_idempotent( names )
+
+    def should_retry( self, method, error, attempt ) -> bool:
+        """Check if a call that failed with `error` on attempt number
+        `attempt` (starting at 1) should be sent again. Calls failed fast by
+        an open circuit breaker are not."""
+        if attempt >= self.max_attempts:
+            return False
+        if isinstance( error, CircuitOpenError ):
+            return False
+        if not isinstance( error, self.retry_on ):
+            return False
+        return self.is_retryable( method )
+
+    def delay( self, attempt, error = None ) -> float:
+        """Delay in seconds before the attempt following attempt number
+        `attempt` (starting at 1), at least the Retry-After delay of a
+        throttled reply `error`."""
+        delay = min(
+            self.max_backoff,
+            self.backoff * self.multiplier**( attempt - 1 )
+        )
+        if self.jitter == JITTER_FULL:
+            delay = random.uniform( 0, delay )
+        elif self.jitter == JITTER_EQUAL:
+            delay = random.uniform( delay / 2, delay )
+        return max( delay, getattr( error, "retry_after", None ) or 0 )
+
+
+NO_RETRY = RetryPolicy( max_attempts = 1 )
+
+_default_policy = RetryPolicy()
+_default_policy_lock = threading.Lock()
+
+
+def get_default_policy() -> RetryPolicy:
+    """Retry policy used by RPC calls that do not specify one."""
+    return settings.lookup( "retry_policy", _default_policy )
+
+
+def set_default_policy( policy ) -> RetryPolicy:
+    """Replace the default retry policy and return the previous one.
+
+    Parameters
+    ----------
+    policy: :obj:`RetryPolicy`
+        New default policy, :data:`NO_RETRY` to disable retries
+    """
+    global _default_policy  # pylint: disable=global-statement
+    if not isinstance( policy, RetryPolicy ):
+        raise TypeError( f"invalid type {policy.__class__}" )
+    with _default_policy_lock:
+        previous, _default_policy = _default_policy, policy
+    return previous
+
+
+def call_with_retry( func, method, policy = None, timeout = None ):
+    """Call `func` until it succeeds or `policy` gives up.
+
+    Parameters
+    ----------
+    func: callable
+        Sends the RPC, called without arguments
+    method: str
+        RPC method (list of methods for a batch) sent by `func`
+    policy: :obj:`RetryPolicy`, optional
+        Policy to apply, the default policy if None
+    timeout: :obj:`int` or :obj:`~pyhmy.rpc.deadline.Deadline`, optional
+        Timeout of `func`; no retry is attempted if its deadline would pass
+        before
+
+    Returns
+    -------
+    The return value of `func`
+    """
+    policy = policy or get_default_policy()
+    attempt = 1
+    while True:
+        try:
+            return func()
+        except Exception as err:  # pylint: disable=broad-except
+            if not policy.should_retry( method, err, attempt ):
+                raise
+            delay = policy.delay( attempt, err )
+            if delay >= remaining( timeout ):
+                raise
+        time.sleep( delay )
+        attempt += 1
+
+
+async def async_call_with_retry( func, method, policy = None, timeout = None ):
+    """Async version of :func:`call_with_retry`, `func` returns an
+    awaitable."""
+    policy = policy or get_default_policy()
+    attempt = 1
+    while True:
+        try:
+            return await func()
+        except Exception as err:  # pylint: disable=broad-except
+            if not policy.should_retry( method, err, attempt ):
+                raise
+            delay = policy.delay( attempt, err )
+            if delay >= remaining( timeout ):
+                raise
+        await asyncio.sleep( delay )
+        attempt += 1
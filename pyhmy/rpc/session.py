@@ -0,0 +1,160 @@
+"""
+Pooled, keep-alive HTTP sessions for RPC requests
+"""
+import threading
+
+from urllib.parse import urlsplit
+
+import requests
+
+from requests.adapters import HTTPAdapter
+
+from . import settings
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+
+class SessionPool:
+    """Per-endpoint pool of :obj:`requests.Session` objects.
+
+    Each endpoint (scheme + host + port) gets its own session, backed by an
+    urllib3 connection pool that keeps connections alive between requests.
+    A session pool is safe to share between threads.
+
+    Parameters
+    ----------
+    pool_connections: :obj:`int`, optional
+        Number of urllib3 connection pools to cache per session
+    pool_maxsize: :obj:`int`, optional
+        Maximum number of connections to keep alive per endpoint
+    pool_block: :obj:`bool`, optional
+        True to block when all connections of an endpoint are in use
+        False to open (and then discard) an extra connection instead
+    """
+    def __init__(
+        self,
+        pool_connections = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize = DEFAULT_POOL_MAXSIZE,
+        pool_block = False,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key( endpoint ) -> str:
+        parts = urlsplit( endpoint )
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def _new_session( self ) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections = self.pool_connections,
+            pool_maxsize = self.pool_maxsize,
+            pool_block = self.pool_block,
+        )
+        session.mount( "http://", adapter )
+        session.mount( "https://", adapter )
+        return session
+
+    def get_session( self, endpoint ) -> requests.Session:
+        """Get (or create) the session used for the given endpoint.
+
+        Parameters
+        ----------
+        endpoint: str
+            Endpoint to get the session for
+
+        Returns
+        -------
+        :obj:`requests.Session`
+            Session with keep-alive connections to the endpoint
+        """
+        key = self._key( endpoint )
+        with self._lock:
+            session = self._sessions.get( key )
+            if session is None:
+                session = self._new_session()
+                self._sessions[ key ] = session
+            return session
+
+    def endpoints( self ) -> list:
+        """List of endpoints (scheme://host:port) with an open session."""
+        with self._lock:
+            return list( self._sessions )
+
+    def close( self ):
+        """Close all sessions and their pooled connections."""
+        with self._lock:
+            sessions = list( self._sessions.values() )
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc_info ):
+        self.close()
+
+
+_default_pool = SessionPool()
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool() -> SessionPool:
+    """Session pool shared by all module level RPC calls
+    (account, blockchain, staking, transaction, contract, ...)"""
+    return settings.lookup( "session_pool", _default_pool )
+
+
+def set_default_pool( pool ) -> SessionPool:
+    """Replace the shared session pool.
+
+    Parameters
+    ----------
+    pool: :obj:`SessionPool`
+        Pool to use for all subsequent module level RPC calls
+
+    Returns
+    -------
+    :obj:`SessionPool`
+        The previous pool, which is left open so that it can be closed
+        (or restored) by the caller
+    """
+    global _default_pool  # pylint: disable=global-statement
+    if not isinstance( pool, SessionPool ):
+        raise TypeError( f"invalid type {pool.__class__}" )
+    with _default_pool_lock:
+        previous, _default_pool = _default_pool, pool
+    return previous
+
+
+def configure_default_pool(
+    pool_connections = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize = DEFAULT_POOL_MAXSIZE,
+    pool_block = False,
+) -> SessionPool:
+    """Replace the shared session pool with a new one of the given size and
+    close the previous one.
+
+    Parameters
+    ----------
+    pool_connections: :obj:`int`, optional
+        Number of urllib3 connection pools to cache per session
+    pool_maxsize: :obj:`int`, optional
+        Maximum number of connections to keep alive per endpoint
+    pool_block: :obj:`bool`, optional
+        True to block when all connections of an endpoint are in use
+
+    Returns
+    -------
+    :obj:`SessionPool`
+        The new shared pool
+    """
+    pool = SessionPool( pool_connections, pool_maxsize, pool_block )
+    set_default_pool( pool ).close()
+    return pool
@@ -0,0 +1,39 @@
+"""
+Settings of the RPC layer overridden within a context
+
+The `get_default_*` functions of the RPC modules return the setting of the
+innermost :func:`using` context if it has one, the module default
+otherwise. This is how a :obj:`~pyhmy.client.HarmonyClient` applies its own
+session pool, retry policy, cache, ... to the calls made through it.
+"""
+import contextlib
+import contextvars
+
+_settings = contextvars.ContextVar( "pyhmy_rpc_settings", default = None )
+
+
+def lookup( name, default ):
+    """Setting `name` of the current context, `default` if not set."""
+    settings = _settings.get()
+    if settings is None:
+        return default
+    return settings.get( name, default )
+
+
+@contextlib.contextmanager
+def using( settings ):
+    """Context in which the given settings override the module defaults.
+
+    Parameters
+    ----------
+    settings: dict
+        Setting name ('session_pool', 'async_session_pool', 'retry_policy',
+        'singleflight', 'cache', 'limiter', 'breaker', 'compression',
+        'codec', 'metrics', 'middleware') to value
+    """
+    outer = _settings.get()
+    token = _settings.set( dict( outer, **settings ) if outer else settings )
+    try:
+        yield
+    finally:
+        _settings.reset( token )
@@ -0,0 +1,203 @@
+"""
+Request coalescing (single-flight): identical RPC calls in flight at the
+same time share one network request and one parsed result
+"""
+import asyncio
+import functools
+import threading
+
+from . import settings
+
+from .methods import call_key, is_idempotent
+
+# hot chain / network level reads, asked for by many workers at once
+COALESCED_METHODS = frozenset(
+    (
+        "hmyv2_latestHeader",
+        "hmyv2_blockNumber",
+        "hmyv2_getEpoch",
+        "hmyv2_getShardingStructure",
+        "hmyv2_getNodeMetadata",
+        "hmyv2_getValidatorInformation",
+        "hmyv2_getAllValidatorAddresses",
+        "hmyv2_getElectedValidatorAddresses",
+        "hmyv2_getStakingNetworkInfo",
+        "hmyv2_getSuperCommittees",
+        "hmyv2_gasPrice",
+    )
+)
+
+
+class _Call:
+    """A call in flight, waited on by its followers."""
+    def __init__( self ):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Group of in-flight calls keyed on (endpoint, method, params).
+
+    The first caller of a key (the leader) sends the request; callers of the
+    same key arriving before it completes wait for it and get the same
+    result, or the same exception. Results are shared objects and must not be
+    mutated by callers.
+
+    Parameters
+    ----------
+    methods: :obj:`set`, optional
+        Methods to coalesce, None for every idempotent method
+    """
+    def __init__( self, methods = COALESCED_METHODS ):
+        self.methods = None if methods is None else frozenset( methods )
+        self._calls = {}
+        self._async_calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+
+    def applies( self, method ) -> bool:
+        """Check if calls of the method are coalesced by this group."""
+        if self.methods is not None and method not in self.methods:
+            return False
+        return is_idempotent( method )
+
+    @staticmethod
+    def key( endpoint, method, params ) -> str:
+        """Key of a call, params are compared by value."""
+        return call_key( endpoint, method, params )
+
+    def do( self, key, func ):
+        """Call `func` unless a call with the same key is in flight, in which
+        case wait for it and return its result.
+
+        Parameters
+        ----------
+        key: str
+            Key of the call, see :meth:`key`
+        func: callable
+            Sends the request, called without arguments
+
+        Returns
+        -------
+        The return value of `func`, possibly from another caller
+        """
+        with self._lock:
+            call = self._calls.get( key )
+            leader = call is None
+            if leader:
+                call = self._calls[ key ] = _Call()
+                self.leaders += 1
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[ key ]
+            call.done.set()
+
+    async def async_do( self, key, func ):
+        """Async version of :meth:`do`, `func` returns an awaitable.
+
+        Calls are only coalesced within the same event loop. The request runs
+        in a task of its own, so that a cancelled caller, leader included,
+        does not cancel it for the others; it is cancelled once every caller
+        waiting for it was.
+        """
+        loop_key = ( asyncio.get_running_loop(), key )
+        with self._lock:
+            call = self._async_calls.get( loop_key )
+            if call is None:
+                task = asyncio.ensure_future( func() )
+                # the task and the number of callers waiting for it
+                call = self._async_calls[ loop_key ] = [ task, 0 ]
+                task.add_done_callback(
+                    functools.partial( self._async_done,
+                                       loop_key,
+                                       call )
+                )
+                self.leaders += 1
+            else:
+                self.shared += 1
+            call[ 1 ] += 1
+        task = call[ 0 ]
+        try:
+            return await asyncio.shield( task )
+        except asyncio.CancelledError:
+            with self._lock:
+                call[ 1 ] -= 1
+                abandoned = call[ 1 ] == 0
+            if abandoned:
+                task.cancel()
+            raise
+
+    def _async_done( self, key, call, task ):
+        with self._lock:
+            if self._async_calls.get( key ) is call:
+                del self._async_calls[ key ]
+        # callers may all be gone, do not warn about the error
+        if not task.cancelled():
+            task.exception()
+
+    def stats( self ) -> dict:
+        """Number of requests sent (`leaders`) and of calls that shared the
+        result of another one (`shared`)."""
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "shared": self.shared,
+                "in_flight": len( self._calls ) + len( self._async_calls ),
+            }
+
+
+_default_group = SingleFlight()
+_default_group_lock = threading.Lock()
+
+
+def get_default_group() -> SingleFlight:
+    """Single-flight group used by :func:`pyhmy.rpc.request.rpc_request`,
+    None if coalescing is disabled."""
+    return settings.lookup( "singleflight", _default_group )
+
+
+def set_default_group( group ) -> SingleFlight:
+    """Replace the default single-flight group and return the previous one.
+
+    Parameters
+    ----------
+    group: :obj:`SingleFlight`
+        New default group, None to disable coalescing
+    """
+    global _default_group  # pylint: disable=global-statement
+    if group is not None and not isinstance( group, SingleFlight ):
+        raise TypeError( f"invalid type {group.__class__}" )
+    with _default_group_lock:
+        previous, _default_group = _default_group, group
+    return previous
+
+
+def coalesce( func, method, params, endpoint ):
+    """Call `func` through the default group if it coalesces `method`."""
+    group = get_default_group()
+    if group is None or not group.applies( method ):
+        return func()
+    return group.do( group.key( endpoint, method, params ), func )
+
+
+async def async_coalesce( func, method, params, endpoint ):
+    """Async version of :func:`coalesce`, `func` returns an awaitable."""
+    group = get_default_group()
+    if group is None or not group.applies( method ):
+        return await func()
+    return await group.async_do( group.key( endpoint, method, params ), func )
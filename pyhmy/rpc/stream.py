@@ -0,0 +1,180 @@
+"""
+Incremental parsing of large JSON-RPC replies, one array element at a time
+"""
+import codecs
+import json
+import re
+
+# characters that change the structure around the array
+_STRUCTURE = re.compile( r'[{}\[\]",:]' )
+_WHITESPACE = re.compile( r"[ \t\r\n]*" )
+
+
+class JSONArrayStream:
+    """Decode the elements of the array found at `path` of a JSON document
+    fed in chunks, as soon as each of them is complete.
+
+    Only the text of the element being read is kept once the array is
+    reached, so memory is bounded by the largest element rather than by the
+    whole document. Elements are decoded by the C scanner of the standard
+    library, which also finds where they end, so streaming costs about as
+    much CPU as decoding the whole document at once.
+
+    Parameters
+    ----------
+    path: :obj:`tuple`
+        Keys of the nested objects leading to the array, e.g.
+        `( "result", "transactions" )`
+    """
+    def __init__( self,
+                  path = ( "result",
+                          ) ):
+        self.path = tuple( path )
+        self.done = False
+        self.document = None
+        self._decoder = codecs.getincrementaldecoder( "utf-8" )()
+        self._json = json.JSONDecoder()
+        self._text = ""
+        self._pos = 0
+        self._found = False
+        # containers ("{" or "[") and object keys around the position, until
+        # the array is reached
+        self._containers = []
+        self._keys = []
+        self._expect_key = False
+        # length of the text needed before decoding the current element
+        # again, doubled after each attempt on a truncated element
+        self._retry_at = 0
+
+    def feed( self, data ) -> list:
+        """Parse the next chunk of the document.
+
+        Parameters
+        ----------
+        data: bytes
+            Next chunk of the document
+
+        Returns
+        -------
+        list
+            Elements of the array completed by the chunk
+        """
+        if self.done:
+            return []
+        self._text += self._decoder.decode( data )
+        elements = []
+        if not self._found:
+            self._scan()
+        if self._found and len( self._text ) >= self._retry_at:
+            self._elements( elements )
+            # drop what precedes the current element
+            self._text = self._text[ self._pos : ]
+            self._pos = 0
+        return elements
+
+    def close( self ) -> list:
+        """Check that the document is complete.
+
+        If the array was not found (e.g. an error reply or a null result),
+        the decoded document is set as :attr:`document`.
+
+        Returns
+        -------
+        list
+            Elements of the array not returned by :meth:`feed` yet
+
+        Raises
+        ------
+        json.decoder.JSONDecodeError
+            If the document is truncated or invalid
+        """
+        self._text += self._decoder.decode( b"", final = True )
+        elements = []
+        if not self._found:
+            self.document = json.loads( self._text )
+        elif not self.done:
+            self._elements( elements, final = True )
+            if not self.done:
+                raise json.decoder.JSONDecodeError(
+                    "Unterminated array",
+                    self._text,
+                    len( self._text )
+                )
+        return elements
+
+    def _scan( self ):
+        """Follow the structure of the document until the array."""
+        text = self._text
+        pos = self._pos
+        while True:
+            match = _STRUCTURE.search( text, pos )
+            if match is None:
+                pos = len( text )
+                break
+            char = match.group()
+            if char == '"':
+                try:
+                    key, end = self._json.raw_decode( text, match.start() )
+                except json.decoder.JSONDecodeError:
+                    # the string is not fully read yet
+                    pos = match.start()
+                    break
+                if self._expect_key:
+                    self._keys[ -1 ] = key
+                    self._expect_key = False
+                pos = end
+                continue
+            pos = match.end()
+            if char == "[" and self._at_path():
+                self._found = True
+                break
+            if char in "{[":
+                self._containers.append( char )
+                self._keys.append( None )
+                self._expect_key = char == "{"
+            elif char in "}]":
+                self._containers.pop()
+                self._keys.pop()
+                self._expect_key = False
+            elif char == ",":
+                self._expect_key = self._containers[ -1 : ] == [ "{" ]
+        self._pos = pos
+
+    def _at_path( self ) -> bool:
+        if len( self._keys ) != len( self.path ):
+            return False
+        levels = zip( self._containers, self._keys, self.path )
+        return all(
+            container == "{" and key == expected
+            for container, key, expected in levels
+        )
+
+    def _elements( self, elements, final = False ):
+        """Decode the complete elements of the array."""
+        text = self._text
+        pos = self._pos
+        while True:
+            pos = _WHITESPACE.match( text, pos ).end()
+            if pos == len( text ):
+                break
+            if text[ pos ] == "]":
+                self.done = True
+                break
+            if text[ pos ] == ",":
+                pos += 1
+                continue
+            try:
+                element, end = self._json.raw_decode( text, pos )
+            except json.decoder.JSONDecodeError:
+                if final:
+                    raise
+                # most likely truncated, try again with twice as much text
+                self._retry_at = 2 * ( len( text ) - pos )
+                break
+            # a number at the end of the text may be missing digits
+            if end == len( text ) and not final:
+                break
+            elements.append( element )
+            self._retry_at = 0
+            pos = end
+        self._pos = pos
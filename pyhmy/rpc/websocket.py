@@ -0,0 +1,584 @@
+"""
+JSON-RPC over WebSocket, with `eth_subscribe` subscriptions
+
+Endpoints starting with `ws://` or `wss://` can be passed to every RPC call,
+which is then sent over a persistent connection shared by all calls to that
+endpoint. Requires the optional `aiohttp` dependency
+(`pip install pyhmy[async]`).
+"""
+import asyncio
+import itertools
+import threading
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+from . import codec
+
+from .exceptions import RequestsError, RequestsTimeoutError, RPCError
+
+from ..constants import DEFAULT_TIMEOUT
+
+_CLOSED = object()
+
+
+def _require_aiohttp():
+    if aiohttp is None:
+        raise ImportError(
+            "WebSocket RPC requires `aiohttp`, install it with `pip install pyhmy[async]`"
+        )
+
+
+def is_websocket( endpoint ) -> bool:
+    """Check if an endpoint is a WebSocket URL."""
+    return isinstance( endpoint,
+                       str ) and endpoint.startswith( ( "ws://",
+                                                        "wss://" ) )
+
+
+class Subscription:
+    """Notifications of a subscription, as an async iterator.
+
+    Notifications are queued until read; with `maxsize`, the oldest ones are
+    dropped (and counted in `dropped`) when the queue is full. Notifications
+    sent while the connection was down are lost.
+    """
+    def __init__( self, transport, kind, params, maxsize = 0 ):
+        self.transport = transport
+        self.kind = kind
+        self.params = params
+        self.maxsize = maxsize
+        self.id = None
+        self.closed = False
+        self.dropped = 0
+        self._queue = asyncio.Queue()
+
+    def _put( self, item ):
+        if self.maxsize and self._queue.qsize() >= self.maxsize:
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait( item )
+
+    def _close( self ):
+        if not self.closed:
+            self.closed = True
+            self._queue.put_nowait( _CLOSED )
+
+    def __aiter__( self ):
+        return self
+
+    async def __anext__( self ):
+        if self.closed and self._queue.empty():
+            raise StopAsyncIteration
+        item = await self._queue.get()
+        if item is _CLOSED:
+            raise StopAsyncIteration
+        return item
+
+    async def unsubscribe( self ):
+        """Cancel the subscription and end the iteration."""
+        await self.transport.unsubscribe( self )
+
+
+class WebSocketTransport:
+    """Persistent JSON-RPC connection to a WebSocket endpoint, for one event
+    loop.
+
+    The connection is opened on first use. When it drops, requests in flight
+    fail with :obj:`~pyhmy.rpc.exceptions.RequestsError` (and are retried by
+    the RPC layer if idempotent), then the connection is opened again with
+    exponential backoff and the subscriptions are renewed.
+
+    Parameters
+    ----------
+    url: str
+        WebSocket endpoint, e.g. `wss://ws.s0.t.hmny.io`
+    heartbeat: :obj:`float`, optional
+        Interval of the pings that detect dead connections, in seconds
+    reconnect_delay: :obj:`float`, optional
+        Delay before the first reconnection attempt, in seconds
+    max_reconnect_delay: :obj:`float`, optional
+        Upper bound of the delay between reconnection attempts, in seconds
+    namespace: :obj:`str`, optional
+        Namespace of the subscription methods, 'eth' or 'hmy'
+    """
+    def __init__(
+        self,
+        url,
+        heartbeat = 30.0,
+        reconnect_delay = 0.5,
+        max_reconnect_delay = 30.0,
+        namespace = "eth",
+    ):
+        _require_aiohttp()
+        self.url = url
+        self.heartbeat = heartbeat
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.namespace = namespace
+        self.connects = 0
+        self._ids = itertools.count( 1 )
+        self._pending = {}
+        self._active = set()
+        self._subscriptions = {}
+        self._ws = None
+        self._session = None
+        self._runner = None
+        self._connected = asyncio.Event()
+        self._closed = False
+
+    async def _run( self ):
+        """Keep the connection open and dispatch incoming messages."""
+        delay = self.reconnect_delay
+        while not self._closed:
+            try:
+                self._ws = await self._session.ws_connect(
+                    self.url,
+                    heartbeat = self.heartbeat
+                )
+            except ( aiohttp.ClientError, asyncio.TimeoutError, OSError ):
+                await asyncio.sleep( delay )
+                delay = min( self.max_reconnect_delay, delay * 2 )
+                continue
+            delay = self.reconnect_delay
+            self.connects += 1
+            self._connected.set()
+            resubscribe = asyncio.ensure_future( self._resubscribe() )
+            try:
+                async for message in self._ws:
+                    if message.type not in (
+                        aiohttp.WSMsgType.TEXT,
+                        aiohttp.WSMsgType.BINARY
+                    ):
+                        break
+                    try:
+                        message = codec.loads( message.data )
+                    except ValueError:
+                        continue
+                    try:
+                        self._dispatch( message )
+                    except Exception:  # pylint: disable=broad-except
+                        # a malformed frame is dropped, not the connection
+                        continue
+            finally:
+                resubscribe.cancel()
+                self._connected.clear()
+                self._subscriptions.clear()
+                await self._ws.close()
+                self._fail_pending()
+
+    def stats( self ) -> dict:
+        """Counters of the connection."""
+        return {
+            "connected": self._connected.is_set(),
+            "connects": self.connects,
+            "pending": len( self._pending ),
+            "subscriptions": len( self._active ),
+        }
+
+    def _fail_pending( self ):
+        pending, self._pending = self._pending, {}
+        for future, _ in pending.values():
+            if not future.done():
+                future.set_exception( RequestsError( self.url ) )
+
+    def _dispatch( self, message ):
+        """Resolve the request a message replies to, or feed the
+        subscription it notifies; messages that are neither are
+        ignored."""
+        if isinstance( message, list ):
+            # items that are not reply objects are dropped
+            message = [
+                reply for reply in message if isinstance( reply, dict )
+            ]
+            key = next(
+                (
+                    reply.get( "id" )
+                    for reply in message
+                    if reply.get( "id" ) in self._pending
+                ),
+                None
+            )
+        elif not isinstance( message, dict ):
+            return
+        elif message.get( "id" ) is not None:
+            key = message[ "id" ]
+        else:
+            # notification of a subscription
+            params = message.get( "params" )
+            if not isinstance( params, dict ):
+                return
+            subscription = self._subscriptions.get(
+                params.get( "subscription" )
+            )
+            if subscription is not None:
+                subscription._put( params.get( "result" ) )  # pylint: disable=protected-access
+            return
+        future, ids = self._pending.pop( key, ( None, None ) )
+        if future is None or future.done():
+            return
+        replies = message if isinstance( message, list ) else [ message ]
+        try:
+            # give the replies the ids of the caller
+            for reply in replies:
+                reply[ "id" ] = ids.get( reply.get( "id" ), reply.get( "id" ) )
+        except TypeError:
+            # an id that is not a JSON scalar fails its request only
+            future.set_exception( RequestsError( self.url ) )
+            return
+        future.set_result( message )
+
+    async def connect( self, timeout = DEFAULT_TIMEOUT ):
+        """Open the connection, if not open yet."""
+        if self._closed:
+            raise RequestsError( self.url )
+        if self._runner is None:
+            self._session = aiohttp.ClientSession()
+            self._runner = asyncio.ensure_future( self._run() )
+        try:
+            await asyncio.wait_for( self._connected.wait(), timeout )
+        except asyncio.TimeoutError as err:
+            raise RequestsTimeoutError( self.url ) from err
+
+    async def request( self, payload, timeout = DEFAULT_TIMEOUT ):
+        """Send a decoded JSON-RPC payload (single call or batch) and return
+        the decoded reply.
+
+        Raises
+        ------
+        RequestsTimeoutError
+            If there was no reply within `timeout` seconds
+        RequestsError
+            If the connection dropped before the reply
+        """
+        await self.connect( timeout )
+        # ids are unique per connection, the ones of the caller are restored
+        # in the reply
+        batch = isinstance( payload, list )
+        ids = {}
+        calls = []
+        for call in payload if batch else [ payload ]:
+            new_id = next( self._ids )
+            ids[ new_id ] = call.get( "id" )
+            calls.append( dict( call, id = new_id ) )
+        key = calls[ 0 ][ "id" ]
+        data = codec.dumps( calls if batch else calls[ 0 ] ).decode()
+        future = asyncio.get_running_loop().create_future()
+        self._pending[ key ] = ( future, ids )
+        try:
+            await self._ws.send_str( data )
+            return await asyncio.wait_for( future, timeout )
+        except asyncio.TimeoutError as err:
+            raise RequestsTimeoutError( self.url ) from err
+        except ( aiohttp.ClientError, ConnectionError ) as err:
+            raise RequestsError( self.url ) from err
+        finally:
+            self._pending.pop( key, None )
+
+    async def rpc_request(
+        self,
+        method,
+        params = None,
+        timeout = DEFAULT_TIMEOUT
+    ) -> dict:
+        """Send an RPC over the connection, see
+        :func:`pyhmy.rpc.request.rpc_request`."""
+        reply = await self.request(
+            {
+                "id": "1",
+                "jsonrpc": "2.0",
+                "method": method,
+                "params": params or []
+            },
+            timeout
+        )
+        if "error" in reply:
+            raise RPCError( method, self.url, str( reply[ "error" ] ) )
+        return reply
+
+    async def subscribe(
+        self,
+        kind,
+        *params,
+        maxsize = 0,
+        timeout = DEFAULT_TIMEOUT
+    ) -> Subscription:
+        """Subscribe to notifications.
+
+        Parameters
+        ----------
+        kind: str
+            'newHeads', 'logs' or 'newPendingTransactions'
+        params:
+            Further parameters of the subscription, e.g. a log filter
+        maxsize: :obj:`int`, optional
+            Maximum number of unread notifications, 0 for no limit
+
+        Returns
+        -------
+        :obj:`Subscription`
+            Async iterator over the notifications
+        """
+        subscription = Subscription( self, kind, list( params ), maxsize )
+        await self._subscribe( subscription, timeout )
+        self._active.add( subscription )
+        return subscription
+
+    async def _subscribe( self, subscription, timeout = DEFAULT_TIMEOUT ):
+        reply = await self.rpc_request(
+            f"{self.namespace}_subscribe",
+            [ subscription.kind ] + subscription.params,
+            timeout
+        )
+        subscription.id = reply[ "result" ]
+        self._subscriptions[ subscription.id ] = subscription
+
+    async def _resubscribe( self ):
+        for subscription in list( self._active ):
+            try:
+                await self._subscribe( subscription )
+            except ( RequestsError, RequestsTimeoutError ):
+                # the connection dropped again, retried on the next one
+                return
+            except RPCError:
+                subscription._close()  # pylint: disable=protected-access
+                self._active.discard( subscription )
+
+    async def unsubscribe( self, subscription, timeout = DEFAULT_TIMEOUT ):
+        """Cancel a subscription and end its iteration."""
+        self._active.discard( subscription )
+        subscription._close()  # pylint: disable=protected-access
+        if self._subscriptions.pop( subscription.id, None ) is None:
+            return
+        try:
+            await self.rpc_request(
+                f"{self.namespace}_unsubscribe",
+                [ subscription.id ],
+                timeout
+            )
+        except ( RequestsError, RequestsTimeoutError, RPCError ):
+            pass
+
+    async def new_heads( self, maxsize = 0 ) -> Subscription:
+        """Subscribe to the headers of new blocks."""
+        return await self.subscribe( "newHeads", maxsize = maxsize )
+
+    async def logs( self, address = None, topics = None, maxsize = 0 ):
+        """Subscribe to the logs of new blocks matching a filter.
+
+        Parameters
+        ----------
+        address: :obj:`str` or :obj:`list`, optional
+            Contract address(es) emitting the logs
+        topics: :obj:`list`, optional
+            Topics to match, see `eth_getLogs`
+        """
+        log_filter = {}
+        if address is not None:
+            log_filter[ "address" ] = address
+        if topics is not None:
+            log_filter[ "topics" ] = topics
+        return await self.subscribe( "logs", log_filter, maxsize = maxsize )
+
+    async def pending_transactions( self, maxsize = 0 ) -> Subscription:
+        """Subscribe to the hashes of transactions entering the pool."""
+        return await self.subscribe(
+            "newPendingTransactions",
+            maxsize = maxsize
+        )
+
+    async def close( self ):
+        """Close the connection and end every subscription."""
+        self._closed = True
+        for subscription in list( self._active ):
+            subscription._close()  # pylint: disable=protected-access
+        self._active.clear()
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+        self._fail_pending()
+        if self._session is not None:
+            await self._session.close()
+
+    async def __aenter__( self ):
+        await self.connect()
+        return self
+
+    async def __aexit__( self, *exc_info ):
+        await self.close()
+
+
+class SyncSubscription:
+    """Notifications of a subscription of a :obj:`WebSocketClient`, as an
+    iterator."""
+    def __init__( self, client, subscription ):
+        self.client = client
+        self.subscription = subscription
+
+    @property
+    def dropped( self ) -> int:
+        """Number of notifications dropped because the queue was full."""
+        return self.subscription.dropped
+
+    def __iter__( self ):
+        return self
+
+    def __next__( self ):
+        try:
+            return self.client.run( self.subscription.__anext__() )
+        except StopAsyncIteration as err:
+            raise StopIteration from err
+
+    def unsubscribe( self ):
+        """Cancel the subscription and end the iteration."""
+        self.client.run( self.subscription.unsubscribe() )
+
+
+class WebSocketClient:
+    """Blocking interface to a :obj:`WebSocketTransport`, run by an event
+    loop in a background thread.
+
+    Parameters
+    ----------
+    url: str
+        WebSocket endpoint, e.g. `wss://ws.s0.t.hmny.io`
+    kwargs:
+        Options of the :obj:`WebSocketTransport`
+    """
+    def __init__( self, url, **kwargs ):
+        _require_aiohttp()
+        self.url = url
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target = self._loop.run_forever,
+            name = "pyhmy-websocket",
+            daemon = True
+        )
+        self._thread.start()
+        self.transport = self.run( self._create( url, kwargs ) )
+
+    @staticmethod
+    async def _create( url, kwargs ):
+        return WebSocketTransport( url, **kwargs )
+
+    def run( self, coroutine ):
+        """Run a coroutine on the loop of the client and wait for it."""
+        future = asyncio.run_coroutine_threadsafe( coroutine, self._loop )
+        return future.result()
+
+    def send( self, data, timeout = DEFAULT_TIMEOUT ) -> bytes:
+        """Send an encoded JSON-RPC payload and return the encoded reply,
+        like :func:`pyhmy.rpc.request._post`."""
+        request = self.transport.request( codec.loads( data ), timeout )
+        reply = self.run( request )
+        return codec.dumps( reply )
+
+    def rpc_request( self, method, params = None, timeout = DEFAULT_TIMEOUT ):
+        """See :meth:`WebSocketTransport.rpc_request`."""
+        return self.run( self.transport.rpc_request( method, params, timeout ) )
+
+    def subscribe( self, kind, *params, maxsize = 0 ) -> SyncSubscription:
+        """See :meth:`WebSocketTransport.subscribe`."""
+        return SyncSubscription(
+            self,
+            self.run(
+                self.transport.subscribe( kind,
+                                          *params,
+                                          maxsize = maxsize )
+            )
+        )
+
+    def new_heads( self, maxsize = 0 ) -> SyncSubscription:
+        """See :meth:`WebSocketTransport.new_heads`."""
+        return SyncSubscription(
+            self,
+            self.run( self.transport.new_heads( maxsize ) )
+        )
+
+    def logs(
+        self,
+        address = None,
+        topics = None,
+        maxsize = 0
+    ) -> SyncSubscription:
+        """See :meth:`WebSocketTransport.logs`."""
+        subscribe = self.transport.logs( address, topics, maxsize )
+        return SyncSubscription( self, self.run( subscribe ) )
+
+    def pending_transactions( self, maxsize = 0 ) -> SyncSubscription:
+        """See :meth:`WebSocketTransport.pending_transactions`."""
+        return SyncSubscription(
+            self,
+            self.run( self.transport.pending_transactions( maxsize ) )
+        )
+
+    def close( self ):
+        """Close the connection and stop the background loop."""
+        if self._loop.is_closed():
+            return
+        self.run( self.transport.close() )
+        self._loop.call_soon_threadsafe( self._loop.stop )
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc_info ):
+        self.close()
+
+
+_clients = {}
+_transports = {}
+_clients_lock = threading.Lock()
+
+
+def get_client( url ) -> WebSocketClient:
+    """Client shared by the blocking RPC calls to a WebSocket endpoint."""
+    with _clients_lock:
+        client = _clients.get( url )
+        if client is None:
+            client = _clients[ url ] = WebSocketClient( url )
+        return client
+
+
+def get_transport( url ) -> WebSocketTransport:
+    """Transport shared by the async RPC calls of the running event loop to
+    a WebSocket endpoint."""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        # drop transports of loops that are gone, e.g. after asyncio.run
+        for key in [ key for key in _transports if key[ 0 ].is_closed() ]:
+            del _transports[ key ]
+        transport = _transports.get( ( loop, url ) )
+        if transport is None:
+            transport = _transports[ ( loop, url ) ] = WebSocketTransport( url )
+        return transport
+
+
+def close_clients():
+    """Close the shared blocking clients."""
+    with _clients_lock:
+        clients = list( _clients.values() )
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+def send( data, endpoint, timeout ) -> bytes:
+    """Send an encoded JSON-RPC payload over the shared client of the
+    endpoint."""
+    return get_client( endpoint ).send( data, timeout )
+
+
+async def async_send( data, endpoint, timeout ) -> bytes:
+    """Async version of :func:`send`, over the transport of the running
+    loop."""
+    transport = get_transport( endpoint )
+    reply = await transport.request( codec.loads( data ), timeout )
+    return codec.dumps( reply )
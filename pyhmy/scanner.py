@@ -0,0 +1,420 @@
+"""
+Scan every shard of the network concurrently, as one stream of blocks
+
+The shards and their endpoints are discovered with
+:func:`~pyhmy.blockchain.get_sharding_structure`. Each shard is scanned by a
+thread of its own, a :obj:`~pyhmy.blockchain.BlockFollower` following the
+tip, or a :obj:`~pyhmy.block_range.BlockRangeFetcher` when the range has an
+end, and their events are merged into a single stream::
+
+    >>> scanner = ShardScanner( "https://api.s0.t.hmny.io", confirmations = 2 )
+    >>> for event in scanner.scan():
+    ...     print( event.shard, event.number )
+"""
+import collections
+import contextvars
+import queue
+import threading
+import time
+
+from .block_range import BlockRangeFetcher
+
+from .blockchain import BLOCK, BlockFollower, get_sharding_structure
+
+from .rpc.exceptions import RequestsError, RequestsTimeoutError, RPCError
+
+from .exceptions import InvalidRPCReplyError
+
+from .constants import DEFAULT_ENDPOINT, DEFAULT_TIMEOUT
+
+# merge orders
+ORDER_TIMESTAMP = "timestamp"
+ORDER_SHARD = "shard"
+ORDER_ARRIVAL = "arrival"
+
+ShardEvent = collections.namedtuple(
+    "ShardEvent",
+    [ "shard",
+      "kind",
+      "number",
+      "hash",
+      "block" ]
+)
+ShardEvent.__doc__ = """:obj:`~pyhmy.blockchain.BlockEvent` of a shard."""
+
+# end of the events of a shard
+_DONE = object()
+
+# follower options that also apply to the range fetcher
+_FETCH_OPTIONS = frozenset(
+    [ "full_tx",
+      "include_tx",
+      "include_staking_tx",
+      "include_signers" ]
+)
+
+
+class _Failure:
+    """Error of the scan of a shard, raised by the merged stream."""
+    def __init__( self, error ):
+        self.error = error
+
+
+def discover( endpoint = DEFAULT_ENDPOINT, timeout = DEFAULT_TIMEOUT ) -> dict:
+    """Shard ID to HTTP endpoint of the shards of the network of
+    `endpoint`."""
+    structure = get_sharding_structure( endpoint = endpoint, timeout = timeout )
+    return {
+        shard[ "shardID" ]: shard[ "http" ]
+        for shard in structure
+    }
+
+
+def _timestamp( block ):
+    timestamp = block.get( "timestamp", 0 ) if isinstance( block, dict ) else 0
+    if isinstance( timestamp, str ):
+        timestamp = int( timestamp, 16 )
+    return timestamp
+
+
+class ShardScanner:  # pylint: disable=too-many-instance-attributes
+    """Concurrent scan of several shards merged into one stream of
+    :obj:`ShardEvent`.
+
+    Without `end_block`, each shard is followed from `start_block` (its
+    head if None) for ever, with reorganizations reported as rollback
+    events, see :obj:`~pyhmy.blockchain.BlockFollower`. With `end_block`,
+    each shard is fetched from `start_block` (0 if None) to `end_block` in
+    parallel chunks and the stream ends with the last block of the last
+    shard.
+
+    Orders of the merged stream:
+
+    * :data:`ORDER_TIMESTAMP`: by block timestamp, then shard. An event is
+      held until every shard has one to compare with, or for at most
+      `max_delay` seconds, so that a stalled shard does not stop the
+      others.
+    * :data:`ORDER_SHARD`: all the blocks of shard 0, then of shard 1, ...;
+      only for scans with an end.
+    * :data:`ORDER_ARRIVAL`: as the events come.
+
+    Parameters
+    ----------
+    endpoint: :obj:`str`, optional
+        Endpoint of the network, whose sharding structure gives the shards
+    shards: :obj:`list` or :obj:`dict`, optional
+        IDs of the shards to scan (all if None), or shard ID to endpoint to
+        skip the discovery
+    start_block: :obj:`int` or :obj:`dict`, optional
+        First block, or shard ID to first block
+    end_block: :obj:`int` or :obj:`dict`, optional
+        Last block, or shard ID to last block; None to follow the tip
+    order: :obj:`str`, optional
+        Order of the merged stream
+    max_delay: :obj:`float`, optional
+        Longest time an event is held for the timestamp order, in seconds
+    queue_size: :obj:`int`, optional
+        Events buffered per shard, above which its scan waits
+    confirmations: :obj:`int`, optional
+        Confirmations of the followed blocks
+    workers: :obj:`int`, optional
+        Chunks fetched in parallel per shard, for scans with an end
+    timeout: :obj:`int`, optional
+        Timeout in seconds
+    follower_options: :obj:`dict`, optional
+        Other arguments of the followers, e.g. `min_interval`, `full_tx`
+
+    Raises
+    ------
+    ValueError
+        If the order is unknown, or is :data:`ORDER_SHARD` without
+        `end_block`
+    """
+    def __init__( # pylint: disable=too-many-arguments
+        self,
+        endpoint = DEFAULT_ENDPOINT,
+        shards = None,
+        start_block = None,
+        end_block = None,
+        order = ORDER_TIMESTAMP,
+        max_delay = 5.0,
+        queue_size = 1000,
+        confirmations = 0,
+        workers = 4,
+        timeout = DEFAULT_TIMEOUT,
+        follower_options = None,
+    ):
+        if order not in ( ORDER_TIMESTAMP, ORDER_SHARD, ORDER_ARRIVAL ):
+            raise ValueError( f"unknown order {order}" )
+        if order == ORDER_SHARD and end_block is None:
+            raise ValueError( "the shard order needs an end_block" )
+        self.endpoint = endpoint
+        self.shards = shards
+        self.start_block = start_block
+        self.end_block = end_block
+        self.order = order
+        self.max_delay = max_delay
+        self.queue_size = queue_size
+        self.confirmations = confirmations
+        self.workers = workers
+        self.timeout = timeout
+        self.follower_options = follower_options or {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._followers = {}
+        self._stats = {}
+
+    @staticmethod
+    def _for_shard( value, shard ):
+        return value.get( shard ) if isinstance( value, dict ) else value
+
+    def endpoints( self ) -> dict:
+        """Shard ID to endpoint of the shards scanned."""
+        if isinstance( self.shards, dict ):
+            return dict( self.shards )
+        endpoints = discover( self.endpoint, self.timeout )
+        if self.shards is None:
+            return endpoints
+        return {
+            shard: endpoints[ shard ]
+            for shard in self.shards
+        }
+
+    def _put( self, events, item ):
+        while not self._stop.is_set():
+            try:
+                events.put( item, timeout = 0.1 )
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce( self, shard, endpoint, events ):
+        start = self._for_shard( self.start_block, shard )
+        end = self._for_shard( self.end_block, shard )
+        try:
+            if end is not None:
+                with self._lock:
+                    self._stats[ shard ][ "head" ] = end
+                options = {
+                    name: value
+                    for name, value in self.follower_options.items()
+                    if name in _FETCH_OPTIONS
+                }
+                fetcher = BlockRangeFetcher(
+                    endpoint = endpoint,
+                    timeout = self.timeout,
+                    workers = self.workers,
+                    **options
+                )
+                blocks = fetcher.fetch( start or 0, end )
+                try:
+                    for block in blocks:
+                        event = ShardEvent(
+                            shard,
+                            BLOCK,
+                            block[ "number" ],
+                            block.get( "hash" ),
+                            block
+                        )
+                        if not self._put( events, event ):
+                            break
+                finally:
+                    blocks.close()
+            else:
+                follower = BlockFollower(
+                    start_block = start,
+                    confirmations = self.confirmations,
+                    endpoint = endpoint,
+                    timeout = self.timeout,
+                    **self.follower_options
+                )
+                with self._lock:
+                    self._followers[ shard ] = follower
+                self._follow( shard, follower, events )
+        except Exception as err:  # pylint: disable=broad-except
+            self._put( events, _Failure( err ) )
+        self._put( events, _DONE )
+
+    def _follow( self, shard, follower, events ):
+        """:meth:`~pyhmy.blockchain.BlockFollower.follow` stopped with the
+        scan."""
+        while not self._stop.is_set():
+            try:
+                polled = follower.poll()
+            except (
+                RequestsError,
+                RequestsTimeoutError,
+                RPCError,
+                InvalidRPCReplyError
+            ):
+                self._stop.wait( follower.max_interval )
+                continue
+            for event in polled:
+                if not self._put( events, ShardEvent( shard, *event ) ):
+                    return
+            self._stop.wait( follower.interval )
+
+    def _record( self, event ):
+        with self._lock:
+            stats = self._stats[ event.shard ]
+            stats[ "events" ] += 1
+            if event.kind == BLOCK:
+                stats[ "last_block" ] = event.number
+                stats[ "last_timestamp" ] = _timestamp( event.block )
+            else:
+                stats[ "rollbacks" ] += 1
+                stats[ "last_block" ] = event.number - 1
+
+    def scan( self ):
+        """Yield the merged events of the shards until the scan ends or
+        :meth:`stop` is called.
+
+        Raises
+        ------
+        Exception
+            The error of a shard, once its events before it were yielded
+        """
+        self._stop.clear()
+        endpoints = self.endpoints()
+        self._followers = {}
+        self._stats = {}
+        queues = {}
+        threads = []
+        for shard in sorted( endpoints ):
+            queues[ shard ] = queue.Queue( self.queue_size )
+            with self._lock:
+                self._stats[ shard ] = {
+                    "endpoint": endpoints[ shard ],
+                    "head": None,
+                    "last_block": None,
+                    "last_timestamp": None,
+                    "events": 0,
+                    "rollbacks": 0,
+                }
+            # the threads see the settings of the caller
+            thread = threading.Thread(
+                target = contextvars.copy_context().run,
+                args = (
+                    self._produce,
+                    shard,
+                    endpoints[ shard ],
+                    queues[ shard ]
+                ),
+                name = f"pyhmy-scanner-{shard}",
+                daemon = True,
+            )
+            threads.append( thread )
+        for thread in threads:
+            thread.start()
+        merge = {
+            ORDER_TIMESTAMP: self._by_timestamp,
+            ORDER_SHARD: self._by_shard,
+            ORDER_ARRIVAL: self._by_arrival,
+        }[ self.order ]
+        try:
+            for event in merge( queues ):
+                self._record( event )
+                yield event
+        finally:
+            self.stop()
+            for thread in threads:
+                thread.join()
+
+    def _get( self, events, timeout ):
+        """Next item of a shard, None if none came within `timeout`;
+        raises the error of the shard."""
+        try:
+            item = events.get( timeout = timeout )
+        except queue.Empty:
+            return None
+        if isinstance( item, _Failure ):
+            raise item.error
+        return item
+
+    def _by_shard( self, queues ):
+        for events in queues.values():
+            while not self._stop.is_set():
+                item = self._get( events, 0.1 )
+                if item is _DONE:
+                    break
+                if item is not None:
+                    yield item
+
+    def _by_arrival( self, queues ):
+        active = dict( queues )
+        while active and not self._stop.is_set():
+            idle = True
+            for shard, events in list( active.items() ):
+                item = self._get( events, 0 )
+                if item is _DONE:
+                    del active[ shard ]
+                elif item is not None:
+                    idle = False
+                    yield item
+            if idle:
+                time.sleep( 0.01 )
+
+    def _by_timestamp( self, queues ):
+        active = dict( queues )
+        # next event of each shard
+        heads = {}
+        # shard to when it was first found without a next event; a shard
+        # stalled for `max_delay` is not waited for until it produces again
+        stalled = {}
+        while ( active or heads ) and not self._stop.is_set():
+            for shard, events in list( active.items() ):
+                if shard in heads:
+                    continue
+                item = self._get( events, 0 )
+                if item is _DONE:
+                    del active[ shard ]
+                    stalled.pop( shard, None )
+                elif item is not None:
+                    heads[ shard ] = item
+                    stalled.pop( shard, None )
+            if not heads:
+                time.sleep( 0.01 )
+                continue
+            now = time.monotonic()
+            waiting = False
+            for shard in active:
+                if shard not in heads:
+                    since = stalled.setdefault( shard, now )
+                    waiting = waiting or now - since < self.max_delay
+            if waiting:
+                time.sleep( 0.01 )
+                continue
+            # ties go to the lowest shard
+            shard = min(
+                sorted( heads ),
+                key = lambda shard: _timestamp( heads[ shard ].block )
+            )
+            yield heads.pop( shard )
+
+    def stop( self ):
+        """Stop the scan of every shard."""
+        self._stop.set()
+
+    def stats( self ) -> dict:
+        """Lag of every shard: last head seen, last block yielded and their
+        difference in blocks (`lag_blocks`), age of the last block yielded
+        in seconds (`lag_seconds`), events and rollbacks yielded."""
+        now = time.time()
+        with self._lock:
+            stats = {
+                shard: dict( values )
+                for shard, values in self._stats.items()
+            }
+            for shard, follower in self._followers.items():
+                stats[ shard ][ "head" ] = follower.head
+        for values in stats.values():
+            head, last = values[ "head" ], values[ "last_block" ]
+            if last is None:
+                last = -1
+            values[ "lag_blocks" ] = None if head is None else head - last
+            lag_seconds = values[ "last_timestamp" ]
+            if lag_seconds is not None:
+                lag_seconds = max( 0.0, now - lag_seconds )
+            values[ "lag_seconds" ] = lag_seconds
+        return stats
@@ -6,6 +6,8 @@ import time
 import random
 from .constants import DEFAULT_ENDPOINT, DEFAULT_TIMEOUT
 from .rpc.request import rpc_request
+from .rpc.deadline import as_deadline
+from .rpc.exceptions import RequestsTimeoutError
 from .exceptions import TxConfirmationTimedoutError, InvalidRPCReplyError
 
 
@@ -470,8 +472,8 @@ def send_and_confirm_raw_transaction(
         Hex representation of signed transaction
     endpoint: :obj:`str`, optional
         Endpoint to send request to
-    timeout: :obj:`int`, optional
-        Timeout in seconds
+    timeout: :obj:`int` or :obj:`~pyhmy.rpc.deadline.Deadline`, optional
+        Total time to send and confirm the transaction, in seconds
 
     Returns
     -------
@@ -491,16 +493,31 @@ def send_and_confirm_raw_transaction(
     -------------
     https://api.hmny.io/#f40d124a-b897-4b7c-baf3-e0dedf8f40a0
     """
-    tx_hash = send_raw_transaction( signed_tx, endpoint = endpoint )
-    start_time = time.time()
-    while ( time.time() - start_time ) <= timeout:
-        tx_response = get_transaction_by_hash( tx_hash, endpoint = endpoint )
-        if tx_response is not None:
-            block_hash = tx_response.get( "blockHash", "0x00" )
-            unique_chars = "".join( set( list( block_hash[ 2 : ] ) ) )
-            if unique_chars != "0":
-                return tx_response
-        time.sleep( random.uniform( 0.2, 0.5 ) )
+    deadline = as_deadline( timeout )
+    tx_hash = send_raw_transaction(
+        signed_tx,
+        endpoint = endpoint,
+        timeout = deadline
+    )
+    try:
+        while not deadline.expired:
+            tx_response = get_transaction_by_hash(
+                tx_hash,
+                endpoint = endpoint,
+                timeout = deadline
+            )
+            if tx_response is not None:
+                block_hash = tx_response.get( "blockHash", "0x00" )
+                unique_chars = "".join( set( list( block_hash[ 2 : ] ) ) )
+                if unique_chars != "0":
+                    return tx_response
+            time.sleep( deadline.cap( random.uniform( 0.2, 0.5 ) ) )
+    except RequestsTimeoutError as exception:
+        if not deadline.expired:
+            raise
+        raise TxConfirmationTimedoutError(
+            "Could not confirm transaction on-chain."
+        ) from exception
     raise TxConfirmationTimedoutError(
         "Could not confirm transaction on-chain."
     )
@@ -869,8 +886,8 @@ def send_and_confirm_raw_staking_transaction(
         Hex representation of signed staking transaction
     endpoint: :obj:`str`, optional
         Endpoint to send request to
-    timeout: :obj:`int`, optional
-        Timeout in seconds
+    timeout: :obj:`int` or :obj:`~pyhmy.rpc.deadline.Deadline`, optional
+        Total time to send and confirm the transaction, in seconds
 
     Returns
     -------
@@ -890,19 +907,31 @@ def send_and_confirm_raw_staking_transaction(
     -------------
     https://api.hmny.io/#e8c17fe9-e730-4c38-95b3-6f1a5b1b9401
     """
-    tx_hash = send_raw_staking_transaction( signed_tx, endpoint = endpoint )
-    start_time = time.time()
-    while ( time.time() - start_time ) <= timeout:
-        tx_response = get_staking_transaction_by_hash(
-            tx_hash,
-            endpoint = endpoint
-        )
-        if tx_response is not None:
-            block_hash = tx_response.get( "blockHash", "0x00" )
-            unique_chars = "".join( set( list( block_hash[ 2 : ] ) ) )
-            if unique_chars != "0":
-                return tx_response
-        time.sleep( random.uniform( 0.2, 0.5 ) )
+    deadline = as_deadline( timeout )
+    tx_hash = send_raw_staking_transaction(
+        signed_tx,
+        endpoint = endpoint,
+        timeout = deadline
+    )
+    try:
+        while not deadline.expired:
+            tx_response = get_staking_transaction_by_hash(
+                tx_hash,
+                endpoint = endpoint,
+                timeout = deadline
+            )
+            if tx_response is not None:
+                block_hash = tx_response.get( "blockHash", "0x00" )
+                unique_chars = "".join( set( list( block_hash[ 2 : ] ) ) )
+                if unique_chars != "0":
+                    return tx_response
+            time.sleep( deadline.cap( random.uniform( 0.2, 0.5 ) ) )
+    except RequestsTimeoutError as exception:
+        if not deadline.expired:
+            raise
+        raise TxConfirmationTimedoutError(
+            "Could not confirm transaction on-chain."
+        ) from exception
     raise TxConfirmationTimedoutError(
         "Could not confirm transaction on-chain."
     )
@@ -0,0 +1,157 @@
+import gzip
+import json
+import socket
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class RPCServer( ThreadingHTTPServer ):
+    """Local JSON-RPC server used to exercise the RPC layer offline.
+
+    `methods` maps an RPC method name to a callable taking the params and
+    returning the result (or a dict with an `error` key to reply with an
+    RPC error). `statuses` lists HTTP error statuses, or (status, headers)
+    pairs, to reply with (without calling any method) to the next
+    requests. Replies are gzip compressed when `compress` is set and the
+    request accepts it, and sent `drip` = (bytes, seconds) at a time when
+    it is set."""
+    daemon_threads = True
+
+    def __init__( self ):
+        super().__init__( ( "127.0.0.1", 0 ), RPCHandler )
+        self.methods = {}
+        self.connections = 0
+        self.requests = []
+        self.statuses = []
+        self.headers = []
+        self.compress = False
+        self.drip = None
+        self.lock = threading.Lock()
+
+    @property
+    def endpoint( self ):
+        return f"http://127.0.0.1:{self.server_address[ 1 ]}"
+
+    def reply( self, call ):
+        handler = self.methods.get( call.get( "method" ) )
+        if handler is None:
+            return {
+                "jsonrpc": "2.0",
+                "id": call.get( "id" ),
+                "error": {
+                    "code": -32601,
+                    "message": "method not found"
+                },
+            }
+        result = handler( call.get( "params" ) )
+        if isinstance( result, dict ) and "error" in result:
+            return {
+                "jsonrpc": "2.0",
+                "id": call.get( "id" ),
+                "error": result[ "error" ]
+            }
+        return {
+            "jsonrpc": "2.0",
+            "id": call.get( "id" ),
+            "result": result
+        }
+
+
+class RPCHandler( BaseHTTPRequestHandler ):
+    protocol_version = "HTTP/1.1"
+
+    def setup( self ):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message( self, *args ):  # pylint: disable=arguments-differ
+        pass
+
+    def do_POST( self ):  # pylint: disable=invalid-name
+        length = int( self.headers.get( "Content-Length", 0 ) )
+        data = self.rfile.read( length )
+        if self.headers.get( "Content-Encoding" ) == "gzip":
+            data = gzip.decompress( data )
+        body = json.loads( data )
+        with self.server.lock:
+            self.server.requests.append( body )
+            self.server.headers.append( dict( self.headers ) )
+            status = None
+            if self.server.statuses:
+                status = self.server.statuses.pop( 0 )
+        if status is not None:
+            headers = {}
+            if isinstance( status, tuple ):
+                status, headers = status
+            self.send_response( status )
+            for name, value in headers.items():
+                self.send_header( name, value )
+            self.send_header( "Content-Length", "0" )
+            self.end_headers()
+            return
+        if isinstance( body, list ):
+            reply = [ self.server.reply( call ) for call in body ]
+        else:
+            reply = self.server.reply( body )
+        data = json.dumps( reply ).encode()
+        self.send_response( 200 )
+        if self.server.compress and "gzip" in self.headers.get(
+            "Accept-Encoding",
+            ""
+        ):
+            data = gzip.compress( data )
+            self.send_header( "Content-Encoding", "gzip" )
+        self.send_header( "Content-Type", "application/json" )
+        self.send_header( "Content-Length", str( len( data ) ) )
+        self.end_headers()
+        if self.server.drip is None:
+            self.wfile.write( data )
+            return
+        size, seconds = self.server.drip
+        for start in range( 0, len( data ), size ):
+            self.wfile.write( data[ start : start + size ] )
+            self.wfile.flush()
+            time.sleep( seconds )
+
+
+@pytest.fixture
+def make_rpc_server():
+    servers = []
+
+    def make():
+        server = RPCServer()
+        thread = threading.Thread(
+            target = server.serve_forever,
+            kwargs = {
+                "poll_interval": 0.05
+            },
+            daemon = True
+        )
+        thread.start()
+        servers.append( server )
+        return server
+
+    yield make
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def rpc_server( make_rpc_server ):
+    return make_rpc_server()
+
+
+@pytest.fixture
+def dead_endpoint():
+    # nothing listens on a port that was just released
+    sock = socket.socket()
+    sock.bind( ( "127.0.0.1", 0 ) )
+    port = sock.getsockname()[ 1 ]
+    sock.close()
+    return f"http://127.0.0.1:{port}"
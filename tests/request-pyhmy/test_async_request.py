@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip( "aiohttp" )
+
+from pyhmy.aio import account, blockchain
+from pyhmy.exceptions import InvalidRPCReplyError
+from pyhmy.rpc import async_request, exceptions
+
+
+def test_async_rpc_request( rpc_server ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 7
+
+    async def run():
+        reply = await async_request.rpc_request(
+            "hmyv2_blockNumber",
+            endpoint = rpc_server.endpoint
+        )
+        with pytest.raises( exceptions.RPCError ):
+            await async_request.rpc_request(
+                "hmyv2_unknown",
+                endpoint = rpc_server.endpoint
+            )
+        await async_request.get_default_pool().close()
+        return reply
+
+    assert asyncio.run( run() )[ "result" ] == 7
+
+
+def test_async_connection_error():
+    async def run():
+        try:
+            await async_request.rpc_request(
+                "hmyv2_blockNumber",
+                endpoint = "http://127.0.0.1:1"
+            )
+        finally:
+            await async_request.get_default_pool().close()
+
+    with pytest.raises( exceptions.RequestsError ):
+        asyncio.run( run() )
+
+
+def test_async_modules( rpc_server ):
+    rpc_server.methods[ "hmyv2_getBalance" ] = lambda params: len( params[ 0 ] )
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: None
+    rpc_server.methods[ "hmyv2_getShardingStructure" ] = lambda params: [
+        {
+            "shardID": shard, "http": rpc_server.endpoint
+        } for shard in ( 0, 1 )
+    ]
+
+    async def run():
+        balances = await asyncio.gather(
+            *[
+                account.get_balance( "x" * i,
+                                     endpoint = rpc_server.endpoint )
+                for i in range( 50 )
+            ]
+        )
+        assert balances == list( range( 50 ) )
+        assert await account.get_total_balance(
+            "one1",
+            endpoint = rpc_server.endpoint
+        ) == 8
+        with pytest.raises( InvalidRPCReplyError ):
+            await blockchain.get_block_number( endpoint = rpc_server.endpoint )
+        await async_request.get_default_pool().close()
+
+    asyncio.run( run() )
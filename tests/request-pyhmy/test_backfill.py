@@ -0,0 +1,149 @@
+import threading
+
+import pytest
+
+from pyhmy import backfill
+from pyhmy.exceptions import BackfillGapError
+
+
+def serve_blocks( server, head ):
+    server.methods[ "hmyv2_blockNumber" ] = lambda params: head
+    server.methods[ "hmyv2_getBlocks" ] = lambda params: [
+        {
+            "number": number, "shard": server.server_address[ 1 ]
+        } for number in range( params[ 0 ], min( params[ 1 ], head ) + 1 )
+    ]
+
+
+class ListSink( backfill.Sink ):
+    def __init__( self, fail_after = None ):
+        self.blocks = {}
+        self.fail_after = fail_after
+        self.lock = threading.Lock()
+
+    def write( self, shard, blocks ):
+        with self.lock:
+            if self.fail_after is not None:
+                if self.fail_after <= 0:
+                    raise IOError( "sink down" )
+                self.fail_after -= 1
+            numbers = self.blocks.setdefault( shard, [] )
+            numbers.extend( number for number, _ in blocks )
+
+    def committed( self, shard ):
+        return None
+
+
+def test_shards( make_rpc_server, tmp_path ):
+    servers = [ make_rpc_server(), make_rpc_server() ]
+    serve_blocks( servers[ 0 ], 250 )
+    serve_blocks( servers[ 1 ], 120 )
+    sink = ListSink()
+    stats = backfill.Backfill(
+        [ server.endpoint for server in servers ],
+        sink,
+        checkpoints = backfill.FileCheckpoints( tmp_path / "checkpoints.json" ),
+        decode = lambda block: block[ "number" ] * 2,
+        batch_size = 16,
+        queue_size = 8,
+    ).run()
+    assert sink.blocks[ 0 ] == list( range( 251 ) )
+    assert sink.blocks[ 1 ] == list( range( 121 ) )
+    assert stats[ 0 ][ "delivered" ] == 251
+    assert stats[ 1 ][ "checkpoint" ] == 120
+    reloaded = backfill.FileCheckpoints( tmp_path / "checkpoints.json" )
+    assert reloaded.load( 0 ) == 250
+    assert reloaded.load( 1 ) == 120
+
+
+def test_resume_exactly_once( rpc_server, tmp_path ):
+    serve_blocks( rpc_server, 999 )
+    path = tmp_path / "checkpoints.json"
+    sink = ListSink( fail_after = 3 )
+
+    def run():
+        return backfill.Backfill(
+            [ rpc_server.endpoint ],
+            sink,
+            checkpoints = backfill.FileCheckpoints( path ),
+            batch_size = 50,
+            queue_size = 20,
+        ).run()
+
+    with pytest.raises( IOError ):
+        run()
+    assert sink.blocks[ 0 ] == list( range( 150 ) )
+    assert backfill.FileCheckpoints( path ).load( 0 ) == 149
+    sink.fail_after = None
+    run()
+    assert sink.blocks[ 0 ] == list( range( 1000 ) )
+
+
+def test_committed( rpc_server ):
+    serve_blocks( rpc_server, 99 )
+
+    class CommittedSink( ListSink ):
+        def committed( self, shard ):
+            numbers = self.blocks.get( shard )
+            return numbers[ -1 ] if numbers else None
+
+    class LostCheckpoints( backfill.Checkpoints ):
+        # as if the process died before each checkpoint was saved
+        def save( self, shard, block_number ):
+            pass
+
+    sink = CommittedSink()
+    for end in ( 40, 99 ):
+        backfill.Backfill(
+            {
+                3: rpc_server.endpoint
+            },
+            sink,
+            checkpoints = LostCheckpoints(),
+            end_block = end,
+            batch_size = 8,
+        ).run()
+    assert sink.blocks[ 3 ] == list( range( 100 ) )
+
+
+def test_stop( rpc_server ):
+    serve_blocks( rpc_server, 10**6 )
+    delivered = []
+    job = None
+
+    def sink( shard, blocks ):
+        delivered.extend( number for number, _ in blocks )
+        if len( delivered ) >= 100:
+            job.stop()
+
+    job = backfill.Backfill(
+        [ rpc_server.endpoint ],
+        sink,
+        batch_size = 10,
+        queue_size = 10,
+    )
+    stats = job.run()
+    assert delivered == list( range( len( delivered ) ) )
+    assert stats[ 0 ][ "checkpoint" ] == delivered[ -1 ]
+    # backpressure: the fetcher did not run far ahead of the sink
+    assert stats[ 0 ][ "fetched" ] < len( delivered ) + 200
+
+
+def test_gap( rpc_server, monkeypatch ):
+    serve_blocks( rpc_server, 99 )
+
+    class GappedFetcher( backfill.BlockRangeFetcher ):
+        # a chunk that lost block 42
+        def fetch( self, start_block, end_block ):
+            for block in super().fetch( start_block, end_block ):
+                if block[ "number" ] != 42:
+                    yield block
+
+    monkeypatch.setattr( backfill, "BlockRangeFetcher", GappedFetcher )
+    sink = ListSink()
+    job = backfill.Backfill( [ rpc_server.endpoint ], sink, batch_size = 16 )
+    with pytest.raises( BackfillGapError ) as err:
+        job.run()
+    assert ( err.value.expected, err.value.number ) == ( 42, 43 )
+    assert sink.blocks[ 0 ] == list( range( 42 ) )
+    assert job.stats()[ 0 ][ "checkpoint" ] == 41
@@ -0,0 +1,81 @@
+import pytest
+
+from pyhmy.rpc import batch, exceptions
+
+
+def _get_balance( params ):
+    if params[ 0 ] == "bad":
+        return {
+            "error": {
+                "code": -32000,
+                "message": "invalid address"
+            }
+        }
+    return len( params[ 0 ] )
+
+
+def test_batch_request( rpc_server ):
+    rpc_server.methods[ "hmyv2_getBalance" ] = _get_balance
+    req = batch.BatchRequest( endpoint = rpc_server.endpoint )
+    good = req.add( "hmyv2_getBalance", [ "one1" ] )
+    bad = req.add( "hmyv2_getBalance", [ "bad" ] )
+    unknown = req.add( "hmyv2_unknown" )
+    with pytest.raises( exceptions.RPCError ):
+        good.result()
+    assert req.send() == [ good, bad, unknown ]
+
+    assert len( rpc_server.requests ) == 1
+    ids = [ call[ "id" ] for call in rpc_server.requests[ 0 ] ]
+    assert len( set( ids ) ) == 3
+    assert good.result()[ "result" ] == 4
+    with pytest.raises( exceptions.RPCError ):
+        bad.result()
+    with pytest.raises( exceptions.RPCError ):
+        unknown.result()
+
+
+def test_batch_max_size( rpc_server ):
+    rpc_server.methods[ "hmyv2_getBalance" ] = _get_balance
+    calls = batch.rpc_batch_request(
+        [ ( "hmyv2_getBalance",
+            [ "x" * i ] ) for i in range( 1, 6 ) ],
+        endpoint = rpc_server.endpoint,
+        max_size = 2
+    )
+    assert len( rpc_server.requests ) == 3
+    assert [ call.result()[ "result" ] for call in calls ] == [ 1, 2, 3, 4, 5 ]
+
+
+def test_batch_invalid_params():
+    with pytest.raises( TypeError ):
+        batch.BatchRequest().add( "hmyv2_getBalance", "one1" )
+    with pytest.raises( ValueError ):
+        batch.BatchRequest( max_size = 0 )
+
+
+@pytest.mark.parametrize(
+    "raw_resp",
+    [ b'{"jsonrpc": "2.0", "result": 1}',
+      b'"busy"',
+      b"42",
+      b"null" ]
+)
+def test_batch_invalid_reply( monkeypatch, raw_resp ):
+    monkeypatch.setattr( batch, "_send", lambda *args: raw_resp )
+    req = batch.BatchRequest()
+    req.add( "hmyv2_getBalance", [ "one1" ] )
+    with pytest.raises( exceptions.RPCError ):
+        req.send()
+
+
+def test_batch_rejected( monkeypatch ):
+    rejected = (
+        b'{"jsonrpc": "2.0", "error": '
+        b'{"code": -32600, "message": "batch too large"}}'
+    )
+    monkeypatch.setattr( batch, "_send", lambda *args: rejected )
+    req = batch.BatchRequest()
+    call = req.add( "hmyv2_getBalance", [ "one1" ] )
+    req.send()
+    with pytest.raises( exceptions.RPCError, match = "batch too large" ):
+        call.result()
@@ -0,0 +1,152 @@
+import random
+import threading
+import time
+
+import pytest
+
+from pyhmy import block_range
+from pyhmy.exceptions import InvalidRPCReplyError
+from pyhmy.rpc import exceptions
+
+
+def get_blocks( max_range = None, delay = 0.0 ):
+    def handler( params ):
+        start, end, _ = params
+        if max_range is not None and end - start + 1 > max_range:
+            return {
+                "error": {
+                    "code": -32000,
+                    "message": "range too large"
+                }
+            }
+        time.sleep( random.uniform( 0, delay ) )
+        return [ {
+            "number": number
+        } for number in range( start, end + 1 ) ]
+
+    return handler
+
+
+def test_in_order( rpc_server ):
+    rpc_server.methods[ "hmyv2_getBlocks" ] = get_blocks( delay = 0.01 )
+    fetcher = block_range.BlockRangeFetcher(
+        endpoint = rpc_server.endpoint,
+        workers = 4,
+        chunker = block_range.AdaptiveChunker( initial = 7 ),
+    )
+    blocks = list( fetcher.fetch( 3, 500 ) )
+    assert [ block[ "number" ] for block in blocks ] == list( range( 3, 501 ) )
+    stats = fetcher.stats()
+    assert stats[ "blocks" ] == 498
+    # fast replies grow the chunks
+    assert stats[ "chunk_size" ] > 7
+    assert stats[ "chunks" ] < 498 / 7
+    assert list( fetcher.fetch( 5, 4 ) ) == []
+
+
+def test_split( rpc_server ):
+    rpc_server.methods[ "hmyv2_getBlocks" ] = get_blocks( max_range = 10 )
+    fetcher = block_range.BlockRangeFetcher(
+        endpoint = rpc_server.endpoint,
+        chunker = block_range.AdaptiveChunker( initial = 64 ),
+    )
+    numbers = [ block[ "number" ] for block in fetcher.fetch( 0, 199 ) ]
+    assert numbers == list( range( 200 ) )
+    assert fetcher.stats()[ "splits" ] > 0
+    assert fetcher.stats()[ "chunk_size" ] <= 64
+
+
+def test_retries( rpc_server ):
+    failures = {
+        42: 2
+    }
+    lock = threading.Lock()
+    handler = get_blocks( max_range = 1 )
+
+    def flaky( params ):
+        with lock:
+            if failures.get( params[ 0 ], 0 ) and params[ 0 ] == params[ 1 ]:
+                failures[ params[ 0 ] ] -= 1
+                return {
+                    "error": {
+                        "code": -1,
+                        "message": "busy"
+                    }
+                }
+        return handler( params )
+
+    rpc_server.methods[ "hmyv2_getBlocks" ] = flaky
+    fetcher = block_range.BlockRangeFetcher(
+        endpoint = rpc_server.endpoint,
+        chunker = block_range.AdaptiveChunker( initial = 1 ),
+        backoff = 0.01,
+    )
+    numbers = [ block[ "number" ] for block in fetcher.fetch( 40, 45 ) ]
+    assert numbers == list( range( 40, 46 ) )
+    assert fetcher.stats()[ "retries" ] == 2
+    failures[ 42 ] = 10
+    fetcher.max_retries = 1
+    with pytest.raises( exceptions.RPCError ):
+        list( fetcher.fetch( 40, 45 ) )
+
+
+def test_short_replies( rpc_server ):
+    handler = get_blocks()
+    # at most 5 blocks per reply, whatever the range
+    rpc_server.methods[ "hmyv2_getBlocks" ] = lambda params: handler(
+        [ params[ 0 ], min( params[ 1 ], params[ 0 ] + 4 ), None ]
+    )
+    fetcher = block_range.BlockRangeFetcher(
+        endpoint = rpc_server.endpoint,
+        chunker = block_range.AdaptiveChunker( initial = 16 ),
+    )
+    numbers = [ block[ "number" ] for block in fetcher.fetch( 0, 99 ) ]
+    assert numbers == list( range( 100 ) )
+    assert fetcher.stats()[ "splits" ] == 0
+
+
+def test_invalid_replies( rpc_server ):
+    handler = get_blocks()
+    replies = {
+        "gaps": 2
+    }
+    lock = threading.Lock()
+
+    def gapped( params ):
+        blocks = handler( params )
+        with lock:
+            if replies[ "gaps" ] and len( blocks ) > 2:
+                replies[ "gaps" ] -= 1
+                del blocks[ 1 ]
+        return blocks
+
+    rpc_server.methods[ "hmyv2_getBlocks" ] = gapped
+    fetcher = block_range.BlockRangeFetcher(
+        endpoint = rpc_server.endpoint,
+        chunker = block_range.AdaptiveChunker( initial = 8 ),
+        backoff = 0.01,
+    )
+    numbers = [ block[ "number" ] for block in fetcher.fetch( 0, 31 ) ]
+    assert numbers == list( range( 32 ) )
+    assert fetcher.stats()[ "splits" ] > 0
+    stray = [ {
+        "number": 7
+    } ]
+    rpc_server.methods[ "hmyv2_getBlocks" ] = lambda params: stray
+    fetcher.max_retries = 1
+    with pytest.raises( InvalidRPCReplyError ):
+        list( fetcher.fetch( 0, 3 ) )
+
+
+def test_early_close( rpc_server ):
+    rpc_server.methods[ "hmyv2_getBlocks" ] = get_blocks()
+    blocks = block_range.fetch_blocks(
+        0,
+        10**6,
+        endpoint = rpc_server.endpoint,
+        workers = 2
+    )
+    assert next( blocks )[ "number" ] == 0
+    blocks.close()
+    # bounded read ahead: workers in flight and buffered chunks only
+    assert len( rpc_server.requests ) <= 2 * 3
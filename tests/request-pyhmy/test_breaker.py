@@ -0,0 +1,110 @@
+import time
+
+import pytest
+
+from pyhmy import blockchain
+from pyhmy.rpc import breaker, exceptions, request, retry
+from pyhmy.rpc.endpoint_pool import EndpointPool
+
+
+@pytest.fixture
+def circuit_breaker():
+    new = breaker.CircuitBreaker( min_requests = 2, open_seconds = 0.2 )
+    previous = breaker.set_default_breaker( new )
+    yield new
+    breaker.set_default_breaker( previous )
+
+
+def test_states():
+    circuit = breaker.Circuit(
+        "e",
+        failure_rate = 0.5,
+        min_requests = 4,
+        open_seconds = 0.1
+    )
+    for failed in ( False, True, False, True ):
+        circuit.acquire()
+        if failed:
+            circuit.failure()
+        else:
+            circuit.success()
+    assert circuit.state == breaker.OPEN
+    with pytest.raises( exceptions.CircuitOpenError ) as err:
+        circuit.acquire()
+    assert 0 < err.value.retry_after <= 0.1
+    time.sleep( 0.1 )
+    assert circuit.state == breaker.HALF_OPEN
+    circuit.acquire()
+    # a single probe at a time
+    with pytest.raises( exceptions.CircuitOpenError ):
+        circuit.acquire()
+    circuit.failure()
+    assert circuit.state == breaker.OPEN
+    time.sleep( 0.1 )
+    circuit.acquire()
+    circuit.success()
+    assert circuit.stats() == {
+        "state": breaker.CLOSED,
+        "requests": 0,
+        "failures": 0,
+        "failure_rate": 0.0,
+        "opened": 2,
+        "rejected": 2,
+    }
+
+
+def test_fail_fast( dead_endpoint, circuit_breaker ):
+    for _ in range( 2 ):
+        with pytest.raises( exceptions.RequestsError ):
+            request.rpc_request(
+                "hmyv2_blockNumber",
+                endpoint = dead_endpoint,
+                retry_policy = retry.NO_RETRY
+            )
+    start = time.monotonic()
+    # not retried either
+    with pytest.raises( exceptions.CircuitOpenError ):
+        blockchain.get_block_number( endpoint = dead_endpoint )
+    assert time.monotonic() - start < 0.1
+    assert circuit_breaker.stats()[ dead_endpoint ][ "rejected" ] == 1
+
+
+def test_rpc_errors( rpc_server, circuit_breaker ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: {
+        "error": {
+            "code": -32000, "message": "oops"
+        }
+    }
+    for _ in range( 2 ):
+        with pytest.raises( exceptions.RPCError ):
+            blockchain.get_block_number( endpoint = rpc_server.endpoint )
+    assert circuit_breaker.is_open( rpc_server.endpoint )
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 7
+    time.sleep( 0.2 )
+    assert blockchain.get_block_number( endpoint = rpc_server.endpoint ) == 7
+    assert circuit_breaker.circuit( rpc_server.endpoint ).state == "closed"
+
+
+def test_pool( rpc_server, dead_endpoint, circuit_breaker ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 7
+    # stays open for the whole test
+    circuit_breaker.open_seconds = 30
+    pool = EndpointPool(
+        [ dead_endpoint,
+          rpc_server.endpoint ],
+        max_failures = 100
+    )
+    for _ in range( 2 ):
+        with pytest.raises( exceptions.RequestsError ):
+            request.rpc_request(
+                "hmyv2_blockNumber",
+                endpoint = dead_endpoint,
+                retry_policy = retry.NO_RETRY
+            )
+    assert pool.healthy() == [ rpc_server.endpoint ]
+    for _ in range( 5 ):
+        assert blockchain.get_block_number( endpoint = pool ) == 7
+    stats = pool.stats()
+    assert stats[ dead_endpoint ][ "circuit" ] == breaker.OPEN
+    assert stats[ dead_endpoint ][ "requests" ] == 0
+    assert stats[ rpc_server.endpoint ][ "circuit" ] == breaker.CLOSED
@@ -0,0 +1,144 @@
+import time
+
+import pytest
+
+from pyhmy import blockchain, transaction
+from pyhmy.rpc import cache, exceptions
+
+_ZERO_HASH = "0x" + "0" * 64
+
+
+@pytest.fixture
+def response_cache():
+    response_cache = cache.ResponseCache( tip_ttl = 0.2 )
+    previous = cache.set_default_cache( response_cache )
+    yield response_cache
+    cache.set_default_cache( previous )
+
+
+def test_final_data_cached( rpc_server, response_cache ):
+    rpc_server.methods[ "hmyv2_getBlockByNumber" ] = lambda params: {
+        "number": params[ 0 ]
+    }
+    for _ in range( 3 ):
+        assert blockchain.get_block_by_number(
+            5,
+            endpoint = rpc_server.endpoint
+        ) == {
+            "number": 5
+        }
+    assert len( rpc_server.requests ) == 1
+    # other params are another call
+    blockchain.get_block_by_number(
+        5,
+        full_tx = True,
+        endpoint = rpc_server.endpoint
+    )
+    assert len( rpc_server.requests ) == 2
+    assert response_cache.stats()[ "hits" ] == 2
+
+
+def test_pending_not_cached( rpc_server, response_cache ):
+    replies = [
+        None,
+        {
+            "hash": "0x1",
+            "blockHash": _ZERO_HASH,
+            "blockNumber": None
+        },
+        {
+            "hash": "0x1",
+            "blockHash": "0x2",
+            "blockNumber": 3
+        },
+    ]
+    rpc_server.methods[ "hmyv2_getTransactionByHash"
+                       ] = lambda params: replies.pop( 0 )
+    for _ in range( 2 ):
+        transaction.get_transaction_by_hash(
+            "0x1",
+            endpoint = rpc_server.endpoint
+        )
+    for _ in range( 2 ):
+        assert transaction.get_transaction_by_hash(
+            "0x1",
+            endpoint = rpc_server.endpoint
+        )[ "blockNumber" ] == 3
+    assert len( rpc_server.requests ) == 3
+
+
+def test_tip_ttl( rpc_server, response_cache ):
+    numbers = iter( range( 100 ) )
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: next( numbers )
+    assert blockchain.get_block_number( endpoint = rpc_server.endpoint ) == 0
+    assert blockchain.get_block_number( endpoint = rpc_server.endpoint ) == 0
+    time.sleep( 0.3 )
+    assert blockchain.get_block_number( endpoint = rpc_server.endpoint ) == 1
+
+
+def test_errors_not_cached( rpc_server, response_cache ):
+    rpc_server.methods[ "hmyv2_getBlockByNumber" ] = lambda params: {
+        "error": {
+            "code": -32000, "message": "oops"
+        }
+    }
+    for _ in range( 2 ):
+        with pytest.raises( exceptions.RPCError ):
+            blockchain.get_block_by_number( 5, endpoint = rpc_server.endpoint )
+    assert len( rpc_server.requests ) == 2
+
+
+def test_ttl_rules():
+    response_cache = cache.ResponseCache()
+    assert response_cache.ttl(
+        "hmyv2_getBlockByNumber",
+        [ "latest" ],
+        {
+            "number": 5
+        }
+    ) is None
+    assert response_cache.ttl( "hmyv2_getBlockByNumber", [ 9 ], None ) is None
+    # range reaching past the tip
+    assert response_cache.ttl(
+        "hmyv2_getBlocks",
+        [ 1,
+          3,
+          {} ],
+        [ {},
+          {} ]
+    ) is None
+    assert response_cache.ttl(
+        "hmyv2_getBlocks",
+        [ 1,
+          2,
+          {} ],
+        [ {},
+          {} ]
+    ) is not None
+    assert response_cache.ttl(
+        "hmyv2_getTransactionReceipt",
+        [ "0x1" ],
+        {
+            "blockHash": _ZERO_HASH
+        }
+    ) is None
+    assert not response_cache.applies( "hmyv2_getBalance" )
+
+
+def test_memory_backend_eviction():
+    backend = cache.MemoryBackend( max_entries = 2, max_bytes = 10 )
+    backend.set( "a", b"1234" )
+    backend.set( "b", b"1234" )
+    assert backend.get( "a" ) == b"1234"
+    backend.set( "c", b"1234" )
+    # b was the least recently used
+    assert backend.get( "b" ) is None
+    backend.set( "d", b"123456" )
+    assert backend.stats() == {
+        "entries": 2,
+        "bytes": 10,
+        "evictions": 2
+    }
+    backend.set( "e", b"1", ttl = 0.05 )
+    time.sleep( 0.1 )
+    assert backend.get( "e" ) is None
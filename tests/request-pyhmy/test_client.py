@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from pyhmy import blockchain
+from pyhmy.client import AsyncHarmonyClient, HarmonyClient
+from pyhmy.rpc import cache, exceptions, retry
+from pyhmy.rpc.async_request import AsyncSessionPool
+from pyhmy.rpc.session import SessionPool
+
+
+def test_bound_namespaces( rpc_server ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 7
+    rpc_server.methods[ "hmyv2_getBalance" ] = lambda params: 12
+    with HarmonyClient( rpc_server.endpoint, timeout = 5 ) as client:
+        assert client.blockchain.get_block_number() == 7
+        assert client.account.get_balance(
+            "one1zksj3evekayy90xt4psrz8h6j2v3hla4qwz4ur"
+        ) == 12
+        # explicit endpoint wins
+        with pytest.raises( exceptions.RequestsError ):
+            client.blockchain.get_block_number(
+                endpoint = "http://127.0.0.1:1",
+                timeout = 1
+            )
+        assert client.rpc_request( "hmyv2_blockNumber" )[ "result" ] == 7
+    with pytest.raises( AttributeError ):
+        client.wallet  # pylint: disable=pointless-statement
+
+
+def test_settings_isolated( rpc_server ):
+    calls = []
+
+    def block_number( params ):
+        calls.append( params )
+        return len( calls )
+
+    rpc_server.methods[ "hmyv2_blockNumber" ] = block_number
+    responses = cache.ResponseCache()
+    client = HarmonyClient(
+        rpc_server.endpoint,
+        cache = responses,
+        session_pool = SessionPool()
+    )
+    cache.set_default_cache( None )
+    try:
+        assert client.blockchain.get_block_number() == 1
+        assert client.blockchain.get_block_number() == 1
+        assert responses.hits == 1
+        # module functions do not see the client's cache
+        assert blockchain.get_block_number( rpc_server.endpoint ) == 2
+        assert cache.get_default_cache() is None
+    finally:
+        client.close()
+    with pytest.raises( TypeError ):
+        HarmonyClient( retry_policy = None )
+    with pytest.raises( TypeError ):
+        HarmonyClient( cache = object() )
+
+
+def test_retry_policy( dead_endpoint ):
+    client = HarmonyClient(
+        dead_endpoint,
+        retry_policy = retry.RetryPolicy( max_attempts = 5,
+                                          backoff = 0 )
+    )
+    with client.activate():
+        assert retry.get_default_policy().max_attempts == 5
+    assert retry.get_default_policy() is not client.settings[ "retry_policy" ]
+
+
+def test_inherit():
+    client = HarmonyClient()
+    assert client.settings == {}
+    assert client.blockchain.get_block_number.__wrapped__ is blockchain.get_block_number
+
+
+def test_async_client( rpc_server ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 7
+
+    async def run():
+        async with AsyncHarmonyClient(
+            rpc_server.endpoint,
+            session_pool = AsyncSessionPool()
+        ) as client:
+            assert ( await client.rpc_request( "hmyv2_blockNumber" )
+                    )[ "result" ] == 7
+            return await client.blockchain.get_block_number()
+
+    assert asyncio.run( run() ) == 7
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from pyhmy import account
+from pyhmy.rpc import codec
+
+
+def _codecs():
+    codecs = [ codec.JSONCodec() ]
+    if codec.orjson is not None:
+        codecs.append( codec.OrjsonCodec() )
+    return codecs
+
+
+@pytest.mark.parametrize( "json_codec", _codecs(), ids = lambda c: c.name )
+def test_round_trip( json_codec ):
+    reply = {
+        "jsonrpc": "2.0",
+        "id": "1",
+        "result": {
+            "balance": 123456789012345678901234567890,
+            "nonce": 7,
+            "hash": "0x" + "12" * 32,
+            "logs": [ 1.5,
+                      None,
+                      True ],
+        },
+    }
+    data = json_codec.dumps( reply )
+    assert isinstance( data, bytes )
+    assert json_codec.loads( data ) == reply
+    assert json_codec.loads( memoryview( data ) ) == reply
+    assert json_codec.loads( data.decode() ) == reply
+    # big integers stay exact
+    result = json_codec.loads( data )[ "result" ]
+    assert result[ "balance" ] == 123456789012345678901234567890
+    with pytest.raises( json.decoder.JSONDecodeError ):
+        json_codec.loads( b"{" )
+
+
+@pytest.mark.parametrize( "json_codec", _codecs(), ids = lambda c: c.name )
+@pytest.mark.parametrize(
+    "number",
+    [ 2**64,
+      -2**63 - 1,
+      -9999999999999999999,
+      -10**25,
+      2**64 - 1,
+      -2**63 ]
+)
+def test_integer_bounds( json_codec, number ):
+    for data in (
+        f'{{"value":{number}}}',
+        f'{{"value": {number}}}',
+        f'[1,{number}]',
+        f'[\n  {number}\n]'
+    ):
+        decoded = json_codec.loads( data )
+        value = decoded[ "value" ] if isinstance( decoded,
+                                                  dict ) else decoded[ -1 ]
+        assert value == number and isinstance( value, int )
+
+
+@pytest.mark.parametrize( "json_codec", _codecs(), ids = lambda c: c.name )
+def test_rpc_request( rpc_server, json_codec ):
+    rpc_server.methods[ "hmyv2_getBalance" ] = lambda params: 10**30
+    previous = codec.set_default_codec( json_codec )
+    try:
+        assert account.get_balance(
+            "one1",
+            endpoint = rpc_server.endpoint
+        ) == 10**30
+    finally:
+        codec.set_default_codec( previous )
+
+
+def test_set_default_codec():
+    assert codec.get_default_codec().name == "json"
+    with pytest.raises( TypeError ):
+        codec.set_default_codec( json )
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from pyhmy import blockchain
+from pyhmy.rpc import batch, compression
+
+
+@pytest.fixture
+def settings():
+    new = compression.Compression( compress_requests = 1024 )
+    previous = compression.set_default_compression( new )
+    yield new
+    compression.set_default_compression( previous )
+
+
+def _blocks( params ):
+    return [
+        {
+            "number": number,
+            "hash": "0x" + "ab" * 32
+        } for number in range( params[ 0 ], params[ 1 ] + 1 )
+    ]
+
+
+def test_compressed_reply( rpc_server, settings ):
+    rpc_server.compress = True
+    rpc_server.methods[ "hmyv2_getBlocks" ] = _blocks
+    blocks = blockchain.get_blocks( 0, 999, endpoint = rpc_server.endpoint )
+    assert blocks == _blocks( [ 0, 999 ] )
+    assert rpc_server.headers[ -1 ][ "Accept-Encoding" ] == "gzip, deflate"
+    stats = settings.stats()
+    assert stats[ "requests" ] == 1
+    assert stats[ "response_wire_bytes" ] * 5 < stats[ "response_bytes" ]
+    assert stats[ "compressed_requests" ] == 0
+
+
+def test_compressed_request( rpc_server, settings ):
+    rpc_server.methods[ "hmyv2_getBalance" ] = lambda params: 1
+    calls = batch.rpc_batch_request(
+        [ ( "hmyv2_getBalance",
+            [ "one1" ] ) ] * 100,
+        endpoint = rpc_server.endpoint
+    )
+    assert all( call.result()[ "result" ] == 1 for call in calls )
+    assert rpc_server.headers[ -1 ][ "Content-Encoding" ] == "gzip"
+    stats = settings.stats()
+    assert stats[ "compressed_requests" ] == 1
+    assert stats[ "request_wire_bytes" ] * 5 < stats[ "request_bytes" ]
+    assert stats[ "response_wire_bytes" ] == stats[ "response_bytes" ]
+
+
+def test_identity( rpc_server ):
+    rpc_server.compress = True
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 1
+    previous = compression.set_default_compression(
+        compression.Compression( accept_encoding = "identity" )
+    )
+    try:
+        assert blockchain.get_block_number( endpoint = rpc_server.endpoint )
+        assert "Content-Encoding" not in rpc_server.headers[ -1 ]
+        stats = compression.get_default_compression().stats()
+        assert stats[ "response_wire_bytes" ] == stats[ "response_bytes" ]
+    finally:
+        compression.set_default_compression( previous )
+    with pytest.raises( TypeError ):
+        compression.set_default_compression( None )
+
+
+def test_async( rpc_server, settings ):
+    pytest.importorskip( "aiohttp" )
+    # pylint: disable=import-outside-toplevel
+    from pyhmy.aio import blockchain as aio_blockchain
+    from pyhmy.rpc import async_request
+    rpc_server.compress = True
+    rpc_server.methods[ "hmyv2_getBlocks" ] = _blocks
+
+    async def run():
+        try:
+            return await aio_blockchain.get_blocks(
+                0,
+                999,
+                endpoint = rpc_server.endpoint
+            )
+        finally:
+            await async_request.get_default_pool().close()
+
+    assert asyncio.run( run() ) == _blocks( [ 0, 999 ] )
+    stats = settings.stats()
+    assert stats[ "response_wire_bytes" ] * 5 < stats[ "response_bytes" ]
@@ -0,0 +1,187 @@
+import asyncio
+import math
+import threading
+import time
+
+import pytest
+
+from pyhmy import account, transaction
+from pyhmy.exceptions import TxConfirmationTimedoutError
+from pyhmy.rpc import deadline, exceptions, request, retry
+from pyhmy.rpc.deadline import Deadline
+
+
+def _slow( result, seconds ):
+    def handler( params ):
+        time.sleep( seconds )
+        return result
+
+    return handler
+
+
+def test_timeouts():
+    assert Deadline( connect = 1, read = 2 ).timeouts( "e" ) == ( 1, 2 )
+    connect, read = Deadline( 5, connect = 1 ).timeouts( "e" )
+    assert connect == 1 and 4.9 < read <= 5
+    with pytest.raises( exceptions.RequestsTimeoutError ):
+        Deadline( 0 ).timeouts( "e" )
+    assert deadline.resolve( 30 ) is None
+    with Deadline( 5, read = 2 ) as scope:
+        assert deadline.current() is scope
+        connect, read = deadline.requests_timeout( 30, "e" )
+        assert 4.9 < connect <= 5 and read == 2
+        with Deadline( 10 ):
+            # an outer deadline is never extended
+            assert deadline.current().expires == scope.expires
+        assert deadline.as_deadline( 10 ).expires == scope.expires
+    assert deadline.current() is None
+    assert deadline.remaining( 30 ) == math.inf
+
+
+def test_request_cut_short( rpc_server ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = _slow( 1, 2 )
+    start = time.monotonic()
+    with pytest.raises( exceptions.RequestsTimeoutError ):
+        request.rpc_request(
+            "hmyv2_blockNumber",
+            endpoint = rpc_server.endpoint,
+            timeout = Deadline( 0.3 ),
+            retry_policy = retry.NO_RETRY
+        )
+    with Deadline( 0.3 ):
+        with pytest.raises( exceptions.RequestsTimeoutError ):
+            request.rpc_request(
+                "hmyv2_blockNumber",
+                endpoint = rpc_server.endpoint,
+                retry_policy = retry.NO_RETRY
+            )
+    assert time.monotonic() - start < 1.5
+
+
+def test_slow_reply_cut_short( rpc_server ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: "x" * 200000
+    # every read gets data in time, the whole reply does not
+    rpc_server.drip = ( 16384, 0.1 )
+    start = time.monotonic()
+    with pytest.raises( exceptions.RequestsTimeoutError ):
+        request.rpc_request(
+            "hmyv2_blockNumber",
+            endpoint = rpc_server.endpoint,
+            timeout = Deadline( 0.4,
+                                read = 1 ),
+            retry_policy = retry.NO_RETRY
+        )
+    assert time.monotonic() - start < 0.9
+    # without a total budget the reply is read whole
+    resp = request.rpc_request(
+        "hmyv2_blockNumber",
+        endpoint = rpc_server.endpoint,
+        timeout = Deadline( read = 1 )
+    )
+    assert len( resp[ "result" ] ) == 200000
+
+
+def test_shared_deadline_context():
+    scope = Deadline( 5 )
+    entered = threading.Barrier( 2 )
+    exited = threading.Event()
+    errors = []
+
+    def enter( first ):
+        try:
+            with scope:
+                entered.wait()
+                # the first thread leaves while the second is still inside
+                if not first:
+                    exited.wait( 5 )
+                assert deadline.current() is scope
+            assert deadline.current() is None
+        except Exception as err:  # pylint: disable=broad-except
+            errors.append( err )
+        finally:
+            if first:
+                exited.set()
+
+    threads = [
+        threading.Thread( target = enter,
+                          args = [ first ] ) for first in ( True, False )
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_no_retry_past_deadline( rpc_server ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 1
+    rpc_server.statuses = [ 503 ] * 3
+    policy = retry.RetryPolicy( backoff = 5, jitter = retry.JITTER_NONE )
+    start = time.monotonic()
+    with pytest.raises( exceptions.RequestsServerError ):
+        request.rpc_request(
+            "hmyv2_blockNumber",
+            endpoint = rpc_server.endpoint,
+            timeout = Deadline( 1 ),
+            retry_policy = policy
+        )
+    assert time.monotonic() - start < 1
+    assert len( rpc_server.requests ) == 1
+
+
+def test_total_balance( rpc_server ):
+    rpc_server.methods[ "hmyv2_getShardingStructure" ] = lambda params: [
+        {
+            "shardID": shard, "http": rpc_server.endpoint
+        } for shard in range( 4 )
+    ]
+    rpc_server.methods[ "hmyv2_getBalance" ] = _slow( 1, 0.3 )
+    start = time.monotonic()
+    with pytest.raises( RuntimeError ):
+        account.get_total_balance(
+            "one1",
+            endpoint = rpc_server.endpoint,
+            timeout = Deadline( 0.5 )
+        )
+    assert time.monotonic() - start < 1
+
+
+def test_send_and_confirm( rpc_server ):
+    rpc_server.methods[ "hmyv2_sendRawTransaction" ] = lambda params: "0x1"
+    rpc_server.methods[ "hmyv2_getTransactionByHash" ] = _slow(
+        {
+            "blockHash": "0x" + "0" * 64
+        },
+        0.2
+    )
+    start = time.monotonic()
+    with pytest.raises( TxConfirmationTimedoutError ):
+        transaction.send_and_confirm_raw_transaction(
+            "0x00",
+            endpoint = rpc_server.endpoint,
+            timeout = 0.5
+        )
+    assert time.monotonic() - start < 1
+
+
+def test_async_deadline( rpc_server ):
+    pytest.importorskip( "aiohttp" )
+    # pylint: disable=import-outside-toplevel
+    from pyhmy.rpc import async_request
+    rpc_server.methods[ "hmyv2_blockNumber" ] = _slow( 1, 2 )
+
+    async def run():
+        try:
+            with Deadline( 0.3 ):
+                await async_request.rpc_request(
+                    "hmyv2_blockNumber",
+                    endpoint = rpc_server.endpoint,
+                    retry_policy = retry.NO_RETRY
+                )
+        finally:
+            await async_request.get_default_pool().close()
+
+    start = time.monotonic()
+    with pytest.raises( exceptions.RequestsTimeoutError ):
+        asyncio.run( run() )
+    assert time.monotonic() - start < 1.5
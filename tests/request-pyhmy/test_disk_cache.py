@@ -0,0 +1,161 @@
+import multiprocessing
+import time
+
+import pytest
+
+from pyhmy import blockchain
+from pyhmy.rpc import cache
+from pyhmy.rpc.endpoint_pool import EndpointPool
+from pyhmy.rpc.disk_cache import SQLiteBackend
+
+
+def _write_blocks( path, start ):
+    backend = SQLiteBackend( path )
+    for number in range( start, start + 50 ):
+        backend.set( f"block-{number}", str( number ).encode() )
+    backend.close()
+
+
+def test_persistent( tmp_path ):
+    path = tmp_path / "cache.sqlite"
+    backend = SQLiteBackend( path )
+    backend.set( "a", b"final" )
+    backend.set( "b", b"tip", ttl = 0.05 )
+    backend.close()
+
+    backend = SQLiteBackend( path )
+    assert backend.get( "a" ) == b"final"
+    time.sleep( 0.1 )
+    assert backend.get( "b" ) is None
+    backend.delete( "a" )
+    assert backend.get( "a" ) is None
+    backend.close()
+
+
+def test_processes( tmp_path ):
+    path = tmp_path / "cache.sqlite"
+    SQLiteBackend( path ).close()
+    processes = [
+        multiprocessing.Process(
+            target = _write_blocks,
+            args = ( path,
+                     start )
+        ) for start in ( 0, 50, 100 )
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+    backend = SQLiteBackend( path )
+    assert backend.stats()[ "entries" ] == 150
+    assert backend.get( "block-120" ) == b"120"
+    backend.close()
+
+
+def test_compact( tmp_path ):
+    backend = SQLiteBackend(
+        tmp_path / "cache.sqlite",
+        max_bytes = 30,
+        access_resolution = 0
+    )
+    for key in range( 5 ):
+        backend.set( str( key ), b"0123456789" )
+        time.sleep( 0.01 )
+    backend.set( "tip", b"0", ttl = 0 )
+    # recently read entries are kept
+    backend.get( "0" )
+    assert backend.compact( vacuum = True ) == 3
+    assert backend.get( "0" ) is not None
+    assert backend.get( "1" ) is None
+    assert backend.stats() == {
+        "entries": 3,
+        "bytes": 30,
+        "evictions": 2
+    }
+    backend.close()
+
+
+def test_tiered( tmp_path, rpc_server ):
+    rpc_server.methods[ "hmyv2_getBlockByNumber" ] = lambda params: {
+        "number": params[ 0 ]
+    }
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 9
+    path = tmp_path / "cache.sqlite"
+    previous = cache.set_default_cache(
+        cache.ResponseCache(
+            cache.TieredBackend( cache.MemoryBackend(),
+                                 SQLiteBackend( path ) ),
+            chain = "localnet-s0"
+        )
+    )
+    try:
+        blockchain.get_block_by_number( 5, endpoint = rpc_server.endpoint )
+        blockchain.get_block_number( endpoint = rpc_server.endpoint )
+        # a restarted process starts with an empty memory backend
+        cache.get_default_cache().close()
+        cache.set_default_cache(
+            cache.ResponseCache(
+                cache.TieredBackend(
+                    cache.MemoryBackend(),
+                    SQLiteBackend( path )
+                ),
+                chain = "localnet-s0"
+            )
+        )
+        assert blockchain.get_block_by_number(
+            5,
+            endpoint = rpc_server.endpoint
+        ) == {
+            "number": 5
+        }
+        assert len( rpc_server.requests ) == 2
+        stats = cache.get_default_cache().stats()
+        assert stats[ "back" ][ "entries" ] == 1
+        assert stats[ "front" ][ "entries" ] == 1
+    finally:
+        cache.get_default_cache().close()
+        cache.set_default_cache( previous )
+
+
+def test_chain_keys( tmp_path, rpc_server, make_rpc_server ):
+    other = make_rpc_server()
+    for server in ( rpc_server, other ):
+        server.methods[ "hmyv2_getBlockByNumber" ] = lambda params: {
+            "number": params[ 0 ]
+        }
+    path = tmp_path / "cache.sqlite"
+    with pytest.raises( ValueError ):
+        cache.ResponseCache( SQLiteBackend( path ) )
+    previous = cache.set_default_cache(
+        cache.ResponseCache( SQLiteBackend( path ),
+                             chain = "localnet-s0" )
+    )
+    try:
+        blockchain.get_block_by_number(
+            5,
+            endpoint = EndpointPool( [ rpc_server.endpoint,
+                                       other.endpoint ] )
+        )
+        cache.get_default_cache().close()
+        cache.set_default_cache(
+            cache.ResponseCache(
+                SQLiteBackend( path ),
+                chain = lambda endpoint: "localnet-s0"
+            )
+        )
+        # same shard through a reordered pool or a single node
+        for endpoint in (
+            EndpointPool( [ other.endpoint,
+                            rpc_server.endpoint ] ),
+            other.endpoint,
+        ):
+            block = blockchain.get_block_by_number( 5, endpoint = endpoint )
+            assert block == {
+                "number": 5
+            }
+        assert len( rpc_server.requests ) + len( other.requests ) == 1
+        assert cache.get_default_cache().stats()[ "hits" ] == 2
+    finally:
+        cache.get_default_cache().close()
+        cache.set_default_cache( previous )
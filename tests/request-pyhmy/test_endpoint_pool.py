@@ -0,0 +1,57 @@
+import datetime
+
+import pytest
+
+from pyhmy import blockchain, transaction
+from pyhmy.rpc import exceptions
+from pyhmy.rpc.endpoint_pool import EndpointPool
+
+
+def test_failover( rpc_server, dead_endpoint ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 7
+    pool = EndpointPool(
+        [ dead_endpoint,
+          rpc_server.endpoint ],
+        max_failures = 1
+    )
+    for _ in range( 10 ):
+        assert blockchain.get_block_number( endpoint = pool ) == 7
+    stats = pool.stats()
+    assert stats[ rpc_server.endpoint ][ "requests" ] == 10
+    assert stats[ dead_endpoint ][ "failures" ] == 1
+    assert stats[ dead_endpoint ][ "ejected" ]
+    assert pool.healthy() == [ rpc_server.endpoint ]
+    assert pool.select() == rpc_server.endpoint
+
+
+def test_write_not_retried( rpc_server, dead_endpoint ):
+    rpc_server.methods[ "hmyv2_sendRawTransaction" ] = lambda params: "0x1"
+    pool = EndpointPool( [ dead_endpoint, rpc_server.endpoint ] )
+    pool.eject( rpc_server.endpoint )
+    with pytest.raises( exceptions.RequestsError ):
+        transaction.send_raw_transaction( "0x00", endpoint = pool )
+    assert rpc_server.requests == []
+
+
+def test_check_health( make_rpc_server ):
+    now = datetime.datetime.now( datetime.UTC )
+    fresh, stale = make_rpc_server(), make_rpc_server()
+    fresh.methods[ "hmyv2_latestHeader" ] = lambda params: {
+        "timestamp": now.strftime( "%Y-%m-%d %H:%M:%S +0000 UTC" )
+    }
+    late = now - datetime.timedelta( minutes = 10 )
+    stale.methods[ "hmyv2_latestHeader" ] = lambda params: {
+        "timestamp": late.strftime( "%Y-%m-%d %H:%M:%S +0000 UTC" )
+    }
+    pool = EndpointPool( [ fresh.endpoint, stale.endpoint ] )
+    assert pool.check_health() == {
+        fresh.endpoint: True,
+        stale.endpoint: False
+    }
+    assert pool.healthy() == [ fresh.endpoint ]
+
+
+def test_invalid_pool():
+    with pytest.raises( ValueError ):
+        EndpointPool( [] )
+    assert len( EndpointPool( "http://localhost:9620" ) ) == 1
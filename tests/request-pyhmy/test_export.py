@@ -0,0 +1,177 @@
+import pytest
+
+from pyhmy import export
+from pyhmy.util import convert_one_to_hex
+
+numpy = pytest.importorskip( "numpy" )
+
+MINER = "one1pdv9lrdwl0rg5vglh4xtyrv3wjk3wsqket7zxy"
+SENDER = "one1a0x3d6xpmr6f8wsyaxd9v36pytvp48zckswvv9"
+
+
+def make_block( number ):
+    return {
+        "number": number,
+        "hash": "0x" + f"{number:064x}",
+        "parentHash": "0x" + f"{max( number - 1, 0 ):064x}",
+        "miner": MINER,
+        "timestamp": 1600000000 + 2 * number,
+        "epoch": 7,
+        "viewID": number,
+        "gasLimit": 80000000,
+        "gasUsed": 21000 * ( number % 2 ),
+        "size": 700,
+        "stateRoot": "0x" + "aa" * 32,
+        "transactionsRoot": "0x" + "bb" * 32,
+        "receiptsRoot": "0x" + "cc" * 32,
+        "mixHash": "0x" + "00" * 32,
+        "logsBloom": "0x" + "00" * 256,
+        "extraData": "0x" + "ee" * number,
+        "transactions": [
+            {
+                "blockNumber": number,
+                "blockHash": "0x" + f"{number:064x}",
+                "transactionIndex": 0,
+                "hash": "0x" + f"{number + 1000:064x}",
+                "ethHash": "0x" + f"{number + 2000:064x}",
+                "from": SENDER,
+                "to": None,
+                "shardID": 0,
+                "toShardID": 1,
+                "nonce": number,
+                "gas": 21000,
+                "gasPrice": 100000000000,
+                "value": 10**27 + number,
+                "input": "0x6080",
+                "timestamp": 1600000000 + 2 * number,
+                "v": "0x25",
+                "r": "0x1",
+                "s": "0x" + "ff" * 32,
+            }
+        ] if number % 2 else [],
+        "stakingTransactions": [
+            {
+                "blockNumber": number,
+                "blockHash": "0x" + f"{number:064x}",
+                "transactionIndex": 0,
+                "hash": "0x" + f"{number + 3000:064x}",
+                "from": SENDER,
+                "type": "CollectRewards",
+                "nonce": 1,
+                "gas": 25000,
+                "gasPrice": 100000000000,
+                "timestamp": 1600000000 + 2 * number,
+                "v": "0x26",
+                "r": "0x2",
+                "s": "0x3",
+                "msg": {
+                    "delegatorAddress": SENDER
+                },
+            }
+        ] if number == 2 else [],
+        "signers": [ MINER,
+                     SENDER ],
+    }
+
+
+def address( one ):
+    return bytes.fromhex( convert_one_to_hex( one )[ 2 : ] )
+
+
+def test_npy( tmp_path ):
+    with export.ColumnarExporter(
+        tmp_path,
+        file_format = export.NPY,
+        batch_size = 2
+    ) as exporter:
+        exporter.write( make_block( number ) for number in range( 5 ) )
+        rows = exporter.close()
+    assert rows == {
+        "blocks": 5,
+        "transactions": 2,
+        "staking_transactions": 1,
+        "signers": 10
+    }
+    blocks = tmp_path / "blocks"
+    assert numpy.load( blocks / "number.npy" ).tolist() == [ 0, 1, 2, 3, 4 ]
+    assert numpy.load( blocks / "number.npy" ).dtype == numpy.uint64
+    hashes = numpy.load( blocks / "hash.npy" )
+    assert hashes.shape == ( 5, 32 ) and hashes.dtype == numpy.uint8
+    assert int.from_bytes( hashes[ 3 ].tobytes(), "big" ) == 3
+    assert numpy.load( blocks / "miner.npy" )[ 0 ].tobytes() == address( MINER )
+    counts = numpy.load( blocks / "transactionCount.npy" )
+    assert counts.tolist() == [ 0, 1, 0, 1, 0 ]
+    data = numpy.load( blocks / "extraData.npy" )
+    offsets = numpy.load( blocks / "extraData.offsets.npy" )
+    assert offsets.tolist() == [ 0, 0, 1, 3, 6, 10 ]
+    assert data[ offsets[ 3 ]: offsets[ 4 ] ].tobytes() == b"\xee" * 3
+
+    transactions = tmp_path / "transactions"
+    assert numpy.load( transactions / "blockNumber.npy" ).tolist() == [ 1, 3 ]
+    assert not numpy.load( transactions / "to.npy" ).any()
+    value = numpy.load( transactions / "value.npy" )[ 1 ].tobytes()
+    assert int.from_bytes( value, "big" ) == 10**27 + 3
+    r = numpy.load( transactions / "r.npy" )[ 0 ].tobytes()
+    assert r == bytes( 31 ) + b"\1"
+    assert numpy.load( transactions / "v.npy" ).tolist() == [ 37, 37 ]
+    staking = tmp_path / "staking_transactions"
+    assert numpy.load( staking / "type.npy" ).tobytes() == b"CollectRewards"
+    assert numpy.load( tmp_path / "signers" / "signer.npy" ).shape == ( 10, 20 )
+
+
+@pytest.mark.parametrize( "file_format", [ "parquet", "arrow" ] )
+def test_arrow( tmp_path, file_format ):
+    pyarrow = pytest.importorskip( "pyarrow" )
+    import pyarrow.ipc  # pylint: disable=import-outside-toplevel
+    import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+    with export.ColumnarExporter(
+        tmp_path,
+        file_format = file_format,
+        batch_size = 2,
+        compression = "zstd"
+    ) as exporter:
+        exporter.write( make_block( number ) for number in range( 5 ) )
+
+    def read( table ):
+        if file_format == "parquet":
+            return pyarrow.parquet.read_table( tmp_path / f"{table}.parquet" )
+        source = pyarrow.memory_map( str( tmp_path / f"{table}.arrow" ) )
+        return pyarrow.ipc.open_file( source ).read_all()
+
+    blocks = read( "blocks" )
+    assert blocks.num_rows == 5
+    assert blocks.schema.field( "hash" ).type == pyarrow.binary( 32 )
+    assert blocks.schema.field( "miner" ).type == pyarrow.binary( 20 )
+    assert blocks.schema.field( "number" ).type == pyarrow.uint64()
+    assert blocks.column( "miner" )[ 0 ].as_py() == address( MINER )
+    transactions = read( "transactions" )
+    assert transactions.column( "input" ).to_pylist() == [ b"\x60\x80" ] * 2
+    staking = read( "staking_transactions" )
+    assert staking.column( "msg" ).to_pylist() == [
+        f'{{"delegatorAddress":"{SENDER}"}}'
+    ]
+    assert read( "signers" ).num_rows == 10
+
+
+def test_export_blocks( rpc_server, tmp_path ):
+    rpc_server.methods[ "hmyv2_getBlocks" ] = lambda params: [
+        make_block( number )
+        for number in range( params[ 0 ], params[ 1 ] + 1 )
+    ]
+    rows = export.export_blocks(
+        0,
+        99,
+        tmp_path,
+        file_format = export.NPY,
+        endpoint = rpc_server.endpoint
+    )
+    assert rows[ "blocks" ] == 100
+    assert rows[ "transactions" ] == 50
+    numbers = numpy.load( tmp_path / "blocks" / "number.npy" )
+    assert numbers.tolist() == list( range( 100 ) )
+    assert rpc_server.requests[ 0 ][ "params" ][ 2 ][ "fullTx" ] is True
+
+
+def test_unknown_format( tmp_path ):
+    with pytest.raises( ValueError ):
+        export.ColumnarExporter( tmp_path, file_format = "csv" )
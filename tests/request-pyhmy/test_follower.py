@@ -0,0 +1,227 @@
+import threading
+import time
+
+import pytest
+
+from pyhmy import blockchain
+from pyhmy.exceptions import ReorgTooDeepError
+from pyhmy.rpc import cache
+
+
+class Chain:
+    """Blocks served by the local RPC server, extended and reorganized by
+    the tests."""
+    def __init__( self, server, length ):
+        self.blocks = []
+        self.lock = threading.Lock()
+        self.extend( length )
+        server.methods[ "hmyv2_blockNumber" ] = self.block_number
+        server.methods[ "hmyv2_getBlockByNumber" ] = self.get_block
+
+    def block_number( self, params ):
+        with self.lock:
+            return len( self.blocks ) - 1
+
+    def get_block( self, params ):
+        with self.lock:
+            number = params[ 0 ]
+            if number < len( self.blocks ):
+                return self.blocks[ number ]
+            return None
+
+    def extend( self, count, fork = "a" ):
+        with self.lock:
+            for _ in range( count ):
+                number = len( self.blocks )
+                parent = self.blocks[ -1 ][ "hash" ] if self.blocks else "0x0"
+                self.blocks.append(
+                    {
+                        "number": number,
+                        "hash": f"0x{fork}{number}",
+                        "parentHash": parent
+                    }
+                )
+
+    def reorg( self, number, count, fork ):
+        with self.lock:
+            del self.blocks[ number : ]
+        self.extend( count, fork )
+
+
+def summary( events ):
+    return [ f"{event.kind} {event.number} {event.hash}" for event in events ]
+
+
+def test_follow_and_rollback( rpc_server ):
+    chain = Chain( rpc_server, 5 )
+    follower = blockchain.BlockFollower(
+        start_block = 3,
+        endpoint = rpc_server.endpoint
+    )
+    assert summary( follower.poll() ) == [ "block 3 0xa3", "block 4 0xa4" ]
+    assert follower.poll() == []
+    chain.reorg( 4, 3, "b" )
+    assert summary( follower.poll() ) == [
+        "rollback 4 0xa4",
+        "block 4 0xb4",
+        "block 5 0xb5",
+        "block 6 0xb6"
+    ]
+    assert follower.reorgs == 1
+
+
+def test_confirmations( rpc_server ):
+    chain = Chain( rpc_server, 10 )
+    follower = blockchain.BlockFollower(
+        confirmations = 2,
+        endpoint = rpc_server.endpoint
+    )
+    # starts at the head, emitted once confirmed
+    assert follower.poll() == []
+    chain.extend( 2 )
+    assert summary( follower.poll() ) == [ "block 9 0xa9" ]
+    chain.extend( 1 )
+    assert summary( follower.poll() ) == [ "block 10 0xa10" ]
+    # unconfirmed blocks replaced without rollbacks
+    chain.reorg( 11, 4, "b" )
+    assert summary( follower.poll() ) == [ "block 11 0xb11", "block 12 0xb12" ]
+
+
+def test_too_deep( rpc_server ):
+    chain = Chain( rpc_server, 10 )
+    follower = blockchain.BlockFollower(
+        start_block = 0,
+        depth = 4,
+        endpoint = rpc_server.endpoint
+    )
+    assert len( follower.poll() ) == 10
+    chain.reorg( 2, 9, "b" )
+    with pytest.raises( ReorgTooDeepError ):
+        follower.poll()
+
+
+def test_bypasses_cache( rpc_server ):
+    chain = Chain( rpc_server, 3 )
+    previous = cache.set_default_cache( cache.ResponseCache() )
+    try:
+        follower = blockchain.BlockFollower(
+            start_block = 0,
+            endpoint = rpc_server.endpoint
+        )
+        follower.poll()
+        chain.reorg( 2, 2, "b" )
+        assert summary( follower.poll() )[ 0 ] == "rollback 2 0xa2"
+    finally:
+        cache.set_default_cache( previous )
+
+
+class Clock:
+    """Monotonic time of the follower, moved by the tests."""
+    def __init__( self ):
+        self.now = 0.0
+
+    def monotonic( self ):
+        return self.now
+
+    def __getattr__( self, name ):
+        return getattr( time, name )
+
+
+def test_adaptive_polling( rpc_server, monkeypatch ):
+    clock = Clock()
+    monkeypatch.setattr( blockchain, "time", clock )
+    chain = Chain( rpc_server, 1 )
+    follower = blockchain.BlockFollower(
+        min_interval = 0.01,
+        max_interval = 1.0,
+        endpoint = rpc_server.endpoint
+    )
+    assert follower.interval == 0.01
+    assert [ event.number for event in follower.poll() ] == [ 0 ]
+    for number in range( 1, 5 ):
+        clock.now += 0.1
+        chain.extend( 1 )
+        assert [ event.number for event in follower.poll() ] == [ number ]
+    # polls without a new block do not change the estimate
+    clock.now += 0.5
+    assert follower.poll() == []
+    assert follower.block_time == pytest.approx( 0.1 )
+    assert follower.interval == pytest.approx( 0.05 )
+    # two blocks 0.9 seconds after the last one, smoothed
+    clock.now += 0.4
+    chain.extend( 2 )
+    assert len( follower.poll() ) == 2
+    sample = 0.9 / 2
+    assert follower.block_time == pytest.approx(
+        0.1 + follower.smoothing * ( sample - 0.1 )
+    )
+    # within [ min_interval, max_interval ]
+    clock.now += 60
+    chain.extend( 1 )
+    follower.poll()
+    assert follower.interval == 1.0
+
+
+def test_follow( rpc_server ):
+    chain = Chain( rpc_server, 1 )
+    follower = blockchain.BlockFollower(
+        min_interval = 0.01,
+        max_interval = 0.05,
+        endpoint = rpc_server.endpoint
+    )
+    numbers = []
+    for event in follower.follow():
+        numbers.append( event.number )
+        if event.number == 4:
+            follower.stop()
+        else:
+            chain.extend( 1 )
+    assert numbers == [ 0, 1, 2, 3, 4 ]
+
+
+def failing( chain, number, count ):
+    """Make `count` fetches of block `number` fail with an RPC error."""
+    failures = [ count ]
+
+    def get_block( params ):
+        if params[ 0 ] == number and failures[ 0 ]:
+            failures[ 0 ] -= 1
+            return {
+                "error": {
+                    "code": -32000,
+                    "message": "unavailable"
+                }
+            }
+        return chain.get_block( params )
+
+    return get_block
+
+
+def test_poll_keeps_emitted_on_error( rpc_server ):
+    chain = Chain( rpc_server, 4 )
+    rpc_server.methods[ "hmyv2_getBlockByNumber" ] = failing( chain, 2, 1 )
+    follower = blockchain.BlockFollower(
+        start_block = 0,
+        endpoint = rpc_server.endpoint
+    )
+    assert [ event.number for event in follower.poll() ] == [ 0, 1 ]
+    assert [ event.number for event in follower.poll() ] == [ 2, 3 ]
+
+
+def test_follow_retries_rpc_errors( rpc_server ):
+    chain = Chain( rpc_server, 1 )
+    rpc_server.methods[ "hmyv2_getBlockByNumber" ] = failing( chain, 2, 3 )
+    follower = blockchain.BlockFollower(
+        start_block = 0,
+        min_interval = 0.01,
+        max_interval = 0.05,
+        endpoint = rpc_server.endpoint
+    )
+    numbers = []
+    for event in follower.follow():
+        numbers.append( event.number )
+        if event.number == 4:
+            follower.stop()
+        else:
+            chain.extend( 1 )
+    assert numbers == [ 0, 1, 2, 3, 4 ]
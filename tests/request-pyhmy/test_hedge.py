@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import pytest
+
+from pyhmy import blockchain
+from pyhmy.rpc.endpoint_pool import EndpointPool
+from pyhmy.rpc.hedge import HedgePolicy
+
+
+def _slow( params ):
+    time.sleep( 0.5 )
+    return 1
+
+
+def _pool( make_rpc_server ):
+    slow, fast = make_rpc_server(), make_rpc_server()
+    slow.methods[ "hmyv2_blockNumber" ] = _slow
+    fast.methods[ "hmyv2_blockNumber" ] = lambda params: 2
+    policy = HedgePolicy( initial_delay = 0.05, min_samples = 100 )
+    pool = EndpointPool(
+        [ slow.endpoint,
+          fast.endpoint ],
+        hedge_policy = policy
+    )
+    # make sure the slow endpoint is picked first
+    pool.record_success( fast.endpoint, 1 )
+    return pool, policy, slow, fast
+
+
+def test_hedged_read( make_rpc_server ):
+    pool, policy, slow, fast = _pool( make_rpc_server )
+    try:
+        start = time.monotonic()
+        assert blockchain.get_block_number( endpoint = pool ) == 2
+        assert time.monotonic() - start < 0.4
+    finally:
+        pool.close()
+    assert len( slow.requests ) == 1
+    assert len( fast.requests ) == 1
+    stats = policy.stats()
+    assert stats[ "hedged" ] == 1
+    assert stats[ "hedge_wins" ] == 1
+    # the abandoned request counts towards the latency of the slow endpoint
+    assert pool.stats()[ slow.endpoint ][ "latency" ] > 0
+
+
+def test_hedged_async_read( make_rpc_server ):
+    pytest.importorskip( "aiohttp" )
+    from pyhmy.aio import blockchain as aio_blockchain  # pylint: disable=import-outside-toplevel
+    from pyhmy.rpc import async_request  # pylint: disable=import-outside-toplevel
+
+    pool, policy, _, _ = _pool( make_rpc_server )
+
+    async def run():
+        try:
+            return await aio_blockchain.get_block_number( endpoint = pool )
+        finally:
+            await async_request.get_default_pool().close()
+
+    assert asyncio.run( run() ) == 2
+    assert policy.stats()[ "hedge_wins" ] == 1
+
+
+def test_hedge_delay():
+    policy = HedgePolicy( percentile = 50, min_samples = 4, max_delay = 0.3 )
+    assert policy.delay() == policy.initial_delay
+    for latency in ( 0.1, 0.2, 0.3, 0.4 ):
+        policy.observe( latency )
+    assert policy.delay() == 0.3
+    assert policy.applies( "hmyv2_getBalance" )
+    assert not policy.applies( "hmyv2_sendRawTransaction" )
@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+
+from pyhmy import blockchain
+from pyhmy.client import HarmonyClient
+from pyhmy.rpc import (
+    async_request,
+    breaker,
+    exceptions,
+    metrics,
+    request,
+    retry
+)
+
+
+@pytest.fixture
+def rpc_metrics():
+    new = metrics.Metrics()
+    previous = metrics.set_default_metrics( new )
+    yield new
+    metrics.set_default_metrics( previous )
+
+
+def test_disabled( rpc_server ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 7
+    assert metrics.get_default_metrics() is None
+    assert blockchain.get_block_number( rpc_server.endpoint ) == 7
+    assert metrics.to_prometheus() == ""
+
+
+def test_requests( rpc_server, rpc_metrics ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 7
+    rpc_server.methods[ "hmyv2_getBalance" ] = lambda params: {
+        "error": {
+            "code": -32000, "message": "oops"
+        }
+    }
+    assert blockchain.get_block_number( rpc_server.endpoint ) == 7
+    with pytest.raises( exceptions.RPCError ):
+        request.rpc_request(
+            "hmyv2_getBalance",
+            [ "one1" ],
+            endpoint = rpc_server.endpoint
+        )
+    snapshot = rpc_metrics.snapshot()[ rpc_server.endpoint ]
+    block_number = snapshot[ "hmyv2_blockNumber" ]
+    assert block_number[ "requests" ] == 1
+    assert block_number[ "errors" ] == {}
+    assert block_number[ "latency" ][ "count" ] == 1
+    assert block_number[ "latency" ][ "buckets" ][ float( "inf" ) ] == 1
+    assert block_number[ "request_bytes" ][ "sum" ] > 0
+    assert block_number[ "response_bytes" ][ "sum" ] > 0
+    assert block_number[ "decode" ][ "count" ] == 1
+    assert snapshot[ "hmyv2_getBalance" ][ "errors" ] == {
+        "RPCError": 1
+    }
+
+
+def test_retries_and_failures( dead_endpoint, rpc_metrics ):
+    with pytest.raises( exceptions.RequestsError ):
+        request.rpc_request(
+            "hmyv2_blockNumber",
+            endpoint = dead_endpoint,
+            retry_policy = retry.RetryPolicy( max_attempts = 3,
+                                              backoff = 0 )
+        )
+    values = rpc_metrics.snapshot()[ dead_endpoint ][ "hmyv2_blockNumber" ]
+    assert values[ "requests" ] == 3
+    assert values[ "retries" ] == 2
+    assert values[ "errors" ] == {
+        "RequestsError": 3
+    }
+
+
+def test_async( rpc_server, rpc_metrics ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 7
+
+    async def run():
+        try:
+            return await async_request.rpc_request(
+                "hmyv2_blockNumber",
+                endpoint = rpc_server.endpoint
+            )
+        finally:
+            await async_request.get_default_pool().close()
+
+    assert asyncio.run( run() )[ "result" ] == 7
+    snapshot = rpc_metrics.snapshot()
+    values = snapshot[ rpc_server.endpoint ][ "hmyv2_blockNumber" ]
+    assert values[ "requests" ] == 1
+    assert values[ "decode" ][ "count" ] == 1
+
+
+def test_client( rpc_server ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 7
+    client_metrics = metrics.Metrics()
+    client = HarmonyClient( rpc_server.endpoint, metrics = client_metrics )
+    assert client.blockchain.get_block_number() == 7
+    assert blockchain.get_block_number( rpc_server.endpoint ) == 7
+    values = client_metrics.snapshot()[ rpc_server.endpoint ]
+    assert values[ "hmyv2_blockNumber" ][ "requests" ] == 1
+
+
+def test_prometheus():
+    registry = metrics.Metrics()
+    registry.observe_request(
+        'http://a"b',
+        "hmyv2_blockNumber",
+        0.02,
+        100,
+        2000
+    )
+    registry.observe_failure(
+        "http://c",
+        [ "hmyv2_blockNumber" ],
+        1.0,
+        exceptions.RequestsTimeoutError( "http://c" )
+    )
+    text = metrics.to_prometheus( registry )
+    assert "# TYPE pyhmy_rpc_latency_seconds histogram" in text
+    assert 'pyhmy_rpc_requests_total{endpoint="http://a\\"b",method="hmyv2_blockNumber"} 1' in text
+    assert 'pyhmy_rpc_latency_seconds_bucket{endpoint="http://a\\"b",method="hmyv2_blockNumber",le="0.025"} 1' in text
+    assert 'pyhmy_rpc_latency_seconds_bucket{endpoint="http://a\\"b",method="hmyv2_blockNumber",le="0.01"} 0' in text
+    assert 'pyhmy_rpc_response_bytes_sum{endpoint="http://a\\"b",method="hmyv2_blockNumber"} 2000.0' in text
+    assert 'pyhmy_rpc_errors_total{endpoint="http://c",method="batch",error="RequestsTimeoutError"} 1' in text
+    assert text.endswith( "\n" )
+
+
+def test_circuit( rpc_server, dead_endpoint, rpc_metrics ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 7
+    circuit_breaker = breaker.CircuitBreaker(
+        min_requests = 1,
+        open_seconds = 30
+    )
+    previous = breaker.set_default_breaker( circuit_breaker )
+    try:
+        assert blockchain.get_block_number( rpc_server.endpoint ) == 7
+        for error in ( exceptions.RequestsError, exceptions.CircuitOpenError ):
+            with pytest.raises( error ):
+                blockchain.get_block_number( dead_endpoint )
+        snapshot = rpc_metrics.snapshot()
+        text = metrics.to_prometheus( rpc_metrics )
+    finally:
+        breaker.set_default_breaker( previous )
+    assert snapshot[ rpc_server.endpoint ][ metrics.CIRCUIT ] == {
+        "state": breaker.CLOSED,
+        "opened": 0,
+        "rejected": 0
+    }
+    circuit = snapshot[ dead_endpoint ][ metrics.CIRCUIT ]
+    assert circuit[ "state" ] == breaker.OPEN
+    assert circuit[ "opened" ] == 1
+    # retries of the first call are rejected too
+    assert circuit[ "rejected" ] >= 1
+    assert "# TYPE pyhmy_rpc_circuit_state gauge" in text
+    assert f'pyhmy_rpc_circuit_state{{endpoint="{dead_endpoint}",state="open"}} 1' in text
+    assert f'pyhmy_rpc_circuit_state{{endpoint="{dead_endpoint}",state="closed"}} 0' in text
+    assert f'pyhmy_rpc_circuit_trips_total{{endpoint="{dead_endpoint}"}} 1' in text
+    assert f'pyhmy_rpc_circuit_rejected_total{{endpoint="{dead_endpoint}"}} {circuit[ "rejected" ]}' in text
+    assert 'method="circuit"' not in text
+    # the circuits of a breaker given to the registry
+    snapshot = metrics.Metrics( breaker = circuit_breaker ).snapshot()
+    assert snapshot[ dead_endpoint ] == {
+        metrics.CIRCUIT: circuit
+    }
@@ -0,0 +1,127 @@
+import asyncio
+import json
+
+import pytest
+
+from pyhmy import blockchain
+from pyhmy.client import HarmonyClient
+from pyhmy.rpc import async_request, exceptions, middleware, request, retry
+
+
+class Recorder( middleware.Middleware ):
+    def __init__( self, name, events ):
+        self.name = name
+        self.events = events
+
+    def before_send( self, call ):
+        self.events.append( ( self.name, "before", call.method ) )
+        call.headers[ f"X-{self.name}" ] = "1"
+
+    def after_receive( self, call, content ):
+        self.events.append( ( self.name, "after", len( content ) ) )
+
+    def on_error( self, call, error ):
+        self.events.append( ( self.name, "error", error.__class__.__name__ ) )
+
+
+@pytest.fixture
+def chain():
+    new = middleware.MiddlewareChain()
+    previous = middleware.set_default_chain( new )
+    yield new
+    middleware.set_default_chain( previous )
+
+
+def test_order_and_headers( rpc_server, chain ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 7
+    events = []
+    chain.add( Recorder( "a", events ) )
+    chain.add( Recorder( "b", events ) )
+    assert blockchain.get_block_number( rpc_server.endpoint ) == 7
+    hooks = [ f"{name}.{hook}" for name, hook, _ in events ]
+    assert hooks == [ "a.before", "b.before", "b.after", "a.after" ]
+    assert rpc_server.headers[ -1 ][ "X-a" ] == "1"
+    assert rpc_server.headers[ -1 ][ "X-b" ] == "1"
+
+
+def test_short_circuit_and_replace( rpc_server, chain ):
+    class Answer( middleware.Middleware ):
+        def before_send( self, call ):
+            if call.method == "hmyv2_blockNumber":
+                return b'{"jsonrpc":"2.0","id":"1","result":42}'
+            return None
+
+    class Rewrite( middleware.Middleware ):
+        def after_receive( self, call, content ):
+            reply = json.loads( content )
+            reply[ "result" ] += 1
+            return json.dumps( reply ).encode()
+
+    rpc_server.methods[ "hmyv2_getEpoch" ] = lambda params: 3
+    chain.add( Rewrite() )
+    chain.add( Answer() )
+    assert blockchain.get_block_number( rpc_server.endpoint ) == 43
+    assert blockchain.get_current_epoch( rpc_server.endpoint ) == 4
+    methods = [ call[ "method" ] for call in rpc_server.requests ]
+    assert methods == [ "hmyv2_getEpoch" ]
+
+
+def test_on_error( dead_endpoint, chain ):
+    events = []
+    chain.add( Recorder( "a", events ) )
+    with pytest.raises( exceptions.RequestsError ):
+        request.rpc_request(
+            "hmyv2_blockNumber",
+            endpoint = dead_endpoint,
+            retry_policy = retry.NO_RETRY
+        )
+    assert events[ -1 ] == ( "a", "error", "RequestsError" )
+
+    reply = b'{"jsonrpc":"2.0","id":"1","result":5}'
+
+    class Fallback( middleware.Middleware ):
+        def on_error( self, call, error ):
+            return reply
+
+    chain.add( Fallback() )
+    assert blockchain.get_block_number( dead_endpoint ) == 5
+    # the fallback recovers before the recorder sees the error
+    assert events[ -1 ] == ( "a", "after", len( reply ) )
+
+
+def test_async( rpc_server, chain ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 7
+
+    class Auth( middleware.Middleware ):
+        async def before_send( self, call ):
+            await asyncio.sleep( 0 )
+            call.headers[ "Authorization" ] = "Bearer token"
+
+    chain.add( Auth() )
+
+    async def run():
+        try:
+            return await async_request.rpc_request(
+                "hmyv2_blockNumber",
+                endpoint = rpc_server.endpoint
+            )
+        finally:
+            await async_request.get_default_pool().close()
+
+    assert asyncio.run( run() )[ "result" ] == 7
+    assert rpc_server.headers[ -1 ][ "Authorization" ] == "Bearer token"
+
+
+def test_client( rpc_server ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 7
+    events = []
+    client = HarmonyClient(
+        rpc_server.endpoint,
+        middleware = middleware.MiddlewareChain( [ Recorder( "a",
+                                                             events ) ] )
+    )
+    assert client.blockchain.get_block_number() == 7
+    assert blockchain.get_block_number( rpc_server.endpoint ) == 7
+    assert len( events ) == 2
+    with pytest.raises( TypeError ):
+        middleware.MiddlewareChain( [ object() ] )
@@ -0,0 +1,127 @@
+import asyncio
+import concurrent.futures
+import email.utils
+import threading
+import time
+
+import pytest
+
+from pyhmy.rpc import exceptions, ratelimit, retry
+from pyhmy.rpc.request import rpc_request
+
+RETRY_AFTER = {
+    "Retry-After": "0.2"
+}
+
+
+@pytest.fixture
+def limiter():
+    limiter = ratelimit.RateLimiter()
+    previous = ratelimit.set_default_limiter( limiter )
+    yield limiter
+    ratelimit.set_default_limiter( previous )
+
+
+def _concurrency( rpc_server ):
+    """Serve hmyv2_getBalance slowly and record the concurrency."""
+    lock = threading.Lock()
+    counts = {
+        "current": 0,
+        "max": 0
+    }
+
+    def balance( params ):
+        with lock:
+            counts[ "current" ] += 1
+            counts[ "max" ] = max( counts[ "max" ], counts[ "current" ] )
+        time.sleep( 0.05 )
+        with lock:
+            counts[ "current" ] -= 1
+        return 1
+
+    rpc_server.methods[ "hmyv2_getBalance" ] = balance
+    return counts
+
+
+def test_rate( rpc_server, limiter ):
+    limiter.rate = 20
+    limiter.burst = 1
+    rpc_server.methods[ "hmyv2_getBalance" ] = lambda params: 1
+    start = time.monotonic()
+    for _ in range( 5 ):
+        rpc_request( "hmyv2_getBalance", endpoint = rpc_server.endpoint )
+    assert time.monotonic() - start >= 0.18
+    stats = limiter.stats()[ rpc_server.endpoint ]
+    assert stats[ "requests" ] == 5
+    assert stats[ "delayed" ] == 4
+
+
+def test_max_in_flight( rpc_server, limiter ):
+    limiter.max_in_flight = 2
+    counts = _concurrency( rpc_server )
+    with concurrent.futures.ThreadPoolExecutor( 8 ) as executor:
+        list(
+            executor.map(
+                lambda _: rpc_request(
+                    "hmyv2_getBalance", endpoint = rpc_server.endpoint
+                ),
+                range( 8 )
+            )
+        )
+    assert counts[ "max" ] == 2
+    assert limiter.stats()[ rpc_server.endpoint ][ "in_flight" ] == 0
+
+
+def test_async_max_in_flight( rpc_server, limiter ):
+    pytest.importorskip( "aiohttp" )
+    from pyhmy.rpc import async_request  # pylint: disable=import-outside-toplevel
+    limiter.max_in_flight = 3
+    counts = _concurrency( rpc_server )
+
+    async def run():
+        await asyncio.gather(
+            *[
+                async_request.rpc_request(
+                    "hmyv2_getBalance",
+                    endpoint = rpc_server.endpoint
+                ) for _ in range( 9 )
+            ]
+        )
+        await async_request.get_default_pool().close()
+
+    asyncio.run( run() )
+    assert counts[ "max" ] == 3
+
+
+def test_throttled( rpc_server, limiter ):
+    rpc_server.methods[ "hmyv2_getBalance" ] = lambda params: 1
+    rpc_server.statuses.append( ( 429, RETRY_AFTER ) )
+    with pytest.raises( exceptions.RequestsThrottledError ) as err:
+        rpc_request(
+            "hmyv2_getBalance",
+            endpoint = rpc_server.endpoint,
+            retry_policy = retry.NO_RETRY
+        )
+    assert err.value.retry_after == 0.2
+    # the endpoint is held back for the Retry-After delay
+    start = time.monotonic()
+    rpc_request( "hmyv2_getBalance", endpoint = rpc_server.endpoint )
+    assert time.monotonic() - start >= 0.15
+    assert limiter.stats()[ rpc_server.endpoint ][ "throttled" ] == 1
+
+
+def test_throttled_retried( rpc_server ):
+    rpc_server.methods[ "hmyv2_getBalance" ] = lambda params: 1
+    rpc_server.statuses.append( ( 429, RETRY_AFTER ) )
+    start = time.monotonic()
+    resp = rpc_request( "hmyv2_getBalance", endpoint = rpc_server.endpoint )
+    assert resp[ "result" ] == 1
+    assert time.monotonic() - start >= 0.2
+
+
+def test_parse_retry_after():
+    assert ratelimit.parse_retry_after( "3" ) == 3
+    assert ratelimit.parse_retry_after( None ) is None
+    assert ratelimit.parse_retry_after( "soon" ) is None
+    date = email.utils.formatdate( time.time() + 10, usegmt = True )
+    assert 8 < ratelimit.parse_retry_after( date ) <= 10
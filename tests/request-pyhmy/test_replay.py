@@ -0,0 +1,116 @@
+import asyncio
+import gzip
+import json
+import time
+
+import pytest
+
+from pyhmy import blockchain
+from pyhmy.aio import blockchain as aio_blockchain
+from pyhmy.client import HarmonyClient
+from pyhmy.rpc import batch, exceptions, middleware, replay
+
+
+@pytest.fixture
+def recording( rpc_server, tmp_path ):
+    numbers = iter( range( 10, 20 ) )
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: next( numbers )
+    rpc_server.methods[ "hmyv2_getEpoch" ] = lambda params: 3
+    path = str( tmp_path / "exchanges.jsonl.gz" )
+    with replay.record( path ) as recorder:
+        assert blockchain.get_block_number( rpc_server.endpoint ) == 10
+        assert blockchain.get_block_number( rpc_server.endpoint ) == 11
+        assert blockchain.get_current_epoch( rpc_server.endpoint ) == 3
+    assert recorder.recorded == 3
+    assert len( middleware.get_default_chain() ) == 0
+    return path
+
+
+def test_recording_format( recording, rpc_server ):
+    with gzip.open( recording, "rt" ) as file:
+        exchanges = [ json.loads( line ) for line in file ]
+    assert exchanges[ 0 ][ "endpoint" ] == rpc_server.endpoint
+    request = json.loads( exchanges[ 0 ][ "request" ] )
+    assert request[ "method" ] == "hmyv2_blockNumber"
+    assert json.loads( exchanges[ 1 ][ "reply" ] )[ "result" ] == 11
+    assert exchanges[ 2 ][ "latency" ] > 0
+
+
+def test_replay( recording, dead_endpoint ):
+    with replay.replay( recording ) as replayer:
+        assert len( replayer ) == 3
+        # in order, then the last reply again
+        assert blockchain.get_block_number( dead_endpoint ) == 10
+        assert blockchain.get_block_number( dead_endpoint ) == 11
+        assert blockchain.get_block_number( dead_endpoint ) == 11
+        assert blockchain.get_current_epoch( dead_endpoint ) == 3
+        with pytest.raises( exceptions.ReplayMissError ):
+            blockchain.get_gas_price( dead_endpoint )
+        replayer.rewind()
+        assert blockchain.get_block_number( dead_endpoint ) == 10
+    assert replayer.hits == 5
+    assert replayer.misses == 1
+
+
+def test_latency( recording, dead_endpoint ):
+    with replay.replay( recording, latency = 0.05 ):
+        start = time.monotonic()
+        blockchain.get_current_epoch( dead_endpoint )
+        assert time.monotonic() - start >= 0.05
+    with replay.replay( recording, latency = replay.RECORDED, speed = 1e6 ):
+        start = time.monotonic()
+        blockchain.get_current_epoch( dead_endpoint )
+        assert time.monotonic() - start < 0.05
+
+
+def test_not_strict( recording, rpc_server ):
+    rpc_server.methods[ "hmyv2_gasPrice" ] = lambda params: 1
+    with replay.replay( recording, strict = False, match_endpoint = True ):
+        assert blockchain.get_gas_price( rpc_server.endpoint ) == 1
+        assert blockchain.get_current_epoch( rpc_server.endpoint ) == 3
+    assert rpc_server.requests[ -1 ][ "method" ] == "hmyv2_gasPrice"
+
+
+def test_async( recording, dead_endpoint ):
+    async def run():
+        with replay.replay( recording, latency = 0.01 ):
+            return await asyncio.gather(
+                aio_blockchain.get_current_epoch( dead_endpoint ),
+                aio_blockchain.get_current_epoch( dead_endpoint ),
+            )
+
+    assert asyncio.run( run() ) == [ 3, 3 ]
+
+
+def test_client( recording, dead_endpoint ):
+    client = HarmonyClient(
+        dead_endpoint,
+        middleware = middleware.MiddlewareChain(
+            [ replay.Replay( recording ) ]
+        )
+    )
+    assert client.blockchain.get_current_epoch() == 3
+
+
+def test_batch( rpc_server, dead_endpoint, tmp_path ):
+    rpc_server.methods[ "hmyv2_getBalance" ] = lambda params: len( params[ 0 ] )
+    calls = [
+        ( "hmyv2_getBalance",
+          [ "one1" ] ),
+        ( "hmyv2_getBalance",
+          [ "one12" ] )
+    ]
+    path = str( tmp_path / "batch.jsonl.gz" )
+    with replay.record( path ):
+        recorded = batch.rpc_batch_request(
+            calls,
+            endpoint = rpc_server.endpoint
+        )
+    with replay.replay( path ) as replayer:
+        # the ids of the calls differ from the recorded ones
+        replayed = batch.rpc_batch_request( calls, endpoint = dead_endpoint )
+    ids = [ call.id for call in replayed ]
+    assert not set( ids ).intersection( call.id for call in recorded )
+    assert [ call.result()[ "result" ] for call in replayed ] == [ 4, 5 ]
+    assert [ call.result()[ "id" ] for call in replayed ] == ids
+    assert replayer.hits == 1
@@ -0,0 +1,73 @@
+import pytest
+
+from pyhmy import blockchain, transaction
+from pyhmy.rpc import exceptions, request, retry
+
+
+def test_read_retried( rpc_server ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 7
+    rpc_server.statuses = [ 503, 502 ]
+    assert blockchain.get_block_number( endpoint = rpc_server.endpoint ) == 7
+    assert len( rpc_server.requests ) == 3
+
+
+def test_write_not_retried( rpc_server ):
+    rpc_server.methods[ "hmyv2_sendRawTransaction" ] = lambda params: "0x1"
+    rpc_server.statuses = [ 503 ]
+    with pytest.raises( exceptions.RequestsServerError ) as err:
+        transaction.send_raw_transaction(
+            "0x00",
+            endpoint = rpc_server.endpoint
+        )
+    assert err.value.status_code == 503
+    assert len( rpc_server.requests ) == 1
+
+
+def test_policy_override( rpc_server ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 7
+    rpc_server.statuses = [ 503 ]
+    with pytest.raises( exceptions.RequestsServerError ):
+        request.rpc_request(
+            "hmyv2_blockNumber",
+            endpoint = rpc_server.endpoint,
+            retry_policy = retry.NO_RETRY
+        )
+    previous = retry.set_default_policy(
+        retry.RetryPolicy( max_attempts = 2,
+                           backoff = 0 )
+    )
+    try:
+        rpc_server.statuses = [ 503, 503 ]
+        with pytest.raises( exceptions.RequestsServerError ):
+            blockchain.get_block_number( endpoint = rpc_server.endpoint )
+    finally:
+        retry.set_default_policy( previous )
+    assert len( rpc_server.requests ) == 3
+
+
+def test_backoff():
+    policy = retry.RetryPolicy(
+        max_attempts = 5,
+        backoff = 0.1,
+        max_backoff = 0.3,
+        jitter = retry.JITTER_NONE
+    )
+    delays = [ policy.delay( attempt ) for attempt in range( 1, 5 ) ]
+    assert delays == [ 0.1, 0.2, 0.3, 0.3 ]
+    jittered = retry.RetryPolicy( backoff = 1, jitter = retry.JITTER_EQUAL )
+    assert 0.5 <= jittered.delay( 1 ) <= 1
+    assert policy.is_retryable( "hmyv2_getBlockByNumber" )
+    assert not policy.is_retryable( "hmyv2_sendRawTransaction" )
+    assert not policy.is_retryable(
+        [ "hmyv2_getBalance",
+          "hmyv2_sendRawTransaction" ]
+    )
+    assert not policy.should_retry(
+        "hmyv2_getBalance",
+        exceptions.RPCError( "hmyv2_getBalance",
+                             "",
+                             "" ),
+        1
+    )
+    with pytest.raises( ValueError ):
+        retry.RetryPolicy( jitter = "random" )
@@ -0,0 +1,238 @@
+import threading
+import time
+
+import pytest
+
+from pyhmy import scanner
+from pyhmy.rpc.exceptions import RPCError
+
+
+def serve_shard( server, shard, head, spacing, offset = 0 ):
+    blocks = [
+        {
+            "number": number,
+            "hash": f"0x{shard}{number}",
+            "parentHash": f"0x{shard}{number - 1}",
+            "timestamp": offset + number * spacing,
+        } for number in range( head + 1 )
+    ]
+    server.blocks = blocks
+    server.methods[ "hmyv2_blockNumber" ] = lambda params: len( blocks ) - 1
+    server.methods[ "hmyv2_getBlockByNumber" ] = lambda params: (
+        blocks[ params[ 0 ] ] if params[ 0 ] < len( blocks ) else None
+    )
+
+    def get_blocks( params ):
+        first, last = params[ 0 ], params[ 1 ]
+        return blocks[ first : last + 1 ]
+
+    server.methods[ "hmyv2_getBlocks" ] = get_blocks
+
+
+@pytest.fixture
+def network( make_rpc_server ):
+    shards = [ make_rpc_server(), make_rpc_server() ]
+    # shard 0 makes a block every 2 seconds, shard 1 every 3
+    serve_shard( shards[ 0 ], 0, 30, 2 )
+    serve_shard( shards[ 1 ], 1, 20, 3, offset = 1 )
+    shards[ 0 ].methods[ "hmyv2_getShardingStructure" ] = lambda params: [
+        {
+            "current": shard == 0, "http": server.endpoint, "shardID": shard,
+            "wss": ""
+        } for shard, server in enumerate( shards )
+    ]
+    return shards
+
+
+def test_discover( network ):
+    assert scanner.discover( network[ 0 ].endpoint ) == {
+        0: network[ 0 ].endpoint,
+        1: network[ 1 ].endpoint,
+    }
+    scan = scanner.ShardScanner( network[ 0 ].endpoint, shards = [ 1 ] )
+    assert scan.endpoints() == {
+        1: network[ 1 ].endpoint
+    }
+
+
+def test_timestamp_order( network ):
+    scan = scanner.ShardScanner(
+        network[ 0 ].endpoint,
+        start_block = 0,
+        end_block = {
+            0: 30,
+            1: 20
+        },
+        queue_size = 4,
+    )
+    events = list( scan.scan() )
+    assert len( events ) == 52
+    keys = [ ( event.block[ "timestamp" ], event.shard ) for event in events ]
+    assert keys == sorted( keys )
+    stats = scan.stats()
+    assert stats[ 0 ][ "last_block" ] == 30
+    assert stats[ 1 ][ "lag_blocks" ] == 0
+    assert stats[ 1 ][ "events" ] == 21
+
+
+def test_shard_order( network ):
+    scan = scanner.ShardScanner(
+        network[ 0 ].endpoint,
+        start_block = {
+            0: 25,
+            1: 18
+        },
+        end_block = {
+            0: 30,
+            1: 20
+        },
+        order = scanner.ORDER_SHARD,
+    )
+    events = list( scan.scan() )
+    assert [ event.shard for event in events ] == [ 0 ] * 6 + [ 1 ] * 3
+    numbers = [ event.number for event in events ]
+    assert numbers == list( range( 25, 31 ) ) + list( range( 18, 21 ) )
+
+
+def test_follow_and_lag( network ):
+    scan = scanner.ShardScanner(
+        network[ 0 ].endpoint,
+        start_block = {
+            0: 28,
+            1: 20
+        },
+        order = scanner.ORDER_ARRIVAL,
+        follower_options = {
+            "min_interval": 0.01,
+            "max_interval": 0.05
+        },
+    )
+    events = []
+    stats = {}
+
+    def consume():
+        for event in scan.scan():
+            events.append( ( event.shard, event.number ) )
+            if len( events ) == 4:
+                stats.update( scan.stats() )
+                scan.stop()
+
+    thread = threading.Thread( target = consume, daemon = True )
+    thread.start()
+    thread.join( 10 )
+    assert not thread.is_alive()
+    assert sorted( events ) == [ ( 0, 28 ), ( 0, 29 ), ( 0, 30 ), ( 1, 20 ) ]
+    assert stats[ 0 ][ "head" ] == 30
+    assert stats[ 1 ][ "lag_blocks" ] == 0
+    assert stats[ 1 ][ "lag_seconds" ] > 0
+
+
+def test_follow_retries_rpc_errors( network ):
+    get_block = network[ 1 ].methods[ "hmyv2_getBlockByNumber" ]
+    failures = [ 2 ]
+
+    def flaky( params ):
+        if failures[ 0 ]:
+            failures[ 0 ] -= 1
+            return {
+                "error": {
+                    "code": -32000,
+                    "message": "unavailable"
+                }
+            }
+        return get_block( params )
+
+    network[ 1 ].methods[ "hmyv2_getBlockByNumber" ] = flaky
+    scan = scanner.ShardScanner(
+        network[ 0 ].endpoint,
+        shards = [ 1 ],
+        start_block = 19,
+        order = scanner.ORDER_ARRIVAL,
+        follower_options = {
+            "min_interval": 0.01,
+            "max_interval": 0.05
+        },
+    )
+    events = []
+    for event in scan.scan():
+        events.append( event.number )
+        if len( events ) == 2:
+            scan.stop()
+    assert events == [ 19, 20 ]
+    assert failures == [ 0 ]
+
+
+def test_timestamp_order_does_not_wait_for_idle_shard( network ):
+    blocks = network[ 1 ].blocks
+    network[ 1 ].methods[ "hmyv2_getBlocks" ] = lambda params: (
+        time.sleep( 1 ) or blocks[ params[ 0 ]: params[ 1 ] + 1 ]
+    )
+    scan = scanner.ShardScanner(
+        network[ 0 ].endpoint,
+        start_block = 0,
+        end_block = {
+            0: 3,
+            1: 0
+        },
+        max_delay = 0.1,
+    )
+    events = scan.scan()
+    began = time.monotonic()
+    assert next( events ).shard == 0
+    assert time.monotonic() - began < 1
+    events.close()
+
+
+def test_timestamp_order_with_stalled_shard( network ):
+    release = threading.Event()
+    blocks = network[ 1 ].blocks
+    network[ 1 ].methods[ "hmyv2_getBlocks" ] = lambda params: (
+        release.wait( 10 ) and blocks[ params[ 0 ]: params[ 1 ] + 1 ]
+    )
+    scan = scanner.ShardScanner(
+        network[ 0 ].endpoint,
+        start_block = 0,
+        end_block = {
+            0: 9,
+            1: 0
+        },
+        max_delay = 0.2,
+    )
+    events = scan.scan()
+    try:
+        began = time.monotonic()
+        numbers = [ next( events ).number for _ in range( 10 ) ]
+        elapsed = time.monotonic() - began
+        release.set()
+        assert ( next( events ).shard, next( events, None ) ) == ( 1, None )
+    finally:
+        release.set()
+        events.close()
+    assert numbers == list( range( 10 ) )
+    # the stalled shard delays the others once, not before every event
+    assert elapsed < 0.2 + 0.5
+
+
+def test_shard_order_needs_end( network ):
+    with pytest.raises( ValueError ):
+        scanner.ShardScanner(
+            network[ 0 ].endpoint,
+            order = scanner.ORDER_SHARD
+        )
+
+
+def test_shard_error( network ):
+    network[ 1 ].methods[ "hmyv2_getBlocks" ] = lambda params: {
+        "error": {
+            "code": -1, "message": "pruned"
+        }
+    }
+    scan = scanner.ShardScanner(
+        network[ 0 ].endpoint,
+        start_block = 0,
+        end_block = 2,
+        workers = 1,
+        order = scanner.ORDER_SHARD,
+    )
+    with pytest.raises( RPCError ):
+        list( scan.scan() )
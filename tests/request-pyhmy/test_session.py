@@ -0,0 +1,43 @@
+import pytest
+
+from pyhmy.rpc import request, session
+
+
+def test_session_per_endpoint():
+    with session.SessionPool( pool_maxsize = 4 ) as pool:
+        first = pool.get_session( "http://localhost:9620" )
+        assert pool.get_session( "http://LOCALHOST:9620/" ) is first
+        assert pool.get_session( "http://localhost:9621" ) is not first
+        adapter = first.get_adapter( "http://localhost:9620" )
+        assert adapter._pool_maxsize == 4
+        assert len( pool.endpoints() ) == 2
+    assert pool.endpoints() == []
+
+
+def test_set_default_pool():
+    pool = session.SessionPool()
+    previous = session.set_default_pool( pool )
+    try:
+        assert session.get_default_pool() is pool
+        with pytest.raises( TypeError ):
+            session.set_default_pool( "not a pool" )
+    finally:
+        session.set_default_pool( previous )
+        pool.close()
+
+
+def test_keep_alive( rpc_server ):
+    rpc_server.methods[ "hmyv2_blockNumber" ] = lambda params: 7
+    pool = session.SessionPool()
+    previous = session.set_default_pool( pool )
+    try:
+        for _ in range( 5 ):
+            reply = request.rpc_request(
+                "hmyv2_blockNumber",
+                endpoint = rpc_server.endpoint
+            )
+            assert reply[ "result" ] == 7
+    finally:
+        session.set_default_pool( previous )
+        pool.close()
+    assert rpc_server.connections == 1
@@ -0,0 +1,152 @@
+import asyncio
+import concurrent.futures
+import time
+
+import pytest
+
+from pyhmy import account, blockchain
+from pyhmy.rpc import exceptions, singleflight
+
+
+def _slow_header( params ):
+    time.sleep( 0.2 )
+    return {
+        "blockNumber": 7
+    }
+
+
+def test_coalesced( rpc_server ):
+    rpc_server.methods[ "hmyv2_latestHeader" ] = _slow_header
+    rpc_server.methods[ "hmyv2_getBalance" ] = lambda params: 1
+
+    def get_header( _ ):
+        return blockchain.get_latest_header( endpoint = rpc_server.endpoint )
+
+    def get_balance( _ ):
+        return account.get_balance( "one1", endpoint = rpc_server.endpoint )
+
+    with concurrent.futures.ThreadPoolExecutor( 10 ) as executor:
+        headers = list( executor.map( get_header, range( 10 ) ) )
+        assert len( rpc_server.requests ) == 1
+        assert all( header is headers[ 0 ] for header in headers )
+
+        balances = list( executor.map( get_balance, range( 10 ) ) )
+        assert balances == [ 1 ] * 10
+        assert len( rpc_server.requests ) == 11
+
+
+def test_errors_shared():
+    group = singleflight.SingleFlight()
+    calls = []
+
+    def fail():
+        calls.append( 1 )
+        time.sleep( 0.1 )
+        raise exceptions.RPCError( "hmyv2_latestHeader", "", "error" )
+
+    def call():
+        with pytest.raises( exceptions.RPCError ):
+            group.do( "key", fail )
+
+    with concurrent.futures.ThreadPoolExecutor( 4 ) as executor:
+        for future in [ executor.submit( call ) for _ in range( 4 ) ]:
+            future.result()
+    assert len( calls ) == 1
+    assert group.stats() == {
+        "leaders": 1,
+        "shared": 3,
+        "in_flight": 0
+    }
+
+
+def test_async_coalesced():
+    group = singleflight.SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append( 1 )
+        await asyncio.sleep( 0.1 )
+        return {
+            "blockNumber": 7
+        }
+
+    async def run():
+        return await asyncio.gather(
+            *[ group.async_do( "key",
+                               fetch ) for _ in range( 5 ) ]
+        )
+
+    results = asyncio.run( run() )
+    assert len( calls ) == 1
+    assert all( result is results[ 0 ] for result in results )
+
+
+def test_async_leader_cancelled():
+    group = singleflight.SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append( 1 )
+        await asyncio.sleep( 0.1 )
+        return 7
+
+    async def run():
+        leader = asyncio.ensure_future( group.async_do( "key", fetch ) )
+        await asyncio.sleep( 0 )
+        followers = [
+            asyncio.ensure_future( group.async_do( "key",
+                                                   fetch ) )
+            for _ in range( 3 )
+        ]
+        await asyncio.sleep( 0.01 )
+        leader.cancel()
+        results = await asyncio.gather( *followers )
+        return leader.cancelled(), results
+
+    assert asyncio.run( run() ) == ( True, [ 7, 7, 7 ] )
+    assert len( calls ) == 1
+    assert group.stats()[ "in_flight" ] == 0
+
+
+def test_async_all_cancelled():
+    group = singleflight.SingleFlight()
+    finished = []
+
+    async def fetch():
+        await asyncio.sleep( 1 )
+        finished.append( 1 )
+
+    async def run():
+        callers = [
+            asyncio.ensure_future( group.async_do( "key",
+                                                   fetch ) )
+            for _ in range( 2 )
+        ]
+        await asyncio.sleep( 0.01 )
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather( *callers, return_exceptions = True )
+        await asyncio.sleep( 0 )
+
+    asyncio.run( run() )
+    assert not finished
+    assert group.stats()[ "in_flight" ] == 0
+
+
+def test_default_group():
+    previous = singleflight.set_default_group( None )
+    try:
+        assert singleflight.get_default_group() is None
+        assert singleflight.coalesce(
+            lambda: 1,
+            "hmyv2_latestHeader",
+            [],
+            "http://localhost:9620"
+        ) == 1
+    finally:
+        singleflight.set_default_group( previous )
+    assert previous.applies( "hmyv2_latestHeader" )
+    assert not previous.applies( "hmyv2_getBalance" )
+    assert not singleflight.SingleFlight( None ).applies(
+        "hmyv2_sendRawTransaction"
+    )
@@ -0,0 +1,132 @@
+import asyncio
+import json
+
+import pytest
+
+from pyhmy import account, blockchain
+from pyhmy.rpc import exceptions
+from pyhmy.rpc.stream import JSONArrayStream
+
+
+def _blocks( params ):
+    return [
+        {
+            "number": number,
+            "hash": "0x" + "ab" * 32,
+            "extra": "]},\"{[" * 10,
+            "transactions": [ {
+                "value": 10**21 + number
+            } ] * 20,
+        } for number in range( params[ 0 ], params[ 1 ] + 1 )
+    ]
+
+
+def test_chunks():
+    reply = {
+        "jsonrpc": "2.0",
+        "id": "1",
+        "result": {
+            "other": [ 1,
+                       {
+                           "transactions": [ 2 ]
+                       } ],
+            "transactions": [
+                "0x1",
+                {
+                    "a": [ "é€\\\"" ]
+                },
+                12345678901234567890123,
+                None
+            ],
+        },
+    }
+    data = json.dumps( reply, ensure_ascii = False ).encode()
+    for size in ( 1, 3, 7, 64 ):
+        parser = JSONArrayStream( ( "result", "transactions" ) )
+        elements = []
+        for start in range( 0, len( data ), size ):
+            elements += parser.feed( data[ start : start + size ] )
+        elements += parser.close()
+        assert elements == reply[ "result" ][ "transactions" ]
+        assert parser.done
+
+
+def test_memory_bounded():
+    data = json.dumps(
+        {
+            "jsonrpc": "2.0",
+            "id": "1",
+            "result": _blocks( [ 0,
+                                 200 ] )
+        }
+    ).encode()
+    element = len( json.dumps( _blocks( [ 0, 0 ] )[ 0 ] ) )
+    parser = JSONArrayStream()
+    count = 0
+    for start in range( 0, len( data ), 1024 ):
+        count += len( parser.feed( data[ start : start + 1024 ] ) )
+        assert len( parser._text ) <= element + 1024  # pylint: disable=protected-access
+    assert count == 201
+
+
+def test_truncated():
+    parser = JSONArrayStream()
+    assert parser.feed( b'{"result":[1,{"a":' ) == [ 1 ]
+    with pytest.raises( json.decoder.JSONDecodeError ):
+        parser.close()
+
+
+def test_iter_blocks( rpc_server ):
+    rpc_server.methods[ "hmyv2_getBlocks" ] = _blocks
+    blocks = blockchain.iter_blocks( 1, 50, endpoint = rpc_server.endpoint )
+    assert next( blocks )[ "number" ] == 1
+    assert list( blocks ) == _blocks( [ 2, 50 ] )
+
+
+def test_iter_history( rpc_server ):
+    rpc_server.methods[ "hmyv2_getTransactionsHistory" ] = lambda params: {
+        "transactions": [ "0x1", "0x2" ]
+    }
+    assert list(
+        account.iter_transaction_history(
+            "one1",
+            endpoint = rpc_server.endpoint
+        )
+    ) == [ "0x1",
+           "0x2" ]
+
+
+def test_errors( rpc_server ):
+    rpc_server.methods[ "hmyv2_getBlocks" ] = lambda params: None
+    assert not list(
+        blockchain.iter_blocks( 1,
+                                2,
+                                endpoint = rpc_server.endpoint )
+    )
+    with pytest.raises( exceptions.RPCError ):
+        list(
+            account.iter_staking_transaction_history(
+                "one1",
+                endpoint = rpc_server.endpoint
+            )
+        )
+
+
+def test_async_iter_blocks( rpc_server ):
+    pytest.importorskip( "aiohttp" )
+    # pylint: disable=import-outside-toplevel
+    from pyhmy.aio import blockchain as aio_blockchain
+    from pyhmy.rpc import async_request
+    rpc_server.methods[ "hmyv2_getBlocks" ] = _blocks
+
+    async def run():
+        stream = aio_blockchain.iter_blocks(
+            1,
+            20,
+            endpoint = rpc_server.endpoint
+        )
+        blocks = [ block async for block in stream ]
+        await async_request.get_default_pool().close()
+        return blocks
+
+    assert asyncio.run( run() ) == _blocks( [ 1, 20 ] )
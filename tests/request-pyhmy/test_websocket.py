@@ -0,0 +1,198 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+aiohttp = pytest.importorskip( "aiohttp" )
+
+from aiohttp import web  # pylint: disable=wrong-import-position
+
+from pyhmy import blockchain  # pylint: disable=wrong-import-position
+from pyhmy.rpc import batch, exceptions, websocket  # pylint: disable=wrong-import-position
+
+
+class WSServer:
+    """Local JSON-RPC WebSocket server, answering `hmyv2_blockNumber` and
+    `eth_subscribe`, run by an event loop in a background thread."""
+    def __init__( self ):
+        self.sockets = []
+        self.subscribes = 0
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread( target = self.loop.run_forever )
+        self.thread.start()
+        self.runner, self.port = self.run( self._start() )
+
+    def run( self, coroutine ):
+        return asyncio.run_coroutine_threadsafe( coroutine, self.loop ).result()
+
+    async def _start( self ):
+        app = web.Application()
+        app.router.add_get( "/", self._handle )
+        runner = web.AppRunner( app )
+        await runner.setup()
+        site = web.TCPSite( runner, "127.0.0.1", 0 )
+        await site.start()
+        return runner, site._server.sockets[ 0 ].getsockname()[ 1 ]  # pylint: disable=protected-access
+
+    @property
+    def endpoint( self ):
+        return f"ws://127.0.0.1:{self.port}"
+
+    async def _handle( self, request ):
+        socket = web.WebSocketResponse()
+        await socket.prepare( request )
+        self.sockets.append( socket )
+        async for message in socket:
+            payload = json.loads( message.data )
+            calls = payload if isinstance( payload, list ) else [ payload ]
+            replies = []
+            for call in calls:
+                if call[ "method" ] == "eth_subscribe":
+                    self.subscribes += 1
+                    result = f"0x{self.subscribes}"
+                else:
+                    result = 42
+                replies.append(
+                    {
+                        "jsonrpc": "2.0",
+                        "id": call[ "id" ],
+                        "result": result
+                    }
+                )
+            if not isinstance( payload, list ):
+                replies = replies[ 0 ]
+            await socket.send_str( json.dumps( replies ) )
+        return socket
+
+    def notify( self, result ):
+        self.send(
+            json.dumps(
+                {
+                    "jsonrpc": "2.0",
+                    "method": "eth_subscription",
+                    "params": {
+                        "subscription": f"0x{self.subscribes}",
+                        "result": result
+                    },
+                }
+            )
+        )
+
+    def send( self, text ):
+        async def send():
+            for socket in self.sockets:
+                if not socket.closed:
+                    await socket.send_str( text )
+
+        self.run( send() )
+
+    def drop( self ):
+        async def close():
+            for socket in self.sockets:
+                await socket.close()
+            self.sockets.clear()
+
+        self.run( close() )
+
+    def close( self ):
+        self.run( self.runner.cleanup() )
+        self.loop.call_soon_threadsafe( self.loop.stop )
+        self.thread.join()
+
+
+@pytest.fixture
+def ws_server():
+    server = WSServer()
+    yield server
+    websocket.close_clients()
+    server.close()
+
+
+def test_request( ws_server ):
+    assert blockchain.get_block_number( endpoint = ws_server.endpoint ) == 42
+    calls = batch.rpc_batch_request(
+        [ ( "hmyv2_blockNumber",
+            [] ) ] * 3,
+        endpoint = ws_server.endpoint
+    )
+    assert [ call.result()[ "result" ] for call in calls ] == [ 42 ] * 3
+
+
+def test_subscription_reconnect( ws_server ):
+    with websocket.WebSocketClient(
+        ws_server.endpoint,
+        reconnect_delay = 0.01
+    ) as client:
+        heads = client.new_heads()
+        ws_server.notify( {
+            "number": "0x1"
+        } )
+        assert next( heads ) == {
+            "number": "0x1"
+        }
+        ws_server.drop()
+        # wait for the client to resubscribe on a new connection
+        while ws_server.subscribes < 2:
+            time.sleep( 0.01 )
+        assert client.rpc_request( "hmyv2_blockNumber" )[ "result" ] == 42
+        ws_server.notify( {
+            "number": "0x2"
+        } )
+        assert next( heads ) == {
+            "number": "0x2"
+        }
+        assert client.transport.stats()[ "connects" ] == 2
+        heads.unsubscribe()
+        assert not list( heads )
+
+
+def test_async_subscription( ws_server ):
+    async def run():
+        async with websocket.WebSocketTransport(
+            ws_server.endpoint
+        ) as transport:
+            logs = await transport.logs( address = "0x1", maxsize = 1 )
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                ws_server.notify,
+                "0xa"
+            )
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                ws_server.notify,
+                "0xb"
+            )
+            while logs.dropped == 0:
+                await asyncio.sleep( 0.01 )
+            assert await logs.__anext__() == "0xb"
+            with pytest.raises( exceptions.RequestsTimeoutError ):
+                await transport.request(
+                    {
+                        "id": 1,
+                        "method": "hmyv2_blockNumber"
+                    },
+                    timeout = 0
+                )
+        return [ log async for log in logs ]
+
+    assert asyncio.run( run() ) == []
+
+
+def test_malformed_frames( ws_server ):
+    with websocket.WebSocketClient( ws_server.endpoint ) as client:
+        assert client.rpc_request( "hmyv2_blockNumber" )[ "result" ] == 42
+        frames = (
+            "null",
+            "3",
+            '"x"',
+            "[1, null]",
+            '{"params": 5}',
+            '[{"id": [1]}]'
+        )
+        for text in frames:
+            ws_server.send( text )
+        # the connection survived them
+        assert client.rpc_request( "hmyv2_blockNumber" )[ "result" ] == 42
+        assert client.transport.stats()[ "connects" ] == 1